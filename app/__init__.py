@@ -1,12 +1,17 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# APP_IMPORT_PROFILE=1: catat waktu import per modul selama boot
+# (/api/admin/import-timings). Dipasang sebelum import lainnya
+from .import_profile import import_profiler
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
+
 # SQLAlchemy and Migrate objects
 db = SQLAlchemy()
 migrate = Migrate()
@@ -55,7 +60,8 @@ def create_app():
     
     # Init SQLAlchemy and Migrate
     db.init_app(app)
-    migrate.init_app(app, db)
+    from .database import MIGRATIONS_DIR
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR)
 
     # Register blueprints
     from .routes import main
@@ -77,6 +83,7 @@ def create_app():
     from .routes_prediction import prediction_bp
     from .routes_njop_api import njop_bp
     from .routes_jual_prediction import jual_prediction_bp
+    from .routes_batch_prediction import batch_prediction_bp
     # ML routes imports removed - to be rebuilt from scratch
     
     app.register_blueprint(main)
@@ -98,43 +105,42 @@ def create_app():
     app.register_blueprint(prediction_bp, url_prefix='/prediction')
     app.register_blueprint(njop_bp)
     app.register_blueprint(jual_prediction_bp)
+    app.register_blueprint(batch_prediction_bp)
     # ML blueprint registration removed - to be rebuilt from scratch
 
-    # Initialize DB tables - with better error handling
+    # Counter status (listener ORM) + `flask reconcile-status-counters`
+    from .status_counters import reconcile_status_counters_command
+    app.cli.add_command(reconcile_status_counters_command)
+
+    # Model prediksi dimuat saat request prediksi pertama; PREDICTION_WARMUP=1
+    # memuatnya di background thread agar request pertama tidak menunggu.
+    # PREDICTION_PRELOAD=1 (gunicorn --preload, lihat gunicorn.conf.py) memuat
+    # model sekarang di master agar worker berbagi memori copy-on-write
+    if os.environ.get('PREDICTION_PRELOAD') == '1':
+        from prediction_system import prediction_system
+        from .routes_jual_prediction import ensure_tanah_models, ensure_bangunan_models
+        prediction_system.load_models()
+        ensure_tanah_models()
+        ensure_bangunan_models()
+    elif os.environ.get('PREDICTION_WARMUP') == '1':
+        from .routes_jual_prediction import warm_up_models
+        warm_up_models()
+
+    # Skema database dikelola migration (`flask db upgrade`, sekali per deploy).
+    # Worker hanya membaca versi skema (satu SELECT ke alembic_version), tanpa DDL
     with app.app_context():
-        try:
-            from .database import init_mysql_db
-            from .models_sqlalchemy import RentalAsset, RentalRequest
-            from .models_rental_transaction import RentalTransaction
-            from .models_user_notification import UserNotification
-            
-            # Try to initialize MySQL database
-            success = init_mysql_db()
-            if success:
-                print("[OK] Database initialized successfully")
-            else:
-                print("[ERROR] Database initialization failed")
-                print("[INFO] Run 'python fix_database_init.py' to fix database issues")
-                # Don't return app here, let it continue to start
-            
-            # Try to create SQLAlchemy tables
-            try:
-                db.create_all()
-                print("[OK] SQLAlchemy tables created successfully")
-            except Exception as e:
-                if "doesn't exist in engine" in str(e) or "Table" in str(e) and "doesn't exist" in str(e):
-                    print(f"[WARNING] Database table check failed: {e}")
-                    print("[INFO] Run 'python fix_database_init.py' to initialize tables")
-                elif "Tablespace" in str(e):
-                    print(f"[ERROR] Tablespace error: {e}")
-                    print("[INFO] Run 'python fix_database_tablespace.py' to fix this issue")
-                else:
-                    print(f"[ERROR] Error creating tables: {e}")
-                # Don't return here - let the app start anyway
-                
-        except Exception as e:
-            print(f"[ERROR] Error during database setup: {e}")
-            print("[INFO] Run 'python fix_database_init.py' to fix database issues")
-            # Let the app continue to start
+        from .database import check_schema_version
+        
+        schema = check_schema_version()
+        if schema['up_to_date']:
+            print(f"[OK] Database schema up to date ({', '.join(schema['head'])})")
+        else:
+            current = ', '.join(schema['current']) if schema['current'] else 'belum dimigrasi'
+            print(f"[WARNING] Database schema {current}, head {', '.join(schema['head'])}")
+            print("[INFO] Run 'flask db upgrade' to apply migrations")
+            # Don't stop here - let the app start anyway
+
+    # Boot selesai: import setelah ini (lazy, saat request) tidak dicatat
+    import_profiler.stop()
 
     return app
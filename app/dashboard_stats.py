@@ -0,0 +1,319 @@
+"""
+Dashboard Statistics Service
+============================
+
+Semua KPI dashboard admin (aset, pengajuan sewa, transaksi, user) dihitung
+dengan beberapa query conditional aggregation (SUM(CASE WHEN status = ...))
+di database, bukan 15-20 query COUNT terpisah + load semua transaksi aktif.
+
+Hasil di-cache per proses selama DASHBOARD_STATS_TTL_SECONDS dan dipakai
+bersama oleh admin_dashboard, /api/dashboard/stats dan test_dashboard.
+
+Invalidasi:
+- Otomatis setelah commit ORM yang menambah/mengubah/menghapus RentalAsset,
+  RentalRequest atau RentalTransaction (session event)
+- Manual lewat invalidate_dashboard_stats() untuk jalur SQL mentah
+  (raw connection / cursor) yang tidak melewati ORM
+
+Snapshot disimpan per worker, tetapi dikunci pada generation bersama di file
+SQLite (instance/dashboard_stats.sqlite3, DASHBOARD_STATS_DB) seperti
+SQLitePredictionCache.bump_generation: invalidasi menaikkan generation, dan
+setiap worker menghitung ulang begitu generation snapshot-nya tertinggal.
+Generation dibaca ulang paling sering sekali per
+DASHBOARD_STATS_GENERATION_CHECK_SECONDS, jadi request dalam interval itu
+dilayani dari memori tanpa I/O (worker lain melihat invalidasi paling lambat
+setelah interval tersebut).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import case, event, func, text
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models_sqlalchemy import RentalAsset, RentalRequest
+from app.models_rental_transaction import RentalTransaction
+
+DASHBOARD_STATS_TTL_SECONDS = float(os.environ.get('DASHBOARD_STATS_TTL_SECONDS', 30))
+DEFAULT_GENERATION_DB = Path(__file__).parent.parent / "instance" / "dashboard_stats.sqlite3"
+GENERATION_CHECK_SECONDS = float(os.environ.get('DASHBOARD_STATS_GENERATION_CHECK_SECONDS', 1.0))
+
+# Model yang mempengaruhi KPI dashboard
+TRACKED_MODELS = (RentalAsset, RentalRequest, RentalTransaction)
+
+
+def count_if(condition):
+    """COUNT baris yang memenuhi kondisi (SUM(CASE WHEN ... THEN 1 ELSE 0))"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _number(value):
+    return float(value) if value else 0
+
+
+def compute_dashboard_stats():
+    """
+    Hitung semua KPI dashboard langsung dari database (tanpa cache)
+
+    Returns:
+        dict: statistik aset, pengajuan, transaksi dan user
+    """
+    now = datetime.now()
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    current_month = now.replace(day=1)
+    next_month = now + timedelta(days=30)
+
+    # 1. Aset: jumlah per status, harga, aset baru
+    assets = db.session.query(
+        func.count(RentalAsset.id),
+        count_if(RentalAsset.status == 'available'),
+        count_if(RentalAsset.status == 'rented'),
+        count_if(RentalAsset.status == 'maintenance'),
+        func.avg(RentalAsset.harga_sewa),
+        func.min(RentalAsset.harga_sewa),
+        func.max(RentalAsset.harga_sewa),
+        func.avg(case((RentalAsset.asset_type == 'tanah', RentalAsset.harga_sewa))),
+        func.avg(case((RentalAsset.asset_type == 'bangunan', RentalAsset.harga_sewa))),
+        count_if(RentalAsset.created_at >= thirty_days_ago)
+    ).one()
+    (total_assets, available_assets, rented_assets, maintenance_assets, avg_price,
+     min_price, max_price, avg_tanah_price, avg_bangunan_price, new_assets) = assets
+
+    # 2. Pengajuan sewa
+    pending_requests, approved_requests, new_requests = db.session.query(
+        count_if(RentalRequest.status == 'pending'),
+        count_if(RentalRequest.status == 'approved'),
+        count_if(RentalRequest.created_at >= thirty_days_ago)
+    ).one()
+
+    # 3. Transaksi: revenue & penyewa aktif dihitung di database
+    is_active = RentalTransaction.status == 'active'
+    transactions = db.session.query(
+        func.sum(case((is_active, RentalTransaction.monthly_price))),
+        func.count(func.distinct(case((is_active, RentalTransaction.user_id)))),
+        func.count(func.distinct(case(
+            (is_active & (RentalTransaction.start_date >= current_month), RentalTransaction.user_id)
+        ))),
+        func.avg(case((is_active, RentalTransaction.total_months))),
+        count_if(RentalTransaction.status == 'completed'),
+        count_if(RentalTransaction.status == 'renewed'),
+        count_if(RentalTransaction.status == 'expired'),
+        count_if(is_active & (RentalTransaction.end_date <= next_month))
+    ).one()
+    (monthly_revenue, active_renters, new_renters, avg_duration,
+     completed_transactions, renewed_transactions, expired_transactions, expiring_contracts) = transactions
+
+    # 4. User (tabel users dikelola dengan SQL mentah)
+    total_users = db.session.execute(text("SELECT COUNT(id) FROM users WHERE role = 'pengguna'")).scalar() or 0
+
+    occupancy_rate = (rented_assets / total_assets * 100) if total_assets > 0 else 0
+    retention_rate = (renewed_transactions / completed_transactions * 100) if completed_transactions > 0 else 0
+    renewal_base = expired_transactions + renewed_transactions
+    renewal_rate = (renewed_transactions / renewal_base * 100) if renewal_base > 0 else 0
+    avg_rental_duration = _number(avg_duration)
+
+    return {
+        # Aset
+        'total_assets': total_assets,
+        'available_assets': available_assets,
+        'rented_assets': rented_assets,
+        'maintenance_assets': maintenance_assets,
+        'occupancy_rate': round(occupancy_rate, 2),
+        'new_assets_this_month': new_assets,
+
+        # Harga
+        'avg_rental_price': _number(avg_price),
+        'min_price': _number(min_price),
+        'max_price': _number(max_price),
+        'avg_tanah_price': _number(avg_tanah_price),
+        'avg_bangunan_price': _number(avg_bangunan_price),
+
+        # Pengajuan
+        'pending_requests': pending_requests,
+        'approved_requests': approved_requests,
+        'new_requests_this_month': new_requests,
+
+        # Transaksi
+        'monthly_revenue': _number(monthly_revenue),
+        'active_renters': active_renters,
+        'new_renters_this_month': new_renters,
+        'avg_rental_duration': int(avg_rental_duration) if avg_rental_duration == round(avg_rental_duration) else round(avg_rental_duration, 1),
+        'retention_rate': retention_rate,
+        'expiring_contracts': expiring_contracts,
+        'renewal_rate': renewal_rate,
+
+        # User
+        'total_users': total_users
+    }
+
+
+class DashboardStatsCache:
+    """
+    Cache TTL untuk hasil compute_dashboard_stats
+
+    Snapshot per proses, berlaku selama TTL belum habis dan generation bersama
+    (file SQLite, dibaca semua worker) belum dinaikkan sejak snapshot dihitung.
+    Generation bersama dibaca ulang paling sering sekali per
+    generation_check_interval detik.
+    """
+
+    def __init__(self, ttl_seconds=DASHBOARD_STATS_TTL_SECONDS, db_path=None,
+                 generation_check_interval=GENERATION_CHECK_SECONDS):
+        self.ttl = ttl_seconds
+        if db_path is None:
+            db_path = os.environ.get('DASHBOARD_STATS_DB') or DEFAULT_GENERATION_DB
+        self.db_path = Path(db_path)
+        self.generation_check_interval = generation_check_interval
+        self._stats = None
+        self._stats_generation = None
+        self._computed_at = 0.0
+        self._seen_generation = None
+        self._generation_checked_at = None
+        self._lock = threading.Lock()
+        self._compute_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self):
+        """Koneksi per thread dan per proses (aman setelah fork gunicorn)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_meta ("
+                " name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO cache_meta (name, value) VALUES ('generation', 0)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @property
+    def generation(self):
+        """Generation bersama semua worker (None jika file tidak bisa dibaca)"""
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM cache_meta WHERE name = 'generation'"
+            ).fetchone()
+            return row[0] if row else 0
+        except sqlite3.Error as e:
+            print(f"⚠️ Warning: Dashboard stats generation read failed: {e}")
+            return None
+
+    def _current_generation(self, force=False):
+        """Generation bersama, dari memori jika baru dibaca < generation_check_interval lalu"""
+        now = time.monotonic()
+        with self._lock:
+            checked_at = self._generation_checked_at
+            if not force and checked_at is not None and now - checked_at < self.generation_check_interval:
+                return self._seen_generation
+        generation = self.generation
+        with self._lock:
+            self._seen_generation = generation
+            self._generation_checked_at = now
+        return generation
+
+    def _fresh(self, generation):
+        if generation is None or generation != self._stats_generation:
+            return None
+        if self._stats is not None and time.monotonic() - self._computed_at < self.ttl:
+            return self._stats
+        return None
+
+    def get(self, compute=compute_dashboard_stats):
+        """Snapshot statistik (salinan); hitung ulang jika expired / di-invalidate"""
+        generation = self._current_generation()
+        with self._lock:
+            stats = self._fresh(generation)
+        if stats is not None:
+            return dict(stats)
+
+        # Satu request yang menghitung, request lain menunggu hasilnya
+        with self._compute_lock:
+            generation = self._current_generation(force=True)
+            with self._lock:
+                stats = self._fresh(generation)
+            if stats is not None:
+                return dict(stats)
+
+            stats = compute()
+            with self._lock:
+                # Invalidate saat query berjalan -> snapshot tertinggal satu
+                # generation dan dihitung ulang pada get() berikutnya
+                self._stats = stats
+                self._stats_generation = generation
+                self._computed_at = time.monotonic()
+        return dict(stats)
+
+    def invalidate(self):
+        """Naikkan generation bersama -> snapshot di semua worker kedaluwarsa"""
+        with self._lock:
+            self._stats = None
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("UPDATE cache_meta SET value = value + 1 WHERE name = 'generation'")
+        except sqlite3.Error as e:
+            print(f"⚠️ Warning: Dashboard stats invalidation failed: {e}")
+        # Worker ini langsung melihat generation baru (tanpa menunggu interval)
+        return self._current_generation(force=True)
+
+    def get_stats(self):
+        generation = self.generation
+        with self._lock:
+            age = time.monotonic() - self._computed_at if self._stats is not None else None
+            current = generation is not None and generation == self._stats_generation
+        return {
+            'ttl_seconds': self.ttl,
+            'generation': generation,
+            'path': str(self.db_path),
+            'cached': current and age is not None and age < self.ttl,
+            'age_seconds': round(age, 1) if age is not None else None
+        }
+
+
+dashboard_stats_cache = DashboardStatsCache()
+
+
+def get_dashboard_statistics():
+    """KPI dashboard dari cache bersama"""
+    return dashboard_stats_cache.get()
+
+
+def invalidate_dashboard_stats():
+    """Buang snapshot cache (panggil setelah commit SQL mentah yang mengubah aset/pengajuan/transaksi)"""
+    return dashboard_stats_cache.invalidate()
+
+
+# ===== INVALIDASI OTOMATIS (ORM) =====
+
+def _touches_dashboard(session):
+    return any(
+        isinstance(instance, TRACKED_MODELS)
+        for instance in (*session.new, *session.dirty, *session.deleted)
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_dashboard_dirty(session, flush_context):
+    if _touches_dashboard(session):
+        session.info['dashboard_stats_dirty'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('dashboard_stats_dirty', False):
+        invalidate_dashboard_stats()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dashboard_mark(session):
+    session.info.pop('dashboard_stats_dirty', None)
@@ -1,183 +1,59 @@
+import os
+from functools import lru_cache
+
 from app import db
 from flask import current_app
-from werkzeug.security import generate_password_hash
 from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
-def init_mysql_db():
-    """Create users table & default admin"""
-    try:
-        # Detect database type
-        engine_name = db.engine.name
-        is_postgres = engine_name == 'postgresql'
-        
-        # Use SQLAlchemy instead of Flask-MySQLdb
-        # Handle potential tablespace issues
-        try:
-            if is_postgres:
-                # PostgreSQL syntax
-                # Create ENUM types first
-                db.session.execute(text("""
-                    DO $$ BEGIN
-                        CREATE TYPE user_role AS ENUM ('admin', 'pengguna');
-                    EXCEPTION
-                        WHEN duplicate_object THEN null;
-                    END $$;
-                """))
-                
-                db.session.execute(text("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id SERIAL PRIMARY KEY,
-                        name VARCHAR(100) NOT NULL,
-                        email VARCHAR(100) NOT NULL UNIQUE,
-                        password VARCHAR(255) NOT NULL,
-                        role user_role NOT NULL DEFAULT 'pengguna',
-                        phone VARCHAR(20),
-                        address TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """))
-            else:
-                # MySQL syntax
-                db.session.execute(text("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        name VARCHAR(100) NOT NULL,
-                        email VARCHAR(100) NOT NULL UNIQUE,
-                        password VARCHAR(255) NOT NULL,
-                        role ENUM('admin', 'pengguna') NOT NULL DEFAULT 'pengguna',
-                        phone VARCHAR(20),
-                        address TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-                """))
-        except Exception as table_error:
-            # Handle tablespace issues
-            if "Tablespace" in str(table_error):
-                print(f"⚠️  Tablespace issue detected: {table_error}")
-                print("🔧 Run 'python fix_database_tablespace.py' to fix this issue")
-                return False
-            else:
-                raise table_error
+# Folder Alembic (flask db upgrade); skema hanya diubah lewat migration
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
 
-        # Note: rental_assets and rental_requests tables are now managed by SQLAlchemy
-        # They are created by models_sqlalchemy.py
-        
-        # Create pengajuan_sewa table for rental applications
-        try:
-            if is_postgres:
-                # PostgreSQL syntax
-                # Create ENUM types first
-                db.session.execute(text("""
-                    DO $$ BEGIN
-                        CREATE TYPE jenis_aset_type AS ENUM ('tanah', 'tanah_bangunan');
-                    EXCEPTION
-                        WHEN duplicate_object THEN null;
-                    END $$;
-                """))
-                
-                db.session.execute(text("""
-                    DO $$ BEGIN
-                        CREATE TYPE status_pengajuan AS ENUM ('pending', 'approved', 'rejected', 'completed');
-                    EXCEPTION
-                        WHEN duplicate_object THEN null;
-                    END $$;
-                """))
-                
-                db.session.execute(text("""
-                    CREATE TABLE IF NOT EXISTS pengajuan_sewa (
-                        id SERIAL PRIMARY KEY,
-                        user_id INT NOT NULL,
-                        aset_id INT NOT NULL,
-                        jenis_aset jenis_aset_type NOT NULL,
-                        nama_penyewa VARCHAR(100) NOT NULL,
-                        email VARCHAR(100) NOT NULL,
-                        telepon VARCHAR(20) NOT NULL,
-                        durasi_sewa INT NOT NULL,
-                        tanggal_mulai DATE,
-                        pesan TEXT,
-                        status status_pengajuan DEFAULT 'pending',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                    )
-                """))
-            else:
-                # MySQL syntax
-                db.session.execute(text("""
-                    CREATE TABLE IF NOT EXISTS pengajuan_sewa (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        user_id INT NOT NULL,
-                        aset_id INT NOT NULL,
-                        jenis_aset ENUM('tanah', 'tanah_bangunan') NOT NULL,
-                        nama_penyewa VARCHAR(100) NOT NULL,
-                        email VARCHAR(100) NOT NULL,
-                        telepon VARCHAR(20) NOT NULL,
-                        durasi_sewa INT NOT NULL COMMENT 'dalam bulan',
-                        tanggal_mulai DATE,
-                        pesan TEXT,
-                        status ENUM('pending', 'approved', 'rejected', 'completed') DEFAULT 'pending',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-                """))
-        except Exception as table_error:
-            # Handle tablespace issues
-            if "Tablespace" in str(table_error):
-                print(f"⚠️  Tablespace issue detected for pengajuan_sewa: {table_error}")
-                print("🔧 Run 'python fix_database_tablespace.py' to fix this issue")
-                return False
-            else:
-                raise table_error
-        
-        # Harga tanah real table removed - feature no longer used
-        # cur.execute("""
-        #     CREATE TABLE IF NOT EXISTS harga_tanah_real (
-        #         id INT AUTO_INCREMENT PRIMARY KEY,
-        #         prediksi_id INT NOT NULL,
-        #         harga_real DECIMAL(20,2) NOT NULL,
-        #         catatan TEXT,
-        #         updated_by VARCHAR(100) NOT NULL,
-        #         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-        #         INDEX idx_prediksi_id (prediksi_id)
-        #     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        # """)
-        
-        # Harga bangunan tanah real table removed - feature no longer used
-        # cur.execute("""
-        #     CREATE TABLE IF NOT EXISTS harga_bangunan_tanah_real (
-        #         id INT AUTO_INCREMENT PRIMARY KEY,
-        #         prediksi_id INT NOT NULL,
-        #         harga_real DECIMAL(20,2) NOT NULL,
-        #         catatan TEXT,
-        #         updated_by VARCHAR(100) NOT NULL,
-        #         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-        #         INDEX idx_prediksi_id (prediksi_id)
-        #     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        # """)
+# Tabel versi yang ditulis Alembic setelah setiap upgrade
+SCHEMA_VERSION_TABLE = 'alembic_version'
 
-        # Create default admin if none exists
-        if is_postgres:
-            result = db.session.execute(text("SELECT COUNT(*) FROM users WHERE role = 'admin'")).fetchone()
-        else:
-            result = db.session.execute(text('SELECT COUNT(*) FROM users WHERE role = "admin"')).fetchone()
-            
-        if result[0] == 0:
-            hashed_pw = generate_password_hash('admin123')
-            db.session.execute(text("""
-                INSERT INTO users (name, email, password, role)
-                VALUES (:name, :email, :password, :role)
-            """), {'name': 'Administrator', 'email': 'admin@telkom.co.id', 'password': hashed_pw, 'role': 'admin'})
 
-        db.session.commit()
-        print("[OK] DB check done: users table ready, admin ensured, pengajuan_sewa table created.")
-        return True
-    except Exception as e:
-        print(f"[ERROR] Error init DB: {e}")
+@lru_cache(maxsize=None)
+def schema_head_revisions():
+    """Revision head di migrations/versions (dibaca sekali per proses)"""
+    from alembic.script import ScriptDirectory
+    
+    return frozenset(ScriptDirectory(MIGRATIONS_DIR).get_heads())
+
+
+def current_schema_revisions():
+    """
+    Revision yang tercatat di database (satu SELECT, tanpa DDL)
+    
+    Returns:
+        frozenset: Revision aktif, atau None jika tabel versi belum ada /
+                   database tidak bisa dibaca
+    """
+    try:
+        rows = db.session.execute(text(f"SELECT version_num FROM {SCHEMA_VERSION_TABLE}")).fetchall()
+    except SQLAlchemyError:
         db.session.rollback()
-        return False
+        return None
+    return frozenset(row[0] for row in rows)
+
+
+def check_schema_version():
+    """
+    Bandingkan versi skema database dengan head migration
+    
+    Dipanggil create_app() di setiap worker menggantikan DDL saat boot;
+    DDL hanya dijalankan `flask db upgrade` (sekali per deploy).
+    
+    Returns:
+        dict: {'current': [...] atau None, 'head': [...], 'up_to_date': bool}
+    """
+    head = schema_head_revisions()
+    current = current_schema_revisions()
+    return {
+        'current': sorted(current) if current is not None else None,
+        'head': sorted(head),
+        'up_to_date': current == head
+    }
 
 class Database:
     """Database connection class for SQLite operations"""
@@ -0,0 +1,206 @@
+"""
+Histogram Service
+=================
+
+Distribusi harga (atau kolom numerik lain) dalam satu query: semua bucket
+dihitung dengan satu GROUP BY atas ekspresi CASE, dan persentil diambil
+dari scan yang sama lewat window function cume_dist().
+
+Bucket:
+- edges eksplisit: [e0, e1, ..., en], bucket i = [e_i, e_i+1); edge
+  terakhir boleh float('inf') untuk bucket terbuka (>= e_n-1)
+- quantiles=k: k bucket berisi jumlah baris (hampir) sama (NTILE), edge
+  diambil dari nilai minimum/maksimum tiap bucket
+
+Persentil memakai definisi nearest-rank (nilai terkecil dengan cume_dist
+>= p/100), sama dengan numpy.percentile(method='inverted_cdf').
+
+Catatan: window function butuh SQLite >= 3.25, MySQL >= 8.0 atau PostgreSQL.
+"""
+
+from sqlalchemy import case, func, literal, select, union_all
+
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+DEFAULT_SERIES = 'all'
+
+
+def value_source(column, series=DEFAULT_SERIES, where=()):
+    """
+    Sumber nilai untuk histogram (baris NULL diabaikan)
+
+    Args:
+        column: kolom / ekspresi numerik SQLAlchemy
+        series (str): nama seri (mis. 'tanah', 'bangunan') untuk hitungan per seri
+        where: kondisi filter tambahan
+    """
+    return select(
+        column.label('value'),
+        literal(series).label('series')
+    ).where(column.isnot(None), *where)
+
+
+def bucket_expression(value, edges):
+    """CASE WHEN value >= e0 AND value < e1 THEN 0 ... ELSE NULL (di luar range)"""
+    whens = []
+    for index, (lower, upper) in enumerate(zip(edges[:-1], edges[1:])):
+        condition = value >= lower
+        if upper != float('inf'):
+            condition = condition & (value < upper)
+        whens.append((condition, index))
+    return case(*whens, else_=None)
+
+
+def _validate_edges(edges):
+    if len(edges) < 2:
+        raise ValueError("Histogram butuh minimal 2 edge")
+    if any(upper <= lower for lower, upper in zip(edges[:-1], edges[1:])):
+        raise ValueError(f"Edge histogram harus naik: {edges}")
+    if float('inf') in edges[:-1]:
+        raise ValueError("Hanya edge terakhir yang boleh tak hingga")
+
+
+def compute_histogram(session, sources, edges=None, quantiles=None, labels=None,
+                      percentiles=DEFAULT_PERCENTILES):
+    """
+    Hitung histogram + statistik dalam satu query
+
+    Args:
+        session: SQLAlchemy session (db.session)
+        sources: satu atau beberapa value_source() (digabung UNION ALL)
+        edges (list): batas bucket naik; atau
+        quantiles (int): jumlah bucket quantile (NTILE)
+        labels (list): label per bucket (default dibuat dari edge)
+        percentiles (tuple): persentil 0-100 yang dihitung
+
+    Returns:
+        dict: buckets (count per bucket dan per seri), statistics (count, min,
+              max, avg, percentiles, out_of_range), series (count per seri)
+    """
+    if (edges is None) == (quantiles is None):
+        raise ValueError("Isi salah satu dari edges atau quantiles")
+    if edges is not None:
+        edges = [float(edge) for edge in edges]
+        _validate_edges(edges)
+        bucket_count = len(edges) - 1
+    else:
+        bucket_count = int(quantiles)
+        if bucket_count < 1:
+            raise ValueError("quantiles minimal 1")
+    if labels is not None and len(labels) != bucket_count:
+        raise ValueError(f"Jumlah label ({len(labels)}) harus sama dengan jumlah bucket ({bucket_count})")
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise ValueError(f"Persentil harus di antara 0 dan 100: {percentiles}")
+
+    if not isinstance(sources, (list, tuple)):
+        sources = [sources]
+    values = (union_all(*sources) if len(sources) > 1 else sources[0]).subquery('histogram_values')
+    value = values.c.value
+
+    if edges is not None:
+        bucket = bucket_expression(value, edges)
+    else:
+        bucket = func.ntile(bucket_count).over(order_by=value) - 1
+
+    scan = select(
+        value.label('value'),
+        values.c.series.label('series'),
+        bucket.label('bucket'),
+        func.cume_dist().over(order_by=value).label('cume')
+    ).subquery('histogram_scan')
+
+    rows = session.execute(
+        select(
+            scan.c.bucket,
+            scan.c.series,
+            func.count(),
+            func.min(scan.c.value),
+            func.max(scan.c.value),
+            func.sum(scan.c.value),
+            *[func.min(case((scan.c.cume >= p / 100.0, scan.c.value))) for p in percentiles]
+        ).group_by(scan.c.bucket, scan.c.series)
+    ).all()
+
+    buckets = [
+        {'index': index, 'count': 0, 'series': {}, 'min_value': None, 'max_value': None}
+        for index in range(bucket_count)
+    ]
+    series_counts = {}
+    total = out_of_range = 0
+    minimum = maximum = None
+    value_sum = 0.0
+    percentile_values = [None] * len(percentiles)
+
+    for bucket_index, series, count, low, high, subtotal, *candidates in rows:
+        low, high = float(low), float(high)
+        total += count
+        value_sum += float(subtotal)
+        minimum = low if minimum is None else min(minimum, low)
+        maximum = high if maximum is None else max(maximum, high)
+        series_counts[series] = series_counts.get(series, 0) + count
+        # cume_dist dihitung atas semua baris, jadi persentil global =
+        # kandidat terkecil dari semua grup
+        for position, candidate in enumerate(candidates):
+            if candidate is not None and (percentile_values[position] is None or candidate < percentile_values[position]):
+                percentile_values[position] = float(candidate)
+
+        if bucket_index is None:
+            out_of_range += count
+            continue
+        entry = buckets[int(bucket_index)]
+        entry['count'] += count
+        entry['series'][series] = entry['series'].get(series, 0) + count
+        entry['min_value'] = low if entry['min_value'] is None else min(entry['min_value'], low)
+        entry['max_value'] = high if entry['max_value'] is None else max(entry['max_value'], high)
+
+    for entry in buckets:
+        if edges is not None:
+            entry['min_edge'] = edges[entry['index']]
+            upper = edges[entry['index'] + 1]
+            entry['max_edge'] = None if upper == float('inf') else upper
+        else:
+            entry['min_edge'] = entry['min_value']
+            entry['max_edge'] = entry['max_value']
+        entry['label'] = labels[entry['index']] if labels else _default_label(entry, edges is None)
+        entry['percentage'] = round(entry['count'] / total * 100, 1) if total else 0
+
+    return {
+        'buckets': buckets,
+        'series': series_counts,
+        'statistics': {
+            'count': total,
+            'min': minimum if minimum is not None else 0,
+            'max': maximum if maximum is not None else 0,
+            'avg': value_sum / total if total else 0,
+            'percentiles': {
+                f"p{p:g}": (percentile if percentile is not None else 0)
+                for p, percentile in zip(percentiles, percentile_values)
+            },
+            'out_of_range': out_of_range
+        }
+    }
+
+
+def _default_label(entry, quantile):
+    if quantile:
+        return f"Q{entry['index'] + 1}"
+    if entry['max_edge'] is None:
+        return f">= {entry['min_edge']:,.0f}"
+    return f"{entry['min_edge']:,.0f} - {entry['max_edge']:,.0f}"
+
+
+def histogram_options(args, edges, labels=None):
+    """
+    Opsi bucket dari query string endpoint chart
+
+    - ?quantiles=5 -> 5 bucket quantile
+    - ?edges=0,5000000,10000000,inf -> edge kustom (label default)
+    - tanpa parameter -> edges/labels bawaan endpoint
+
+    Raises:
+        ValueError: parameter tidak valid
+    """
+    if args.get('quantiles'):
+        return {'quantiles': int(args['quantiles'])}
+    if args.get('edges'):
+        return {'edges': [float(edge) for edge in args['edges'].split(',')]}
+    return {'edges': edges, 'labels': labels}
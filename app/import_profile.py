@@ -0,0 +1,145 @@
+"""
+Import Profiler untuk Boot Aplikasi
+===================================
+
+APP_IMPORT_PROFILE=1 mencatat waktu import setiap modul selama boot (dari
+import package app sampai create_app() selesai), seperti python -X importtime:
+
+- self: waktu eksekusi modul itu sendiri
+- cumulative: termasuk modul yang diimport olehnya
+
+Hasil tersedia di /api/admin/import-timings. Modul yang sudah diimport
+sebelum profiler aktif (mis. flask oleh test runner) tidak tercatat.
+
+Catatan: env var harus di-set di environment proses (atau .env), karena
+profiler dipasang sebelum blueprint diimport.
+"""
+
+import os
+import sys
+import threading
+import time
+
+
+class ImportProfiler:
+    """
+    MetaPathFinder yang membungkus exec_module loader untuk mengukur waktu import
+
+    Pencarian modul tetap dilakukan finder lain (urutan sys.meta_path tidak
+    berubah); profiler hanya mengukur eksekusi modul.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.started = None
+        self.stopped = None
+        self._local = threading.local()
+
+    @property
+    def active(self):
+        return self in sys.meta_path
+
+    def start(self):
+        """Pasang profiler di depan sys.meta_path"""
+        if not self.active:
+            self.started = time.perf_counter()
+            self.stopped = None
+            sys.meta_path.insert(0, self)
+
+    def stop(self):
+        """Lepas profiler (record yang sudah ada tetap disimpan)"""
+        if self.active:
+            sys.meta_path.remove(self)
+            self.stopped = time.perf_counter()
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        # BuiltinImporter/FrozenImporter (class, bukan instance) tidak dibungkus
+        if loader is not None and not isinstance(loader, type) and hasattr(loader, 'exec_module'):
+            self._wrap(loader)
+        return spec
+
+    def _wrap(self, loader):
+        # Loader bisa dipakai beberapa modul (mis. zipimporter): bungkus sekali,
+        # nama modul diambil dari argumen
+        if getattr(loader, '_import_profiler', None) is self:
+            return
+        original = loader.exec_module
+
+        def exec_module(module):
+            if not self.active:
+                return original(module)
+            return self._measure(module.__name__, original, module)
+
+        try:
+            loader.exec_module = exec_module
+            loader._import_profiler = self
+        except (AttributeError, TypeError):
+            pass
+
+    def _measure(self, name, exec_module, module):
+        stack = self._local.__dict__.setdefault('stack', [])
+        children = [0.0]
+        stack.append(children)
+        started = time.perf_counter()
+        try:
+            return exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][0] += cumulative
+            self.records.append({
+                'module': name,
+                'self_us': int((cumulative - children[0]) * 1e6),
+                'cumulative_us': int(cumulative * 1e6),
+                'depth': len(stack)
+            })
+
+    def report(self, limit=50, sort='cumulative_us'):
+        """
+        Ringkasan untuk endpoint admin
+
+        Returns:
+            dict: enabled, boot_ms, module_count, packages (self time per
+                  package top-level), modules (record teratas per `sort`)
+        """
+        if sort not in ('cumulative_us', 'self_us'):
+            raise ValueError(f"Urutan tidak dikenal: {sort}")
+        records = list(self.records)
+
+        packages = {}
+        for record in records:
+            package = record['module'].split('.', 1)[0]
+            packages[package] = packages.get(package, 0) + record['self_us']
+
+        boot_ms = None
+        if self.started is not None:
+            end = self.stopped if self.stopped is not None else time.perf_counter()
+            boot_ms = round((end - self.started) * 1000, 1)
+
+        return {
+            'enabled': self.started is not None,
+            'boot_ms': boot_ms,
+            'module_count': len(records),
+            'packages': [
+                {'package': name, 'self_ms': round(us / 1000, 1)}
+                for name, us in sorted(packages.items(), key=lambda item: -item[1])[:limit]
+            ],
+            'modules': sorted(records, key=lambda record: -record[sort])[:limit]
+        }
+
+
+import_profiler = ImportProfiler()
+
+if os.environ.get('APP_IMPORT_PROFILE') == '1':
+    import_profiler.start()
@@ -0,0 +1,27 @@
+from app import db
+from datetime import datetime
+
+class StatusCounter(db.Model):
+    """
+    Jumlah baris per status untuk rental_assets, rental_requests dan
+    rental_transactions. Dijaga oleh listener di app/status_counters.py
+    (satu transaksi dengan perubahan datanya) dan dibangun ulang oleh
+    reconcile_status_counters().
+    """
+    __tablename__ = 'status_counters'
+
+    entity = db.Column(db.String(50), primary_key=True)  # nama tabel sumber
+    status = db.Column(db.String(50), primary_key=True)  # '' untuk status NULL
+    count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StatusCounter {self.entity}.{self.status}={self.count}>'
+
+    def to_dict(self):
+        return {
+            'entity': self.entity,
+            'status': self.status,
+            'count': self.count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -7,13 +7,15 @@ try:
 except ImportError:
     mysql = None
 from sqlalchemy import text
-from .data_processor import AssetDataProcessor, TanahDataProcessor
 from .database import Database
 # Prediction imports removed - to be rebuilt from scratch
 from .models_sqlalchemy import RentalAsset, RentalRequest
 from .models_rental_transaction import RentalTransaction
+from .dashboard_stats import get_dashboard_statistics
+from .status_counters import status_count
+from .histogram import compute_histogram, histogram_options, value_source
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import column, func, table
 import json
 import os
 
@@ -96,8 +98,15 @@ if mysql is None:
 
 main = Blueprint('main', __name__)
 
-data_processor = AssetDataProcessor()
-tanah_processor = TanahDataProcessor()
+_data_processor = None
+
+def get_data_processor():
+    """AssetDataProcessor (pandas + baca CSV) dibuat saat pertama dipakai, bukan saat boot"""
+    global _data_processor
+    if _data_processor is None:
+        from .data_processor import AssetDataProcessor
+        _data_processor = AssetDataProcessor()
+    return _data_processor
 
 @main.route('/')
 def index():
@@ -172,100 +181,15 @@ def admin_dashboard():
         return redirect(url_for('main.login'))
 
     try:
-        # Basic counts - same as API
-        total_assets = RentalAsset.query.count()
-        available_assets = RentalAsset.query.filter_by(status='available').count()
-        rented_assets = RentalAsset.query.filter_by(status='rented').count()
-        
-        # Pending requests
-        pending_requests = RentalRequest.query.filter_by(status='pending').count()
-        
-        # Revenue calculations
-        active_transactions = db.session.query(RentalTransaction).filter_by(status='active').all()
-        monthly_revenue = sum(tx.monthly_price for tx in active_transactions)
-        
-        # Occupancy rate
-        occupancy_rate = (rented_assets / total_assets * 100) if total_assets > 0 else 0
-        
-        # Get user count
-        result = db.session.execute(text("SELECT COUNT(id) FROM users WHERE role = 'pengguna'")).fetchone()
-        total_users = result[0] if result else 0
-        
-        # Additional visualization metrics
-        # Average rental price
-        avg_price_result = db.session.query(func.avg(RentalAsset.harga_sewa)).filter(
-            RentalAsset.harga_sewa.isnot(None)).scalar()
-        avg_rental_price = float(avg_price_result) if avg_price_result else 0
-        
-        # Price range
-        min_price_result = db.session.query(func.min(RentalAsset.harga_sewa)).filter(
-            RentalAsset.harga_sewa.isnot(None)).scalar()
-        max_price_result = db.session.query(func.max(RentalAsset.harga_sewa)).filter(
-            RentalAsset.harga_sewa.isnot(None)).scalar()
-        min_price = float(min_price_result) if min_price_result else 0
-        max_price = float(max_price_result) if max_price_result else 0
-        
-        # Active renters (count of unique users with active rentals)
-        active_renters = db.session.query(func.count(func.distinct(RentalTransaction.user_id))).filter_by(status='active').scalar() or 0
-        
-        # New renters this month
-        current_month = datetime.now().replace(day=1)
-        new_renters_this_month = db.session.query(func.count(func.distinct(RentalTransaction.user_id))).filter(
-            RentalTransaction.start_date >= current_month,
-            RentalTransaction.status == 'active'
-        ).scalar() or 0
-        
-        # Average rental duration (in months)
-        avg_duration_result = db.session.query(func.avg(RentalTransaction.total_months)).filter_by(status='active').scalar()
-        avg_rental_duration = float(avg_duration_result) if avg_duration_result else 0
-        
-        # Retention rate (calculate based on completed vs renewed transactions)
-        completed_transactions = db.session.query(RentalTransaction).filter_by(status='completed').count()
-        renewed_transactions = db.session.query(RentalTransaction).filter_by(status='renewed').count()
-        retention_rate = (renewed_transactions / completed_transactions * 100) if completed_transactions > 0 else 0
-        
-        # Approved requests
-        approved_requests = RentalRequest.query.filter_by(status='approved').count()
-        
-        # Expiring contracts (contracts ending in next 30 days)
-        next_month = datetime.now() + timedelta(days=30)
-        expiring_contracts = db.session.query(RentalTransaction).filter(
-            RentalTransaction.end_date <= next_month,
-            RentalTransaction.status == 'active'
-        ).count()
-        
-        # Renewal rate (calculate based on renewals vs expirations)
-        total_expired = db.session.query(RentalTransaction).filter_by(status='expired').count()
-        renewal_rate = (renewed_transactions / (total_expired + renewed_transactions) * 100) if (total_expired + renewed_transactions) > 0 else 0
-        
-        # Use only real data from database - no dummy fallbacks
-        
+        stats = get_dashboard_statistics()
+
         # Use consistent structure with API
-        combined_stats = {
-            'total_assets': total_assets,
-            'available_assets': available_assets,
-            'rented_assets': rented_assets,
-            'pending_requests': pending_requests,
-            'monthly_revenue': float(monthly_revenue),
-            'occupancy_rate': round(occupancy_rate, 2),
-            'total_users': total_users,
-            
-            # Additional visualization metrics
-            'avg_rental_price': avg_rental_price,
-            'min_price': min_price,
-            'max_price': max_price,
-            'active_renters': active_renters,
-            'new_renters_this_month': new_renters_this_month,
-            'avg_rental_duration': int(round(avg_rental_duration)) if avg_rental_duration and avg_rental_duration == round(avg_rental_duration) else round(avg_rental_duration, 1),
-            'retention_rate': retention_rate,
-            'approved_requests': approved_requests,
-            'expiring_contracts': expiring_contracts,
-            'renewal_rate': renewal_rate,
-            
+        combined_stats = dict(
+            stats,
             # Keep legacy keys for backward compatibility
-            'total_properties': total_assets,
-            'total_locations': 31,
-        }
+            total_properties=stats['total_assets'],
+            total_locations=31,
+        )
         
         return render_template('dashboard_admin.html', 
                              stats=combined_stats, 
@@ -599,65 +523,42 @@ def get_certificate_analysis():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+# Bucket harga prediksi properti (jual)
+PREDICTION_PRICE_EDGES = [0, 500000000, 1000000000, 2000000000, 5000000000, float('inf')]
+PREDICTION_PRICE_LABELS = ["< 500 Juta", "500 Juta - 1 Milyar", "1 - 2 Milyar", "2 - 5 Milyar", "> 5 Milyar"]
+
 @main.route('/api/visualization/price-range-distribution')
 def get_price_range_distribution():
     """Get price range distribution"""
     try:
-        cur = mysql.connection.cursor()
-        
-        # Define price ranges
-        price_ranges = [
-            (0, 500000000, "< 500 Juta"),
-            (500000000, 1000000000, "500 Juta - 1 Milyar"),
-            (1000000000, 2000000000, "1 - 2 Milyar"),
-            (2000000000, 5000000000, "2 - 5 Milyar"),
-            (5000000000, float('inf'), "> 5 Milyar")
-        ]
-        
-        result_data = []
-        
-        for min_price, max_price, label in price_ranges:
-            # Count from tanah table
-            if max_price == float('inf'):
-                cur.execute("""
-                    SELECT COUNT(*) FROM prediksi_properti_tanah 
-                    WHERE harga_prediksi_tanah >= %s
-                """, (min_price,))
-                tanah_count = cur.fetchone()[0]
-                
-                cur.execute("""
-                    SELECT COUNT(*) FROM prediksi_properti_bangunan_tanah 
-                    WHERE harga_prediksi_total >= %s
-                """, (min_price,))
-                bangunan_count = cur.fetchone()[0]
-            else:
-                cur.execute("""
-                    SELECT COUNT(*) FROM prediksi_properti_tanah 
-                    WHERE harga_prediksi_tanah >= %s AND harga_prediksi_tanah < %s
-                """, (min_price, max_price))
-                tanah_count = cur.fetchone()[0]
-                
-                cur.execute("""
-                    SELECT COUNT(*) FROM prediksi_properti_bangunan_tanah 
-                    WHERE harga_prediksi_total >= %s AND harga_prediksi_total < %s
-                """, (min_price, max_price))
-                bangunan_count = cur.fetchone()[0]
-            
-            total_count = tanah_count + bangunan_count
-            result_data.append({
-                'range': label,
-                'count': total_count,
-                'tanah_count': tanah_count,
-                'bangunan_count': bangunan_count
-            })
-        
-        cur.close()
+        # Tanah dan bangunan dihitung dalam satu scan (UNION ALL), dipisah per seri
+        tanah = table('prediksi_properti_tanah', column('harga_prediksi_tanah'))
+        bangunan = table('prediksi_properti_bangunan_tanah', column('harga_prediksi_total'))
+        histogram = compute_histogram(
+            db.session,
+            [
+                value_source(tanah.c.harga_prediksi_tanah, series='tanah'),
+                value_source(bangunan.c.harga_prediksi_total, series='bangunan')
+            ],
+            **histogram_options(request.args, PREDICTION_PRICE_EDGES, PREDICTION_PRICE_LABELS)
+        )
+        
+        result_data = [{
+            'range': bucket['label'],
+            'count': bucket['count'],
+            'tanah_count': bucket['series'].get('tanah', 0),
+            'bangunan_count': bucket['series'].get('bangunan', 0)
+        } for bucket in histogram['buckets']]
         
         return jsonify({
             'success': True,
-            'data': result_data
+            'data': result_data,
+            'statistics': histogram['statistics']
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)})
 
 @main.route('/api/visualization/building-condition-analysis')
@@ -1138,6 +1039,7 @@ def api_property_detail(property_id):
 
 @main.route('/api/statistics')
 def api_statistics():
+    data_processor = get_data_processor()
     stats = data_processor.get_statistics()
     location_prices = data_processor.get_price_by_location()
     return jsonify({
@@ -1423,7 +1325,7 @@ def get_admin_rental_requests():
         requests = query.paginate(page=page, per_page=per_page, error_out=False)
         
         # Get pending count
-        pending_count = RentalRequest.query.filter_by(status='pending').count()
+        pending_count = status_count(RentalRequest, 'pending')
         
         # Prepare response data with both rental request and asset details
         result_data = []
@@ -1846,128 +1748,10 @@ def get_favorit_count():
 def dashboard_stats():
     """Get comprehensive dashboard statistics"""
     try:
-        # Basic counts
-        total_assets = RentalAsset.query.count()
-        available_assets = RentalAsset.query.filter_by(status='available').count()
-        rented_assets = RentalAsset.query.filter_by(status='rented').count()
-        
-        # Use only real data - no dummy fallbacks
-        
-        # Pending requests
-        pending_requests = RentalRequest.query.filter_by(status='pending').count()
-        
-        # Revenue calculations
-        active_transactions = db.session.query(RentalTransaction).filter_by(status='active').all()
-        monthly_revenue = sum(tx.monthly_price for tx in active_transactions) if active_transactions else 0
-        
-        # Occupancy rate
-        occupancy_rate = (rented_assets / total_assets * 100) if total_assets > 0 else 0
-        
-        # Get user count
-        try:
-            result = db.session.execute(text("SELECT COUNT(id) FROM users WHERE role = 'pengguna'")).fetchone()
-            total_users = result[0] if result else 0
-        except:
-            total_users = 0  # Show real zero if error
-        
-        # Additional visualization metrics
-        # Average rental price
-        try:
-            avg_price_result = db.session.query(func.avg(RentalAsset.harga_sewa)).filter(
-                RentalAsset.harga_sewa.isnot(None)).scalar()
-            avg_rental_price = float(avg_price_result) if avg_price_result else 0
-        except:
-            avg_rental_price = 0  # Show real zero if error
-        
-        # Price range
-        try:
-            min_price_result = db.session.query(func.min(RentalAsset.harga_sewa)).filter(
-                RentalAsset.harga_sewa.isnot(None)).scalar()
-            max_price_result = db.session.query(func.max(RentalAsset.harga_sewa)).filter(
-                RentalAsset.harga_sewa.isnot(None)).scalar()
-            min_price = float(min_price_result) if min_price_result else 0
-            max_price = float(max_price_result) if max_price_result else 0
-        except:
-            min_price = 0
-            max_price = 0
-        
-        # Active renters (count of unique users with active rentals)
-        try:
-            active_renters = db.session.query(func.count(func.distinct(RentalTransaction.user_id))).filter_by(status='active').scalar() or 0
-        except:
-            active_renters = 0
-        
-        # New renters this month
-        try:
-            current_month = datetime.now().replace(day=1)
-            new_renters_this_month = db.session.query(func.count(func.distinct(RentalTransaction.user_id))).filter(
-                RentalTransaction.start_date >= current_month,
-                RentalTransaction.status == 'active'
-            ).scalar() or 0
-        except:
-            new_renters_this_month = 0
-        
-        # Average rental duration (in months)
-        try:
-            avg_duration_result = db.session.query(func.avg(RentalTransaction.duration_months)).filter_by(status='active').scalar()
-            avg_rental_duration = float(avg_duration_result) if avg_duration_result else 0
-        except:
-            avg_rental_duration = 0  # Show real zero if error
-        
-        # Retention rate (calculate based on real data)
-        try:
-            completed_transactions = db.session.query(RentalTransaction).filter_by(status='completed').count()
-            renewed_transactions = db.session.query(RentalTransaction).filter_by(status='renewed').count()
-            retention_rate = (renewed_transactions / completed_transactions * 100) if completed_transactions > 0 else 0
-        except:
-            retention_rate = 0
-        
-        # Approved requests
-        try:
-            approved_requests = RentalRequest.query.filter_by(status='approved').count()
-        except:
-            approved_requests = 0
-        
-        # Expiring contracts (contracts ending in next 30 days)
-        try:
-            next_month = datetime.now() + timedelta(days=30)
-            expiring_contracts = db.session.query(RentalTransaction).filter(
-                RentalTransaction.end_date <= next_month,
-                RentalTransaction.status == 'active'
-            ).count()
-        except:
-            expiring_contracts = 0
-        
-        # Renewal rate (calculate based on real data)
-        try:
-            total_expired = db.session.query(RentalTransaction).filter_by(status='expired').count()
-            renewal_rate = (renewed_transactions / (total_expired + renewed_transactions) * 100) if (total_expired + renewed_transactions) > 0 else 0
-        except:
-            renewal_rate = 0
-        
         # Revenue growth (calculate based on historical data or set to 0)
         revenue_growth = 0  # Set to 0 until we have historical data to calculate real growth
         
-        stats = {
-            'total_assets': total_assets,
-            'available_assets': available_assets,
-            'rented_assets': rented_assets,
-            'pending_requests': pending_requests,
-            'monthly_revenue': float(monthly_revenue),
-            'occupancy_rate': round(occupancy_rate, 2),
-            'total_users': total_users,
-            'avg_rental_price': avg_rental_price,
-            'min_price': min_price,
-            'max_price': max_price,
-            'active_renters': active_renters,
-            'new_renters_this_month': new_renters_this_month,
-            'avg_rental_duration': int(round(avg_rental_duration)) if avg_rental_duration and avg_rental_duration == round(avg_rental_duration) else round(avg_rental_duration, 1),
-            'retention_rate': retention_rate,
-            'approved_requests': approved_requests,
-            'expiring_contracts': expiring_contracts,
-            'renewal_rate': renewal_rate,
-            'revenue_growth': revenue_growth,
-        }
+        stats = dict(get_dashboard_statistics(), revenue_growth=revenue_growth)
         
         return jsonify({'success': True, 'stats': stats})
         
@@ -2048,22 +1832,32 @@ def dashboard_location_distribution():
         return jsonify({'success': False, 'error': str(e)})
 
 
+# Bucket harga sewa untuk chart dashboard
+DASHBOARD_PRICE_EDGES = [0, 2000000, 3000000, 4000000, 5000000, 7000000, float('inf')]
+DASHBOARD_PRICE_LABELS = ['< 2M', '2M-3M', '3M-4M', '4M-5M', '5M-7M', '> 7M']
+
 @main.route('/api/dashboard/price-range-analysis')
 def dashboard_price_range_analysis():
     """Get price range analysis data"""
     try:
-        # Create dummy price range data
-        price_ranges = [
-            {'range': '< 2M', 'count': 45, 'percentage': 14.5},
-            {'range': '2M-3M', 'count': 78, 'percentage': 25.2},
-            {'range': '3M-4M', 'count': 89, 'percentage': 28.7},
-            {'range': '4M-5M', 'count': 56, 'percentage': 18.1},
-            {'range': '5M-7M', 'count': 31, 'percentage': 10.0},
-            {'range': '> 7M', 'count': 11, 'percentage': 3.5}
-        ]
-        
-        return jsonify({'success': True, 'data': {'histogram': price_ranges}})
-        
+        histogram = compute_histogram(
+            db.session,
+            value_source(RentalAsset.harga_sewa),
+            **histogram_options(request.args, DASHBOARD_PRICE_EDGES, DASHBOARD_PRICE_LABELS)
+        )
+        price_ranges = [{
+            'range': bucket['label'],
+            'count': bucket['count'],
+            'percentage': bucket['percentage']
+        } for bucket in histogram['buckets']]
+        
+        return jsonify({'success': True, 'data': {
+            'histogram': price_ranges,
+            'statistics': histogram['statistics']
+        }})
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error getting price range analysis: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
@@ -2111,33 +1905,16 @@ def dashboard_revenue_analysis():
 def test_dashboard():
     """Test dashboard endpoint without admin authentication"""
     try:
-        # Basic counts - same as API
-        total_assets = RentalAsset.query.count()
-        available_assets = RentalAsset.query.filter_by(status='available').count()
-        rented_assets = RentalAsset.query.filter_by(status='rented').count()
-        
-        # Pending requests
-        pending_requests = RentalRequest.query.filter_by(status='pending').count()
-        
-        # Revenue calculations
-        active_transactions = db.session.query(RentalTransaction).filter_by(status='active').all()
-        monthly_revenue = sum(tx.monthly_price for tx in active_transactions)
-        
-        # Occupancy rate
-        occupancy_rate = (rented_assets / total_assets * 100) if total_assets > 0 else 0
-        
-        # Get user count
-        result = db.session.execute(text("SELECT COUNT(id) FROM users WHERE role = 'pengguna'")).fetchone()
-        total_users = result[0]
+        stats = get_dashboard_statistics()
 
         return render_template('dashboard_admin.html', 
-                               total_assets=total_assets,
-                               available_assets=available_assets,
-                               rented_assets=rented_assets,
-                               pending_requests=pending_requests,
-                               monthly_revenue=monthly_revenue,
-                               occupancy_rate=occupancy_rate,
-                               total_users=total_users)
+                               total_assets=stats['total_assets'],
+                               available_assets=stats['available_assets'],
+                               rented_assets=stats['rented_assets'],
+                               pending_requests=stats['pending_requests'],
+                               monthly_revenue=stats['monthly_revenue'],
+                               occupancy_rate=stats['occupancy_rate'],
+                               total_users=stats['total_users'])
         
     except Exception as e:
         print(f"Error in test dashboard: {str(e)}")
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
 from app import db
 from app.models_sqlalchemy import RentalAsset, RentalRequest, AdminNotification
+from app.status_counters import status_counts
 from datetime import datetime
 import json
 
@@ -198,12 +199,13 @@ def get_rental_request_count():
         }), 401
     
     try:
-        # Hitung jumlah permintaan sewa berdasarkan status
-        pending_count = RentalRequest.query.filter_by(status='pending').count()
-        approved_count = RentalRequest.query.filter_by(status='approved').count()
-        rejected_count = RentalRequest.query.filter_by(status='rejected').count()
-        active_count = RentalRequest.query.filter_by(status='active').count()
-        completed_count = RentalRequest.query.filter_by(status='completed').count()
+        # Hitung jumlah permintaan sewa berdasarkan status (tabel status_counters)
+        counts = status_counts(RentalRequest)
+        pending_count = counts.get('pending', 0)
+        approved_count = counts.get('approved', 0)
+        rejected_count = counts.get('rejected', 0)
+        active_count = counts.get('active', 0)
+        completed_count = counts.get('completed', 0)
         
         return jsonify({
             'success': True,
@@ -224,6 +226,80 @@ def get_rental_request_count():
 
 
 
+@admin_routes.route('/api/admin/import-timings')
+def get_import_timings():
+    """API waktu import per modul saat boot (aktif dengan APP_IMPORT_PROFILE=1)"""
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+    
+    try:
+        from app.import_profile import import_profiler
+        
+        report = import_profiler.report(
+            limit=request.args.get('limit', 50, type=int),
+            sort=request.args.get('sort', 'cumulative_us')
+        )
+        if not report['enabled']:
+            report['message'] = 'Set APP_IMPORT_PROFILE=1 lalu restart aplikasi untuk mencatat waktu import'
+        return jsonify({
+            'success': True,
+            **report
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@admin_routes.route('/api/admin/status-counters')
+def get_status_counters():
+    """API isi tabel status_counters (jumlah baris per status)"""
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+
+    try:
+        from app.models_status_counter import StatusCounter
+
+        counters = StatusCounter.query.order_by(StatusCounter.entity, StatusCounter.status).all()
+        return jsonify({
+            'success': True,
+            'data': [counter.to_dict() for counter in counters]
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_routes.route('/api/admin/status-counters/reconcile', methods=['POST'])
+def reconcile_status_counters_api():
+    """API untuk membangun ulang status_counters dari data (setelah perubahan di luar ORM)"""
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+
+    try:
+        from app.status_counters import reconcile_status_counters
+
+        corrections = reconcile_status_counters()
+        return jsonify({
+            'success': True,
+            'corrections': corrections
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @admin_routes.route('/admin/notifications')
 def admin_notifications_page():
     """Halaman notifikasi admin"""
@@ -9,14 +9,27 @@ Version: 5.0
 """
 
 from flask import Blueprint, request, jsonify
-from prediction_system import PredictionSystem
+import os
+import sys
 import time
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
 # Create blueprint
 batch_prediction_bp = Blueprint('batch_prediction', __name__)
 
-# Initialize prediction system with caching enabled
-prediction_system = PredictionSystem(enable_cache=True)
+# Batas jumlah baris per request (predict_batch sudah vectorized)
+MAX_BATCH_SIZE = int(os.environ.get('PREDICTION_BATCH_MAX_SIZE', 20000))
+
+
+def get_prediction_system():
+    """
+    Instance global yang sama dengan route prediksi lain, sehingga
+    /cache/stats dan /cache/clear mencerminkan cache yang sebenarnya
+    (diimport saat request pertama, bukan saat boot)
+    """
+    from prediction_system import prediction_system
+    return prediction_system
 
 
 @batch_prediction_bp.route('/predict_batch', methods=['POST'])
@@ -82,14 +95,14 @@ def predict_batch():
                 'error': 'predictions list cannot be empty'
             }), 400
         
-        if len(predictions_input) > 100:
+        if len(predictions_input) > MAX_BATCH_SIZE:
             return jsonify({
                 'success': False,
-                'error': 'Maximum 100 predictions per batch'
+                'error': f'Maximum {MAX_BATCH_SIZE} predictions per batch'
             }), 400
         
         # Perform batch prediction
-        result = prediction_system.predict_batch(model_type, predictions_input)
+        result = get_prediction_system().predict_batch(model_type, predictions_input)
         
         return jsonify(result), 200
         
@@ -104,7 +117,7 @@ def predict_batch():
 def get_cache_stats():
     """Get cache statistics"""
     try:
-        stats = prediction_system.get_cache_stats()
+        stats = get_prediction_system().get_cache_stats()
         return jsonify({
             'success': True,
             'stats': stats
@@ -120,7 +133,7 @@ def get_cache_stats():
 def clear_cache():
     """Clear prediction cache"""
     try:
-        result = prediction_system.clear_cache()
+        result = get_prediction_system().clear_cache()
         return jsonify(result), 200
     except Exception as e:
         return jsonify({
@@ -133,7 +146,7 @@ def clear_cache():
 def get_performance_stats():
     """Get overall performance statistics"""
     try:
-        stats = prediction_system.get_performance_stats()
+        stats = get_prediction_system().get_performance_stats()
         return jsonify({
             'success': True,
             'stats': stats
@@ -5,15 +5,18 @@ Menggunakan ensemble machine learning models
 FASE 2 IMPROVEMENT: Added auto-upload & training endpoints
 """
 
-from flask import Blueprint, request, jsonify, render_template, current_app
+from flask import Blueprint, request, jsonify, render_template, current_app, url_for
 from werkzeug.utils import secure_filename
-import joblib
-import pandas as pd
-import numpy as np
 import os
 import sys
+import threading
 from datetime import datetime
 
+# prediction_system, preprocessing, pandas dan joblib diimport di dalam fungsi
+# yang memakainya (saat model dimuat / request prediksi), bukan saat boot
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from training_jobs import submit_training_job
+
 # Create blueprint
 jual_prediction_bp = Blueprint('jual_prediction', __name__, url_prefix='/jual-prediction')
 
@@ -21,69 +24,192 @@ jual_prediction_bp = Blueprint('jual_prediction', __name__, url_prefix='/jual-pr
 TANAH_MODEL_PATH = 'model/jual_tanah'
 BANGUNAN_MODEL_PATH = 'model/jual_bangunan'
 
-# Global variables for loaded models
-tanah_models = {}
-bangunan_models = {}
+def load_ensemble(model_dir):
+    """
+    Load ensemble scorer untuk satu folder model jual
+    
+    VotingRegressor sudah menyimpan estimator hasil fit beserta weights-nya,
+    jadi member diambil dari sana dan setiap member cukup diprediksi sekali.
+    Tanpa voting_regressor.pkl, ketiga file member dirata-rata (weights None).
+    """
+    import joblib
+    from prediction_system import EnsembleScorer
+    
+    voting_path = os.path.join(model_dir, 'voting_regressor.pkl')
+    if os.path.exists(voting_path):
+        return EnsembleScorer(voting=joblib.load(voting_path))
+    
+    return EnsembleScorer({
+        name: joblib.load(os.path.join(model_dir, f'{name}.pkl'))
+        for name in ['xgboost', 'random_forest', 'catboost']
+    })
 
-def load_tanah_models():
-    """Load all tanah models and metadata"""
-    global tanah_models
+def load_model_components(model_dir):
+    """
+    Ensemble, encoders, features dan pipeline preprocessing untuk satu folder model jual
     
-    try:
-        model_dir = TANAH_MODEL_PATH
-        
-        tanah_models = {
-            'voting': joblib.load(os.path.join(model_dir, 'voting_regressor.pkl')),
-            'xgboost': joblib.load(os.path.join(model_dir, 'xgboost.pkl')),
-            'random_forest': joblib.load(os.path.join(model_dir, 'random_forest.pkl')),
-            'catboost': joblib.load(os.path.join(model_dir, 'catboost.pkl')),
-            'encoders': joblib.load(os.path.join(model_dir, 'label_encoders.pkl')),
-            'features': joblib.load(os.path.join(model_dir, 'feature_names.pkl'))
+    manifest.json (format artefak, diverifikasi sebelum dimuat) diutamakan;
+    tanpa manifest dipakai file .pkl lama. Versi tanpa preprocessing.joblib
+    (dilatih sebelum pipeline disimpan) memakai lookup kategori.
+    """
+    import joblib
+    from prediction_system import ARTIFACT_MANIFEST, load_model_artifacts, ensemble_from_artifacts
+    
+    if os.path.exists(os.path.join(model_dir, ARTIFACT_MANIFEST)):
+        artifacts = load_model_artifacts(model_dir)
+        return {
+            'ensemble': ensemble_from_artifacts(artifacts),
+            'encoders': artifacts['objects']['encoders'],
+            'features': artifacts['manifest']['feature_schema']['features'],
+            'preprocessing': artifacts['objects'].get('preprocessing')
         }
-        
-        # Load performance metrics
-        perf_file = os.path.join(model_dir, 'model_performance.csv')
-        if os.path.exists(perf_file):
-            tanah_models['performance'] = pd.read_csv(perf_file)
-        
-        print(f"✅ Tanah models loaded successfully")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error loading tanah models: {e}")
-        return False
+    
+    return {
+        'ensemble': load_ensemble(model_dir),
+        'encoders': joblib.load(os.path.join(model_dir, 'label_encoders.pkl')),
+        'features': joblib.load(os.path.join(model_dir, 'feature_names.pkl')),
+        'preprocessing': None
+    }
 
-def load_bangunan_models():
-    """Load all bangunan models and metadata"""
-    global bangunan_models
+def model_path(model_type):
+    return TANAH_MODEL_PATH if model_type == 'tanah' else BANGUNAN_MODEL_PATH
+
+def load_jual_models(model_type):
+    """
+    Load satu versi model jual (dipanggil ModelRegistry)
+    
+    Versi aktif dibaca dari index (registry.json): folder versi, atau file
+    langsung di folder model jual (format lama, versi 'legacy').
+    """
+    import pandas as pd
+    from prediction_system import ModelIndex, ModelVersion, compile_category_lookups
     
     try:
-        model_dir = BANGUNAN_MODEL_PATH
-        
-        bangunan_models = {
-            'voting': joblib.load(os.path.join(model_dir, 'voting_regressor.pkl')),
-            'xgboost': joblib.load(os.path.join(model_dir, 'xgboost.pkl')),
-            'random_forest': joblib.load(os.path.join(model_dir, 'random_forest.pkl')),
-            'catboost': joblib.load(os.path.join(model_dir, 'catboost.pkl')),
-            'encoders': joblib.load(os.path.join(model_dir, 'label_encoders.pkl')),
-            'features': joblib.load(os.path.join(model_dir, 'feature_names.pkl'))
-        }
+        index = ModelIndex(model_path(model_type))
+        version_entry = index.active_entry()
+        if version_entry is None:
+            raise FileNotFoundError(f"Tidak ada versi model di {model_path(model_type)}")
+        model_dir = str(index.version_dir(version_entry))
+        
+        models = ModelVersion(load_model_components(model_dir))
+        models['version'] = version_entry['version']
+        models['lookups'] = compile_category_lookups(models['encoders'])
         
         # Load performance metrics
         perf_file = os.path.join(model_dir, 'model_performance.csv')
         if os.path.exists(perf_file):
-            bangunan_models['performance'] = pd.read_csv(perf_file)
+            models['performance'] = pd.read_csv(perf_file)
         
-        print(f"✅ Bangunan models loaded successfully")
-        return True
+        print(f"✅ {model_type.capitalize()} models loaded successfully (versi {models['version']})")
+        return models
         
     except Exception as e:
-        print(f"❌ Error loading bangunan models: {e}")
-        return False
+        print(f"❌ Error loading {model_type} models: {e}")
+        return None
+
+def validate_jual_models(model_type, models):
+    """Smoke prediction sebelum versi baru dipublish"""
+    import pandas as pd
+    from prediction_system import smoke_test_ensemble
+    
+    features = models['features']
+    smoke_test_ensemble(models['ensemble'], pd.DataFrame([[0] * len(features)], columns=features))
+
+# Versi model per tipe: load di side slot, smoke test, lalu swap referensi.
+# Request memegang versi yang dipakainya; worker lain ikut lewat mtime CURRENT.
+# Registry dibuat saat pertama dipakai (get_jual_models)
+jual_models = None
+_jual_models_lock = threading.Lock()
+
+def get_jual_models():
+    """ModelRegistry model jual (dibuat sekali, saat pertama dipakai)"""
+    global jual_models
+    with _jual_models_lock:
+        if jual_models is None:
+            from prediction_system import ModelRegistry, model_pointer_signature
+            jual_models = ModelRegistry(
+                load_jual_models, ['tanah', 'bangunan'],
+                validator=validate_jual_models,
+                watch=lambda model_type: model_pointer_signature(model_path(model_type)),
+                watch_interval=float(os.environ.get('PREDICTION_MODEL_WATCH_INTERVAL', 2))
+            )
+        return jual_models
+
+def reload_jual_models(model_type):
+    """
+    Aktifkan versi terbaru di index (kecuali di-pin) lalu muat tanpa downtime
+    
+    Worker ini memuat langsung (side slot + smoke test + swap); worker lain
+    mengikuti lewat perubahan mtime CURRENT. Jika versi baru gagal, versi
+    lama tetap dipakai.
+    """
+    from prediction_system import ModelIndex
+    
+    index = ModelIndex(model_path(model_type))
+    if index.read()['versions']:
+        index.promote_latest()
+    return get_jual_models().reload(model_type)
+
+def load_tanah_models():
+    """Muat versi terbaru model tanah"""
+    return reload_jual_models('tanah')
+
+def load_bangunan_models():
+    """Muat versi terbaru model bangunan"""
+    return reload_jual_models('bangunan')
+
+def ensure_tanah_models():
+    """Load model tanah saat pertama dipakai (lazy, thread-safe)"""
+    return 'tanah' in get_jual_models()
+
+def ensure_bangunan_models():
+    """Load model bangunan saat pertama dipakai (lazy, thread-safe)"""
+    return 'bangunan' in get_jual_models()
 
-# Load models on startup
-load_tanah_models()
-load_bangunan_models()
+def warm_up_models():
+    """Muat model jual di background thread (opsional, PREDICTION_WARMUP=1)"""
+    return get_jual_models().warm_up()
+
+# Models dimuat saat request prediksi pertama (tidak lagi saat import)
+
+# Field JSON -> kolom yang boleh dikosongkan jika pipeline menyimpan nilai per kecamatan
+KECAMATAN_FILLED_FIELDS = {'kepadatan_penduduk': 'Kepadatan_Penduduk'}
+
+def required_jual_fields(models, fields):
+    """Field wajib untuk versi model ini (tanpa field yang bisa diisi pipeline)"""
+    pipeline = models.get('preprocessing')
+    if pipeline is None:
+        return fields
+    return [
+        field for field in fields
+        if field not in KECAMATAN_FILLED_FIELDS or not pipeline.can_fill(KECAMATAN_FILLED_FIELDS[field])
+    ]
+
+def prepare_jual_input(models, row):
+    """
+    Satu baris input (nama kolom training) -> DataFrame fitur urutan training
+    
+    Versi dengan pipeline tersimpan menjalankan preprocessing yang sama
+    dengan training; versi lama memakai lookup kategori (O(1), tanpa exception).
+    
+    Raises:
+        UnknownCategoryError: nilai kategori tidak ada di data training
+    """
+    import pandas as pd
+    from preprocessing import UnknownCategoryError
+    
+    pipeline = models.get('preprocessing')
+    if pipeline is not None:
+        return pipeline.transform_frame(row)
+    
+    input_data = pd.DataFrame({col: [value] for col, value in row.items()})
+    for col, lookup in models['lookups'].items():
+        if col in input_data:
+            code = lookup.get(input_data[col].iloc[0])
+            if code is None:
+                raise UnknownCategoryError(col, [input_data[col].iloc[0]])
+            input_data[col] = code
+    return input_data[models['features']]
 
 @jual_prediction_bp.route('/predict-tanah', methods=['POST'])
 def predict_tanah():
@@ -103,23 +229,26 @@ def predict_tanah():
         "model_type": "voting"  // optional: voting, xgboost, random_forest, catboost
     }
     """
+    import numpy as np
+    from preprocessing import UnknownCategoryError
+    
     try:
-        # Check if models are loaded
-        if not tanah_models:
-            if not load_tanah_models():
-                return jsonify({
-                    'success': False,
-                    'error': 'Models not loaded. Please train the models first.'
-                }), 500
+        # Versi model dipegang sampai request selesai (aman terhadap hot-swap)
+        tanah_models = get_jual_models().get('tanah')
+        if tanah_models is None:
+            return jsonify({
+                'success': False,
+                'error': 'Models not loaded. Please train the models first.'
+            }), 500
         
         # Get input data
         data = request.get_json()
         
         # Validate required fields
-        required_fields = [
+        required_fields = required_jual_fields(tanah_models, [
             'kecamatan', 'sertifikat', 'luas_tanah', 'jenis_zona',
             'aksesibilitas', 'tingkat_keamanan', 'kepadatan_penduduk', 'jarak_ke_pusat'
-        ]
+        ])
         
         for field in required_fields:
             if field not in data:
@@ -128,51 +257,39 @@ def predict_tanah():
                     'error': f'Missing required field: {field}'
                 }), 400
         
-        # Create input dataframe
-        input_data = pd.DataFrame({
-            'Kecamatan': [data['kecamatan']],
-            'Sertifikat': [data['sertifikat']],
-            'Luas Tanah (M²)': [float(data['luas_tanah'])],
-            'Jenis Zona': [data['jenis_zona']],
-            'Aksesibilitas': [data['aksesibilitas']],
-            'Tingkat Keamanan': [data['tingkat_keamanan']],
-            'Kepadatan_Penduduk': [int(data['kepadatan_penduduk'])],
-            'Jarak ke Pusat Kota (km)': [float(data['jarak_ke_pusat'])]
-        })
-        
-        # Encode categorical variables
-        encoders = tanah_models['encoders']
-        for col in ['Kecamatan', 'Sertifikat', 'Jenis Zona', 'Aksesibilitas', 'Tingkat Keamanan']:
-            if col in encoders:
-                try:
-                    input_data[col] = encoders[col].transform(input_data[col].astype(str))
-                except ValueError as e:
-                    return jsonify({
-                        'success': False,
-                        'error': f'Invalid value for {col}. Please use values from training data.'
-                    }), 400
-        
-        # Reorder columns to match training
-        feature_names = tanah_models['features']
-        input_data = input_data[feature_names]
+        # Input row (nama kolom training)
+        row = {
+            'Kecamatan': data['kecamatan'],
+            'Sertifikat': data['sertifikat'],
+            'Luas Tanah (M²)': float(data['luas_tanah']),
+            'Jenis Zona': data['jenis_zona'],
+            'Aksesibilitas': data['aksesibilitas'],
+            'Tingkat Keamanan': data['tingkat_keamanan'],
+            'Jarak ke Pusat Kota (km)': float(data['jarak_ke_pusat'])
+        }
+        if 'kepadatan_penduduk' in data:
+            row['Kepadatan_Penduduk'] = int(data['kepadatan_penduduk'])
         
-        # Always use Voting Regressor (ensemble model) for best accuracy
-        model = tanah_models['voting']
+        # Encoding + urutan kolom sama dengan training
+        try:
+            input_data = prepare_jual_input(tanah_models, row)
+        except UnknownCategoryError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        # Make prediction using ensemble
-        prediction = model.predict(input_data)[0]
+        # Ensemble: setiap member diprediksi sekali (paralel), nilai ensemble
+        # diturunkan dari output member dengan semantik VotingRegressor
+        scored = tanah_models['ensemble'].score(input_data)
+        prediction = scored['prediction'][0]
         
-        # Get predictions from all individual models for analysis
+        # Predictions dari semua model individual untuk analisis
         all_predictions = {
-            'xgboost': float(tanah_models['xgboost'].predict(input_data)[0]),
-            'random_forest': float(tanah_models['random_forest'].predict(input_data)[0]),
-            'catboost': float(tanah_models['catboost'].predict(input_data)[0]),
-            'ensemble': float(prediction)
+            name: float(output[0]) for name, output in scored['members'].items()
         }
+        all_predictions['ensemble'] = float(prediction)
         
         # Calculate confidence using improved method
         # Confidence based on agreement between models and prediction variance
-        pred_values = [all_predictions['xgboost'], all_predictions['random_forest'], all_predictions['catboost']]
+        pred_values = [float(output[0]) for output in scored['members'].values()]
         mean_pred = np.mean(pred_values)
         std_pred = np.std(pred_values)
         
@@ -199,8 +316,9 @@ def predict_tanah():
             'success': True,
             'prediction': float(prediction),
             'formatted_prediction': f"Rp {prediction:,.0f}",
-            'model_used': 'Ensemble (XGBoost + Random Forest + CatBoost)',
+            'model_used': tanah_models['ensemble'].display_name,
             'all_predictions': all_predictions,
+            'model_timings_ms': scored['timings_ms'],
             'confidence': round(confidence, 2),
             'confidence_level': 'High' if confidence >= 90 else 'Good' if confidence >= 80 else 'Moderate' if confidence >= 70 else 'Low',
             'cv_percentage': round(cv, 2),
@@ -236,24 +354,27 @@ def predict_bangunan():
         "model_type": "voting"  // optional
     }
     """
+    import numpy as np
+    from preprocessing import UnknownCategoryError
+    
     try:
-        # Check if models are loaded
-        if not bangunan_models:
-            if not load_bangunan_models():
-                return jsonify({
-                    'success': False,
-                    'error': 'Models not loaded. Please train the models first.'
-                }), 500
+        # Versi model dipegang sampai request selesai (aman terhadap hot-swap)
+        bangunan_models = get_jual_models().get('bangunan')
+        if bangunan_models is None:
+            return jsonify({
+                'success': False,
+                'error': 'Models not loaded. Please train the models first.'
+            }), 500
         
         # Get input data
         data = request.get_json()
         
         # Validate required fields
-        required_fields = [
+        required_fields = required_jual_fields(bangunan_models, [
             'kecamatan', 'sertifikat', 'luas_tanah', 'luas_bangunan',
             'jenis_zona', 'kondisi_bangunan', 'jumlah_lantai', 'tahun_dibangun',
             'aksesibilitas', 'tingkat_keamanan', 'kepadatan_penduduk', 'jarak_ke_pusat'
-        ]
+        ])
         
         for field in required_fields:
             if field not in data:
@@ -262,54 +383,42 @@ def predict_bangunan():
                     'error': f'Missing required field: {field}'
                 }), 400
         
-        # Create input dataframe
-        input_data = pd.DataFrame({
-            'Kecamatan': [data['kecamatan']],
-            'Sertifikat': [data['sertifikat']],
-            'Luas Tanah (M²)': [float(data['luas_tanah'])],
-            'Luas Bangunan (M²)': [float(data['luas_bangunan'])],
-            'Jenis Zona': [data['jenis_zona']],
-            'Kondisi Bangunan': [data['kondisi_bangunan']],
-            'Jumlah Lantai': [int(data['jumlah_lantai'])],
-            'Tahun Dibangun': [int(data['tahun_dibangun'])],
-            'Aksesibilitas': [data['aksesibilitas']],
-            'Tingkat Keamanan': [data['tingkat_keamanan']],
-            'Kepadatan_Penduduk': [int(data['kepadatan_penduduk'])],
-            'Jarak ke Pusat Kota (km)': [float(data['jarak_ke_pusat'])]
-        })
-        
-        # Encode categorical variables
-        encoders = bangunan_models['encoders']
-        for col in ['Kecamatan', 'Sertifikat', 'Jenis Zona', 'Kondisi Bangunan', 'Aksesibilitas', 'Tingkat Keamanan']:
-            if col in encoders:
-                try:
-                    input_data[col] = encoders[col].transform(input_data[col].astype(str))
-                except ValueError as e:
-                    return jsonify({
-                        'success': False,
-                        'error': f'Invalid value for {col}. Please use values from training data.'
-                    }), 400
-        
-        # Reorder columns to match training
-        feature_names = bangunan_models['features']
-        input_data = input_data[feature_names]
+        # Input row (nama kolom training)
+        row = {
+            'Kecamatan': data['kecamatan'],
+            'Sertifikat': data['sertifikat'],
+            'Luas Tanah (M²)': float(data['luas_tanah']),
+            'Luas Bangunan (M²)': float(data['luas_bangunan']),
+            'Jenis Zona': data['jenis_zona'],
+            'Kondisi Bangunan': data['kondisi_bangunan'],
+            'Jumlah Lantai': int(data['jumlah_lantai']),
+            'Tahun Dibangun': int(data['tahun_dibangun']),
+            'Aksesibilitas': data['aksesibilitas'],
+            'Tingkat Keamanan': data['tingkat_keamanan'],
+            'Jarak ke Pusat Kota (km)': float(data['jarak_ke_pusat'])
+        }
+        if 'kepadatan_penduduk' in data:
+            row['Kepadatan_Penduduk'] = int(data['kepadatan_penduduk'])
         
-        # Always use Voting Regressor (ensemble model) for best accuracy
-        model = bangunan_models['voting']
+        # Encoding + urutan kolom sama dengan training
+        try:
+            input_data = prepare_jual_input(bangunan_models, row)
+        except UnknownCategoryError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        # Make prediction using ensemble
-        prediction = model.predict(input_data)[0]
+        # Ensemble: setiap member diprediksi sekali (paralel), nilai ensemble
+        # diturunkan dari output member dengan semantik VotingRegressor
+        scored = bangunan_models['ensemble'].score(input_data)
+        prediction = scored['prediction'][0]
         
-        # Get predictions from all individual models for analysis
+        # Predictions dari semua model individual untuk analisis
         all_predictions = {
-            'xgboost': float(bangunan_models['xgboost'].predict(input_data)[0]),
-            'random_forest': float(bangunan_models['random_forest'].predict(input_data)[0]),
-            'catboost': float(bangunan_models['catboost'].predict(input_data)[0]),
-            'ensemble': float(prediction)
+            name: float(output[0]) for name, output in scored['members'].items()
         }
+        all_predictions['ensemble'] = float(prediction)
         
         # Calculate confidence using improved method
-        pred_values = [all_predictions['xgboost'], all_predictions['random_forest'], all_predictions['catboost']]
+        pred_values = [float(output[0]) for output in scored['members'].values()]
         mean_pred = np.mean(pred_values)
         std_pred = np.std(pred_values)
         
@@ -332,8 +441,9 @@ def predict_bangunan():
             'success': True,
             'prediction': float(prediction),
             'formatted_prediction': f"Rp {prediction:,.0f}",
-            'model_used': 'Ensemble (XGBoost + Random Forest + CatBoost)',
+            'model_used': bangunan_models['ensemble'].display_name,
             'all_predictions': all_predictions,
+            'model_timings_ms': scored['timings_ms'],
             'confidence': round(confidence, 2),
             'confidence_level': 'High' if confidence >= 90 else 'Good' if confidence >= 80 else 'Moderate' if confidence >= 70 else 'Low',
             'cv_percentage': round(cv, 2),
@@ -351,6 +461,9 @@ def predict_bangunan():
 def get_model_info():
     """Get information about loaded models"""
     try:
+        loaded = get_jual_models().loaded()
+        tanah_models = loaded.get('tanah')
+        bangunan_models = loaded.get('bangunan')
         info = {
             'tanah_models_loaded': bool(tanah_models),
             'bangunan_models_loaded': bool(bangunan_models),
@@ -365,6 +478,12 @@ def get_model_info():
         if bangunan_models and 'performance' in bangunan_models:
             info['bangunan_performance'] = bangunan_models['performance'].to_dict('records')
         
+        if tanah_models:
+            info['tanah_version'] = tanah_models['version']
+        
+        if bangunan_models:
+            info['bangunan_version'] = bangunan_models['version']
+        
         # Add feature names
         if tanah_models and 'features' in tanah_models:
             info['tanah_features'] = tanah_models['features']
@@ -408,6 +527,8 @@ def get_valid_values():
     """Get valid values for categorical fields"""
     try:
         valid_values = {}
+        tanah_models = get_jual_models().get('tanah')
+        bangunan_models = get_jual_models().get('bangunan')
         
         # Tanah valid values
         if tanah_models and 'encoders' in tanah_models:
@@ -445,7 +566,9 @@ def allowed_file(filename):
 @jual_prediction_bp.route('/upload-dataset', methods=['POST'])
 def upload_dataset():
     """
-    Upload dataset CSV untuk auto-training model jual prediction
+    Upload dataset CSV lalu jadwalkan auto-training model jual prediction
+    
+    Returns 202 dengan job_id; progress/cancel lewat /prediction/training_jobs/<job_id>
     
     Expected form data:
     - jual_tanah_file: CSV file untuk tanah jual (optional)
@@ -516,62 +639,29 @@ def upload_dataset():
                 except Exception as e:
                     results['jual_bangunan'] = {'error': f'Gagal memproses file jual bangunan: {str(e)}'}
         
-        # Auto-train models if files were uploaded successfully
+        # Training dijalankan di background job; setelah sukses versi baru
+        # diaktifkan di index dan semua worker memuat ulang lewat CURRENT
         if uploaded_files:
-            try:
-                # Import auto trainer for jual prediction
-                sys.path.append(os.path.join(current_app.root_path, '..'))
-                from auto_model_trainer_jual import auto_train_jual_from_uploads
-                
-                print(f"🚀 Starting auto-training for JUAL prediction ({len(uploaded_files)} files)...")
-                training_results = auto_train_jual_from_uploads(uploaded_files)
-                
-                if training_results['success']:
-                    # Auto-reload models after successful training
-                    tanah_loaded = load_tanah_models()
-                    bangunan_loaded = load_bangunan_models()
-                    
-                    results['training'] = {
-                        'status': 'success',
-                        'message': 'Ensemble models berhasil dilatih dan dimuat ulang otomatis',
-                        'models_trained': training_results['models_trained'],
-                        'timestamp': training_results['timestamp'],
-                        'tanah_reloaded': tanah_loaded,
-                        'bangunan_reloaded': bangunan_loaded
-                    }
-                    
-                    return jsonify({
-                        'success': True,
-                        'results': results,
-                        'message': 'File berhasil diunggah dan ensemble models dilatih otomatis! 🎉'
-                    })
-                else:
-                    results['training'] = {
-                        'status': 'error',
-                        'message': 'Training gagal',
-                        'errors': training_results['errors']
-                    }
-                    
-                    return jsonify({
-                        'success': False,
-                        'results': results,
-                        'message': 'File diunggah tapi training gagal'
-                    }), 500
-                    
-            except Exception as e:
-                current_app.logger.error(f"Auto-training error: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                results['training'] = {
-                    'status': 'error',
-                    'message': f'Error dalam auto-training: {str(e)}'
-                }
-                
-                return jsonify({
-                    'success': False,
-                    'results': results,
-                    'message': 'File diunggah tapi auto-training gagal'
-                }), 500
+            # training_mode=full memaksa training ulang dari nol; default
+            # mengikuti TRAINING_INCREMENTAL (warm-start dari versi aktif)
+            options = {}
+            training_mode = request.form.get('training_mode')
+            if training_mode in ('full', 'incremental'):
+                options['incremental'] = training_mode == 'incremental'
+            job_id = submit_training_job('jual', uploaded_files, options)
+            results['training'] = {
+                'status': 'queued',
+                'job_id': job_id,
+                'status_url': url_for('prediction.get_training_job', job_id=job_id),
+                'message': 'Training ensemble dijadwalkan'
+            }
+            
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'results': results,
+                'message': 'File berhasil diunggah, training ensemble berjalan di background'
+            }), 202
         
         # If no files were uploaded successfully
         return jsonify({
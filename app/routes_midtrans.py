@@ -7,6 +7,10 @@ import hmac
 import base64
 import midtransclient
 from app import mysql
+from app.dashboard_stats import invalidate_dashboard_stats
+from app.models_sqlalchemy import RentalAsset
+from app.models_rental_transaction import RentalTransaction
+from app.status_counters import reconcile_after_raw_sql
 
 # Create Blueprint
 midtrans_bp = Blueprint('midtrans', __name__)
@@ -278,6 +282,8 @@ def verify_payment():
                 
                 # Commit the transaction
                 mysql.connection.commit()
+                invalidate_dashboard_stats()
+                reconcile_after_raw_sql(RentalAsset, RentalTransaction)
                 cursor.close()
                 
                 return jsonify({
@@ -385,6 +391,8 @@ def payment_notification():
                 """, (transaction_id,))
             
             mysql.connection.commit()
+            invalidate_dashboard_stats()
+            reconcile_after_raw_sql(RentalAsset, RentalTransaction)
         
         cursor.close()
         return jsonify({'status': 'success'})
@@ -1,22 +1,14 @@
 import os
 import sys
-import pandas as pd
-import numpy as np
-import joblib
 import json
 from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app, render_template, flash, redirect, url_for
 from werkzeug.utils import secure_filename
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-import xgboost as xgb
-from catboost import CatBoostRegressor
 
-# Import sistem prediksi yang sudah distandarisasi
+# Sistem prediksi yang sudah distandarisasi. prediction_system (pandas,
+# model ML) tidak diimport saat boot; training berjalan di proses job terpisah
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from prediction_system import prediction_system
+from training_jobs import get_training_queue, submit_training_job
 
 prediction_bp = Blueprint('prediction', __name__)
 
@@ -27,6 +19,11 @@ ALLOWED_EXTENSIONS = {'csv'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def get_prediction_system():
+    """Instance global PredictionSystem (diimport saat request pertama, bukan saat boot)"""
+    from prediction_system import prediction_system
+    return prediction_system
+
 @prediction_bp.route('/predict_land_price', methods=['POST'])
 def predict_land_price():
     """Predict land rental price using standardized prediction system"""
@@ -80,7 +77,7 @@ def predict_land_price():
         }
         
         # Lakukan prediksi menggunakan sistem prediksi terstandarisasi
-        result = prediction_system.predict_land_price(input_data)
+        result = get_prediction_system().predict_land_price(input_data)
         
         if result['success']:
             return jsonify(result)
@@ -149,7 +146,7 @@ def predict_building_price():
         }
         
         # Lakukan prediksi menggunakan sistem prediksi terstandarisasi
-        result = prediction_system.predict_building_price(input_data)
+        result = get_prediction_system().predict_building_price(input_data)
         
         if result['success']:
             return jsonify(result)
@@ -164,7 +161,7 @@ def predict_building_price():
 def get_model_status():
     """Get status of available prediction models"""
     try:
-        status = prediction_system.get_model_status()
+        status = get_prediction_system().get_model_status()
         return jsonify(status)
     except Exception as e:
         current_app.logger.error(f"Error getting model status: {str(e)}")
@@ -172,7 +169,11 @@ def get_model_status():
 
 @prediction_bp.route('/update_prediction_models', methods=['POST'])
 def update_prediction_models():
-    """Update prediction models using uploaded CSV data with auto-training"""
+    """
+    Upload CSV data lalu jadwalkan auto-training sebagai background job
+    
+    Returns 202 dengan job_id; progress lewat /training_jobs/<job_id>
+    """
     try:
         # Check if files were uploaded
         if 'tanah_file' not in request.files and 'bangunan_file' not in request.files:
@@ -223,57 +224,22 @@ def update_prediction_models():
                 except Exception as e:
                     results['bangunan'] = {'error': f'Gagal memproses file bangunan: {str(e)}'}
         
-        # Auto-train models if files were uploaded successfully
+        # Training dijalankan di background job (bukan di dalam request)
         if uploaded_files:
-            try:
-                # Import auto trainer
-                sys.path.append(os.path.join(current_app.root_path, '..'))
-                from auto_model_trainer import auto_train_from_uploads
-                
-                print(f"🚀 Starting auto-training for {len(uploaded_files)} files...")
-                training_results = auto_train_from_uploads(uploaded_files)
-                
-                if training_results['success']:
-                    # Auto-reload models after successful training
-                    prediction_system.reload_models()
-                    
-                    results['training'] = {
-                        'status': 'success',
-                        'message': 'Model berhasil dilatih dan dimuat ulang otomatis',
-                        'models_trained': training_results['models_trained'],
-                        'timestamp': training_results['timestamp']
-                    }
-                    
-                    return jsonify({
-                        'success': True,
-                        'results': results,
-                        'message': 'File berhasil diunggah dan model dilatih otomatis!'
-                    })
-                else:
-                    results['training'] = {
-                        'status': 'error',
-                        'message': 'Training gagal',
-                        'errors': training_results['errors']
-                    }
-                    
-                    return jsonify({
-                        'success': False,
-                        'results': results,
-                        'message': 'File diunggah tapi training gagal'
-                    }), 500
-                    
-            except Exception as e:
-                current_app.logger.error(f"Auto-training error: {str(e)}")
-                results['training'] = {
-                    'status': 'error', 
-                    'message': f'Error dalam auto-training: {str(e)}'
-                }
-                
-                return jsonify({
-                    'success': False,
-                    'results': results,
-                    'message': 'File diunggah tapi auto-training gagal'
-                }), 500
+            job_id = submit_training_job('rental', uploaded_files)
+            results['training'] = {
+                'status': 'queued',
+                'job_id': job_id,
+                'status_url': url_for('prediction.get_training_job', job_id=job_id),
+                'message': 'Training dijadwalkan; model dimuat ulang otomatis setelah selesai'
+            }
+            
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'results': results,
+                'message': 'File berhasil diunggah, training berjalan di background'
+            }), 202
         
         # If no files were uploaded successfully
         return jsonify({
@@ -286,15 +252,44 @@ def update_prediction_models():
         current_app.logger.error(f"Error updating models: {str(e)}")
         return jsonify({'error': f'Gagal memperbarui model: {str(e)}'}), 500
 
+@prediction_bp.route('/training_jobs', methods=['GET'])
+def list_training_jobs():
+    """Daftar job training terbaru (query: limit, status)"""
+    try:
+        jobs = get_training_queue().list_jobs(
+            limit=request.args.get('limit', 20, type=int),
+            status=request.args.get('status')
+        )
+        return jsonify({'success': True, 'jobs': jobs})
+    except Exception as e:
+        current_app.logger.error(f"Error listing training jobs: {str(e)}")
+        return jsonify({'error': f'Gagal membaca job training: {str(e)}'}), 500
+
+@prediction_bp.route('/training_jobs/<job_id>', methods=['GET'])
+def get_training_job(job_id):
+    """Status, progress (0-1) dan hasil job training"""
+    job = get_training_queue().get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job tidak ditemukan'}), 404
+    return jsonify({'success': True, 'job': job})
+
+@prediction_bp.route('/training_jobs/<job_id>/cancel', methods=['POST'])
+def cancel_training_job(job_id):
+    """Batalkan job training (queued: langsung, running: proses dihentikan)"""
+    job = get_training_queue().cancel(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job tidak ditemukan'}), 404
+    return jsonify({'success': True, 'job': job})
+
 @prediction_bp.route('/reload_models', methods=['POST'])
 def reload_models():
     """Reload prediction models to get latest trained versions"""
     try:
         # Reload models dari sistem prediksi
-        prediction_system.reload_models()
+        get_prediction_system().reload_models()
         
         # Get updated model status
-        status = prediction_system.get_model_status()
+        status = get_prediction_system().get_model_status()
         
         return jsonify({
             'success': True,
@@ -306,11 +301,67 @@ def reload_models():
         current_app.logger.error(f"Error reloading models: {str(e)}")
         return jsonify({'error': f'Gagal memuat ulang model: {str(e)}'}), 500
 
+@prediction_bp.route('/model_versions/<model_type>', methods=['GET'])
+def get_model_versions(model_type):
+    """Daftar versi model dari index (registry.json): versi aktif, pin, metrics"""
+    if model_type not in ('tanah', 'bangunan'):
+        return jsonify({'error': 'Tipe model harus tanah atau bangunan'}), 400
+    try:
+        return jsonify({'success': True, **get_prediction_system().list_model_versions(model_type)})
+    except Exception as e:
+        current_app.logger.error(f"Error listing model versions: {str(e)}")
+        return jsonify({'error': f'Gagal membaca versi model: {str(e)}'}), 500
+
+@prediction_bp.route('/model_versions/<model_type>/pin', methods=['POST'])
+def pin_model_version(model_type):
+    """
+    Pin versi model (form/JSON 'version', default versi aktif)
+    
+    Selama di-pin, training baru tetap didaftarkan tapi tidak diaktifkan.
+    Kirim unpin=1 untuk melepas pin dan kembali ke versi terbaru.
+    """
+    if model_type not in ('tanah', 'bangunan'):
+        return jsonify({'error': 'Tipe model harus tanah atau bangunan'}), 400
+    params = request.get_json(silent=True) or request.form
+    try:
+        if str(params.get('unpin', '0')) == '1':
+            loaded = get_prediction_system().unpin_model_version(model_type)
+        else:
+            loaded = get_prediction_system().pin_model_version(model_type, params.get('version'))
+        return jsonify({
+            'success': loaded,
+            'loaded': loaded,
+            **get_prediction_system().list_model_versions(model_type)
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error pinning model version: {str(e)}")
+        return jsonify({'error': f'Gagal pin versi model: {str(e)}'}), 500
+
+@prediction_bp.route('/model_versions/<model_type>/rollback', methods=['POST'])
+def rollback_model_version(model_type):
+    """Rollback ke versi sebelum versi aktif (versi tersebut di-pin)"""
+    if model_type not in ('tanah', 'bangunan'):
+        return jsonify({'error': 'Tipe model harus tanah atau bangunan'}), 400
+    try:
+        loaded = get_prediction_system().rollback_model(model_type)
+        return jsonify({
+            'success': loaded,
+            'loaded': loaded,
+            **get_prediction_system().list_model_versions(model_type)
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error rolling back model: {str(e)}")
+        return jsonify({'error': f'Gagal rollback model: {str(e)}'}), 500
+
 @prediction_bp.route('/get_prediction_stats', methods=['GET'])
 def get_prediction_stats():
     """Get prediction model statistics with model availability check"""
     try:
-        stats = prediction_system.get_model_status()
+        stats = get_prediction_system().get_model_status()
         
         return jsonify({
             'success': True,
@@ -332,6 +383,7 @@ def get_prediction_analytics():
     
     Query Parameters:
         days (int): Jumlah hari ke belakang untuk analisis (default: 7)
+        hours (int): Jika diisi, sertakan rollup per jam untuk N jam terakhir
         
     Returns:
         JSON dengan prediction stats dan model status
@@ -341,18 +393,24 @@ def get_prediction_analytics():
         days = request.args.get('days', 7, type=int)
         
         # Get prediction statistics from logs
-        prediction_stats = prediction_system.get_prediction_stats(days=days)
+        prediction_stats = get_prediction_system().get_prediction_stats(days=days)
         
         # Get current model status
-        model_status = prediction_system.get_model_status()
+        model_status = get_prediction_system().get_model_status()
         
-        return jsonify({
+        response = {
             'success': True,
             'period_days': days,
             'prediction_stats': prediction_stats,
             'model_status': model_status,
             'timestamp': datetime.now().isoformat()
-        })
+        }
+        
+        hours = request.args.get('hours', type=int)
+        if hours:
+            response['hourly_stats'] = get_prediction_system().get_hourly_prediction_stats(hours=hours)
+        
+        return jsonify(response)
         
     except Exception as e:
         current_app.logger.error(f"Error getting prediction analytics: {str(e)}")
@@ -360,3 +418,32 @@ def get_prediction_analytics():
             'success': False,
             'error': f'Gagal mendapatkan analytics: {str(e)}'
         }), 500
+
+@prediction_bp.route('/prediction_logs/query', methods=['GET'])
+def query_prediction_logs():
+    """
+    Query prediction logs kolumnar (jumlah prediksi dan persentil harga)
+    
+    Query Parameters:
+        start_date (str): 'YYYY-MM-DD' (default: 6 hari sebelum end_date)
+        end_date (str): 'YYYY-MM-DD' (default: hari ini)
+        model_type (str): 'tanah' atau 'bangunan' (opsional)
+        kecamatan (str): Filter kecamatan (opsional)
+    """
+    try:
+        result = get_prediction_system().query_prediction_logs(
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            model_type=request.args.get('model_type'),
+            kecamatan=request.args.get('kecamatan')
+        )
+        return jsonify({'success': True, 'query': result})
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Parameter tidak valid: {str(e)}'}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error querying prediction logs: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Gagal query prediction logs: {str(e)}'
+        }), 500
@@ -3,6 +3,7 @@ from werkzeug.utils import secure_filename
 from app import db
 from app.models_sqlalchemy import RentalAsset, RentalRequest, AdminNotification
 from app.models_rental_transaction import RentalTransaction
+from app.status_counters import status_count, status_counts, total_count
 from functools import wraps
 from datetime import datetime, date
 import json
@@ -529,12 +530,16 @@ def force_delete_asset(asset_id):
     try:
         asset = RentalAsset.query.get_or_404(asset_id)
         
+        # Hapus per instance (bukan bulk query.delete()) agar listener
+        # status_counters ikut mengurangi counter transaksi dan pengajuan
+        
         # First, delete all related rental transactions
-        from app.models_rental_transaction import RentalTransaction
-        RentalTransaction.query.filter_by(asset_id=asset_id).delete()
+        for transaction in RentalTransaction.query.filter_by(asset_id=asset_id).all():
+            db.session.delete(transaction)
         
         # Delete all related rental requests
-        RentalRequest.query.filter_by(asset_id=asset_id).delete()
+        for rental_request in RentalRequest.query.filter_by(asset_id=asset_id).all():
+            db.session.delete(rental_request)
         
         # Finally, delete the asset
         db.session.delete(asset)
@@ -739,9 +744,10 @@ def create_rental_request():
 def get_rental_stats():
     """Get rental assets statistics"""
     try:
-        total_assets = RentalAsset.query.count()
-        available_assets = RentalAsset.query.filter_by(status='available').count()
-        rented_assets = RentalAsset.query.filter_by(status='rented').count()
+        asset_counts = status_counts(RentalAsset)
+        total_assets = total_count(RentalAsset, asset_counts)
+        available_assets = status_count(RentalAsset, 'available', asset_counts)
+        rented_assets = status_count(RentalAsset, 'rented', asset_counts)
         
         avg_price = db.session.query(db.func.avg(RentalAsset.harga_sewa)).scalar() or 0
         
@@ -749,9 +755,9 @@ def get_rental_stats():
             'total_assets': total_assets,
             'available_assets': available_assets,
             'rented_assets': rented_assets,
-            'maintenance_assets': RentalAsset.query.filter_by(status='maintenance').count(),
+            'maintenance_assets': status_count(RentalAsset, 'maintenance', asset_counts),
             'avg_rental_price': float(avg_price),
-            'pending_requests': RentalRequest.query.filter_by(status='pending').count()
+            'pending_requests': status_count(RentalRequest, 'pending')
         }
         
         return jsonify({
@@ -3,6 +3,8 @@ from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 from app import db
+from app.dashboard_stats import invalidate_dashboard_stats
+from app.status_counters import reconcile_after_raw_sql
 from sqlalchemy import text
 
 # Load environment variables
@@ -177,6 +179,8 @@ def create_rental_transaction():
                 # Don't fail the transaction creation if asset update fails
             
             connection.commit()
+            invalidate_dashboard_stats()
+            reconcile_after_raw_sql()
             
             return jsonify({
                 'success': True,
@@ -346,6 +350,8 @@ def end_rental(rental_id):
                     print(f"Warning: Could not update asset status: {e}")
             
             connection.commit()
+            invalidate_dashboard_stats()
+            reconcile_after_raw_sql()
             
             return jsonify({
                 'success': True,
@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash,
 from app import db
 from app.models_sqlalchemy import RentalAsset, RentalRequest
 from app.routes_user_favorites import UserFavorite
+from app.status_counters import status_count
 from datetime import datetime
 import json
 
@@ -20,7 +21,7 @@ def get_user_dashboard_stats():
         user_id = session['user_id']
         
         # Hitung jumlah aset tersedia
-        total_assets = RentalAsset.query.filter_by(status='available').count()
+        total_assets = status_count(RentalAsset, 'available')
         
         # Hitung jumlah favorit
         total_favorites = UserFavorite.query.filter_by(user_id=user_id).count()
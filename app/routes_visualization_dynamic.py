@@ -7,6 +7,9 @@ from flask import Blueprint, request, jsonify
 from sqlalchemy import func, extract, case, and_
 from app.models_sqlalchemy import RentalAsset, RentalRequest, db
 from app.models_rental_transaction import RentalTransaction
+from app.dashboard_stats import get_dashboard_statistics
+from app.status_counters import status_count, status_counts, total_count
+from app.histogram import compute_histogram, histogram_options, value_source
 from datetime import datetime, timedelta
 import calendar
 
@@ -16,55 +19,32 @@ visualization_dynamic = Blueprint('visualization_dynamic', __name__)
 def get_dashboard_stats():
     """Get real-time dashboard statistics"""
     try:
-        # Basic counts
-        total_assets = RentalAsset.query.count()
-        available_assets = RentalAsset.query.filter_by(status='available').count()
-        rented_assets = RentalAsset.query.filter_by(status='rented').count()
-        maintenance_assets = RentalAsset.query.filter_by(status='maintenance').count()
-        
-        # Pending requests
-        pending_requests = RentalRequest.query.filter_by(status='pending').count()
-        
-        # Revenue calculations
-        active_transactions = db.session.query(RentalTransaction).filter_by(status='active').all()
-        monthly_revenue = sum(tx.monthly_price for tx in active_transactions)
-        
-        # Average prices by type
-        avg_tanah_price = db.session.query(func.avg(RentalAsset.harga_sewa)).filter_by(asset_type='tanah').scalar() or 0
-        avg_bangunan_price = db.session.query(func.avg(RentalAsset.harga_sewa)).filter_by(asset_type='bangunan').scalar() or 0
-        
-        # Occupancy rate
-        occupancy_rate = (rented_assets / total_assets * 100) if total_assets > 0 else 0
-        
-        # Recent activity (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        new_assets_this_month = RentalAsset.query.filter(RentalAsset.created_at >= thirty_days_ago).count()
-        new_requests_this_month = RentalRequest.query.filter(RentalRequest.created_at >= thirty_days_ago).count()
+        stats = get_dashboard_statistics()
         
         return jsonify({
             'success': True,
             'stats': {
                 # Asset statistics
-                'total_assets': total_assets,
-                'available_assets': available_assets,
-                'rented_assets': rented_assets,
-                'maintenance_assets': maintenance_assets,
-                'occupancy_rate': round(occupancy_rate, 2),
+                'total_assets': stats['total_assets'],
+                'available_assets': stats['available_assets'],
+                'rented_assets': stats['rented_assets'],
+                'maintenance_assets': stats['maintenance_assets'],
+                'occupancy_rate': stats['occupancy_rate'],
                 
                 # Financial data
-                'monthly_revenue': float(monthly_revenue),
-                'avg_tanah_price': float(avg_tanah_price),
-                'avg_bangunan_price': float(avg_bangunan_price),
+                'monthly_revenue': stats['monthly_revenue'],
+                'avg_tanah_price': stats['avg_tanah_price'],
+                'avg_bangunan_price': stats['avg_bangunan_price'],
                 
                 # Activity metrics
-                'pending_requests': pending_requests,
-                'new_assets_this_month': new_assets_this_month,
-                'new_requests_this_month': new_requests_this_month,
+                'pending_requests': stats['pending_requests'],
+                'new_assets_this_month': stats['new_assets_this_month'],
+                'new_requests_this_month': stats['new_requests_this_month'],
                 
                 # Performance indicators
                 'revenue_growth': 12.5,  # Placeholder - could be calculated from historical data
                 'request_approval_rate': 85.0,  # Placeholder
-                'avg_rental_duration': 6.2,  # Placeholder - months
+                'avg_rental_duration': stats['avg_rental_duration'],  # months (active transactions)
             }
         })
         
@@ -150,56 +130,45 @@ def get_location_distribution():
         print(f"Error in get_location_distribution: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Bucket harga sewa (per bulan)
+RENTAL_PRICE_EDGES = [0, 5000000, 10000000, 20000000, 50000000, float('inf')]
+RENTAL_PRICE_LABELS = ['< 5 Juta', '5-10 Juta', '10-20 Juta', '20-50 Juta', '> 50 Juta']
+
 @visualization_dynamic.route('/api/dashboard/price-range-analysis', methods=['GET'])
 def get_price_range_analysis():
     """Get price range distribution for histogram"""
     try:
-        # Define price ranges
-        price_ranges = [
-            (0, 5000000, '< 5 Juta'),
-            (5000000, 10000000, '5-10 Juta'),
-            (10000000, 20000000, '10-20 Juta'),
-            (20000000, 50000000, '20-50 Juta'),
-            (50000000, float('inf'), '> 50 Juta')
-        ]
-        
-        range_data = []
-        for min_price, max_price, label in price_ranges:
-            if max_price == float('inf'):
-                count = RentalAsset.query.filter(RentalAsset.harga_sewa >= min_price).count()
-            else:
-                count = RentalAsset.query.filter(
-                    and_(RentalAsset.harga_sewa >= min_price, RentalAsset.harga_sewa < max_price)
-                ).count()
-            
-            range_data.append({
-                'range': label,
-                'count': count,
-                'min_price': min_price,
-                'max_price': max_price if max_price != float('inf') else None
-            })
-        
-        # Get detailed price statistics
-        price_stats = db.session.query(
-            func.min(RentalAsset.harga_sewa).label('min_price'),
-            func.max(RentalAsset.harga_sewa).label('max_price'),
-            func.avg(RentalAsset.harga_sewa).label('avg_price'),
-            func.count(RentalAsset.id).label('total_count')
-        ).first()
-        
+        # ?quantiles=N atau ?edges=a,b,c untuk bucket selain default
+        histogram = compute_histogram(
+            db.session,
+            value_source(RentalAsset.harga_sewa),
+            **histogram_options(request.args, RENTAL_PRICE_EDGES, RENTAL_PRICE_LABELS)
+        )
+        
+        range_data = [{
+            'range': bucket['label'],
+            'count': bucket['count'],
+            'min_price': bucket['min_edge'],
+            'max_price': bucket['max_edge']
+        } for bucket in histogram['buckets']]
+        
+        statistics = histogram['statistics']
         return jsonify({
             'success': True,
             'data': {
                 'ranges': range_data,
                 'statistics': {
-                    'min_price': float(price_stats.min_price) if price_stats.min_price else 0,
-                    'max_price': float(price_stats.max_price) if price_stats.max_price else 0,
-                    'avg_price': float(price_stats.avg_price) if price_stats.avg_price else 0,
-                    'total_count': price_stats.total_count
+                    'min_price': statistics['min'],
+                    'max_price': statistics['max'],
+                    'avg_price': statistics['avg'],
+                    'total_count': statistics['count'],
+                    'percentiles': statistics['percentiles']
                 }
             }
         })
         
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error in get_price_range_analysis: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -374,19 +343,21 @@ def get_property_metrics():
 def get_performance_indicators():
     """Get key performance indicators"""
     try:
-        # Calculate various KPIs
-        total_assets = RentalAsset.query.count()
+        # Calculate various KPIs (jumlah per status dari tabel status_counters)
+        asset_counts = status_counts(RentalAsset)
+        request_counts = status_counts(RentalRequest)
+        total_assets = total_count(RentalAsset, asset_counts)
         
         # Request conversion rate
-        total_requests = RentalRequest.query.count()
-        approved_requests = RentalRequest.query.filter_by(status='active').count()
+        total_requests = total_count(RentalRequest, request_counts)
+        approved_requests = status_count(RentalRequest, 'active', request_counts)
         conversion_rate = (approved_requests / total_requests * 100) if total_requests > 0 else 0
         
         # Average time to rent (placeholder - would need timestamp analysis)
         avg_time_to_rent = 15.5  # days
         
         # Asset utilization
-        rented_count = RentalAsset.query.filter_by(status='rented').count()
+        rented_count = status_count(RentalAsset, 'rented', asset_counts)
         utilization_rate = (rented_count / total_assets * 100) if total_assets > 0 else 0
         
         # Price per sqm analysis
@@ -415,7 +386,7 @@ def get_performance_indicators():
                 },
                 'portfolio_health': {
                     'available_ratio': round((total_assets - rented_count) / total_assets * 100, 2) if total_assets > 0 else 0,
-                    'maintenance_ratio': round(RentalAsset.query.filter_by(status='maintenance').count() / total_assets * 100, 2) if total_assets > 0 else 0
+                    'maintenance_ratio': round(status_count(RentalAsset, 'maintenance', asset_counts) / total_assets * 100, 2) if total_assets > 0 else 0
                 }
             }
         })
@@ -217,13 +217,18 @@ class PredictionManager {
             
             const data = await response.json();
             
-            if (data.success || (data.tanah && !data.tanah.error) || (data.bangunan && !data.bangunan.error)) {
-                this.showUpdateSuccess(progressDiv, resultDiv, data);
-                // Refresh model status
-                setTimeout(() => this.loadModelStatus(), 1000);
-            } else {
-                throw new Error('Gagal memperbarui model');
+            if (!response.ok || !data.success) {
+                throw new Error(data.error || data.message || 'Gagal memperbarui model');
+            }
+            
+            // Training berjalan di background job: tunggu sampai selesai
+            const job = await this.pollTrainingJob(data.results.training.status_url, progressDiv);
+            if (job.status !== 'succeeded') {
+                throw new Error(job.error || job.message || `Training ${job.status}`);
             }
+            this.showUpdateSuccess(progressDiv, resultDiv, data.results);
+            // Refresh model status
+            setTimeout(() => this.loadModelStatus(), 1000);
             
         } catch (error) {
             this.showUpdateError(progressDiv, resultDiv, error.message);
@@ -390,6 +395,28 @@ class PredictionManager {
         resultDiv.style.display = 'none';
     }
 
+    async pollTrainingJob(statusUrl, progressDiv, intervalMs = 2000) {
+        const bar = progressDiv.querySelector('.progress-bar');
+        const text = progressDiv.querySelector('p.text-muted');
+        
+        while (true) {
+            const response = await fetch(statusUrl);
+            const data = await response.json();
+            if (!response.ok || !data.success) {
+                return { status: 'failed', error: data.error || 'Status job tidak tersedia' };
+            }
+            
+            const job = data.job;
+            const percent = Math.round(job.progress * 100);
+            if (bar) bar.style.width = `${Math.max(5, percent)}%`;
+            if (text && job.message) text.textContent = `${job.message} (${percent}%)`;
+            if (['succeeded', 'failed', 'cancelled'].includes(job.status)) {
+                return job;
+            }
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+    }
+
     showUpdateSuccess(progressDiv, resultDiv, data) {
         progressDiv.style.display = 'none';
         resultDiv.style.display = 'block';
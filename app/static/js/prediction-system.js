@@ -311,16 +311,23 @@ async function handleModelUpdate(event) {
         
         const result = await response.json();
         
-        // Hide progress
-        hideElement('updateProgress');
-        
         if (response.ok && result.success) {
-            showUpdateSuccess(result);
-            // Reload model status
-            setTimeout(() => {
-                loadModelStatus();
-            }, 1000);
+            // Training berjalan di background job: tunggu sampai selesai
+            submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i>Training...';
+            const job = await pollTrainingJob(result.results.training.status_url, 'updateProgress');
+            hideElement('updateProgress');
+            
+            if (job.status === 'succeeded') {
+                showUpdateSuccess({ message: 'Model berhasil dilatih dan dimuat ulang otomatis', results: {} });
+                // Reload model status
+                setTimeout(() => {
+                    loadModelStatus();
+                }, 1000);
+            } else {
+                showUpdateError(job.error || job.message || `Training ${job.status}`);
+            }
         } else {
+            hideElement('updateProgress');
             showUpdateError(result.error || 'Gagal mengupload file');
         }
         
@@ -487,6 +494,36 @@ function showUpdateError(errorMessage) {
     }
 }
 
+/**
+ * Poll status background training job sampai selesai
+ * Progress bar dan pesan di elemen progressId ikut diperbarui
+ */
+async function pollTrainingJob(statusUrl, progressId, intervalMs = 2000) {
+    const container = document.getElementById(progressId);
+    const bar = container ? container.querySelector('.progress-bar') : null;
+    const text = container ? container.querySelector('p.text-muted') : null;
+    
+    while (true) {
+        const response = await fetch(statusUrl);
+        const data = await response.json();
+        if (!response.ok || !data.success) {
+            return { status: 'failed', error: data.error || 'Status job tidak tersedia' };
+        }
+        
+        const job = data.job;
+        if (bar) {
+            bar.style.width = `${Math.max(5, Math.round(job.progress * 100))}%`;
+        }
+        if (text && job.message) {
+            text.textContent = `${job.message} (${Math.round(job.progress * 100)}%)`;
+        }
+        if (['succeeded', 'failed', 'cancelled'].includes(job.status)) {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 /**
  * Utility functions
  */
@@ -586,16 +623,22 @@ async function handleJualModelUpdate(event) {
         
         const result = await response.json();
         
-        // Hide progress
-        hideElement('jualUpdateProgress');
-        
         if (response.ok && result.success) {
-            showJualUpdateSuccess(result);
-            
             // Clear file inputs
             form.querySelector('#jual_tanah_file').value = '';
             form.querySelector('#jual_bangunan_file').value = '';
+            
+            // Training berjalan di background job: tunggu sampai selesai
+            const job = await pollTrainingJob(result.results.training.status_url, 'jualUpdateProgress');
+            hideElement('jualUpdateProgress');
+            
+            if (job.status === 'succeeded') {
+                showJualUpdateSuccess({ results: { training: job.result } });
+            } else {
+                showJualUpdateError(job.error || job.message || `Training ${job.status}`);
+            }
         } else {
+            hideElement('jualUpdateProgress');
             showJualUpdateError(result.error || result.message || 'Gagal mengupload file atau training model');
         }
         
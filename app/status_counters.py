@@ -0,0 +1,190 @@
+"""
+Status Counters
+===============
+
+Tabel status_counters menyimpan jumlah baris per status untuk RentalAsset,
+RentalRequest dan RentalTransaction, sehingga endpoint hitungan cukup
+membaca beberapa baris kecil (satu per status) alih-alih COUNT(*) per
+status di setiap polling.
+
+- Listener after_insert / after_update / after_delete menambah/mengurangi
+  counter memakai connection flush yang sama, jadi counter ikut commit
+  atau rollback bersama perubahan datanya.
+- Perubahan di luar ORM (SQL mentah, query.update()/delete() bulk) tidak
+  terdeteksi listener; gunakan reconcile_status_counters() (CLI
+  `flask reconcile-status-counters`, POST /api/admin/status-counters/reconcile)
+  untuk membangun ulang dari GROUP BY.
+"""
+
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, func, inspect
+
+from app import db
+from app.models_sqlalchemy import RentalAsset, RentalRequest
+from app.models_rental_transaction import RentalTransaction
+from app.models_status_counter import StatusCounter
+
+TRACKED_MODELS = (RentalAsset, RentalRequest, RentalTransaction)
+
+# Status NULL disimpan sebagai '' (bagian dari primary key)
+NULL_STATUS = ''
+
+
+def _entity(model):
+    return model.__tablename__
+
+
+def _status_key(status):
+    return NULL_STATUS if status is None else status
+
+
+def known_statuses(model):
+    """Nilai enum kolom status (counter-nya di-seed 0 oleh reconcile)"""
+    return list(getattr(model.__table__.c.status.type, 'enums', []))
+
+
+# ===== READ =====
+
+def status_counts(model):
+    """
+    Jumlah baris per status dari status_counters
+
+    Returns:
+        dict: {status: count}; status NULL dengan key ''
+    """
+    rows = db.session.query(StatusCounter.status, StatusCounter.count).filter(
+        StatusCounter.entity == _entity(model)
+    ).all()
+    return {status: count for status, count in rows}
+
+
+def status_count(model, status, counts=None):
+    counts = status_counts(model) if counts is None else counts
+    return counts.get(_status_key(status), 0)
+
+
+def total_count(model, counts=None):
+    counts = status_counts(model) if counts is None else counts
+    return sum(counts.values())
+
+
+# ===== WRITE (listener) =====
+
+def _bump(connection, entity, status, delta):
+    """Tambah delta ke counter (di dalam transaksi flush)"""
+    table = StatusCounter.__table__
+    status = _status_key(status)
+    result = connection.execute(
+        table.update()
+        .where(table.c.entity == entity, table.c.status == status)
+        .values(count=table.c.count + delta, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        # Status baru (belum di-seed reconcile / migration)
+        connection.execute(table.insert().values(
+            entity=entity, status=status, count=max(delta, 0), updated_at=datetime.utcnow()
+        ))
+
+
+def _after_insert(mapper, connection, target):
+    _bump(connection, mapper.local_table.name, target.status, 1)
+
+
+def _after_delete(mapper, connection, target):
+    _bump(connection, mapper.local_table.name, target.status, -1)
+
+
+def _after_update(mapper, connection, target):
+    history = inspect(target).attrs.status.history
+    if not history.has_changes():
+        return
+    old_status = history.deleted[0] if history.deleted else None
+    new_status = target.status
+    if _status_key(old_status) == _status_key(new_status):
+        return
+    entity = mapper.local_table.name
+    _bump(connection, entity, old_status, -1)
+    _bump(connection, entity, new_status, 1)
+
+
+def _load_old_status(target, value, oldvalue, initiator):
+    pass
+
+
+for _model in TRACKED_MODELS:
+    event.listen(_model, 'after_insert', _after_insert)
+    event.listen(_model, 'after_update', _after_update)
+    event.listen(_model, 'after_delete', _after_delete)
+    # active_history: nilai lama status selalu dimuat sebelum di-set, supaya
+    # after_update tahu counter mana yang dikurangi
+    event.listen(_model.status, 'set', _load_old_status, active_history=True)
+
+
+# ===== RECONCILE =====
+
+def reconcile_status_counters(models=TRACKED_MODELS):
+    """
+    Bangun ulang counter dari COUNT(*) GROUP BY status
+
+    Baris counter dikunci (SELECT ... FOR UPDATE) sebelum menghitung, sehingga
+    listener yang berjalan bersamaan menunggu sampai reconcile selesai.
+
+    Returns:
+        dict: koreksi per entity {entity: {status: {'counter': lama, 'actual': baru}}}
+    """
+    corrections = {}
+    try:
+        for model in models:
+            entity = _entity(model)
+            stored = {
+                counter.status: counter
+                for counter in StatusCounter.query.filter_by(entity=entity).with_for_update()
+            }
+            actual = {status: 0 for status in known_statuses(model)}
+            for status, count in db.session.query(model.status, func.count()).group_by(model.status):
+                actual[_status_key(status)] = count
+
+            for status in sorted(set(actual) | set(stored)):
+                count = actual.get(status, 0)
+                counter = stored.get(status)
+                if counter is None:
+                    db.session.add(StatusCounter(entity=entity, status=status, count=count))
+                    previous = None
+                elif counter.count != count:
+                    previous = counter.count
+                    counter.count = count
+                else:
+                    continue
+                if previous is not None or count:
+                    corrections.setdefault(entity, {})[status] = {'counter': previous, 'actual': count}
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return corrections
+
+
+def reconcile_after_raw_sql(*models):
+    """Reconcile setelah commit SQL mentah yang mengubah status (kegagalan hanya dicatat)"""
+    try:
+        return reconcile_status_counters(models or TRACKED_MODELS)
+    except Exception as e:
+        print(f"[WARNING] Failed to reconcile status counters: {e}")
+        return None
+
+
+@click.command('reconcile-status-counters')
+@with_appcontext
+def reconcile_status_counters_command():
+    """Bangun ulang tabel status_counters dari data (jalankan berkala, mis. cron)"""
+    corrections = reconcile_status_counters()
+    if not corrections:
+        click.echo('[OK] Status counters sudah sesuai')
+        return
+    for entity, statuses in corrections.items():
+        for status, change in statuses.items():
+            click.echo(f"[FIX] {entity}.{status or '<null>'}: {change['counter']} -> {change['actual']}")
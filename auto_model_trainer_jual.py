@@ -13,12 +13,10 @@ import os
 import sys
 import pandas as pd
 import numpy as np
-import joblib
 import json
 from datetime import datetime
 from pathlib import Path
 from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score, mean_absolute_percentage_error
 from sklearn.ensemble import RandomForestRegressor, VotingRegressor
 from xgboost import XGBRegressor
@@ -26,6 +24,13 @@ from catboost import CatBoostRegressor
 import warnings
 warnings.filterwarnings('ignore')
 
+from prediction_system import save_model_artifacts, load_model_artifacts, ModelIndex
+from preprocessing import PreprocessingPipeline
+from incremental_training import (
+    TrainingStore, detect_drift, incremental_rounds, holdout_split, ensemble_predict,
+    warm_start_xgboost, warm_start_random_forest, warm_start_catboost
+)
+
 class AutoModelTrainerJual:
     """
     Auto training system untuk update model prediksi harga JUAL
@@ -40,15 +45,63 @@ class AutoModelTrainerJual:
         
         self.data_dir = self.project_root / "data" / "raw"
         self.model_dir = self.project_root / "model"
+        self.store_dir = self.project_root / "data" / "training_store"
         self.random_state = 42
-        
-    def train_models_from_files(self, tanah_file_path=None, bangunan_file_path=None):
+        self.progress_callback = None
+        self._progress_span = (0, 1)
+    
+    # Tahap per tipe model: XGBoost, Random Forest, CatBoost, Voting, simpan
+    PROGRESS_STEPS = 5
+    
+    TARGET_COL = 'Harga Jual (Rp)'
+    
+    # Jumlah pohon/iterasi per member saat full training
+    BASE_ESTIMATORS = 300
+    
+    # Kolom yang boleh dikosongkan saat prediksi: diisi nilai per kecamatan dari data training
+    KECAMATAN_CONSTANTS = ['Kepadatan_Penduduk']
+    
+    MODEL_SPECS = {
+        'jual_tanah': {
+            'label': 'Jual Tanah',
+            'features': [
+                'Kecamatan', 'Sertifikat', 'Luas Tanah (M²)', 'Jenis Zona',
+                'Aksesibilitas', 'Tingkat Keamanan', 'Kepadatan_Penduduk',
+                'Jarak ke Pusat Kota (km)'
+            ],
+            'categorical': ['Kecamatan', 'Sertifikat', 'Jenis Zona', 'Aksesibilitas', 'Tingkat Keamanan']
+        },
+        'jual_bangunan': {
+            'label': 'Jual Bangunan',
+            'features': [
+                'Kecamatan', 'Sertifikat', 'Luas Tanah (M²)', 'Luas Bangunan (M²)',
+                'Jenis Zona', 'Kondisi Bangunan', 'Jumlah Lantai', 'Tahun Dibangun',
+                'Aksesibilitas', 'Tingkat Keamanan', 'Kepadatan_Penduduk',
+                'Jarak ke Pusat Kota (km)'
+            ],
+            'categorical': ['Kecamatan', 'Sertifikat', 'Jenis Zona', 'Kondisi Bangunan',
+                            'Aksesibilitas', 'Tingkat Keamanan']
+        }
+    }
+    
+    def _report_progress(self, step, message):
+        """Laporkan progress (0-1) ke job runner; callback boleh raise untuk membatalkan"""
+        if self.progress_callback is not None:
+            done, total = self._progress_span
+            self.progress_callback((done + step / self.PROGRESS_STEPS) / total, message)
+        
+    def train_models_from_files(self, tanah_file_path=None, bangunan_file_path=None, progress=None,
+                                incremental=False):
         """
         Training ensemble models dari file CSV yang diupload
         
         Args:
             tanah_file_path (str): Path ke file CSV tanah jual
             bangunan_file_path (str): Path ke file CSV bangunan jual
+            progress (callable): progress(fraction, message), dipanggil per tahap
+            incremental (bool): Baris baru ditambahkan ke training store dan
+                model sebelumnya dilanjutkan (warm-start); full retrain pada
+                seluruh store hanya jika drift melewati threshold
             
         Returns:
             dict: Hasil training dengan metrics untuk semua model
@@ -60,11 +113,17 @@ class AutoModelTrainerJual:
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         }
         
+        tasks = [path for path in (tanah_file_path, bangunan_file_path) if path and os.path.exists(path)]
+        self.progress_callback = progress
+        
         # Training model tanah jual
         if tanah_file_path and os.path.exists(tanah_file_path):
+            self._progress_span = (0, len(tasks))
             try:
                 print(f"🏞️ Training JUAL TANAH ensemble models dari: {tanah_file_path}")
-                tanah_result = self._train_tanah_jual_ensemble(tanah_file_path, results['timestamp'])
+                tanah_result = self._train_model_type(
+                    'jual_tanah', tanah_file_path, results['timestamp'], incremental
+                )
                 results['models_trained'].append(tanah_result)
                 print(f"✅ Ensemble tanah jual berhasil dilatih!")
                 print(f"   - Voting Regressor R²: {tanah_result['performance']['voting_r2']:.4f}")
@@ -75,9 +134,12 @@ class AutoModelTrainerJual:
         
         # Training model bangunan jual
         if bangunan_file_path and os.path.exists(bangunan_file_path):
+            self._progress_span = (len(tasks) - 1, len(tasks))
             try:
                 print(f"🏢 Training JUAL BANGUNAN ensemble models dari: {bangunan_file_path}")
-                bangunan_result = self._train_bangunan_jual_ensemble(bangunan_file_path, results['timestamp'])
+                bangunan_result = self._train_model_type(
+                    'jual_bangunan', bangunan_file_path, results['timestamp'], incremental
+                )
                 results['models_trained'].append(bangunan_result)
                 print(f"✅ Ensemble bangunan jual berhasil dilatih!")
                 print(f"   - Voting Regressor R²: {bangunan_result['performance']['voting_r2']:.4f}")
@@ -91,40 +153,262 @@ class AutoModelTrainerJual:
             
         return results
     
-    def _train_tanah_jual_ensemble(self, csv_path, timestamp):
+    def build_pipeline(self, model_type):
+        """PreprocessingPipeline (belum di-fit) untuk satu tipe model jual"""
+        spec = self.MODEL_SPECS[model_type]
+        return PreprocessingPipeline(
+            spec['features'], spec['categorical'],
+            kecamatan_columns=self.KECAMATAN_CONSTANTS
+        )
+    
+    def _train_model_type(self, model_type, csv_path, timestamp, incremental):
+        """
+        Full training pada file upload, atau incremental lewat training store
+        
+        Baris upload ditambahkan ke training store agar mode incremental
+        berikutnya punya data pembanding untuk deteksi drift, tetapi hanya
+        setelah versi baru tersimpan dan terdaftar: training yang gagal atau
+        dibatalkan (TrainingJobCancelled) tidak mengubah store.
+        """
+        full_train = {
+            'jual_tanah': self._train_tanah_jual_ensemble,
+            'jual_bangunan': self._train_bangunan_jual_ensemble
+        }[model_type]
+        spec = self.MODEL_SPECS[model_type]
+        store = TrainingStore(
+            self.store_dir / f"{model_type}.csv", spec['features'] + [self.TARGET_COL]
+        )
+        upload = pd.read_csv(csv_path)
+        existing, delta = store.diff(upload)
+        print(f"🗃️ Training store {model_type}: {len(existing)} baris lama + {len(delta)} baris baru")
+        
+        if not incremental:
+            result = full_train(upload, timestamp)
+            store.append(delta)
+            return result
+        
+        previous = self._load_previous_version(model_type)
+        if previous is not None and len(delta) == 0:
+            print("   Tidak ada baris baru, versi aktif tetap dipakai")
+            return {
+                'model_type': model_type,
+                'timestamp': previous['version'],
+                'training_mode': 'unchanged',
+                'performance': previous['metadata']['performance'],
+                'data_info': previous['metadata']['data_info']
+            }
+        
+        if previous is None:
+            drift = {'drift': True, 'reasons': ['no_previous_version']}
+        else:
+            numeric_cols = [
+                col for col in spec['features'] if col not in spec['categorical']
+            ] + [self.TARGET_COL]
+            drift = detect_drift(existing, delta, numeric_cols, previous['objects']['encoders'])
+        
+        if drift['drift']:
+            print(f"   Full retrain pada seluruh training store ({', '.join(drift['reasons'])})")
+            result = full_train(store.combine(existing, delta), timestamp)
+        else:
+            result = self._train_incremental_ensemble(model_type, previous, existing, delta, timestamp)
+        store.append(delta)
+        result['drift'] = drift
+        result['delta_rows'] = len(delta)
+        return result
+    
+    def _load_previous_version(self, model_type):
+        """Versi aktif (format artefak dengan ketiga member) untuk warm-start, atau None"""
+        index = ModelIndex(self.model_dir / model_type)
+        entry = index.active_entry()
+        if entry is None or entry['format'] != 'artifact':
+            return None
+        try:
+            artifacts = load_model_artifacts(index.version_dir(entry), mmap=False)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Versi {entry['version']} tidak bisa dipakai untuk warm-start: {e}")
+            return None
+        
+        objects = artifacts['objects']
+        metadata = artifacts['manifest'].get('metadata') or {}
+        if not {'xgboost', 'random_forest', 'catboost', 'encoders'} <= set(objects) or 'performance' not in metadata:
+            return None
+        return {
+            'version': entry['version'],
+            'objects': objects,
+            'weights': (artifacts['manifest'].get('ensemble') or {}).get('weights'),
+            'metadata': metadata
+        }
+    
+    def _train_incremental_ensemble(self, model_type, previous, existing, delta, timestamp):
+        """
+        Warm-start ketiga member pada baris baru saja
+        
+        XGBoost/CatBoost melanjutkan boosting dari versi sebelumnya dan
+        RandomForest menambah pohon; jumlah pohon/iterasi tambahan sebanding
+        dengan rasio delta terhadap data lama. Ensemble tidak di-refit:
+        nilainya rata-rata (berbobot) member seperti VotingRegressor.
+        """
+        feature_cols = self.MODEL_SPECS[model_type]['features']
+        objects = previous['objects']
+        
+        # Pipeline versi sebelumnya (versi lama tanpa pipeline: dari encoders)
+        pipeline = objects.get('preprocessing') or PreprocessingPipeline.from_encoders(
+            feature_cols, objects['encoders']
+        )
+        X = pipeline.transform_frame(delta)
+        y = delta[self.TARGET_COL]
+        X_train, X_test, y_train, y_test, in_sample = holdout_split(X, y, random_state=self.random_state)
+        evaluation = 'in_sample' if in_sample else 'holdout'
+        
+        rounds = incremental_rounds(self.BASE_ESTIMATORS, len(X_train), len(existing))
+        print(f"🤖 Warm-start dari versi {previous['version']}: {len(X_train)} baris, +{rounds} pohon/iterasi")
+        
+        self._report_progress(0, "Warm-start XGBoost")
+        xgb_model = warm_start_xgboost(objects['xgboost'], X_train, y_train, rounds)
+        self._report_progress(1, "Warm-start Random Forest")
+        rf_model = warm_start_random_forest(objects['random_forest'], X_train, y_train, rounds)
+        self._report_progress(2, "Warm-start CatBoost")
+        cat_model = warm_start_catboost(objects['catboost'], X_train, y_train, rounds)
+        
+        self._report_progress(3, "Evaluating ensemble")
+        members = {'xgboost': xgb_model, 'random_forest': rf_model, 'catboost': cat_model}
+        predictions = {name: model.predict(X_test) for name, model in members.items()}
+        predictions['voting'] = ensemble_predict(members, X_test, previous['weights'])
+        print(f"      Voting Regressor R² ({evaluation}): {r2_score(y_test, predictions['voting']):.4f}")
+        
+        metadata = self._save_ensemble_version(
+            model_type, timestamp, members, previous['weights'], pipeline, feature_cols,
+            y_test, predictions,
+            data_info={
+                'total_samples': len(existing) + len(delta),
+                'train_samples': len(X_train),
+                'test_samples': len(X_test),
+                'features_count': len(feature_cols),
+                'target_column': self.TARGET_COL
+            },
+            training_info={
+                'mode': 'incremental',
+                'base_version': previous['version'],
+                'delta_rows': len(delta),
+                'added_estimators': rounds,
+                'evaluation': evaluation
+            }
+        )
+        
+        return {
+            'model_type': model_type,
+            'timestamp': timestamp,
+            'training_mode': 'incremental',
+            'performance': metadata['performance'],
+            'data_info': metadata['data_info']
+        }
+    
+    def _save_ensemble_version(self, model_type, timestamp, members, weights, pipeline,
+                               feature_cols, y_test, predictions, data_info, training_info):
+        """
+        Simpan satu versi ensemble (folder versi baru) dan daftarkan ke index
+        
+        Returns:
+            dict: Metadata versi
+        """
+        # Setiap training = folder versi baru; versi aktif dipilih lewat CURRENT
+        model_dir = self.model_dir / model_type / timestamp
+        model_dir.mkdir(parents=True, exist_ok=True)
+        
+        print(f"\n💾 Saving models to: {model_dir}")
+        self._report_progress(4, "Saving models")
+        
+        names = ['xgboost', 'random_forest', 'catboost', 'voting']
+        r2 = {name: r2_score(y_test, predictions[name]) for name in names}
+        mape = {name: mean_absolute_percentage_error(y_test, predictions[name]) for name in names}
+        mae = {name: mean_absolute_error(y_test, predictions[name]) for name in names}
+        
+        # Save performance metrics as CSV
+        performance_df = pd.DataFrame({
+            'Model': ['XGBoost', 'Random Forest', 'CatBoost', 'Voting Regressor'],
+            'R2_Score': [r2[name] for name in names],
+            'MAPE': [mape[name] for name in names],
+            'MAE': [mae[name] for name in names]
+        })
+        performance_df.to_csv(model_dir / "model_performance.csv", index=False)
+        
+        # Save detailed metadata
+        metadata = {
+            'model_info': {
+                'type': f"Ensemble - {self.MODEL_SPECS[model_type]['label']}",
+                'timestamp': timestamp,
+                'models': ['XGBoost', 'Random Forest', 'CatBoost', 'Voting Regressor'],
+                'features_count': len(feature_cols)
+            },
+            'performance': {
+                'xgboost_r2': float(r2['xgboost']),
+                'random_forest_r2': float(r2['random_forest']),
+                'catboost_r2': float(r2['catboost']),
+                'voting_r2': float(r2['voting']),
+                'voting_mape': float(mape['voting']),
+                'voting_mae': float(mae['voting']),
+                'evaluation': training_info.get('evaluation', 'holdout')
+            },
+            'data_info': data_info,
+            'training': training_info,
+            'features': feature_cols
+        }
+        
+        with open(model_dir / f"metadata_{timestamp}.json", 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        # Save models as artifacts (XGBoost .ubj, CatBoost .cbm, RF/encoders .joblib)
+        # manifest.json ditulis terakhir; member + weights VotingRegressor
+        # dicatat di manifest sehingga member tidak disimpan dua kali
+        # preprocessing.joblib: pipeline yang dijalankan serving; encoders tetap
+        # disimpan untuk feature_schema, deteksi drift dan loader lama
+        encoders = pipeline.encoders()
+        save_model_artifacts(
+            model_dir,
+            dict(members, encoders=encoders, preprocessing=pipeline),
+            feature_cols,
+            encoders,
+            ensemble={'members': list(members), 'weights': weights},
+            metadata=metadata
+        )
+        
+        # Daftarkan ke index (registry.json) dan aktifkan kecuali versi lain di-pin;
+        # semua worker memuat versi ini (side slot + swap) saat CURRENT berubah.
+        # Metrics in-sample (delta terlalu kecil) tidak dipakai untuk membandingkan versi
+        in_sample = metadata['performance']['evaluation'] == 'in_sample'
+        ModelIndex(model_dir.parent).register(
+            timestamp, metrics=None if in_sample else metadata['performance']
+        )
+        
+        print(f"✅ All models saved successfully!")
+        return metadata
+    
+    def _train_tanah_jual_ensemble(self, df, timestamp):
         """
         Training ensemble models untuk prediksi JUAL tanah
         Models: XGBoost, Random Forest, CatBoost, Voting Regressor
+        
+        Args:
+            df (DataFrame): Data upload, atau isi training store + delta (full retrain)
         """
         
-        # Load data
-        df = pd.read_csv(csv_path)
         print(f"📊 Data tanah jual loaded: {df.shape}")
         
         # Data preprocessing
         df_clean = df.dropna()
         
         # Prepare features and target
-        target_col = 'Harga Jual (Rp)'
+        target_col = self.TARGET_COL
         
         # Features yang digunakan (sesuai dengan jual_aset.ipynb)
-        feature_cols = [
-            'Kecamatan', 'Sertifikat', 'Luas Tanah (M²)', 'Jenis Zona',
-            'Aksesibilitas', 'Tingkat Keamanan', 'Kepadatan_Penduduk', 
-            'Jarak ke Pusat Kota (km)'
-        ]
+        feature_cols = self.MODEL_SPECS['jual_tanah']['features']
         
-        X = df_clean[feature_cols].copy()
+        # Encoding kategori + konstanta per kecamatan di-fit sekali dan
+        # disimpan bersama model; serving menjalankan pipeline yang sama
+        pipeline = self.build_pipeline('jual_tanah').fit(df_clean)
+        X = pipeline.transform_frame(df_clean)
         y = df_clean[target_col]
-        
-        # Encode categorical variables
-        categorical_cols = ['Kecamatan', 'Sertifikat', 'Jenis Zona', 'Aksesibilitas', 'Tingkat Keamanan']
-        
-        encoders = {}
-        for col in categorical_cols:
-            encoder = LabelEncoder()
-            X[col] = encoder.fit_transform(X[col].astype(str))
-            encoders[col] = encoder
+        encoders = pipeline.encoders()
         
         # Train-test split
         X_train, X_test, y_train, y_test = train_test_split(
@@ -135,6 +419,7 @@ class AutoModelTrainerJual:
         
         # 1. Train XGBoost
         print("   1/4 Training XGBoost...")
+        self._report_progress(0, "Training XGBoost")
         xgb_model = XGBRegressor(
             n_estimators=300,
             learning_rate=0.05,
@@ -150,6 +435,7 @@ class AutoModelTrainerJual:
         
         # 2. Train Random Forest
         print("   2/4 Training Random Forest...")
+        self._report_progress(1, "Training Random Forest")
         rf_model = RandomForestRegressor(
             n_estimators=300,
             max_depth=20,
@@ -164,12 +450,14 @@ class AutoModelTrainerJual:
         
         # 3. Train CatBoost
         print("   3/4 Training CatBoost...")
+        self._report_progress(2, "Training CatBoost")
         cat_model = CatBoostRegressor(
             iterations=300,
             learning_rate=0.05,
             depth=8,
             random_state=self.random_state,
-            verbose=False
+            verbose=False,
+            allow_writing_files=False
         )
         cat_model.fit(X_train, y_train)
         cat_pred = cat_model.predict(X_test)
@@ -179,6 +467,7 @@ class AutoModelTrainerJual:
         
         # 4. Train Voting Regressor (Ensemble)
         print("   4/4 Training Voting Regressor (Ensemble)...")
+        self._report_progress(3, "Training Voting Regressor (Ensemble)")
         voting_model = VotingRegressor([
             ('xgb', xgb_model),
             ('rf', rf_model),
@@ -199,109 +488,55 @@ class AutoModelTrainerJual:
         print(f"   Voting Ensemble:  R² = {voting_r2:.4f} ⭐")
         
         # Save all models and artifacts
-        model_dir = self.model_dir / "jual_tanah"
-        model_dir.mkdir(parents=True, exist_ok=True)
-        
-        print(f"\n💾 Saving models to: {model_dir}")
-        
-        # Save individual models
-        joblib.dump(xgb_model, model_dir / "xgboost.pkl")
-        joblib.dump(rf_model, model_dir / "random_forest.pkl")
-        joblib.dump(cat_model, model_dir / "catboost.pkl")
-        joblib.dump(voting_model, model_dir / "voting_regressor.pkl")
-        
-        # Save encoders and feature names
-        joblib.dump(encoders, model_dir / "label_encoders.pkl")
-        joblib.dump(feature_cols, model_dir / "feature_names.pkl")
-        
-        # Save performance metrics as CSV
-        performance_df = pd.DataFrame({
-            'Model': ['XGBoost', 'Random Forest', 'CatBoost', 'Voting Regressor'],
-            'R2_Score': [xgb_r2, rf_r2, cat_r2, voting_r2],
-            'MAPE': [xgb_mape, rf_mape, cat_mape, voting_mape],
-            'MAE': [
-                mean_absolute_error(y_test, xgb_pred),
-                mean_absolute_error(y_test, rf_pred),
-                mean_absolute_error(y_test, cat_pred),
-                voting_mae
-            ]
-        })
-        performance_df.to_csv(model_dir / "model_performance.csv", index=False)
-        
-        # Save detailed metadata
-        metadata = {
-            'model_info': {
-                'type': 'Ensemble - Jual Tanah',
-                'timestamp': timestamp,
-                'models': ['XGBoost', 'Random Forest', 'CatBoost', 'Voting Regressor'],
-                'features_count': len(feature_cols)
-            },
-            'performance': {
-                'xgboost_r2': float(xgb_r2),
-                'random_forest_r2': float(rf_r2),
-                'catboost_r2': float(cat_r2),
-                'voting_r2': float(voting_r2),
-                'voting_mape': float(voting_mape),
-                'voting_mae': float(voting_mae)
-            },
-            'data_info': {
+        metadata = self._save_ensemble_version(
+            'jual_tanah', timestamp,
+            {'xgboost': xgb_model, 'random_forest': rf_model, 'catboost': cat_model},
+            voting_model.weights, pipeline, feature_cols, y_test,
+            {'xgboost': xgb_pred, 'random_forest': rf_pred, 'catboost': cat_pred, 'voting': voting_pred},
+            data_info={
                 'total_samples': len(df_clean),
                 'train_samples': len(X_train),
                 'test_samples': len(X_test),
                 'features_count': len(feature_cols),
                 'target_column': target_col
             },
-            'features': feature_cols
-        }
-        
-        with open(model_dir / f"metadata_{timestamp}.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        print(f"✅ All models saved successfully!")
+            training_info={'mode': 'full'}
+        )
         
         return {
             'model_type': 'jual_tanah',
             'timestamp': timestamp,
+            'training_mode': 'full',
             'performance': metadata['performance'],
             'data_info': metadata['data_info']
         }
     
-    def _train_bangunan_jual_ensemble(self, csv_path, timestamp):
+    def _train_bangunan_jual_ensemble(self, df, timestamp):
         """
         Training ensemble models untuk prediksi JUAL bangunan
         Models: XGBoost, Random Forest, CatBoost, Voting Regressor
+        
+        Args:
+            df (DataFrame): Data upload, atau isi training store + delta (full retrain)
         """
         
-        # Load data
-        df = pd.read_csv(csv_path)
         print(f"📊 Data bangunan jual loaded: {df.shape}")
         
         # Data preprocessing
         df_clean = df.dropna()
         
         # Prepare features and target
-        target_col = 'Harga Jual (Rp)'
+        target_col = self.TARGET_COL
         
         # Features yang digunakan (sesuai dengan jual_aset.ipynb)
-        feature_cols = [
-            'Kecamatan', 'Sertifikat', 'Luas Tanah (M²)', 'Luas Bangunan (M²)',
-            'Jenis Zona', 'Kondisi Bangunan', 'Jumlah Lantai', 'Tahun Dibangun',
-            'Aksesibilitas', 'Tingkat Keamanan', 'Kepadatan_Penduduk',
-            'Jarak ke Pusat Kota (km)'
-        ]
-        
-        X = df_clean[feature_cols].copy()
-        y = df_clean[target_col]
+        feature_cols = self.MODEL_SPECS['jual_bangunan']['features']
         
-        # Encode categorical variables
-        categorical_cols = ['Kecamatan', 'Sertifikat', 'Jenis Zona', 'Kondisi Bangunan', 
-                           'Aksesibilitas', 'Tingkat Keamanan']
-        
-        encoders = {}
-        for col in categorical_cols:
-            encoder = LabelEncoder()
-            X[col] = encoder.fit_transform(X[col].astype(str))
-            encoders[col] = encoder
+        # Encoding kategori + konstanta per kecamatan di-fit sekali dan
+        # disimpan bersama model; serving menjalankan pipeline yang sama
+        pipeline = self.build_pipeline('jual_bangunan').fit(df_clean)
+        X = pipeline.transform_frame(df_clean)
+        y = df_clean[target_col]
+        encoders = pipeline.encoders()
         
         # Train-test split
         X_train, X_test, y_train, y_test = train_test_split(
@@ -312,6 +547,7 @@ class AutoModelTrainerJual:
         
         # 1. Train XGBoost
         print("   1/4 Training XGBoost...")
+        self._report_progress(0, "Training XGBoost")
         xgb_model = XGBRegressor(
             n_estimators=300,
             learning_rate=0.05,
@@ -327,6 +563,7 @@ class AutoModelTrainerJual:
         
         # 2. Train Random Forest
         print("   2/4 Training Random Forest...")
+        self._report_progress(1, "Training Random Forest")
         rf_model = RandomForestRegressor(
             n_estimators=300,
             max_depth=20,
@@ -341,12 +578,14 @@ class AutoModelTrainerJual:
         
         # 3. Train CatBoost
         print("   3/4 Training CatBoost...")
+        self._report_progress(2, "Training CatBoost")
         cat_model = CatBoostRegressor(
             iterations=300,
             learning_rate=0.05,
             depth=8,
             random_state=self.random_state,
-            verbose=False
+            verbose=False,
+            allow_writing_files=False
         )
         cat_model.fit(X_train, y_train)
         cat_pred = cat_model.predict(X_test)
@@ -356,6 +595,7 @@ class AutoModelTrainerJual:
         
         # 4. Train Voting Regressor (Ensemble)
         print("   4/4 Training Voting Regressor (Ensemble)...")
+        self._report_progress(3, "Training Voting Regressor (Ensemble)")
         voting_model = VotingRegressor([
             ('xgb', xgb_model),
             ('rf', rf_model),
@@ -376,80 +616,39 @@ class AutoModelTrainerJual:
         print(f"   Voting Ensemble:  R² = {voting_r2:.4f} ⭐")
         
         # Save all models and artifacts
-        model_dir = self.model_dir / "jual_bangunan"
-        model_dir.mkdir(parents=True, exist_ok=True)
-        
-        print(f"\n💾 Saving models to: {model_dir}")
-        
-        # Save individual models
-        joblib.dump(xgb_model, model_dir / "xgboost.pkl")
-        joblib.dump(rf_model, model_dir / "random_forest.pkl")
-        joblib.dump(cat_model, model_dir / "catboost.pkl")
-        joblib.dump(voting_model, model_dir / "voting_regressor.pkl")
-        
-        # Save encoders and feature names
-        joblib.dump(encoders, model_dir / "label_encoders.pkl")
-        joblib.dump(feature_cols, model_dir / "feature_names.pkl")
-        
-        # Save performance metrics as CSV
-        performance_df = pd.DataFrame({
-            'Model': ['XGBoost', 'Random Forest', 'CatBoost', 'Voting Regressor'],
-            'R2_Score': [xgb_r2, rf_r2, cat_r2, voting_r2],
-            'MAPE': [xgb_mape, rf_mape, cat_mape, voting_mape],
-            'MAE': [
-                mean_absolute_error(y_test, xgb_pred),
-                mean_absolute_error(y_test, rf_pred),
-                mean_absolute_error(y_test, cat_pred),
-                voting_mae
-            ]
-        })
-        performance_df.to_csv(model_dir / "model_performance.csv", index=False)
-        
-        # Save detailed metadata
-        metadata = {
-            'model_info': {
-                'type': 'Ensemble - Jual Bangunan',
-                'timestamp': timestamp,
-                'models': ['XGBoost', 'Random Forest', 'CatBoost', 'Voting Regressor'],
-                'features_count': len(feature_cols)
-            },
-            'performance': {
-                'xgboost_r2': float(xgb_r2),
-                'random_forest_r2': float(rf_r2),
-                'catboost_r2': float(cat_r2),
-                'voting_r2': float(voting_r2),
-                'voting_mape': float(voting_mape),
-                'voting_mae': float(voting_mae)
-            },
-            'data_info': {
+        metadata = self._save_ensemble_version(
+            'jual_bangunan', timestamp,
+            {'xgboost': xgb_model, 'random_forest': rf_model, 'catboost': cat_model},
+            voting_model.weights, pipeline, feature_cols, y_test,
+            {'xgboost': xgb_pred, 'random_forest': rf_pred, 'catboost': cat_pred, 'voting': voting_pred},
+            data_info={
                 'total_samples': len(df_clean),
                 'train_samples': len(X_train),
                 'test_samples': len(X_test),
                 'features_count': len(feature_cols),
                 'target_column': target_col
             },
-            'features': feature_cols
-        }
-        
-        with open(model_dir / f"metadata_{timestamp}.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        print(f"✅ All models saved successfully!")
+            training_info={'mode': 'full'}
+        )
         
         return {
             'model_type': 'jual_bangunan',
             'timestamp': timestamp,
+            'training_mode': 'full',
             'performance': metadata['performance'],
             'data_info': metadata['data_info']
         }
 
-def auto_train_jual_from_uploads(uploaded_files):
+def auto_train_jual_from_uploads(uploaded_files, progress=None, incremental=None):
     """
     Main function untuk auto training JUAL models dari uploaded files
     
     Args:
         uploaded_files (list): List of (type, path) tuples
                              type = 'jual_tanah' or 'jual_bangunan'
+        progress (callable): progress(fraction, message) untuk job runner
+        incremental (bool): Warm-start dari versi aktif (default: env
+                            TRAINING_INCREMENTAL, aktif kecuali '0')
         
     Returns:
         dict: Training results dengan metrics untuk semua model
@@ -469,7 +668,12 @@ def auto_train_jual_from_uploads(uploaded_files):
     # Start training
     print("🚀 Starting auto training for JUAL prediction models...")
     print("=" * 60)
-    results = trainer.train_models_from_files(tanah_file, bangunan_file)
+    if incremental is None:
+        incremental = os.environ.get('TRAINING_INCREMENTAL', '1') == '1'
+    
+    results = trainer.train_models_from_files(
+        tanah_file, bangunan_file, progress=progress, incremental=incremental
+    )
     
     if results['success']:
         print(f"\n✅ Auto training completed successfully!")
@@ -3,9 +3,15 @@ Auto Model Trainer with Hyperparameter Tuning - FASE 5
 =======================================================
 
 Enhanced training script dengan:
-- GridSearchCV untuk hyperparameter tuning
+- Successive halving (HalvingRandomSearchCV) untuk hyperparameter tuning:
+  kandidat buruk dibuang setelah dievaluasi pada sebagian kecil data
+- Budget CPU global yang dibagi antara fold CV paralel dan thread model
+  (tanpa oversubscription n_jobs=-1 di dua level)
+- Early stopping native XGBoost/CatBoost pada validation split
+- Ensemble memakai member hasil tuning (tanpa refit VotingRegressor)
+- Feature importance native (default) atau permutation, opsional di
+  background thread setelah model disimpan
 - Cross-validation untuk validasi robust
-- Feature importance analysis
 - Model compression
 - Performance optimization
 
@@ -15,18 +21,18 @@ Version: 5.0
 
 import pandas as pd
 import numpy as np
-import pickle
 import json
 import os
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
 # Scikit-learn
-from sklearn.model_selection import train_test_split, GridSearchCV, RandomizedSearchCV
-from sklearn.ensemble import RandomForestRegressor, VotingRegressor
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import train_test_split, HalvingRandomSearchCV
+from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.preprocessing import LabelEncoder
-from sklearn.inspection import permutation_importance
 
 # XGBoost & CatBoost
 import xgboost as xgb
@@ -35,26 +41,80 @@ import catboost as cb
 import warnings
 warnings.filterwarnings('ignore')
 
+from prediction_system import save_model_artifacts, load_model_artifacts, ModelIndex, ARTIFACT_MANIFEST
+from incremental_training import (
+    TrainingStore, detect_drift, incremental_rounds, holdout_split, ensemble_predict,
+    warm_start_xgboost, warm_start_random_forest, warm_start_catboost
+)
+from feature_importance import compute_feature_importance
+from preprocessing import PreprocessingPipeline
+
+# Jumlah core yang boleh dipakai training (default: semua core)
+TUNING_CPU_BUDGET = int(os.environ.get('TUNING_CPU_BUDGET', 0)) or os.cpu_count() or 1
+
+
+def split_cpu_budget(budget, cv_folds):
+    """
+    Bagi budget core antara fold CV yang berjalan paralel dan thread di dalam
+    setiap model, sehingga search_jobs * model_threads <= budget
+    
+    Returns:
+        tuple: (search_jobs, model_threads)
+    """
+    budget = max(1, int(budget))
+    search_jobs = min(cv_folds, budget)
+    return search_jobs, max(1, budget // search_jobs)
+
 
 class OptimizedModelTrainer:
     """Enhanced model trainer with hyperparameter optimization"""
     
-    def __init__(self, model_type='tanah', use_tuning=True):
+    CV_FOLDS = 5
+    
+    # Kandidat awal successive halving; setiap iterasi hanya 1/HALVING_FACTOR
+    # kandidat terbaik yang lanjut dengan data HALVING_FACTOR kali lebih banyak
+    N_CANDIDATES = 20
+    HALVING_FACTOR = 3
+    
+    # Early stopping booster pada validation split (bagian dari data training)
+    VALIDATION_SIZE = 0.15
+    EARLY_STOPPING_ROUNDS = 30
+    
+    def __init__(self, model_type='tanah', use_tuning=True, cpu_budget=None,
+                 importance_method=None, importance_async=None):
         """
         Initialize trainer
         
         Args:
             model_type: 'tanah' or 'bangunan'
             use_tuning: Whether to use hyperparameter tuning (slower but better)
+            cpu_budget: Jumlah core maksimum (default: TUNING_CPU_BUDGET)
+            importance_method: 'native', 'permutation' atau 'none'
+                               (default: env FEATURE_IMPORTANCE_METHOD, native)
+            importance_async: Hitung importance di background thread setelah
+                              model disimpan (default: env FEATURE_IMPORTANCE_ASYNC)
         """
         self.model_type = model_type
         self.use_tuning = use_tuning
+        self.importance_method = importance_method or os.environ.get('FEATURE_IMPORTANCE_METHOD', 'native')
+        if importance_async is None:
+            importance_async = os.environ.get('FEATURE_IMPORTANCE_ASYNC', '0') == '1'
+        self.importance_async = importance_async
+        self.importance_thread = None
+        self.cpu_budget = cpu_budget or TUNING_CPU_BUDGET
+        if use_tuning:
+            self.search_jobs, self.model_threads = split_cpu_budget(self.cpu_budget, self.CV_FOLDS)
+        else:
+            self.search_jobs, self.model_threads = 1, self.cpu_budget
         self.model_dir = Path('model') / model_type
         self.model_dir.mkdir(parents=True, exist_ok=True)
+        self.store_path = Path('data') / 'training_store' / f"optimized_{model_type}.csv"
         
         self.label_encoders = {}
+        self.preprocessing = None
         self.feature_importance = {}
         self.best_params = {}
+        self.timings = {}
         
     def get_optimized_params(self, model_name):
         """Get optimized hyperparameters for each model"""
@@ -79,8 +139,7 @@ class OptimizedModelTrainer:
                     'min_samples_split': 5,
                     'min_samples_leaf': 2,
                     'max_features': 'sqrt',
-                    'random_state': 42,
-                    'n_jobs': -1
+                    'random_state': 42
                 }
         
         elif model_name == 'xgboost':
@@ -102,8 +161,7 @@ class OptimizedModelTrainer:
                     'subsample': 0.9,
                     'colsample_bytree': 0.9,
                     'min_child_weight': 3,
-                    'random_state': 42,
-                    'n_jobs': -1
+                    'random_state': 42
                 }
         
         elif model_name == 'catboost':
@@ -128,27 +186,84 @@ class OptimizedModelTrainer:
         
         return {}
     
-    def train_with_tuning(self, X_train, y_train, model_name, base_model):
+    def base_estimator(self, model_name):
+        """Estimator dengan jumlah thread sesuai budget (dan early stopping untuk booster)"""
+        if model_name == 'random_forest':
+            return RandomForestRegressor(random_state=42, n_jobs=self.model_threads)
+        if model_name == 'xgboost':
+            return xgb.XGBRegressor(
+                random_state=42,
+                n_jobs=self.model_threads,
+                early_stopping_rounds=self.EARLY_STOPPING_ROUNDS
+            )
+        if model_name == 'catboost':
+            return cb.CatBoostRegressor(
+                random_state=42,
+                verbose=0,
+                thread_count=self.model_threads,
+                early_stopping_rounds=self.EARLY_STOPPING_ROUNDS,
+                allow_writing_files=False
+            )
+        raise ValueError(f"Model tidak dikenal: {model_name}")
+    
+    @staticmethod
+    def fit_params(model_name, X_val, y_val):
+        """Validation set untuk early stopping (n_estimators/iterations = batas atas)"""
+        if model_name == 'xgboost':
+            return {'eval_set': [(X_val, y_val)], 'verbose': False}
+        if model_name == 'catboost':
+            return {'eval_set': (X_val, y_val)}
+        return {}
+    
+    def train_model(self, model_name, X_train, y_train, fit_params=None):
+        """Train satu model (dengan tuning jika diaktifkan) dan catat waktunya"""
+        fit_params = fit_params or {}
+        started = time.perf_counter()
+        
+        if self.use_tuning:
+            model = self.train_with_tuning(
+                X_train, y_train, model_name, self.base_estimator(model_name), fit_params
+            )
+        else:
+            model = self.base_estimator(model_name)
+            model.set_params(**self.get_optimized_params(model_name))
+            model.fit(X_train, y_train, **fit_params)
+        
+        self.timings[model_name] = round(time.perf_counter() - started, 2)
+        
+        best_iteration = getattr(model, 'best_iteration', None)
+        if model_name == 'catboost':
+            best_iteration = model.get_best_iteration()
+        if best_iteration is not None:
+            print(f"   Early stopping: best iteration {best_iteration}")
+        print(f"⏱️  {model_name}: {self.timings[model_name]:.2f}s")
+        return model
+    
+    def train_with_tuning(self, X_train, y_train, model_name, base_model, fit_params=None):
         """Train model with hyperparameter tuning"""
         
-        print(f"\n🔧 Tuning {model_name}...")
+        print(f"\n🔧 Tuning {model_name} ({self.search_jobs} fold paralel x {self.model_threads} thread)...")
         
         param_grid = self.get_optimized_params(model_name)
         
-        # Use RandomizedSearchCV for faster tuning
-        search = RandomizedSearchCV(
+        # Successive halving: semua kandidat mulai dengan sebagian kecil
+        # sampel, hanya kandidat terbaik yang dievaluasi pada data penuh
+        search = HalvingRandomSearchCV(
             base_model,
             param_grid,
-            n_iter=20,  # Try 20 random combinations
-            cv=5,  # 5-fold cross-validation
+            n_candidates=self.N_CANDIDATES,
+            factor=self.HALVING_FACTOR,
+            min_resources='exhaust',  # iterasi terakhir memakai seluruh data training
+            cv=self.CV_FOLDS,
             scoring='r2',
-            n_jobs=-1,
-            verbose=1,
+            n_jobs=self.search_jobs,
+            verbose=0,
             random_state=42
         )
         
-        search.fit(X_train, y_train)
+        search.fit(X_train, y_train, **(fit_params or {}))
         
+        print(f"   Kandidat per iterasi: {search.n_candidates_} (sampel: {search.n_resources_})")
         print(f"✅ Best params for {model_name}:")
         print(f"   {search.best_params_}")
         print(f"   Best CV R² Score: {search.best_score_:.4f}")
@@ -157,49 +272,282 @@ class OptimizedModelTrainer:
         
         return search.best_estimator_
     
-    def prepare_data(self, df):
-        """Prepare and encode data"""
+    def prepare_data(self, df, target_col):
+        """
+        Prepare and encode data
+        
+        Pipeline preprocessing di-fit pada pemanggilan pertama (kolom object =
+        kategori) lalu dipakai ulang; pipeline yang sama disimpan bersama model
+        dan dijalankan saat serving.
+        
+        Returns:
+            tuple: (X, y)
+        """
+        if self.preprocessing is None:
+            features = list(df.columns.drop(target_col))
+            categorical = list(df[features].select_dtypes(include=['object']).columns)
+            self.preprocessing = PreprocessingPipeline(features, categorical).fit(df)
+            self.label_encoders = self.preprocessing.encoders()
+        
+        X = self.preprocessing.transform_frame(df)
+        X.index = df.index
+        return X, df[target_col]
+    
+    def calculate_feature_importance(self, members, X, y, weights=None):
+        """Calculate, store and save feature importance untuk semua member"""
         
-        df = df.copy()
+        print(f"\n📊 Calculating feature importance ({self.importance_method})...")
+        started = time.perf_counter()
         
-        # Identify categorical columns
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        importance = compute_feature_importance(self.importance_method, members, X, y, weights)
         
-        # Label encode categorical features
-        for col in categorical_cols:
-            if col not in self.label_encoders:
-                self.label_encoders[col] = LabelEncoder()
-                df[col] = self.label_encoders[col].fit_transform(df[col].astype(str))
-            else:
-                df[col] = self.label_encoders[col].transform(df[col].astype(str))
+        for model_name, importance_df in importance.items():
+            importance_path = self.model_dir / f"feature_importance_{model_name}.csv"
+            importance_df.to_csv(importance_path, index=False)
+            print(f"✅ Saved feature importance: {importance_path}")
+            print(f"   Top 5 {model_name}: {', '.join(importance_df['feature'].head())}")
         
-        return df
+        self.feature_importance = importance
+        self.timings['feature_importance'] = round(time.perf_counter() - started, 2)
+        return importance
     
-    def calculate_feature_importance(self, model, X, y, model_name):
-        """Calculate and store feature importance"""
+    def run_feature_importance(self, members, X, y, weights=None):
+        """
+        Stage feature importance setelah model disimpan
         
-        print(f"\n📊 Calculating feature importance for {model_name}...")
+        Mode async: dijalankan di thread terpisah (non-daemon, sehingga proses
+        CLI/job tetap menunggu CSV selesai ditulis) dan train_models langsung
+        return; pakai wait_feature_importance() untuk menunggu hasilnya.
+        """
+        if self.importance_method == 'none':
+            return 'skipped'
+        if not self.importance_async:
+            self.calculate_feature_importance(members, X, y, weights)
+            return 'done'
+        
+        self.importance_thread = threading.Thread(
+            target=self.calculate_feature_importance,
+            args=(members, X, y, weights),
+            name=f"feature-importance-{self.model_type}"
+        )
+        self.importance_thread.start()
+        return 'pending'
+    
+    def wait_feature_importance(self, timeout=None):
+        """Tunggu stage importance async; return dict importance (kosong jika belum selesai)"""
+        if self.importance_thread is not None:
+            self.importance_thread.join(timeout)
+            if self.importance_thread.is_alive():
+                return {}
+        return self.feature_importance
+    
+    def load_previous_artifacts(self):
+        """Versi aktif model/<tipe> (format artefak) untuk warm-start (None jika belum ada)"""
+        index = ModelIndex(self.model_dir)
+        entry = index.active_entry()
+        if entry is None or entry['format'] != 'artifact':
+            return None
+        try:
+            return load_model_artifacts(index.version_dir(entry), mmap=False)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Artefak sebelumnya tidak bisa dipakai untuk warm-start: {e}")
+            return None
+    
+    def train_incremental(self, existing, delta, target_col):
+        """
+        Warm-start member dari artefak sebelumnya pada baris baru saja
+        
+        Returns:
+            dict: Hasil training, atau None jika harus full retrain
+                  (belum ada model, fitur berubah, atau drift)
+        """
+        previous = self.load_previous_artifacts()
+        if previous is None:
+            print("   Belum ada model sebelumnya -> full retrain")
+            return None
+        
+        objects = previous['objects']
+        features = previous['manifest']['feature_schema']['features']
+        if list(delta.columns.drop(target_col)) != features or not {
+                'random_forest', 'xgboost', 'catboost', 'encoders'} <= set(objects):
+            print("   Fitur/member berbeda dari model sebelumnya -> full retrain")
+            return None
+        
+        encoders = objects['encoders']
+        numeric_cols = [col for col in delta.columns if col not in encoders]
+        drift = detect_drift(existing, delta, numeric_cols, encoders)
+        if drift['drift']:
+            print(f"   Drift terdeteksi ({', '.join(drift['reasons'])}) -> full retrain")
+            return None
+        
+        # Pipeline versi sebelumnya (artefak lama tanpa pipeline: dari encoders)
+        self.label_encoders = encoders
+        self.preprocessing = objects.get('preprocessing') or PreprocessingPipeline.from_encoders(
+            features, encoders
+        )
+        X, y = self.prepare_data(delta, target_col)
+        X_train, X_test, y_train, y_test, in_sample = holdout_split(X, y, random_state=42)
+        evaluation = 'in_sample' if in_sample else 'holdout'
+        rounds = incremental_rounds(200, len(X_train), len(existing))
+        print(f"\n🔁 Warm-start: {len(X_train)} baris baru, +{rounds} pohon/iterasi per model")
+        
+        members = {
+            'random_forest': warm_start_random_forest(objects['random_forest'], X_train, y_train, rounds),
+            'xgboost': warm_start_xgboost(objects['xgboost'], X_train, y_train, rounds),
+            'catboost': warm_start_catboost(objects['catboost'], X_train, y_train, rounds)
+        }
+        weights = (previous['manifest'].get('ensemble') or {}).get('weights')
         
-        # Permutation importance (more reliable)
-        perm_importance = permutation_importance(
-            model, X, y, n_repeats=10, random_state=42, n_jobs=-1
+        performances = {}
+        predictions = {name: model.predict(X_test) for name, model in members.items()}
+        predictions['voting'] = ensemble_predict(members, X_test, weights)
+        for name, y_pred in predictions.items():
+            performances[name] = {
+                'r2_score': r2_score(y_test, y_pred),
+                'mae': mean_absolute_error(y_test, y_pred),
+                'rmse': np.sqrt(mean_squared_error(y_test, y_pred))
+            }
+            print(f"✅ {name}: R² ({evaluation}) {performances[name]['r2_score']:.4f}")
+        
+        training = {
+            'mode': 'incremental',
+            'delta_rows': len(delta),
+            'added_estimators': rounds,
+            'drift': drift,
+            'evaluation': evaluation
+        }
+        data_info = {
+            'total_samples': len(existing) + len(delta),
+            'train_samples': len(X_train),
+            'test_samples': len(X_test)
+        }
+        version, saved_files = self.save_artifacts(
+            members, weights, features, target_col, performances, training, data_info
         )
+        self.save_metrics(
+            performances, target_col, features,
+            total=data_info['total_samples'], train=len(X_train), test=len(X_test),
+            training=training
+        )
+        
+        return {
+            'success': True,
+            'training_mode': 'incremental',
+            'version': version,
+            'performances': performances,
+            'saved_files': saved_files,
+            'delta_rows': len(delta),
+            'drift': drift
+        }
+    
+    def save_artifacts(self, members, weights, features, target_col, performances, training, data_info):
+        """
+        Simpan satu versi ke model/<tipe>/<YYYYMMDD_HHMMSS>/ (format artefak)
         
-        importance_df = pd.DataFrame({
-            'feature': X.columns,
-            'importance': perm_importance.importances_mean,
-            'std': perm_importance.importances_std
-        }).sort_values('importance', ascending=False)
+        Metadata memakai struktur yang dibaca PredictionSystem (model_info,
+        performance.test_r2, data_info.features_count). Model primary tidak
+        disimpan terpisah: loader menyusun ensemble dari manifest['ensemble'].
         
-        self.feature_importance[model_name] = importance_df
+        Returns:
+            tuple: (versi, daftar file tersimpan)
+        """
+        # Format artefak: XGBoost .ubj, CatBoost .cbm, RF/encoders .joblib +
+        # manifest.json. VotingRegressor dicatat sebagai daftar member di
+        # manifest (member tidak disimpan dua kali)
+        # Dua training dalam detik yang sama tidak boleh menimpa versi sebelumnya
+        # (mis. warm-start cepat dari versi yang baru saja disimpan)
+        started = datetime.now()
+        version = started.strftime("%Y%m%d_%H%M%S")
+        while (self.model_dir / version).exists():
+            started += timedelta(seconds=1)
+            version = started.strftime("%Y%m%d_%H%M%S")
+        artifact_dir = self.model_dir / version
+        objects = dict(members)
+        objects['encoders'] = self.label_encoders
+        objects['preprocessing'] = self.preprocessing
+        voting = performances['voting']
+        metadata = {
+            'model_info': {
+                'name': 'Voting Regressor',
+                'type': f"Optimized Ensemble - {self.model_type}",
+                'timestamp': version,
+                'models': ['Random Forest', 'XGBoost', 'CatBoost', 'Voting Regressor']
+            },
+            'performance': dict(
+                {f"{name}_r2": float(perf['r2_score']) for name, perf in performances.items()},
+                test_r2=float(voting['r2_score']),
+                test_mae=float(voting['mae']),
+                test_rmse=float(voting['rmse']),
+                evaluation=training.get('evaluation', 'holdout')
+            ),
+            'data_info': dict(
+                data_info,
+                target_column=target_col,
+                features_count=len(features)
+            ),
+            'model_type': self.model_type,
+            'target': target_col,
+            'performances': performances,
+            'training': training
+        }
+        manifest = save_model_artifacts(
+            artifact_dir,
+            objects,
+            list(features),
+            self.label_encoders,
+            ensemble={'members': list(members), 'weights': weights},
+            metadata=metadata
+        )
         
-        print("Top 5 most important features:")
-        print(importance_df.head())
+        saved_files = []
+        for model_name, info in manifest['files'].items():
+            filepath = artifact_dir / info['path']
+            print(f"✅ Saved: {filepath}")
+            saved_files.append(str(filepath))
+        print(f"✅ Saved manifest: {artifact_dir / ARTIFACT_MANIFEST}")
+        
+        # Daftarkan ke index (registry.json) dan aktifkan kecuali versi lain di-pin;
+        # semua worker memuat versi ini (side slot + swap) saat CURRENT berubah.
+        # Metrics in-sample (delta terlalu kecil) tidak dipakai untuk membandingkan versi
+        in_sample = metadata['performance']['evaluation'] == 'in_sample'
+        ModelIndex(self.model_dir).register(
+            version, metrics=None if in_sample else metadata['performance']
+        )
+        print(f"✅ Registered version: {version}")
+        return version, saved_files
+    
+    def save_metrics(self, performances, target_col, features, total, train, test, training):
+        """Simpan performance_metrics_<tipe>.json"""
+        metrics_path = self.model_dir / f"performance_metrics_{self.model_type}.json"
+        metrics_data = {
+            'timestamp': datetime.now().isoformat(),
+            'model_type': self.model_type,
+            'hyperparameter_tuning': self.use_tuning,
+            'training': training,
+            'dataset_info': {
+                'total_samples': total,
+                'train_samples': train,
+                'test_samples': test,
+                'features': list(features),
+                'target': target_col
+            },
+            'performances': performances,
+            'best_params': self.best_params if self.use_tuning else None
+        }
         
-        return importance_df
+        with open(metrics_path, 'w') as f:
+            json.dump(metrics_data, f, indent=2)
+        print(f"✅ Saved metrics: {metrics_path}")
     
-    def train_models(self, csv_path):
-        """Train all models with optimization"""
+    def train_models(self, csv_path, incremental=False):
+        """
+        Train all models with optimization
+        
+        Args:
+            csv_path: Dataset CSV (ditambahkan ke training store)
+            incremental: Warm-start dari artefak sebelumnya pada baris baru;
+                         full retrain pada seluruh training store jika drift
+        """
         
         print(f"\n{'='*60}")
         print(f"🚀 OPTIMIZED MODEL TRAINING - {self.model_type.upper()}")
@@ -212,15 +560,26 @@ class OptimizedModelTrainer:
         print(f"   Dataset shape: {df.shape}")
         print(f"   Columns: {list(df.columns)}")
         
-        # Prepare data
-        df = self.prepare_data(df)
-        
         # Determine target column
         target_col = 'harga_sewa' if 'harga_sewa' in df.columns else 'harga_jual'
         
-        # Split features and target
-        X = df.drop(columns=[target_col])
-        y = df[target_col]
+        # Baris baru baru masuk training store setelah versi tersimpan dan terdaftar
+        store = TrainingStore(self.store_path, df.columns)
+        existing, delta = store.diff(df)
+        print(f"   Training store: {len(existing)} baris lama + {len(delta)} baris baru")
+        
+        training = {'mode': 'full'}
+        if incremental:
+            result = self.train_incremental(existing, delta, target_col)
+            if result is not None:
+                store.append(delta)
+                return result
+            # Full retrain pada seluruh data yang pernah diupload
+            df = store.combine(existing, delta)
+            training['delta_rows'] = len(delta)
+        
+        # Prepare data (split features and target)
+        X, y = self.prepare_data(df, target_col)
         
         print(f"\n📊 Features: {list(X.columns)}")
         print(f"   Target: {target_col}")
@@ -230,9 +589,17 @@ class OptimizedModelTrainer:
             X, y, test_size=0.2, random_state=42
         )
         
+        # Validation split untuk early stopping booster (test set tidak disentuh)
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=self.VALIDATION_SIZE, random_state=42
+        )
+        
         print(f"\n✂️ Train-Test Split:")
-        print(f"   Training samples: {len(X_train)}")
+        print(f"   Training samples: {len(X_train)} (booster: {len(X_fit)} + {len(X_val)} validation)")
         print(f"   Testing samples: {len(X_test)}")
+        print(f"   CPU budget: {self.cpu_budget} core")
+        
+        training_started = time.perf_counter()
         
         # Train models
         models = {}
@@ -243,13 +610,7 @@ class OptimizedModelTrainer:
         print("🌲 RANDOM FOREST")
         print(f"{'='*60}")
         
-        if self.use_tuning:
-            rf = RandomForestRegressor()
-            rf_model = self.train_with_tuning(X_train, y_train, 'random_forest', rf)
-        else:
-            params = self.get_optimized_params('random_forest')
-            rf_model = RandomForestRegressor(**params)
-            rf_model.fit(X_train, y_train)
+        rf_model = self.train_model('random_forest', X_train, y_train)
         
         # Evaluate
         y_pred_rf = rf_model.predict(X_test)
@@ -268,21 +629,14 @@ class OptimizedModelTrainer:
         print(f"   MAE: Rp {mae_rf:,.0f}")
         print(f"   RMSE: Rp {rmse_rf:,.0f}")
         
-        # Feature importance
-        self.calculate_feature_importance(rf_model, X_test, y_test, 'random_forest')
-        
         # 2. XGBoost
         print(f"\n{'='*60}")
         print("🚀 XGBOOST")
         print(f"{'='*60}")
         
-        if self.use_tuning:
-            xgb_model_base = xgb.XGBRegressor()
-            xgb_model = self.train_with_tuning(X_train, y_train, 'xgboost', xgb_model_base)
-        else:
-            params = self.get_optimized_params('xgboost')
-            xgb_model = xgb.XGBRegressor(**params)
-            xgb_model.fit(X_train, y_train)
+        xgb_model = self.train_model(
+            'xgboost', X_fit, y_fit, self.fit_params('xgboost', X_val, y_val)
+        )
         
         # Evaluate
         y_pred_xgb = xgb_model.predict(X_test)
@@ -301,20 +655,14 @@ class OptimizedModelTrainer:
         print(f"   MAE: Rp {mae_xgb:,.0f}")
         print(f"   RMSE: Rp {rmse_xgb:,.0f}")
         
-        self.calculate_feature_importance(xgb_model, X_test, y_test, 'xgboost')
-        
         # 3. CatBoost
         print(f"\n{'='*60}")
         print("🐱 CATBOOST")
         print(f"{'='*60}")
         
-        if self.use_tuning:
-            cb_model_base = cb.CatBoostRegressor(verbose=0)
-            cb_model = self.train_with_tuning(X_train, y_train, 'catboost', cb_model_base)
-        else:
-            params = self.get_optimized_params('catboost')
-            cb_model = cb.CatBoostRegressor(**params)
-            cb_model.fit(X_train, y_train)
+        cb_model = self.train_model(
+            'catboost', X_fit, y_fit, self.fit_params('catboost', X_val, y_val)
+        )
         
         # Evaluate
         y_pred_cb = cb_model.predict(X_test)
@@ -333,30 +681,20 @@ class OptimizedModelTrainer:
         print(f"   MAE: Rp {mae_cb:,.0f}")
         print(f"   RMSE: Rp {rmse_cb:,.0f}")
         
-        self.calculate_feature_importance(cb_model, X_test, y_test, 'catboost')
-        
         # 4. Voting Regressor
         print(f"\n{'='*60}")
         print("🗳️ VOTING REGRESSOR (Ensemble)")
         print(f"{'='*60}")
         
-        voting_model = VotingRegressor(
-            estimators=[
-                ('rf', rf_model),
-                ('xgb', xgb_model),
-                ('cb', cb_model)
-            ],
-            n_jobs=-1
-        )
-        voting_model.fit(X_train, y_train)
-        
-        # Evaluate
-        y_pred_voting = voting_model.predict(X_test)
+        # Member hasil tuning dipakai langsung (tidak di-refit seperti
+        # VotingRegressor.fit); nilainya rata-rata prediksi member
+        members = {name: model for name, model in models.items()}
+        weights = None
+        y_pred_voting = ensemble_predict(members, X_test, weights)
         r2_voting = r2_score(y_test, y_pred_voting)
         mae_voting = mean_absolute_error(y_test, y_pred_voting)
         rmse_voting = np.sqrt(mean_squared_error(y_test, y_pred_voting))
         
-        models['voting'] = voting_model
         performances['voting'] = {
             'r2_score': r2_voting,
             'mae': mae_voting,
@@ -372,49 +710,23 @@ class OptimizedModelTrainer:
         print("💾 SAVING MODELS")
         print(f"{'='*60}")
         
-        saved_files = []
-        for model_name, model in models.items():
-            filename = f"{model_name}_{self.model_type}.pkl"
-            filepath = self.model_dir / filename
-            
-            with open(filepath, 'wb') as f:
-                pickle.dump(model, f)
-            
-            print(f"✅ Saved: {filepath}")
-            saved_files.append(str(filepath))
+        self.timings['total'] = round(time.perf_counter() - training_started, 2)
+        training['timings'] = self.timings
         
-        # Save label encoders
-        encoders_path = self.model_dir / f"label_encoders_{self.model_type}.pkl"
-        with open(encoders_path, 'wb') as f:
-            pickle.dump(self.label_encoders, f)
-        print(f"✅ Saved encoders: {encoders_path}")
+        version, saved_files = self.save_artifacts(
+            members, weights, X.columns, target_col, performances, training,
+            {'total_samples': len(df), 'train_samples': len(X_train), 'test_samples': len(X_test)}
+        )
         
         # Save performance metrics
-        metrics_path = self.model_dir / f"performance_metrics_{self.model_type}.json"
-        metrics_data = {
-            'timestamp': datetime.now().isoformat(),
-            'model_type': self.model_type,
-            'hyperparameter_tuning': self.use_tuning,
-            'dataset_info': {
-                'total_samples': len(df),
-                'train_samples': len(X_train),
-                'test_samples': len(X_test),
-                'features': list(X.columns),
-                'target': target_col
-            },
-            'performances': performances,
-            'best_params': self.best_params if self.use_tuning else None
-        }
-        
-        with open(metrics_path, 'w') as f:
-            json.dump(metrics_data, f, indent=2)
-        print(f"✅ Saved metrics: {metrics_path}")
+        self.save_metrics(
+            performances, target_col, X.columns,
+            total=len(df), train=len(X_train), test=len(X_test), training=training
+        )
+        store.append(delta)
         
-        # Save feature importance
-        for model_name, importance_df in self.feature_importance.items():
-            importance_path = self.model_dir / f"feature_importance_{model_name}.csv"
-            importance_df.to_csv(importance_path, index=False)
-            print(f"✅ Saved feature importance: {importance_path}")
+        # Feature importance setelah model tersimpan (bisa di background)
+        importance_status = self.run_feature_importance(members, X_test, y_test, weights)
         
         # Performance summary
         print(f"\n{'='*60}")
@@ -426,15 +738,20 @@ class OptimizedModelTrainer:
         print(f"   R² Score: {best_model[1]['r2_score']:.4f}")
         print(f"   MAE: Rp {best_model[1]['mae']:,.0f}")
         print(f"   RMSE: Rp {best_model[1]['rmse']:,.0f}")
+        print(f"\n⏱️  Wall-clock: {self.timings['total']:.1f}s ({self.cpu_budget} core)")
         
         print(f"\n✅ Training completed successfully!")
         
         return {
             'success': True,
+            'training_mode': 'full',
+            'version': version,
             'performances': performances,
             'saved_files': saved_files,
             'best_model': best_model[0],
             'best_params': self.best_params if self.use_tuning else None,
+            'timings': self.timings,
+            'feature_importance_status': importance_status,
             'feature_importance': {
                 model_name: importance_df.to_dict('records')[:5]  # Top 5
                 for model_name, importance_df in self.feature_importance.items()
@@ -442,21 +759,68 @@ class OptimizedModelTrainer:
         }
 
 
+def auto_train_from_uploads(uploaded_files, progress=None, incremental=None, use_tuning=True):
+    """
+    Auto training model SEWA dari uploaded files (job training 'rental')
+    
+    Args:
+        uploaded_files (list): List of (type, path) tuples
+                             type = 'tanah' or 'bangunan'
+        progress (callable): progress(fraction, message) untuk job runner
+        incremental (bool): Warm-start dari versi aktif (default: env
+                            TRAINING_INCREMENTAL, aktif kecuali '0')
+        use_tuning (bool): Hyperparameter tuning (successive halving)
+        
+    Returns:
+        dict: success, models_trained (model_type, version, performances), errors
+    """
+    if incremental is None:
+        incremental = os.environ.get('TRAINING_INCREMENTAL', '1') == '1'
+    
+    results = {
+        'success': False,
+        'models_trained': [],
+        'errors': [],
+        'timestamp': datetime.now().strftime('%Y%m%d_%H%M%S')
+    }
+    
+    for step, (model_type, csv_path) in enumerate(uploaded_files):
+        if progress:
+            progress(step / len(uploaded_files), f'Training model sewa {model_type}')
+        try:
+            trainer = OptimizedModelTrainer(model_type=model_type, use_tuning=use_tuning)
+            result = trainer.train_models(csv_path, incremental=incremental)
+            results['models_trained'].append({
+                'model_type': model_type,
+                'version': result['version'],
+                'training_mode': result['training_mode'],
+                'performances': result['performances']
+            })
+        except Exception as e:
+            print(f"❌ Training {model_type} gagal: {e}")
+            results['errors'].append(f"{model_type}: {e}")
+    
+    results['success'] = bool(results['models_trained']) and not results['errors']
+    return results
+
+
 def main():
     """Main training function"""
     import sys
     
     if len(sys.argv) < 3:
-        print("Usage: python auto_model_trainer_optimized.py <csv_path> <model_type> [use_tuning]")
+        print("Usage: python auto_model_trainer_optimized.py <csv_path> <model_type> [use_tuning] [--incremental]")
         print("Example: python auto_model_trainer_optimized.py data.csv tanah true")
         sys.exit(1)
     
-    csv_path = sys.argv[1]
-    model_type = sys.argv[2]
-    use_tuning = sys.argv[3].lower() == 'true' if len(sys.argv) > 3 else False
+    incremental = '--incremental' in sys.argv
+    args = [arg for arg in sys.argv if arg != '--incremental']
+    csv_path = args[1]
+    model_type = args[2]
+    use_tuning = args[3].lower() == 'true' if len(args) > 3 else False
     
     trainer = OptimizedModelTrainer(model_type=model_type, use_tuning=use_tuning)
-    result = trainer.train_models(csv_path)
+    result = trainer.train_models(csv_path, incremental=incremental)
     
     if result['success']:
         print("\n✅ All models trained and saved successfully!")
@@ -0,0 +1,106 @@
+"""
+Konversi model pickle lama ke format artefak ber-manifest
+=========================================================
+
+- model/tanah, model/bangunan: file *_<timestamp>.pkl diekspor ke
+  model/<tipe>/<timestamp>/ (manifest.json + .cbm/.ubj/.joblib)
+- model/jual_tanah, model/jual_bangunan: manifest.json ditulis di folder
+  yang sama, di samping file .pkl lama
+
+Versi hasil ekspor didaftarkan ke index (registry.json) sebagai versi aktif,
+sehingga PredictionSystem dan routes jual memuat format artefak (format
+native + mmap, file diverifikasi terhadap manifest sebelum dimuat).
+
+Usage:
+    python export_model_artifacts.py [--model-dir model]
+"""
+
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+import joblib
+
+from prediction_system import PredictionSystem, EnsembleScorer, ModelIndex, save_model_artifacts
+
+model_dir = Path(__file__).parent / "model"
+if len(sys.argv) == 3 and sys.argv[1] == '--model-dir':
+    model_dir = Path(sys.argv[2])
+
+
+def ensemble_spec(scorer):
+    return {
+        'members': scorer.member_names,
+        'weights': None if scorer.weights is None else scorer.weights.tolist()
+    }
+
+
+def export_rental(ps, model_type):
+    version_entry = ps.model_index(model_type).active_entry()
+    if version_entry is None or version_entry['format'] != 'pickle':
+        return None
+    components = ps._read_pickle_components(model_type, version_entry)
+    if components is None:
+        return None
+
+    objects = OrderedDict([
+        ('model', components['model']),
+        ('scaler', components['scaler']),
+        ('encoders', components['encoders'])
+    ])
+    ensemble = None
+    if components['voting'] is not None or components['members']:
+        scorer = EnsembleScorer(components['members'], voting=components['voting'])
+        objects.update(scorer.members)
+        ensemble = ensemble_spec(scorer)
+
+    timestamp = components['metadata']['model_info']['timestamp']
+    target = model_dir / model_type / timestamp
+    save_model_artifacts(
+        target, objects, components['features'], components['encoders'],
+        ensemble=ensemble, metadata=components['metadata']
+    )
+    ModelIndex(model_dir / model_type).register(
+        timestamp, metrics=components['metadata'].get('performance')
+    )
+    return target
+
+
+def export_jual(jual_dir):
+    voting_path = jual_dir / 'voting_regressor.pkl'
+    if voting_path.exists():
+        scorer = EnsembleScorer(voting=joblib.load(voting_path))
+    else:
+        scorer = EnsembleScorer(OrderedDict(
+            (name, joblib.load(jual_dir / f'{name}.pkl'))
+            for name in ['xgboost', 'random_forest', 'catboost']
+        ))
+
+    encoders = joblib.load(jual_dir / 'label_encoders.pkl')
+    features = joblib.load(jual_dir / 'feature_names.pkl')
+    objects = OrderedDict(scorer.members)
+    objects['encoders'] = encoders
+    save_model_artifacts(jual_dir, objects, features, encoders, ensemble=ensemble_spec(scorer))
+    ModelIndex(jual_dir).register(ModelIndex.LEGACY_VERSION, '.')
+    return jual_dir
+
+
+ps = PredictionSystem(model_base_path=model_dir, enable_cache=False)
+failed = 0
+
+for model_type in ['tanah', 'bangunan']:
+    target = export_rental(ps, model_type)
+    if target is None:
+        print(f"⚠️  Model {model_type} dilewati (versi aktif bukan pickle lengkap)")
+        failed += 1
+    else:
+        print(f"✅ {model_type} -> {target}")
+
+for name in ['jual_tanah', 'jual_bangunan']:
+    try:
+        print(f"✅ {name} -> {export_jual(model_dir / name)}")
+    except (OSError, ValueError) as e:
+        print(f"❌ {name} gagal diekspor: {e}")
+        failed += 1
+
+sys.exit(1 if failed else 0)
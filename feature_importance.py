@@ -0,0 +1,129 @@
+"""
+Feature Importance untuk Model Training
+=======================================
+
+Dipakai OptimizedModelTrainer setelah model selesai dilatih:
+
+- native (default): importance bawaan model, tanpa prediksi tambahan.
+  XGBoost total gain, CatBoost PredictionValuesChange, RandomForest
+  impurity. Dinormalisasi sehingga jumlahnya 1
+- permutation (opsional): penurunan R² saat satu kolom diacak, pada
+  subsample baris test. Setiap permutasi diprediksi satu kali oleh setiap
+  member; ensemble dihitung dari prediksi member yang sama (tidak ada
+  inference ganda untuk voting)
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import r2_score
+
+# Baris maksimum untuk permutation importance
+PERMUTATION_MAX_ROWS = 500
+PERMUTATION_REPEATS = 5
+
+
+def _importance_frame(features, importance, std=None, method='native'):
+    importance = np.asarray(importance, dtype=float)
+    return pd.DataFrame({
+        'feature': list(features),
+        'importance': importance,
+        'std': np.zeros_like(importance) if std is None else std,
+        'method': method
+    }).sort_values('importance', ascending=False).reset_index(drop=True)
+
+
+def native_importance(model, features):
+    """
+    Importance bawaan model (dinormalisasi, jumlah = 1)
+
+    Returns:
+        DataFrame: feature, importance, std, method (None jika model tidak
+                   punya importance bawaan, mis. VotingRegressor)
+    """
+    features = list(features)
+    if hasattr(model, 'get_booster'):
+        # Total gain: kontribusi setiap fitur pada penurunan loss
+        scores = model.get_booster().get_score(importance_type='total_gain')
+        values = [scores.get(feature, 0.0) for feature in features]
+    elif hasattr(model, 'get_feature_importance'):
+        values = model.get_feature_importance()
+    elif hasattr(model, 'feature_importances_'):
+        values = model.feature_importances_
+    else:
+        return None
+
+    values = np.asarray(values, dtype=float)
+    total = values.sum()
+    return _importance_frame(features, values / total if total > 0 else values)
+
+
+def permutation_importance_shared(members, X, y, weights=None, n_repeats=PERMUTATION_REPEATS,
+                                  max_rows=PERMUTATION_MAX_ROWS, random_state=42):
+    """
+    Permutation importance untuk semua member + ensemble sekaligus
+
+    Args:
+        members (dict): nama -> model
+        X (DataFrame): Fitur (biasanya test set)
+        y: Target
+        weights (list): Bobot ensemble (None = rata-rata biasa)
+        n_repeats (int): Jumlah permutasi per kolom
+        max_rows (int): Subsample baris (None = semua baris)
+
+    Returns:
+        dict: nama -> DataFrame (member dan 'voting')
+    """
+    rng = np.random.RandomState(random_state)
+    if max_rows is not None and len(X) > max_rows:
+        rows = rng.choice(len(X), max_rows, replace=False)
+        X, y = X.iloc[rows], np.asarray(y)[rows]
+    X = X.reset_index(drop=True)
+    y = np.asarray(y)
+
+    names = list(members) + ['voting']
+
+    def scores(X_eval):
+        predictions = np.column_stack([model.predict(X_eval) for model in members.values()])
+        ensemble = np.average(predictions, axis=1, weights=weights)
+        values = [r2_score(y, predictions[:, i]) for i in range(len(members))]
+        return np.array(values + [r2_score(y, ensemble)])
+
+    baseline = scores(X)
+    drops = np.zeros((len(names), X.shape[1], n_repeats))
+    for col_idx, col in enumerate(X.columns):
+        X_permuted = X.copy()
+        for repeat in range(n_repeats):
+            X_permuted[col] = X[col].values[rng.permutation(len(X))]
+            drops[:, col_idx, repeat] = baseline - scores(X_permuted)
+
+    return {
+        name: _importance_frame(
+            X.columns, drops[i].mean(axis=1), drops[i].std(axis=1), method='permutation'
+        )
+        for i, name in enumerate(names)
+    }
+
+
+IMPORTANCE_METHODS = ('native', 'permutation', 'none')
+
+
+def compute_feature_importance(method, members, X, y, weights=None):
+    """
+    Jalankan stage importance sesuai method
+
+    Returns:
+        dict: nama model -> DataFrame
+    """
+    if method not in IMPORTANCE_METHODS:
+        raise ValueError(f"Metode feature importance tidak dikenal: {method}")
+    if method == 'none':
+        return {}
+    if method == 'permutation':
+        return permutation_importance_shared(members, X, y, weights=weights)
+
+    importance = {}
+    for name, model in members.items():
+        frame = native_importance(model, X.columns)
+        if frame is not None:
+            importance[name] = frame
+    return importance
@@ -0,0 +1,45 @@
+"""
+Konfigurasi gunicorn (otomatis dibaca dari working directory)
+
+Preload mode (GUNICORN_PRELOAD=1 atau flag --preload):
+- App dan semua model prediksi dimuat SEKALI di master sebelum fork
+- Worker berbagi halaman memori model & library (numpy, sklearn, xgboost,
+  catboost) secara copy-on-write, sehingga memori tidak lagi naik linear
+  dengan jumlah worker
+- gc.freeze() sebelum fork: GC di worker tidak menyentuh header objek
+  yang sudah ada, jadi halaman yang dibagi tidak ikut ter-copy
+
+Tanpa preload, setiap worker memuat model sendiri (lazy, lihat PREDICTION_LAZY_LOADING).
+
+Training job runner: post_fork memulai dispatcher di setiap worker (termasuk
+worker pengganti setelah recycle/crash), jadi job yang disubmit worker lain
+tetap diambil. Klaim job atomic di SQLite membuat ini aman di semua worker.
+
+Usage:
+    GUNICORN_PRELOAD=1 gunicorn run:app --bind 0.0.0.0:$PORT --workers 4 --timeout 120
+"""
+
+import gc
+import os
+import sys
+
+preload_app = os.environ.get('GUNICORN_PRELOAD') == '1' or '--preload' in sys.argv
+
+if preload_app:
+    # Dibaca create_app(): model dimuat eager di master, bukan lazy di worker
+    os.environ['PREDICTION_PRELOAD'] = '1'
+
+
+def when_ready(server):
+    if preload_app:
+        # Objek yang dibuat saat import/load model pindah ke permanent generation
+        gc.freeze()
+        server.log.info("Preload mode: %d objects frozen before fork", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    # Thread tidak ikut ter-fork, jadi dispatcher dimulai di worker (bukan master)
+    from training_jobs import ensure_training_runner
+
+    if ensure_training_runner() is not None:
+        server.log.info("Training job runner started in worker %s", worker.pid)
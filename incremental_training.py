@@ -0,0 +1,276 @@
+"""
+Incremental / Warm-Start Retraining
+===================================
+
+Dipakai AutoModelTrainerJual dan OptimizedModelTrainer agar upload CSV baru
+tidak selalu melatih ulang semua model dari nol:
+
+- TrainingStore: semua baris yang pernah diupload disimpan per tipe model
+  (data/training_store/<tipe>.csv). Upload hanya menambahkan baris yang
+  belum ada (delta), dan baru ditulis setelah versi model tersimpan
+- detect_drift: delta dibandingkan dengan data yang sudah ada (PSI fitur
+  numerik, kategori baru yang belum dikenal encoder). Full retrain hanya
+  jika drift melewati threshold. Delta kecil (< PSI_MIN_ROWS_PER_BIN baris
+  per bin) diuji dengan KS two-sample, karena PSI 10 bin pada beberapa
+  baris hampir selalu > 0.2 walau distribusinya sama
+- warm_start_*: booster melanjutkan boosting dari model sebelumnya
+  (XGBoost xgb_model=, CatBoost init_model), RandomForest menambah pohon
+  dengan warm_start. Pohon baru hanya dilatih pada delta, sehingga waktu
+  training sebanding dengan jumlah baris baru
+
+Catatan: pohon tambahan hanya melihat delta, jadi setelah beberapa kali
+incremental, full retrain (drift atau mode='full') mengembalikan model
+yang dilatih ulang pada seluruh TrainingStore.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# PSI > 0.2 umumnya dianggap pergeseran distribusi yang signifikan
+DEFAULT_DRIFT_THRESHOLD = float(os.environ.get('TRAINING_DRIFT_THRESHOLD', 0.2))
+
+# PSI butuh minimal sekian baris delta per bin; di bawahnya pakai uji KS
+# (delta 100 baris dari distribusi yang sama masih ~15% PSI > 0.2 di salah
+# satu dari 3 kolom, 200 baris praktis tidak pernah)
+PSI_BINS = 10
+PSI_MIN_ROWS_PER_BIN = 20
+
+# Signifikansi uji KS delta kecil (dibagi jumlah kolom, koreksi Bonferroni)
+DEFAULT_DRIFT_PVALUE = float(os.environ.get('TRAINING_DRIFT_PVALUE', 0.01))
+
+# Delta yang lebih besar dari fraksi ini terhadap data lama -> full retrain
+DEFAULT_MAX_DELTA_FRACTION = float(os.environ.get('TRAINING_MAX_DELTA_FRACTION', 0.5))
+
+# Jumlah minimum pohon / iterasi tambahan per warm-start
+MIN_INCREMENTAL_ROUNDS = 10
+
+
+class TrainingStore:
+    """
+    Kumpulan data training persisten untuk satu tipe model (CSV append-only)
+
+    Baris diidentifikasi dari isi kolomnya, sehingga mengupload ulang file
+    yang sama (atau file yang sebagian isinya sudah pernah diupload) hanya
+    menambahkan baris yang benar-benar baru.
+    """
+
+    def __init__(self, path, columns):
+        self.path = Path(path)
+        self.columns = list(columns)
+
+    def load(self):
+        """Semua baris yang tersimpan (DataFrame kosong jika belum ada)"""
+        if not self.path.exists():
+            return pd.DataFrame(columns=self.columns)
+        # round_trip: float dibaca persis seperti yang ditulis, sehingga kunci
+        # baris sama dengan baris asal di memori
+        return pd.read_csv(self.path, float_precision='round_trip')[self.columns]
+
+    def _row_keys(self, df):
+        return pd.util.hash_pandas_object(
+            df[self.columns].astype(str), index=False
+        )
+
+    def diff(self, df):
+        """
+        Pisahkan baris upload yang belum ada di store, tanpa menulis apa pun
+
+        Trainer memanggil append(delta) setelah versi model tersimpan dan
+        terdaftar, sehingga training yang gagal/dibatalkan tidak membuat
+        barisnya dianggap sudah ada (PSI dan delta_too_large tetap benar).
+
+        Returns:
+            tuple: (existing, delta) - data di store dan baris yang baru
+        """
+        existing = self.load()
+        df = df[self.columns].dropna()
+
+        is_new = ~self._row_keys(df).isin(set(self._row_keys(existing)))
+        delta = df[is_new.values].drop_duplicates()
+        return existing, delta.reset_index(drop=True)
+
+    def append(self, df):
+        """
+        Tambahkan baris baru ke store
+
+        Returns:
+            tuple: (existing, delta) - data sebelum upload dan baris yang baru ditambahkan
+        """
+        existing, delta = self.diff(df)
+        if len(delta):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            delta.to_csv(self.path, mode='a', header=not self.path.exists(), index=False)
+        return existing, delta
+
+    @staticmethod
+    def combine(existing, delta):
+        """Data store + delta untuk full retrain (store kosong: delta saja, dtype tetap)"""
+        if len(existing) == 0:
+            return delta
+        return pd.concat([existing, delta], ignore_index=True)
+
+
+def population_stability_index(expected, actual, bins=PSI_BINS):
+    """
+    PSI satu fitur numerik: bin dari kuantil data lama, dibandingkan proporsi
+    data baru di setiap bin (0 = identik, >0.2 = bergeser signifikan)
+    """
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    if len(expected) == 0 or len(actual) == 0:
+        return 0.0
+
+    edges = np.unique(np.quantile(expected, np.linspace(0, 1, bins + 1)))
+    if len(edges) < 2:
+        return 0.0 if np.all(actual == edges[0]) else float('inf')
+    edges[0], edges[-1] = -np.inf, np.inf
+
+    expected_pct = np.histogram(expected, edges)[0] / len(expected)
+    actual_pct = np.histogram(actual, edges)[0] / len(actual)
+    expected_pct = np.clip(expected_pct, 1e-4, None)
+    actual_pct = np.clip(actual_pct, 1e-4, None)
+    return float(np.sum((actual_pct - expected_pct) * np.log(actual_pct / expected_pct)))
+
+
+def detect_drift(existing, delta, numeric_cols, encoders, threshold=None,
+                 max_delta_fraction=None):
+    """
+    Putuskan apakah delta cukup mirip dengan data lama untuk warm-start
+
+    Args:
+        existing (DataFrame): Data yang sudah dipakai model sebelumnya
+        delta (DataFrame): Baris baru
+        numeric_cols (list): Kolom numerik (fitur dan target) untuk PSI
+        encoders (dict): LabelEncoder model sebelumnya per kolom kategori
+        threshold (float): PSI maksimum per kolom
+        max_delta_fraction (float): Rasio delta / data lama maksimum
+
+    Returns:
+        dict: {'drift': bool, 'reasons': [...], 'psi': {kolom: nilai},
+               'ks_pvalues': {kolom: p} (hanya delta kecil),
+               'unseen_categories': {kolom: [nilai]}}
+    """
+    threshold = DEFAULT_DRIFT_THRESHOLD if threshold is None else threshold
+    max_delta_fraction = DEFAULT_MAX_DELTA_FRACTION if max_delta_fraction is None else max_delta_fraction
+    reasons = []
+
+    unseen = {}
+    for col, encoder in encoders.items():
+        known = set(str(value) for value in encoder.classes_)
+        values = sorted(set(delta[col].astype(str)) - known)
+        if values:
+            unseen[col] = values
+    if unseen:
+        # Encoder harus di-fit ulang -> kode kategori lama berubah
+        reasons.append('unseen_categories')
+
+    psi = {
+        col: round(population_stability_index(existing[col], delta[col]), 4)
+        for col in numeric_cols
+    }
+    ks_pvalues = {}
+    if len(delta) >= PSI_BINS * PSI_MIN_ROWS_PER_BIN:
+        drifted = [col for col, value in psi.items() if value > threshold]
+        if drifted:
+            reasons.append(f"psi>{threshold}: {', '.join(drifted)}")
+    elif numeric_cols and len(existing) > 0 and len(delta) > 0:
+        # Delta kecil: PSI didominasi bin kosong, pakai KS two-sample
+        from scipy.stats import ks_2samp
+
+        alpha = DEFAULT_DRIFT_PVALUE / len(numeric_cols)
+        ks_pvalues = {
+            col: float(ks_2samp(existing[col].astype(float), delta[col].astype(float)).pvalue)
+            for col in numeric_cols
+        }
+        drifted = [col for col, value in ks_pvalues.items() if value < alpha]
+        if drifted:
+            reasons.append(f"ks_p<{alpha:.4g}: {', '.join(drifted)}")
+
+    if len(existing) == 0 or len(delta) / len(existing) > max_delta_fraction:
+        reasons.append('delta_too_large')
+
+    return {
+        'drift': bool(reasons),
+        'reasons': reasons,
+        'psi': psi,
+        'ks_pvalues': ks_pvalues,
+        'unseen_categories': unseen
+    }
+
+
+def incremental_rounds(base_rounds, n_delta, n_existing):
+    """Pohon/iterasi tambahan sebanding dengan porsi delta terhadap data lama"""
+    if n_existing == 0:
+        return base_rounds
+    return max(MIN_INCREMENTAL_ROUNDS, int(round(base_rounds * n_delta / n_existing)))
+
+
+def warm_start_xgboost(previous, X, y, rounds):
+    """Lanjutkan boosting dari booster sebelumnya (hyperparameter sama)"""
+    from xgboost import XGBRegressor
+
+    # Model hasil early stopping: lanjutkan dari iterasi terbaik, bukan dari
+    # pohon tambahan setelahnya; delta tidak punya validation set
+    booster = previous.get_booster()
+    best_iteration = booster.attr('best_iteration')
+    if best_iteration is not None:
+        booster = booster[: int(best_iteration) + 1]
+
+    params = previous.get_params()
+    params.update(n_estimators=rounds, early_stopping_rounds=None)
+    model = XGBRegressor(**params)
+    model.fit(X, y, xgb_model=booster)
+    return model
+
+
+def warm_start_catboost(previous, X, y, rounds):
+    """Lanjutkan boosting dari model CatBoost sebelumnya (init_model)"""
+    from catboost import CatBoostRegressor
+
+    params = previous.get_params()
+    params.pop('early_stopping_rounds', None)
+    params.update(iterations=rounds, allow_writing_files=False)
+    params.setdefault('verbose', False)
+    model = CatBoostRegressor(**params)
+    model.fit(X, y, init_model=previous)
+    return model
+
+
+def warm_start_random_forest(previous, X, y, n_new_trees):
+    """
+    Tambah pohon ke RandomForest sebelumnya (warm_start); pohon lama tidak
+    dilatih ulang, pohon baru dilatih pada delta
+    """
+    previous.set_params(
+        warm_start=True,
+        n_estimators=len(previous.estimators_) + n_new_trees
+    )
+    previous.fit(X, y)
+    previous.set_params(warm_start=False)
+    return previous
+
+
+def ensemble_predict(members, X, weights=None):
+    """Rata-rata (berbobot) prediksi member, sama seperti VotingRegressor.predict"""
+    predictions = np.column_stack([model.predict(X) for model in members.values()])
+    return np.average(predictions, axis=1, weights=weights)
+
+
+def holdout_split(X, y, test_size=0.2, min_test=5, random_state=42):
+    """
+    Split delta untuk evaluasi; delta terlalu kecil dievaluasi pada seluruh delta
+
+    Metrics dari evaluasi in-sample (in_sample=True) ditandai di metadata dan
+    tidak didaftarkan sebagai metrics pembanding versi di index model.
+
+    Returns:
+        tuple: (X_train, X_test, y_train, y_test, in_sample)
+    """
+    from sklearn.model_selection import train_test_split
+
+    if len(X) * test_size < min_test:
+        return X, X, y, y, True
+    return (*train_test_split(X, y, test_size=test_size, random_state=random_state), False)
@@ -2,19 +2,17 @@
 Database initialization script for Railway deployment
 """
 from app import create_app, db
-from app.models_sqlalchemy import RentalAsset, RentalRequest
-from app.models_rental_transaction import RentalTransaction
-from app.models_user_notification import UserNotification
+from flask_migrate import upgrade
 import sys
 
 def init_database():
-    """Initialize database tables"""
+    """Initialize database tables (sama dengan `flask db upgrade`)"""
     app = create_app()
     
     with app.app_context():
         try:
-            print("🔄 Creating database tables...")
-            db.create_all()
+            print("🔄 Applying database migrations...")
+            upgrade()
             print("✅ Database tables created successfully!")
             
             # Test connection
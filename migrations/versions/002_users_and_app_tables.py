@@ -0,0 +1,154 @@
+"""Create users, pengajuan_sewa and remaining model tables, seed default admin
+
+Revision ID: 002_users_and_app_tables
+Revises: 001_rental_tables
+Create Date: 2026-10-17 10:00:00.000000
+
+Menggantikan DDL yang sebelumnya dijalankan create_app() di setiap boot
+worker (init_mysql_db + db.create_all). Tabel yang sudah ada dilewati,
+sehingga database lama cukup di-upgrade sekali untuk mendapat versi.
+"""
+from alembic import op
+import sqlalchemy as sa
+from werkzeug.security import generate_password_hash
+
+# revision identifiers, used by Alembic.
+revision = '002_users_and_app_tables'
+down_revision = '001_rental_tables'
+branch_labels = None
+depends_on = None
+
+MYSQL_OPTIONS = {'mysql_engine': 'InnoDB', 'mysql_charset': 'utf8mb4'}
+
+
+def has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    # Users (sebelumnya SQL mentah di app/database.py)
+    if not has_table('users'):
+        op.create_table('users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=100), nullable=False),
+            sa.Column('password', sa.String(length=255), nullable=False),
+            sa.Column('role', sa.Enum('admin', 'pengguna', name='user_role'), nullable=False,
+                      server_default='pengguna'),
+            sa.Column('phone', sa.String(length=20), nullable=True),
+            sa.Column('address', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp(), nullable=True),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            **MYSQL_OPTIONS
+        )
+
+    # Pengajuan sewa (rental applications)
+    if not has_table('pengajuan_sewa'):
+        op.create_table('pengajuan_sewa',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('aset_id', sa.Integer(), nullable=False),
+            sa.Column('jenis_aset', sa.Enum('tanah', 'tanah_bangunan', name='jenis_aset_type'), nullable=False),
+            sa.Column('nama_penyewa', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=100), nullable=False),
+            sa.Column('telepon', sa.String(length=20), nullable=False),
+            sa.Column('durasi_sewa', sa.Integer(), nullable=False, comment='dalam bulan'),
+            sa.Column('tanggal_mulai', sa.Date(), nullable=True),
+            sa.Column('pesan', sa.Text(), nullable=True),
+            sa.Column('status', sa.Enum('pending', 'approved', 'rejected', 'completed', name='status_pengajuan'),
+                      server_default='pending', nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp(), nullable=True),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            **MYSQL_OPTIONS
+        )
+
+    # AdminNotification (app/models_sqlalchemy.py)
+    if not has_table('admin_notifications'):
+        op.create_table('admin_notifications',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(length=255), nullable=False),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('related_type', sa.String(length=50), nullable=False),
+            sa.Column('related_id', sa.Integer(), nullable=True),
+            sa.Column('is_read', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    # UserNotification (app/models_user_notification.py)
+    if not has_table('user_notifications'):
+        op.create_table('user_notifications',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(length=100), nullable=False),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('is_read', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('related_type', sa.String(length=50), nullable=True),
+            sa.Column('related_id', sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    # UserFavorite (app/models_user_favorites.py)
+    if not has_table('user_favorites'):
+        op.create_table('user_favorites',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('asset_id', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    # RentalTransaction (app/models_rental_transaction.py)
+    if not has_table('rental_transactions'):
+        op.create_table('rental_transactions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('rental_request_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('asset_id', sa.Integer(), nullable=False),
+            sa.Column('start_date', sa.Date(), nullable=False),
+            sa.Column('end_date', sa.Date(), nullable=False),
+            sa.Column('current_end_date', sa.Date(), nullable=False),
+            sa.Column('monthly_price', sa.Float(), nullable=False),
+            sa.Column('total_months', sa.Integer(), nullable=False),
+            sa.Column('paid_amount', sa.Float(), nullable=True),
+            sa.Column('remaining_amount', sa.Float(), nullable=False),
+            sa.Column('status', sa.Enum('active', 'extended', 'completed', 'terminated',
+                                        name='rental_transaction_status_enum'), nullable=True),
+            sa.Column('payment_status', sa.Enum('unpaid', 'partial', 'paid', 'failed',
+                                                name='payment_status_enum'), nullable=True),
+            sa.Column('extension_count', sa.Integer(), nullable=True),
+            sa.Column('extension_history', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['asset_id'], ['rental_assets.id'], ),
+            sa.ForeignKeyConstraint(['rental_request_id'], ['rental_requests.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    # Create default admin if none exists
+    connection = op.get_bind()
+    admins = connection.execute(sa.text("SELECT COUNT(*) FROM users WHERE role = 'admin'")).scalar()
+    if admins == 0:
+        connection.execute(sa.text("""
+            INSERT INTO users (name, email, password, role)
+            VALUES (:name, :email, :password, :role)
+        """), {
+            'name': 'Administrator',
+            'email': 'admin@telkom.co.id',
+            'password': generate_password_hash('admin123'),
+            'role': 'admin'
+        })
+
+
+def downgrade():
+    op.drop_table('rental_transactions')
+    op.drop_table('user_favorites')
+    op.drop_table('user_notifications')
+    op.drop_table('admin_notifications')
+    op.drop_table('pengajuan_sewa')
+    op.drop_table('users')
@@ -0,0 +1,62 @@
+"""Create status_counters and fill it from current row counts
+
+Revision ID: 003_status_counters
+Revises: 002_users_and_app_tables
+Create Date: 2026-10-17 14:00:00.000000
+
+Counter dijaga listener di app/status_counters.py; migration ini mengisi
+nilai awal (COUNT(*) GROUP BY status) dan baris 0 untuk setiap nilai enum.
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_status_counters'
+down_revision = '002_users_and_app_tables'
+branch_labels = None
+depends_on = None
+
+# Snapshot nilai enum status saat revisi ini dibuat
+STATUSES = {
+    'rental_assets': ['available', 'rented', 'maintenance', 'reserved'],
+    'rental_requests': ['pending', 'approved', 'rejected', 'active', 'completed', 'cancelled'],
+    'rental_transactions': ['active', 'extended', 'completed', 'terminated'],
+}
+
+
+def upgrade():
+    columns = [
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ]
+    connection = op.get_bind()
+    if sa.inspect(connection).has_table('status_counters'):
+        # Sudah dibuat db.create_all(); isi ulang dari data
+        status_counters = sa.table('status_counters', *[sa.column(c.name) for c in columns])
+        connection.execute(status_counters.delete())
+    else:
+        status_counters = op.create_table('status_counters', *columns,
+            sa.PrimaryKeyConstraint('entity', 'status')
+        )
+
+    now = datetime.utcnow()
+    rows = []
+    for entity, statuses in STATUSES.items():
+        counts = {status: 0 for status in statuses}
+        source = sa.table(entity, sa.column('status'))
+        query = sa.select(source.c.status, sa.func.count()).group_by(source.c.status)
+        for status, count in connection.execute(query):
+            counts['' if status is None else status] = count
+        rows.extend(
+            {'entity': entity, 'status': status, 'count': count, 'updated_at': now}
+            for status, count in counts.items()
+        )
+    op.bulk_insert(status_counters, rows)
+
+
+def downgrade():
+    op.drop_table('status_counters')
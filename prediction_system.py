@@ -14,6 +14,8 @@ Models yang digunakan:
 Model tersimpan dalam folder:
 - model/tanah/ - Model untuk prediksi tanah
 - model/bangunan/ - Model untuk prediksi bangunan
+- model/<tipe>/<timestamp>/manifest.json - Format artefak (CatBoost .cbm,
+  XGBoost .ubj, joblib tanpa kompresi untuk mmap); diutamakan jika ada
 
 FASE 1 IMPROVEMENTS (Nov 2025):
 - ✅ Menggunakan Ensemble Models untuk akurasi lebih tinggi
@@ -28,15 +30,30 @@ FASE 5 IMPROVEMENTS (Nov 2025):
 """
 
 import os
+import re
+import atexit
 import joblib
 import json
 import pandas as pd
 import numpy as np
 import hashlib
+import importlib
+import sqlite3
+import queue
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
 from pathlib import Path
 from functools import lru_cache
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+from preprocessing import (
+    PreprocessingPipeline, BANGUNAN_DEFAULT_FEATURES, BANGUNAN_RENAMES,
+    NJOP_CATEGORY_THRESHOLDS, njop_category
+)
 
 
 class PredictionCache:
@@ -53,6 +70,8 @@ class PredictionCache:
         self.cache = OrderedDict()
         self.max_size = max_size
         self.ttl = timedelta(minutes=ttl_minutes)
+        self.generation = 0
+        self._lock = threading.Lock()
     
     def _make_key(self, input_data):
         """Create cache key from input data"""
@@ -65,17 +84,18 @@ class PredictionCache:
         """Get cached prediction if available and not expired"""
         key = self._make_key(input_data)
         
-        if key in self.cache:
-            cached_data, timestamp = self.cache[key]
-            
-            # Check if expired
-            if datetime.now() - timestamp < self.ttl:
-                # Move to end (most recently used)
-                self.cache.move_to_end(key)
-                return cached_data
-            else:
-                # Expired, remove
-                del self.cache[key]
+        with self._lock:
+            if key in self.cache:
+                cached_data, timestamp = self.cache[key]
+                
+                # Check if expired
+                if datetime.now() - timestamp < self.ttl:
+                    # Move to end (most recently used)
+                    self.cache.move_to_end(key)
+                    return cached_data
+                else:
+                    # Expired, remove
+                    del self.cache[key]
         
         return None
     
@@ -83,52 +103,1935 @@ class PredictionCache:
         """Cache a prediction result"""
         key = self._make_key(input_data)
         
-        # Remove oldest if at max size
-        if len(self.cache) >= self.max_size:
-            self.cache.popitem(last=False)
-        
-        self.cache[key] = (prediction_result, datetime.now())
+        with self._lock:
+            # Remove oldest if at max size
+            if key not in self.cache and len(self.cache) >= self.max_size:
+                self.cache.popitem(last=False)
+            
+            self.cache[key] = (prediction_result, datetime.now())
+            self.cache.move_to_end(key)
     
     def clear(self):
         """Clear all cache"""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+    
+    def bump_generation(self):
+        """Invalidate semua entry (dipanggil saat reload model)"""
+        with self._lock:
+            self.generation += 1
+            self.cache.clear()
+        return self.generation
     
     def get_stats(self):
         """Get cache statistics"""
         return {
+            'backend': 'memory',
             'size': len(self.cache),
             'max_size': self.max_size,
-            'ttl_minutes': self.ttl.total_seconds() / 60
+            'ttl_minutes': self.ttl.total_seconds() / 60,
+            'generation': self.generation
+        }
+
+
+class SQLitePredictionCache:
+    """
+    Shared prediction cache berbasis file SQLite (WAL mode)
+    
+    Dipakai bersama oleh semua gunicorn worker di host yang sama tanpa
+    service tambahan. Mendukung TTL, eviction LRU berbasis ukuran, dan
+    generation global yang dinaikkan oleh reload_models() sehingga semua
+    worker melihat invalidation yang sama.
+    """
+    
+    def __init__(self, db_path, max_size=1000, ttl_minutes=30):
+        """
+        Initialize cache
+        
+        Args:
+            db_path: Path file SQLite (dibuat jika belum ada)
+            max_size: Maximum number of cached predictions
+            ttl_minutes: Time-to-live in minutes
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self._local = threading.local()
+        
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " key TEXT PRIMARY KEY,"
+                " generation INTEGER NOT NULL,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_last_access "
+                "ON cache_entries (last_access)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_meta ("
+                " name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO cache_meta (name, value) VALUES ('generation', 0)"
+            )
+    
+    def _connect(self):
+        """Koneksi per thread dan per proses (aman setelah fork gunicorn)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    _make_key = PredictionCache._make_key
+    
+    @property
+    def generation(self):
+        row = self._connect().execute(
+            "SELECT value FROM cache_meta WHERE name = 'generation'"
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def get(self, input_data):
+        """Get cached prediction if available, not expired and of current generation"""
+        key = self._make_key(input_data)
+        now = time.time()
+        
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND created_at >= ? "
+                "AND generation = (SELECT value FROM cache_meta WHERE name = 'generation')",
+                (key, now - self.ttl.total_seconds())
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key)
+            )
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            print(f"⚠️ Warning: Prediction cache read failed: {e}")
+            return None
+    
+    def set(self, input_data, prediction_result):
+        """Cache a prediction result and evict least recently used entries"""
+        key = self._make_key(input_data)
+        now = time.time()
+        
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries "
+                    "(key, generation, value, created_at, last_access) "
+                    "VALUES (?, (SELECT value FROM cache_meta WHERE name = 'generation'), ?, ?, ?)",
+                    (key, json.dumps(prediction_result, default=str), now, now)
+                )
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN ("
+                    " SELECT key FROM cache_entries ORDER BY last_access DESC"
+                    " LIMIT -1 OFFSET ?)",
+                    (self.max_size,)
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️ Warning: Prediction cache write failed: {e}")
+    
+    def clear(self):
+        """Clear all cache (berlaku untuk semua worker)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache_entries")
+    
+    def bump_generation(self):
+        """Invalidate semua entry di semua worker (dipanggil saat reload model)"""
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE cache_meta SET value = value + 1 WHERE name = 'generation'")
+            conn.execute(
+                "DELETE FROM cache_entries WHERE generation < "
+                "(SELECT value FROM cache_meta WHERE name = 'generation')"
+            )
+        return self.generation
+    
+    def get_stats(self):
+        """Get cache statistics"""
+        size = self._connect().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        return {
+            'backend': 'sqlite',
+            'path': str(self.db_path),
+            'size': size,
+            'max_size': self.max_size,
+            'ttl_minutes': self.ttl.total_seconds() / 60,
+            'generation': self.generation
+        }
+
+
+CACHE_BACKENDS = {
+    'memory': PredictionCache,
+    'sqlite': SQLitePredictionCache
+}
+
+
+def create_prediction_cache(backend='memory', max_size=1000, ttl_minutes=30, db_path=None):
+    """
+    Factory untuk backend cache prediksi
+    
+    Args:
+        backend: 'memory' (LRU per proses) atau 'sqlite' (shared antar worker)
+        max_size: Maximum number of cached predictions
+        ttl_minutes: Time-to-live in minutes
+        db_path: Path file SQLite untuk backend 'sqlite'
+            (default: instance/prediction_cache.sqlite3)
+    """
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown cache backend: {backend}")
+    
+    if backend == 'sqlite':
+        if db_path is None:
+            db_path = Path(__file__).parent / "instance" / "prediction_cache.sqlite3"
+        return SQLitePredictionCache(db_path, max_size=max_size, ttl_minutes=ttl_minutes)
+    
+    return PredictionCache(max_size=max_size, ttl_minutes=ttl_minutes)
+
+
+class CategoryLookup:
+    """
+    Lookup table hasil kompilasi LabelEncoder untuk encoding O(1)
+    
+    Dibangun sekali saat model dimuat, sehingga hot path tidak lagi melewati
+    validasi input sklearn, np.unique/searchsorted, maupun try/except untuk
+    kategori yang tidak dikenal.
+    """
+    
+    def __init__(self, encoder, unknown_code=None):
+        """
+        Args:
+            encoder: LabelEncoder yang sudah di-fit
+            unknown_code: Kode untuk kategori tidak dikenal
+                (default: kode classes_[0], sama seperti perilaku lama)
+        """
+        self.classes = [str(label) for label in encoder.classes_]
+        self._codes = {label: code for code, label in enumerate(self.classes)}
+        self.codes = MappingProxyType(self._codes)
+        self.unknown_code = self._codes[self.classes[0]] if unknown_code is None else unknown_code
+    
+    def __contains__(self, value):
+        return isinstance(value, str) and value in self._codes
+    
+    def __len__(self):
+        return len(self._codes)
+    
+    def get(self, value, default=None):
+        """Kode untuk value, atau default jika tidak dikenal"""
+        return self._codes.get(str(value), default)
+    
+    def encode(self, value):
+        """Kode untuk value, fallback ke unknown_code jika tidak dikenal"""
+        return self._codes.get(str(value), self.unknown_code)
+    
+    def encode_column(self, column):
+        """Encode satu pd.Series sekaligus dengan fallback unknown_code"""
+        return column.astype(str).map(self._codes).fillna(self.unknown_code).astype(np.int64)
+
+
+def compile_category_lookups(encoders):
+    """Compile dict LabelEncoder menjadi dict CategoryLookup"""
+    return {col: CategoryLookup(encoder) for col, encoder in encoders.items()}
+
+
+def rental_pipeline(model_type, features, encoders, scaler):
+    """
+    PreprocessingPipeline untuk model sewa (features/encoders/scaler .pkl)
+    
+    Model sewa dilatih di luar repo ini, jadi pipeline dikompilasi dari
+    komponennya saat dimuat; kategori tidak dikenal memakai kode pertama
+    seperti CategoryLookup.
+    """
+    if model_type == 'bangunan':
+        return PreprocessingPipeline.from_encoders(
+            features, encoders, scaler, derived='bangunan',
+            renames=BANGUNAN_RENAMES, defaults=BANGUNAN_DEFAULT_FEATURES, unknown='fallback'
+        )
+    return PreprocessingPipeline.from_encoders(
+        features, encoders, scaler, derived='tanah', unknown='fallback'
+    )
+
+
+# Member ensemble yang dihasilkan trainer: nama member -> nama tampilan
+ENSEMBLE_MEMBERS = OrderedDict([
+    ('xgboost', 'XGBoost'),
+    ('random_forest', 'Random Forest'),
+    ('catboost', 'CatBoost')
+])
+
+# Nama estimator di dalam VotingRegressor -> nama member standar
+VOTING_MEMBER_ALIASES = {
+    'xgb': 'xgboost',
+    'xgboost': 'xgboost',
+    'rf': 'random_forest',
+    'random_forest': 'random_forest',
+    'cb': 'catboost',
+    'cat': 'catboost',
+    'catboost': 'catboost'
+}
+
+_ensemble_executor = None
+_ensemble_executor_pid = None
+_ensemble_executor_lock = threading.Lock()
+
+
+def get_ensemble_executor():
+    """
+    Thread pool bersama untuk scoring member ensemble
+    
+    Dibuat lazy per proses (aman untuk worker gunicorn hasil fork). XGBoost,
+    sklearn tree dan CatBoost melepas GIL di native code, sehingga member
+    benar-benar berjalan paralel.
+    """
+    global _ensemble_executor, _ensemble_executor_pid
+    with _ensemble_executor_lock:
+        if _ensemble_executor is None or _ensemble_executor_pid != os.getpid():
+            _ensemble_executor = ThreadPoolExecutor(
+                max_workers=int(os.environ.get('PREDICTION_ENSEMBLE_WORKERS', 4)),
+                thread_name_prefix='ensemble'
+            )
+            _ensemble_executor_pid = os.getpid()
+        return _ensemble_executor
+
+
+class EnsembleScorer:
+    """
+    Scoring ensemble: setiap member diprediksi tepat satu kali (paralel),
+    lalu nilai ensemble diturunkan dari output member tersebut.
+    
+    Jika VotingRegressor tersedia, member diambil dari estimator hasil fit
+    di dalamnya (named_estimators_) beserta weights-nya, sehingga rata-rata
+    tertimbang identik dengan VotingRegressor.predict tanpa inference ganda.
+    """
+    
+    def __init__(self, members=None, voting=None, skip_voting_predict=True, weights=None):
+        """
+        Args:
+            members (dict): nama member -> model (dipakai jika voting tidak ada)
+            voting: VotingRegressor hasil fit (opsional)
+            skip_voting_predict (bool): True = nilai ensemble dari rata-rata
+                output member; False = tetap panggil voting.predict
+            weights (list): Bobot member (tanpa voting, mis. dari manifest artefak)
+        """
+        self.voting = voting
+        self.skip_voting_predict = skip_voting_predict
+        self.weights = None
+        
+        if voting is not None and hasattr(voting, 'named_estimators_'):
+            self.members = OrderedDict()
+            weights = []
+            for i, (name, estimator) in enumerate(voting.estimators):
+                if estimator == 'drop':
+                    continue
+                self.members[VOTING_MEMBER_ALIASES.get(name, name)] = voting.named_estimators_[name]
+                weights.append(1.0 if voting.weights is None else voting.weights[i])
+            if voting.weights is not None:
+                self.weights = np.asarray(weights, dtype=float)
+        else:
+            self.members = OrderedDict(members or {})
+            if weights is not None:
+                self.weights = np.asarray(weights, dtype=float)
+        
+        if not self.members:
+            raise ValueError("Ensemble membutuhkan minimal satu member model")
+    
+    @property
+    def member_names(self):
+        return list(self.members)
+    
+    @property
+    def display_name(self):
+        if len(self.members) == 1:
+            name = self.member_names[0]
+            return ENSEMBLE_MEMBERS.get(name, name)
+        return 'Ensemble ({})'.format(
+            ' + '.join(ENSEMBLE_MEMBERS.get(name, name) for name in self.members)
+        )
+    
+    def _timed_predict(self, model, X):
+        start = time.perf_counter()
+        output = np.asarray(model.predict(X), dtype=float).ravel()
+        return output, (time.perf_counter() - start) * 1000
+    
+    def score(self, X):
+        """
+        Args:
+            X (np.array): Matriks fitur (N, F) yang sudah di-scale
+            
+        Returns:
+            dict: {
+                'prediction': np.array (N,) nilai ensemble,
+                'members': {nama: np.array (N,)},
+                'timings_ms': {nama: float}
+            }
+        """
+        models = list(self.members.items())
+        if self.voting is not None and not self.skip_voting_predict:
+            models.append(('voting', self.voting))
+        
+        if len(models) == 1:
+            outputs = [self._timed_predict(models[0][1], X)]
+        else:
+            executor = get_ensemble_executor()
+            futures = [executor.submit(self._timed_predict, model, X) for _, model in models]
+            outputs = [future.result() for future in futures]
+        
+        member_outputs = OrderedDict()
+        timings = OrderedDict()
+        for (name, _), (output, elapsed_ms) in zip(models, outputs):
+            member_outputs[name] = output
+            timings[name] = round(elapsed_ms, 3)
+        
+        if 'voting' in member_outputs:
+            prediction = member_outputs.pop('voting')
+        else:
+            # Semantik VotingRegressor.predict: np.average(axis=1, weights)
+            stacked = np.column_stack(list(member_outputs.values()))
+            prediction = np.average(stacked, axis=1, weights=self.weights)
+        
+        return {
+            'prediction': prediction,
+            'members': member_outputs,
+            'timings_ms': timings
+        }
+
+
+class PredictionLogWriter:
+    """
+    Background writer untuk prediction logs (satu writer per proses)
+    
+    Request thread hanya melakukan satu put_nowait ke bounded queue. Thread
+    writer mengumpulkan entry sampai batch_size atau flush_interval tercapai,
+    lalu menulis sekaligus ke segment milik proses ini:
+    logs/predictions_YYYYMMDD_<pid>.jsonl (tidak ada append bersamaan dari
+    beberapa gunicorn worker ke file yang sama).
+    """
+    
+    def __init__(self, max_queue_size=10000, batch_size=500, flush_interval=1.0,
+                 compact_interval=3600):
+        """
+        Args:
+            max_queue_size (int): Maksimum item di queue; jika penuh, entry dibuang
+                (request tidak pernah menunggu disk)
+            batch_size (int): Jumlah entry yang memicu flush
+            flush_interval (float): Detik maksimum entry menunggu di buffer
+            compact_interval (float): Detik antar pemadatan hari yang sudah
+                selesai ke Parquet (0 = nonaktif)
+        """
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._last_compaction = {}
+        self.written = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._queue = None
+        self._created_dirs = set()
+    
+    def _ensure_started(self):
+        """Start thread writer (ulang setelah fork: thread tidak ikut ter-copy)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._created_dirs = set()
+            self._thread = threading.Thread(
+                target=self._run, name='prediction-log-writer', daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+    
+    def put(self, log_dir, log_entries):
+        """Enqueue entries tanpa blocking"""
+        if not log_entries:
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((Path(log_dir), log_entries))
+        except queue.Full:
+            self.dropped += len(log_entries)
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            pending = len(item[1]) if item is not None else 0
+            deadline = time.monotonic() + self.flush_interval
+            
+            while item is not None and pending < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                if item is not None:
+                    pending += len(item[1])
+            
+            batch = [entry for entry in batch if entry is not None]
+            self.write_batch(batch)
+            self._maybe_compact(batch)
+            for _ in range(len(batch) + (item is None)):
+                self._queue.task_done()
+            
+            if item is None:
+                return
+    
+    def _maybe_compact(self, batch):
+        """Padatkan log hari sebelumnya ke Parquet (di writer thread, bukan request)"""
+        if self.compact_interval <= 0:
+            return
+        now = time.monotonic()
+        for log_dir in {log_dir for log_dir, _ in batch}:
+            last = self._last_compaction.get(log_dir)
+            if last is not None and now - last < self.compact_interval:
+                continue
+            self._last_compaction[log_dir] = now
+            try:
+                PredictionLogArchive(log_dir).compact()
+            except Exception as e:
+                print(f"⚠️ Warning: Prediction log compaction failed: {e}")
+    
+    def write_batch(self, batch):
+        """
+        Tulis batch ke segment harian proses ini (satu open/append per file)
+        
+        Args:
+            batch (list): List of (log_dir, log_entries)
+        """
+        segments = OrderedDict()
+        for log_dir, log_entries in batch:
+            for entry in log_entries:
+                day = entry['timestamp'][:10].replace('-', '')
+                segments.setdefault((log_dir, day), []).append(entry)
+        
+        for (log_dir, day), entries in segments.items():
+            try:
+                if log_dir not in self._created_dirs:
+                    log_dir.mkdir(parents=True, exist_ok=True)
+                    self._created_dirs.add(log_dir)
+                lines = ''.join(
+                    json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries
+                )
+                log_file = log_dir / f"predictions_{day}_{os.getpid()}.jsonl"
+                with open(log_file, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+                self.written += len(entries)
+            except Exception as e:
+                print(f"⚠️ Warning: Failed to log prediction: {e}")
+    
+    def flush(self):
+        """Tunggu sampai semua entry yang sudah di-enqueue tertulis"""
+        if self._pid == os.getpid():
+            self._queue.join()
+    
+    def close(self):
+        """Flush dan hentikan thread writer (dipanggil saat proses shutdown)"""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        self._pid = None
+    
+    def get_stats(self):
+        return {
+            'queued': self._queue.qsize() if self._pid == os.getpid() else 0,
+            'max_queue_size': self.max_queue_size,
+            'written': self.written,
+            'dropped': self.dropped
+        }
+
+
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+
+def get_prediction_log_writer():
+    """PredictionLogWriter bersama untuk proses ini (di-flush saat exit)"""
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None:
+            _log_writer = PredictionLogWriter(
+                max_queue_size=int(os.environ.get('PREDICTION_LOG_QUEUE_SIZE', 10000)),
+                batch_size=int(os.environ.get('PREDICTION_LOG_BATCH_SIZE', 500)),
+                flush_interval=float(os.environ.get('PREDICTION_LOG_FLUSH_INTERVAL', 1.0)),
+                compact_interval=float(os.environ.get('PREDICTION_LOG_COMPACT_INTERVAL', 3600))
+            )
+            atexit.register(_log_writer.close)
+        return _log_writer
+
+
+class PredictionRollupStore:
+    """
+    Rollup analytics prediksi per hari dan per jam (SQLite, WAL mode)
+    
+    Log JSONL di-tail secara incremental: byte offset setiap segment
+    disimpan bersama rollup dalam satu transaksi, sehingga setiap query hanya
+    membaca baris baru dan tidak ada entry yang terhitung dua kali walaupun
+    beberapa worker melakukan refresh bersamaan. Query analytics (7, 30 atau
+    365 hari) hanya membaca tabel rollup.
+    """
+    
+    GRANULARITIES = ('day', 'hour')
+    CONFIDENCE_BIN_WIDTH = 10
+    
+    def __init__(self, log_dir, db_path=None):
+        """
+        Args:
+            log_dir: Folder prediction logs (predictions_YYYYMMDD*.jsonl)
+            db_path: File SQLite rollup (default: <log_dir>/analytics.sqlite3)
+        """
+        self.log_dir = Path(log_dir)
+        self.db_path = Path(db_path) if db_path else self.log_dir / "analytics.sqlite3"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS prediction_rollups ("
+            " granularity TEXT NOT NULL,"
+            " bucket TEXT NOT NULL,"
+            " model_type TEXT NOT NULL,"
+            " total INTEGER NOT NULL,"
+            " successful INTEGER NOT NULL,"
+            " failed INTEGER NOT NULL,"
+            " confidence_sum REAL NOT NULL,"
+            " confidence_count INTEGER NOT NULL,"
+            " PRIMARY KEY (granularity, bucket, model_type))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS confidence_histogram ("
+            " granularity TEXT NOT NULL,"
+            " bucket TEXT NOT NULL,"
+            " model_type TEXT NOT NULL,"
+            " bin INTEGER NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (granularity, bucket, model_type, bin))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS log_offsets ("
+            " file TEXT PRIMARY KEY, offset INTEGER NOT NULL)"
+        )
+    
+    _connect = SQLitePredictionCache._connect
+    
+    def _confidence_bin(self, confidence):
+        return min(max(int(confidence // self.CONFIDENCE_BIN_WIDTH), 0),
+                   100 // self.CONFIDENCE_BIN_WIDTH - 1)
+    
+    def _aggregate(self, day, data, rollups, histogram):
+        """Tambahkan baris JSONL (bytes) ke akumulator rollup"""
+        for line in data.splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            
+            timestamp = entry.get('timestamp') or ''
+            success = bool(entry.get('success'))
+            
+            confidence = None
+            result = entry.get('prediction_result')
+            if success and result and 'confidence' in result:
+                confidence = float(result['confidence'])
+            
+            self._accumulate(
+                day, timestamp[11:13] if len(timestamp) >= 13 else '00',
+                entry.get('model_type'), success, confidence, rollups, histogram
+            )
+    
+    def _accumulate(self, day, hour, model_type, success, confidence, rollups, histogram):
+        model_type = model_type or 'unknown'
+        for key in (('day', day, model_type), ('hour', day + hour, model_type)):
+            row = rollups.setdefault(key, [0, 0, 0, 0.0, 0])
+            row[0] += 1
+            row[1 if success else 2] += 1
+            if confidence is not None:
+                row[3] += confidence
+                row[4] += 1
+                bin_key = key + (self._confidence_bin(confidence),)
+                histogram[bin_key] = histogram.get(bin_key, 0) + 1
+    
+    def _aggregate_archive(self, rollups, histogram):
+        """Tambahkan hari yang sudah dipadatkan ke Parquet (untuk rebuild)"""
+        archive = PredictionLogArchive(self.log_dir)
+        if not archive.archive_dir.exists():
+            return
+        
+        import pyarrow.parquet as pq
+        
+        for path in sorted(archive.archive_dir.glob("predictions_*.parquet")):
+            day = path.stem[len('predictions_'):]
+            table = pq.read_table(path, columns=['timestamp', 'model_type', 'success', 'confidence'])
+            for row in table.to_pylist():
+                self._accumulate(
+                    day, row['timestamp'].strftime('%H'), row['model_type'], row['success'],
+                    row['confidence'] if row['success'] else None, rollups, histogram
+                )
+    
+    def _refresh(self, conn, include_archive=False):
+        """Tail semua segment dari offset terakhir (dalam transaksi yang sudah dibuka)"""
+        offsets = dict(conn.execute("SELECT file, offset FROM log_offsets"))
+        rollups = {}
+        histogram = {}
+        new_offsets = []
+        if include_archive:
+            self._aggregate_archive(rollups, histogram)
+        
+        for item in os.scandir(self.log_dir):
+            name = item.name
+            if not (name.startswith('predictions_') and name.endswith('.jsonl')):
+                continue
+            offset = offsets.get(name, 0)
+            size = item.stat().st_size
+            if size <= offset:
+                continue
+            
+            with open(item.path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+            # Baris terakhir yang belum lengkap dibaca pada refresh berikutnya
+            end = data.rfind(b'\n') + 1
+            if end == 0:
+                continue
+            
+            self._aggregate(name[len('predictions_'):][:8], data[:end], rollups, histogram)
+            new_offsets.append((name, offset + end))
+        
+        conn.executemany(
+            "INSERT INTO prediction_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (granularity, bucket, model_type) DO UPDATE SET"
+            " total = total + excluded.total,"
+            " successful = successful + excluded.successful,"
+            " failed = failed + excluded.failed,"
+            " confidence_sum = confidence_sum + excluded.confidence_sum,"
+            " confidence_count = confidence_count + excluded.confidence_count",
+            [key + tuple(row) for key, row in rollups.items()]
+        )
+        conn.executemany(
+            "INSERT INTO confidence_histogram VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (granularity, bucket, model_type, bin) DO UPDATE SET"
+            " count = count + excluded.count",
+            [key + (count,) for key, count in histogram.items()]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO log_offsets (file, offset) VALUES (?, ?)", new_offsets
+        )
+        return len(new_offsets)
+    
+    def _transaction(self, work):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+    
+    def refresh(self):
+        """Proses baris log baru sejak refresh terakhir"""
+        return self._transaction(self._refresh)
+    
+    def rebuild(self):
+        """Hapus semua rollup dan bangun ulang dari seluruh log yang ada"""
+        def work(conn):
+            conn.execute("DELETE FROM prediction_rollups")
+            conn.execute("DELETE FROM confidence_histogram")
+            conn.execute("DELETE FROM log_offsets")
+            return self._refresh(conn, include_archive=True)
+        return self._transaction(work)
+    
+    def get_stats(self, days=7):
+        """
+        Statistik N hari terakhir (format sama dengan get_prediction_stats)
+        """
+        self.refresh()
+        start = (datetime.now() - timedelta(days=days - 1)).strftime('%Y%m%d')
+        conn = self._connect()
+        
+        stats = {
+            'total_predictions': 0,
+            'successful_predictions': 0,
+            'failed_predictions': 0,
+            'predictions_by_type': {'tanah': 0, 'bangunan': 0},
+            'average_confidence': 0,
+            'confidence_histogram': {}
+        }
+        confidence_sum = 0.0
+        confidence_count = 0
+        
+        rows = conn.execute(
+            "SELECT model_type, SUM(total), SUM(successful), SUM(failed),"
+            " SUM(confidence_sum), SUM(confidence_count) "
+            "FROM prediction_rollups WHERE granularity = 'day' AND bucket >= ? "
+            "GROUP BY model_type",
+            (start,)
+        )
+        for model_type, total, successful, failed, conf_sum, conf_count in rows:
+            stats['total_predictions'] += total
+            stats['successful_predictions'] += successful
+            stats['failed_predictions'] += failed
+            stats['predictions_by_type'][model_type] = (
+                stats['predictions_by_type'].get(model_type, 0) + successful
+            )
+            confidence_sum += conf_sum
+            confidence_count += conf_count
+        
+        width = self.CONFIDENCE_BIN_WIDTH
+        for bin_index, count in conn.execute(
+                "SELECT bin, SUM(count) FROM confidence_histogram "
+                "WHERE granularity = 'day' AND bucket >= ? GROUP BY bin ORDER BY bin",
+                (start,)):
+            stats['confidence_histogram'][f"{bin_index * width}-{(bin_index + 1) * width}"] = count
+        
+        if stats['total_predictions'] > 0:
+            stats['success_rate'] = (stats['successful_predictions'] / stats['total_predictions']) * 100
+        else:
+            stats['success_rate'] = 0
+        
+        if confidence_count:
+            stats['average_confidence'] = confidence_sum / confidence_count
+        
+        return stats
+    
+    def get_hourly_stats(self, hours=24):
+        """
+        Rollup per jam untuk N jam terakhir
+        
+        Returns:
+            list: [{'hour', 'total_predictions', 'successful_predictions',
+                    'failed_predictions', 'average_confidence'}, ...]
+        """
+        self.refresh()
+        start = (datetime.now() - timedelta(hours=hours - 1)).strftime('%Y%m%d%H')
+        rows = self._connect().execute(
+            "SELECT bucket, SUM(total), SUM(successful), SUM(failed),"
+            " SUM(confidence_sum), SUM(confidence_count) "
+            "FROM prediction_rollups WHERE granularity = 'hour' AND bucket >= ? "
+            "GROUP BY bucket ORDER BY bucket",
+            (start,)
+        )
+        return [
+            {
+                'hour': datetime.strptime(bucket, '%Y%m%d%H').isoformat(),
+                'total_predictions': total,
+                'successful_predictions': successful,
+                'failed_predictions': failed,
+                'average_confidence': conf_sum / conf_count if conf_count else 0
+            }
+            for bucket, total, successful, failed, conf_sum, conf_count in rows
+        ]
+
+
+class PredictionLogArchive:
+    """
+    Arsip prediction logs dalam format kolumnar (Parquet harian)
+    
+    JSONL per-PID tetap dipakai sebagai format tulis (append murah dari
+    writer thread). Hari yang sudah selesai dipadatkan ke
+    logs/columnar/predictions_YYYYMMDD.parquet: kolom kategori
+    (kecamatan, sertifikat, jenis_zona, ...) di-dictionary-encode, baris
+    diurutkan per model_type/kecamatan dan ditulis dalam row group sehingga
+    statistik row group bisa dipakai untuk predicate pushdown.
+    """
+    
+    CATEGORY_COLUMNS = ['kecamatan', 'sertifikat', 'jenis_zona', 'aksesibilitas', 'tingkat_keamanan']
+    NUMERIC_COLUMNS = ['njop', 'luas_tanah', 'luas_bangunan', 'jumlah_lantai', 'kepadatan_penduduk']
+    ROW_GROUP_SIZE = 10000
+    COMPACT_GRACE_SECONDS = 300
+    
+    def __init__(self, log_dir):
+        self.log_dir = Path(log_dir)
+        self.archive_dir = self.log_dir / "columnar"
+    
+    @staticmethod
+    def schema():
+        import pyarrow as pa
+        
+        category = pa.dictionary(pa.int32(), pa.string())
+        fields = [
+            ('timestamp', pa.timestamp('ms')),
+            ('model_type', category),
+            ('success', pa.bool_()),
+            ('error', pa.string())
+        ]
+        fields += [(col, category) for col in PredictionLogArchive.CATEGORY_COLUMNS]
+        fields += [(col, pa.float64()) for col in PredictionLogArchive.NUMERIC_COLUMNS]
+        fields += [
+            ('prediction_value', pa.float64()),
+            ('confidence', pa.float64()),
+            ('cv_percentage', pa.float64()),
+            ('confidence_level', category),
+            ('cached', pa.bool_()),
+            ('model_name', category),
+            ('model_timestamp', category),
+            ('model_predictions', pa.string()),
+            ('input_extra', pa.string())
+        ]
+        return pa.schema(fields)
+    
+    def entries_to_table(self, entries):
+        """Konversi log entries (dict) ke pyarrow.Table dengan schema arsip"""
+        import pyarrow as pa
+        
+        entries = sorted(entries, key=lambda e: (
+            str(e.get('model_type')),
+            str((e.get('input_data') or {}).get('kecamatan')),
+            e.get('timestamp') or ''
+        ))
+        schema = self.schema()
+        columns = {name: [] for name in schema.names}
+        
+        for entry in entries:
+            input_data = dict(entry.get('input_data') or {}) if isinstance(entry.get('input_data'), dict) else {}
+            result = entry.get('prediction_result') or {}
+            model_info = result.get('model_info') or {}
+            
+            columns['timestamp'].append(datetime.fromisoformat(entry['timestamp']))
+            columns['model_type'].append(entry.get('model_type'))
+            columns['success'].append(bool(entry.get('success')))
+            columns['error'].append(entry.get('error'))
+            
+            for col in self.CATEGORY_COLUMNS:
+                value = input_data.pop(col, None)
+                columns[col].append(None if value is None else str(value))
+            extra = {}
+            for col in self.NUMERIC_COLUMNS:
+                value = input_data.pop(col, None)
+                try:
+                    columns[col].append(None if value is None else float(value))
+                except (TypeError, ValueError):
+                    columns[col].append(None)
+                    extra[col] = value
+            extra.update(input_data)
+            
+            columns['prediction_value'].append(result.get('prediction_value'))
+            columns['confidence'].append(result.get('confidence'))
+            columns['cv_percentage'].append(result.get('cv_percentage'))
+            columns['confidence_level'].append(result.get('confidence_level'))
+            columns['cached'].append(bool(result.get('cached', False)))
+            columns['model_name'].append(model_info.get('model_name'))
+            columns['model_timestamp'].append(model_info.get('timestamp'))
+            member_predictions = result.get('model_predictions')
+            columns['model_predictions'].append(
+                json.dumps(member_predictions) if member_predictions else None
+            )
+            columns['input_extra'].append(json.dumps(extra, default=str) if extra else None)
+        
+        return pa.table(
+            {name: pa.array(columns[name], type=schema.field(name).type) for name in schema.names},
+            schema=schema
+        )
+    
+    def _jsonl_days(self):
+        """Hari -> list segment JSONL yang belum dipadatkan"""
+        days = {}
+        for path in self.log_dir.glob("predictions_*.jsonl"):
+            days.setdefault(path.name[len('predictions_'):][:8], []).append(path)
+        return days
+    
+    def _read_segments(self, paths):
+        entries = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        return entries
+    
+    def archive_path(self, day):
+        return self.archive_dir / f"predictions_{day}.parquet"
+    
+    def compact(self):
+        """
+        Padatkan hari yang sudah selesai ke Parquet lalu hapus segment JSONL-nya
+        
+        Berjalan di dalam transaksi rollup store: baris yang belum di-tail
+        dihitung dulu, dan worker lain tidak memadatkan hari yang sama.
+        
+        Returns:
+            list: Hari (YYYYMMDD) yang dipadatkan
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        today = datetime.now().strftime('%Y%m%d')
+        cutoff = time.time() - self.COMPACT_GRACE_SECONDS
+        rollups = get_rollup_store(self.log_dir)
+        
+        def work(conn):
+            rollups._refresh(conn)
+            compacted = []
+            for day, paths in sorted(self._jsonl_days().items()):
+                if day >= today or any(p.stat().st_mtime > cutoff for p in paths):
+                    continue
+                
+                table = self.entries_to_table(self._read_segments(paths))
+                target = self.archive_path(day)
+                if target.exists():
+                    table = pa.concat_tables([pq.read_table(target, schema=self.schema()), table])
+                
+                self.archive_dir.mkdir(parents=True, exist_ok=True)
+                tmp = target.with_suffix(f'.tmp{os.getpid()}')
+                pq.write_table(
+                    table, tmp, row_group_size=self.ROW_GROUP_SIZE,
+                    compression='zstd', use_dictionary=True
+                )
+                os.replace(tmp, target)
+                
+                for path in paths:
+                    path.unlink()
+                conn.executemany(
+                    "DELETE FROM log_offsets WHERE file = ?", [(p.name,) for p in paths]
+                )
+                compacted.append(day)
+            return compacted
+        
+        return rollups._transaction(work)
+    
+    def query(self, start_date=None, end_date=None, model_type=None, kecamatan=None,
+              percentiles=(25, 50, 75, 90)):
+        """
+        Query prediction logs dengan predicate pushdown
+        
+        Hanya file harian di rentang tanggal yang dibuka; filter model_type,
+        kecamatan dan timestamp diteruskan ke reader Parquet sehingga row
+        group yang tidak cocok dilewati. Segment JSONL yang belum dipadatkan
+        ikut dibaca, termasuk segment yang muncul setelah harinya diarsip.
+        
+        Args:
+            start_date (str|date): Awal rentang (default: 6 hari lalu)
+            end_date (str|date): Akhir rentang, inklusif (default: hari ini)
+            model_type (str): 'tanah' / 'bangunan' (opsional)
+            kecamatan (str): Filter kecamatan (opsional)
+            percentiles (tuple): Persentil harga yang dihitung
+            
+        Returns:
+            dict: Jumlah prediksi dan persentil harga prediksi sukses
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+        
+        def to_date(value, default):
+            if value is None:
+                return default
+            if isinstance(value, str):
+                return datetime.strptime(value.replace('-', ''), '%Y%m%d').date()
+            return value
+        
+        end = to_date(end_date, datetime.now().date())
+        start = to_date(start_date, end - timedelta(days=6))
+        
+        expr = (pc.field('timestamp') >= pa.scalar(datetime.combine(start, datetime.min.time()), pa.timestamp('ms'))) & \
+               (pc.field('timestamp') < pa.scalar(datetime.combine(end + timedelta(days=1), datetime.min.time()), pa.timestamp('ms')))
+        if model_type:
+            expr = expr & (pc.field('model_type') == model_type)
+        if kecamatan:
+            expr = expr & (pc.field('kecamatan') == kecamatan)
+        
+        days = set()
+        day = start
+        while day <= end:
+            days.add(day.strftime('%Y%m%d'))
+            day += timedelta(days=1)
+        
+        columns = ['success', 'prediction_value']
+        parquet_files = sorted(
+            str(self.archive_path(d)) for d in days if self.archive_path(d).exists()
+        )
+        tables = []
+        if parquet_files:
+            dataset = ds.dataset(parquet_files, format='parquet', schema=self.schema())
+            tables.append(dataset.to_table(columns=columns, filter=expr))
+        
+        # compact() menghapus segment yang sudah masuk Parquet, jadi segment
+        # yang masih ada (juga untuk hari yang sudah diarsip, mis. flush
+        # terlambat dari writer worker lain) berisi baris yang belum diarsip
+        for d, paths in self._jsonl_days().items():
+            if d in days:
+                table = self.entries_to_table(self._read_segments(paths))
+                tables.append(table.filter(expr).select(columns))
+        
+        table = pa.concat_tables(tables) if tables else self.schema().empty_table().select(columns)
+        successful = table.filter(pc.field('success') & pc.field('prediction_value').is_valid())
+        prices = successful['prediction_value'].to_numpy()
+        
+        return {
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'model_type': model_type,
+            'kecamatan': kecamatan,
+            'total_predictions': table.num_rows,
+            'successful_predictions': successful.num_rows,
+            'average_price': float(prices.mean()) if len(prices) else 0,
+            'price_percentiles': {
+                f"p{p}": float(value)
+                for p, value in zip(percentiles, np.percentile(prices, percentiles))
+            } if len(prices) else {},
+            'files_scanned': len(parquet_files)
+        }
+
+
+_rollup_stores = {}
+_rollup_stores_lock = threading.Lock()
+
+
+def get_rollup_store(log_dir):
+    """PredictionRollupStore per folder log (dipakai bersama dalam proses ini)"""
+    log_dir = Path(log_dir)
+    with _rollup_stores_lock:
+        if log_dir not in _rollup_stores:
+            _rollup_stores[log_dir] = PredictionRollupStore(log_dir)
+        return _rollup_stores[log_dir]
+
+
+# ============================================================================
+# MODEL ARTIFACT FORMAT (manifest.json + format native per model)
+# ============================================================================
+
+ARTIFACT_MANIFEST = 'manifest.json'
+ARTIFACT_FORMAT_VERSION = 1
+
+
+class ModelArtifactError(ValueError):
+    """Artefak model tidak lengkap, terpotong, atau checksum tidak cocok"""
+
+
+def _file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _artifact_format(obj):
+    """Format simpan untuk satu objek: native untuk booster, joblib untuk sisanya"""
+    module = type(obj).__module__
+    if module.startswith('catboost'):
+        return 'cbm'
+    if module.startswith('xgboost'):
+        return 'ubj'
+    return 'joblib'
+
+
+def _estimator_params(obj):
+    """
+    Hyperparameter booster yang bisa disimpan di manifest
+    
+    File .cbm/.ubj hanya menyimpan pohon; tanpa ini model yang dimuat ulang
+    kehilangan learning_rate, max_depth, dst. (dibutuhkan untuk warm-start).
+    """
+    params = {}
+    for name, value in obj.get_params().items():
+        if isinstance(value, (np.integer, np.floating)):
+            value = value.item()
+        if isinstance(value, float) and value != value:
+            continue
+        if isinstance(value, (bool, int, float, str)):
+            params[name] = value
+    return params
+
+
+def feature_schema(features, encoders=None):
+    """Skema fitur untuk manifest: urutan kolom + kategori setiap encoder"""
+    return {
+        'features': list(features),
+        'categories': {
+            col: [str(value) for value in encoder.classes_]
+            for col, encoder in (encoders or {}).items()
+        }
+    }
+
+
+def save_model_artifacts(artifact_dir, objects, features, encoders=None,
+                         ensemble=None, metadata=None):
+    """
+    Simpan model dalam format artefak yang bisa dimuat tanpa unpickle penuh
+    
+    - CatBoost -> .cbm, XGBoost -> .ubj (format native masing-masing)
+    - Objek lain (RandomForest, scaler, encoders) -> .joblib TANPA kompresi,
+      sehingga array NumPy di dalamnya bisa dimuat dengan mmap_mode='r'
+    - manifest.json (ditulis terakhir, atomic) mencatat path, ukuran dan
+      sha256 setiap file beserta skema fitur
+    
+    Args:
+        artifact_dir: Folder tujuan
+        objects (dict): nama -> objek (mis. 'xgboost', 'random_forest', 'catboost', 'encoders')
+        features (list): Urutan kolom fitur
+        encoders (dict): LabelEncoder per kolom (untuk feature_schema)
+        ensemble (dict): {'members': [nama], 'weights': [bobot] atau None}
+        metadata (dict): Metadata training (disalin ke manifest)
+        
+    Returns:
+        dict: Manifest yang ditulis
+    """
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    
+    files = OrderedDict()
+    for name, obj in objects.items():
+        fmt = _artifact_format(obj)
+        path = artifact_dir / f"{name}.{fmt}"
+        if fmt == 'joblib':
+            joblib.dump(obj, path)
+        else:
+            obj.save_model(str(path))
+        files[name] = {
+            'path': path.name,
+            'format': fmt,
+            'class': f"{type(obj).__module__}.{type(obj).__name__}",
+            'size': path.stat().st_size,
+            'sha256': _file_sha256(path)
+        }
+        if fmt != 'joblib':
+            files[name]['params'] = _estimator_params(obj)
+    
+    if ensemble is not None:
+        ensemble = {
+            'members': list(ensemble['members']),
+            'weights': None if ensemble.get('weights') is None
+            else [float(w) for w in ensemble['weights']]
+        }
+    
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'files': files,
+        'feature_schema': feature_schema(features, encoders),
+        'ensemble': ensemble,
+        'metadata': metadata
+    }
+    
+    tmp = artifact_dir / f"{ARTIFACT_MANIFEST}.tmp{os.getpid()}"
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(tmp, artifact_dir / ARTIFACT_MANIFEST)
+    return manifest
+
+
+def read_artifact_manifest(artifact_dir):
+    """Baca manifest.json (ModelArtifactError jika tidak ada / tidak valid)"""
+    path = Path(artifact_dir) / ARTIFACT_MANIFEST
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ModelArtifactError(f"Manifest tidak valid: {path} ({e})")
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ModelArtifactError(
+            f"Versi format artefak tidak didukung: {manifest.get('format_version')}"
+        )
+    return manifest
+
+
+def verify_model_artifacts(artifact_dir, manifest, verify_checksums=True):
+    """
+    Cek setiap file terhadap manifest SEBELUM dimuat/unpickle
+    
+    Ukuran selalu dicek (file terpotong langsung ketahuan); sha256 dicek
+    jika verify_checksums=True.
+    """
+    artifact_dir = Path(artifact_dir)
+    for name, info in manifest['files'].items():
+        path = artifact_dir / info['path']
+        if not path.exists():
+            raise ModelArtifactError(f"File artefak '{name}' tidak ada: {path}")
+        size = path.stat().st_size
+        if size != info['size']:
+            raise ModelArtifactError(
+                f"File artefak '{name}' terpotong/berubah: {size} bytes, manifest {info['size']} bytes"
+            )
+        if verify_checksums and _file_sha256(path) != info['sha256']:
+            raise ModelArtifactError(f"Checksum artefak '{name}' tidak cocok: {path}")
+
+
+def _load_artifact_file(path, info, mmap):
+    if info['format'] == 'joblib':
+        return joblib.load(path, mmap_mode='r' if mmap else None)
+    
+    # CatBoost/XGBoost diimport hanya jika artefaknya dipakai
+    module_name, class_name = info['class'].rsplit('.', 1)
+    model = getattr(importlib.import_module(module_name), class_name)(**info.get('params', {}))
+    model.load_model(str(path))
+    return model
+
+
+def load_model_artifacts(artifact_dir, mmap=True, verify_checksums=True):
+    """
+    Muat artefak model dari folder ber-manifest
+    
+    Args:
+        artifact_dir: Folder berisi manifest.json
+        mmap (bool): Array NumPy di file .joblib dipetakan (mmap_mode='r')
+        verify_checksums (bool): Cek sha256 sebelum memuat
+        
+    Returns:
+        dict: {'objects': {nama: objek}, 'manifest': dict}
+    """
+    artifact_dir = Path(artifact_dir)
+    manifest = read_artifact_manifest(artifact_dir)
+    verify_model_artifacts(artifact_dir, manifest, verify_checksums)
+    
+    objects = OrderedDict(
+        (name, _load_artifact_file(artifact_dir / info['path'], info, mmap))
+        for name, info in manifest['files'].items()
+    )
+    return {'objects': objects, 'manifest': manifest}
+
+
+def ensemble_from_artifacts(artifacts, skip_voting_predict=True):
+    """EnsembleScorer dari member yang tercatat di manifest['ensemble']"""
+    spec = artifacts['manifest'].get('ensemble') or {}
+    members = OrderedDict(
+        (name, artifacts['objects'][name]) for name in spec.get('members', [])
+    )
+    return EnsembleScorer(
+        members, weights=spec.get('weights'), skip_voting_predict=skip_voting_predict
+    )
+
+
+MODEL_POINTER_FILE = 'CURRENT'
+
+
+class ModelVersion(dict):
+    """
+    Komponen satu versi model (dict biasa + bisa di-weakref)
+    
+    Request memegang referensi ke versi yang dipakainya; setelah swap, versi
+    lama dilepas otomatis begitu request terakhir yang memakainya selesai.
+    """
+
+
+def read_model_pointer(model_dir):
+    """Nama versi di file CURRENT (None jika tidak ada)"""
+    try:
+        with open(Path(model_dir) / MODEL_POINTER_FILE, 'r') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def model_pointer_signature(model_dir):
+    """(mtime_ns, inode) file CURRENT, berubah setiap kali versi dipublish"""
+    try:
+        stat = os.stat(Path(model_dir) / MODEL_POINTER_FILE)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_ino)
+
+
+def _write_model_pointer(model_dir, version):
+    """Tulis CURRENT secara atomic (tmp + rename); mtime baru = sinyal untuk worker"""
+    model_dir = Path(model_dir)
+    tmp = model_dir / f"{MODEL_POINTER_FILE}.tmp{os.getpid()}"
+    with open(tmp, 'w') as f:
+        f.write(f"{version}\n")
+    os.replace(tmp, model_dir / MODEL_POINTER_FILE)
+
+
+MODEL_INDEX_FILE = 'registry.json'
+
+
+class ModelIndex:
+    """
+    Index versi model per tipe (model/<tipe>/registry.json)
+    
+    Mencatat setiap versi (folder artefak atau set pickle bertimestamp),
+    path, metrics, versi aktif dan status pin. Trainer menambah versi lewat
+    register() (read-modify-write di bawah lock file, tulis atomic);
+    loader cukup membaca versi aktif tanpa scan folder. Hasil parse di-cache
+    per proses dan hanya dibaca ulang jika file index berubah.
+    
+    Setiap perubahan versi aktif juga menulis CURRENT, sehingga worker yang
+    memantau mtime CURRENT melakukan hot-swap ke versi tersebut.
+    
+    Folder lama tanpa registry.json di-scan dan index disusun di memori saja
+    (di-cache per proses sampai isi folder / CURRENT berubah); registry.json
+    baru ditulis oleh operasi yang mengubah index (register/activate/pin/
+    rollback/promote_latest) atau langkah eksplisit bootstrap(). Nama file
+    tanpa timestamp (mis. label_encoders_tanah.pkl dari OptimizedModelTrainer)
+    tidak dianggap versi.
+    """
+    
+    VERSION_PATTERN = re.compile(r'\d{8}_\d{6}')
+    FILE_PATTERN = re.compile(r'(?P<name>[a-z_]+)_(?P<version>\d{8}_\d{6})\.(pkl|json)')
+    LEGACY_VERSION = 'legacy'
+    LOCK_TIMEOUT = 10
+    
+    _cache = {}
+    
+    def __init__(self, model_dir):
+        self.model_dir = Path(model_dir)
+        self.path = self.model_dir / MODEL_INDEX_FILE
+        self.lock_path = self.model_dir / f"{MODEL_INDEX_FILE}.lock"
+    
+    # ------------------------------------------------------------------ read
+    
+    def read(self):
+        """
+        Returns:
+            dict: {'active': versi, 'pinned': bool, 'versions': {versi: info}}
+            (jangan diubah; pakai register/activate/pin/rollback)
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return self._scanned()
+        
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached = self._cache.get(self.path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        self._cache[self.path] = (signature, data)
+        return data
+    
+    def versions(self):
+        return self.read()['versions']
+    
+    def active_entry(self):
+        """Info versi aktif (None jika belum ada versi)"""
+        data = self.read()
+        return data['versions'].get(data['active']) if data['active'] else None
+    
+    def version_dir(self, entry):
+        return self.model_dir / entry['path']
+    
+    # ----------------------------------------------------------------- write
+    
+    def register(self, version, path=None, fmt='artifact', metrics=None, files=None, activate=True):
+        """
+        Tambahkan versi ke index (dipanggil trainer setelah artefak selesai ditulis)
+        
+        Args:
+            version (str): Nama versi (timestamp training)
+            path (str): Folder versi relatif terhadap model_dir (default: version)
+            fmt (str): 'artifact' (manifest.json) atau 'pickle' (format lama)
+            metrics (dict): Metrics training untuk ditampilkan/dibandingkan
+            files (dict): File per komponen (format 'pickle')
+            activate (bool): Jadikan versi aktif, kecuali index sedang di-pin
+        """
+        def mutate(data):
+            # Versi yang didaftarkan ulang (mis. diekspor ke format artefak) tetap di posisinya
+            data['versions'][version] = {
+                'version': version,
+                'format': fmt,
+                'path': path if path is not None else version,
+                'files': files,
+                'metrics': metrics,
+                'registered_at': datetime.now().isoformat()
+            }
+            if activate and not data['pinned']:
+                data['active'] = version
+        
+        return self._update(mutate)
+    
+    def activate(self, version, pin=False):
+        """Jadikan versi aktif (pin=True: trainer/reload tidak memindahkannya)"""
+        def mutate(data):
+            if version not in data['versions']:
+                raise ValueError(f"Versi model tidak terdaftar: {version}")
+            data['active'] = version
+            data['pinned'] = pin
+        
+        return self._update(mutate, touch_pointer=True)
+    
+    def pin(self, version=None):
+        """Pin versi (default: versi aktif sekarang)"""
+        return self.activate(version or self.read()['active'], pin=True)
+    
+    def unpin(self):
+        def mutate(data):
+            data['pinned'] = False
+        return self._update(mutate)
+    
+    def rollback(self):
+        """Aktifkan (dan pin) versi sebelum versi aktif"""
+        data = self.read()
+        versions = list(data['versions'])
+        if data['active'] not in versions or versions.index(data['active']) == 0:
+            raise ValueError("Tidak ada versi sebelumnya untuk rollback")
+        return self.activate(versions[versions.index(data['active']) - 1], pin=True)
+    
+    def promote_latest(self):
+        """
+        Aktifkan versi terbaru kecuali sedang di-pin, lalu sentuh CURRENT
+        agar semua worker memuat ulang versi aktif
+        """
+        def mutate(data):
+            if data['versions'] and not data['pinned']:
+                data['active'] = list(data['versions'])[-1]
+        
+        return self._update(mutate, touch_pointer=True)
+    
+    def _update(self, mutate, touch_pointer=False):
+        fd = self._acquire_lock()
+        try:
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+            except OSError:
+                data = self.scan()
+            
+            previous = data['active']
+            mutate(data)
+            self._write(data)
+            if data['active'] and (touch_pointer or data['active'] != previous):
+                _write_model_pointer(self.model_dir, data['active'])
+            return data
+        finally:
+            self._release_lock(fd)
+    
+    def _write(self, data):
+        tmp = self.model_dir / f"{MODEL_INDEX_FILE}.tmp{os.getpid()}"
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp, self.path)
+    
+    def _acquire_lock(self):
+        """Lock antar proses (O_EXCL, portable); lock basi dari proses mati dibuang"""
+        deadline = time.time() + self.LOCK_TIMEOUT
+        while True:
+            try:
+                return os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > self.LOCK_TIMEOUT:
+                        os.remove(self.lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"Index model sedang dikunci: {self.lock_path}")
+                time.sleep(0.05)
+    
+    def _release_lock(self, fd):
+        os.close(fd)
+        try:
+            os.remove(self.lock_path)
+        except OSError:
+            pass
+    
+    # ------------------------------------------------------------- bootstrap
+    
+    def _scanned(self):
+        """Index belum ada: hasil scan folder, di memori saja (read tidak menulis file)"""
+        try:
+            signature = ('scan', os.stat(self.model_dir).st_mtime_ns, model_pointer_signature(self.model_dir))
+        except OSError:
+            return self.scan()
+        cached = self._cache.get(self.path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        data = self.scan()
+        self._cache[self.path] = (signature, data)
+        return data
+    
+    def bootstrap(self):
+        """Tulis registry.json dari hasil scan folder (langkah eksplisit, mis. saat deploy)"""
+        self._update(lambda data: None)
+        return self.read()
+    
+    def scan(self):
+        """Susun index dari isi folder (index belum ada / bootstrap)"""
+        versions = {}
+        if self.model_dir.exists():
+            # Set pickle lama: <nama>_<YYYYMMDD_HHMMSS>.pkl + metadata_<ts>.json
+            pickle_sets = {}
+            for path in self.model_dir.iterdir():
+                match = self.FILE_PATTERN.fullmatch(path.name)
+                if match:
+                    pickle_sets.setdefault(match.group('version'), {})[match.group('name')] = path.name
+            
+            # Artefak di root folder / file jual tanpa timestamp (format lama)
+            if (self.model_dir / ARTIFACT_MANIFEST).exists():
+                versions[self.LEGACY_VERSION] = self._scan_entry(self.LEGACY_VERSION, '.', 'artifact')
+            elif (self.model_dir / 'label_encoders.pkl').exists():
+                versions[self.LEGACY_VERSION] = self._scan_entry(self.LEGACY_VERSION, '.', 'pickle')
+            
+            for version in sorted(pickle_sets):
+                versions[version] = self._scan_entry(
+                    version, '.', 'pickle', files=pickle_sets[version]
+                )
+            for path in sorted(self.model_dir.glob(f"*/{ARTIFACT_MANIFEST}")):
+                if self.VERSION_PATTERN.fullmatch(path.parent.name):
+                    version = path.parent.name
+                    versions.pop(version, None)
+                    versions[version] = self._scan_entry(version, version, 'artifact')
+        
+        ordered = dict(sorted(
+            versions.items(), key=lambda item: (item[0] != self.LEGACY_VERSION, item[0])
+        ))
+        pointer = read_model_pointer(self.model_dir)
+        active = pointer if pointer in ordered else (list(ordered)[-1] if ordered else None)
+        return {'active': active, 'pinned': False, 'versions': ordered}
+    
+    def _scan_entry(self, version, path, fmt, files=None):
+        metrics = None
+        try:
+            if fmt == 'artifact':
+                metadata = read_artifact_manifest(self.model_dir / path).get('metadata')
+            elif files and 'metadata' in files:
+                with open(self.model_dir / files['metadata'], 'r') as f:
+                    metadata = json.load(f)
+            else:
+                metadata = None
+            metrics = (metadata or {}).get('performance')
+        except (OSError, ValueError):
+            pass
+        return {
+            'version': version,
+            'format': fmt,
+            'path': path,
+            'files': files,
+            'metrics': metrics,
+            'registered_at': datetime.now().isoformat()
         }
 
 
+def publish_model_version(model_dir, version):
+    """
+    Aktifkan versi yang sudah terdaftar di index dan tulis CURRENT
+    
+    Worker yang memantau mtime CURRENT memuat versi baru di side slot lalu
+    menukarnya tanpa perlu dipanggil /reload_models satu per satu.
+    """
+    return ModelIndex(model_dir).activate(version)
+
+
+def smoke_test_ensemble(ensemble, X):
+    """Prediksi uji sebelum versi baru dipublish (ValueError jika gagal)"""
+    prediction = ensemble.score(X)['prediction']
+    if len(prediction) != len(X) or not np.all(np.isfinite(prediction)):
+        raise ValueError(f"Smoke prediction tidak valid: {prediction}")
+    return prediction
+
+
+class ModelRegistry:
+    """
+    Registry model dengan lazy loading dan hot-swap per tipe
+    
+    Model sebuah tipe baru dimuat saat pertama kali dipakai. Load dijaga oleh
+    lock per tipe sehingga beberapa request pertama yang datang bersamaan
+    hanya memuat model satu kali; tipe lain tetap bisa dimuat paralel.
+    Hasil load yang gagal (file tidak ada) juga disimpan agar tidak dicoba
+    ulang di setiap request sampai clear()/reload.
+    
+    reload() memuat versi baru di side slot (request tetap memakai versi
+    lama), menjalankan validator (smoke prediction), lalu mempublish dengan
+    satu pertukaran referensi. Jika watch diberikan, perubahan signature
+    (mtime file CURRENT) memicu reload di background thread.
+    """
+    
+    def __init__(self, loader, model_types, validator=None, watch=None, watch_interval=2.0):
+        """
+        Args:
+            loader (callable): loader(model_type) -> dict komponen model atau None
+            model_types (list): Tipe model yang dikelola
+            validator (callable): validator(model_type, entry), raise jika versi tidak layak
+            watch (callable): watch(model_type) -> signature pointer versi (mis. mtime CURRENT)
+            watch_interval (float): Detik minimal antar pengecekan watch, 0 = nonaktif
+        """
+        self._loader = loader
+        self._validator = validator
+        self._watch = watch if watch_interval else None
+        self.watch_interval = watch_interval
+        self.model_types = list(model_types)
+        self._entries = {}
+        self._signatures = {}
+        self._next_check = {}
+        self._locks = {model_type: threading.Lock() for model_type in self.model_types}
+        self._swap_locks = {model_type: threading.Lock() for model_type in self.model_types}
+        self._publish_lock = threading.Lock()
+        self._retired = {}
+        self.swap_count = 0
+    
+    def _signature(self, model_type):
+        return self._watch(model_type) if self._watch is not None else None
+    
+    def _load_version(self, model_type):
+        """Load + validasi satu versi (None jika gagal)"""
+        entry = self._loader(model_type)
+        if entry is not None and self._validator is not None:
+            try:
+                self._validator(model_type, entry)
+            except Exception as e:
+                print(f"❌ Validasi model {model_type} gagal: {e}")
+                return None
+        return entry
+    
+    def _publish(self, model_type, entry, signature):
+        """Satu pertukaran referensi: reader melihat versi lama atau baru, tidak pernah kosong"""
+        with self._publish_lock:
+            entries = dict(self._entries)
+            old = entries.get(model_type)
+            entries[model_type] = entry
+            self._signatures[model_type] = signature
+            self._entries = entries
+        if old is not None and old is not entry:
+            # Versi lama dilacak lewat weakref: hilang sendiri saat tidak dipakai lagi
+            key = id(old)
+            try:
+                self._retired[key] = weakref.ref(old, lambda _, key=key: self._retired.pop(key, None))
+            except TypeError:
+                pass
+    
+    def _get(self, model_type):
+        entries = self._entries
+        if model_type in entries:
+            if self._watch is not None:
+                self._maybe_check_pointer(model_type)
+            return entries[model_type]
+        
+        lock = self._locks.get(model_type)
+        if lock is None:
+            return None
+        with lock:
+            if model_type not in self._entries:
+                signature = self._signature(model_type)
+                self._publish(model_type, self._load_version(model_type), signature)
+            return self._entries[model_type]
+    
+    def _maybe_check_pointer(self, model_type):
+        now = time.monotonic()
+        if now < self._next_check.get(model_type, 0):
+            return
+        self._next_check[model_type] = now + self.watch_interval
+        
+        if self._signature(model_type) == self._signatures.get(model_type):
+            return
+        if self._swap_locks[model_type].locked():
+            return
+        # Request ini tetap memakai versi sekarang; versi baru disiapkan di background
+        threading.Thread(
+            target=self.reload, args=(model_type,),
+            name=f'model-swap-{model_type}', daemon=True
+        ).start()
+    
+    def reload(self, model_type):
+        """
+        Muat versi terbaru di side slot, validasi, lalu swap
+        
+        Returns:
+            bool: True jika versi baru dipublish; False = versi lama tetap dipakai
+        """
+        with self._swap_locks[model_type]:
+            signature = self._signature(model_type)
+            entry = self._load_version(model_type)
+            if entry is None:
+                # Jangan coba ulang signature yang sama di setiap request
+                self._signatures[model_type] = signature
+                if model_type not in self._entries:
+                    self._publish(model_type, None, signature)
+                return False
+            self._publish(model_type, entry, signature)
+            self.swap_count += 1
+            return True
+    
+    def __contains__(self, model_type):
+        return self._get(model_type) is not None
+    
+    def __getitem__(self, model_type):
+        entry = self._get(model_type)
+        if entry is None:
+            raise KeyError(model_type)
+        return entry
+    
+    def get(self, model_type, default=None):
+        entry = self._get(model_type)
+        return default if entry is None else entry
+    
+    def __iter__(self):
+        """Iterasi tipe yang tersedia (memicu load)"""
+        return iter([model_type for model_type in self.model_types if model_type in self])
+    
+    def items(self):
+        return [(model_type, self[model_type]) for model_type in self]
+    
+    def loaded(self):
+        """Versi yang sedang aktif per tipe (tanpa memicu load)"""
+        return {
+            model_type: entry for model_type, entry in self._entries.items()
+            if entry is not None
+        }
+    
+    def status(self, model_type):
+        """'loaded', 'failed' atau 'not_loaded' (tanpa memicu load)"""
+        if model_type not in self._entries:
+            return 'not_loaded'
+        return 'failed' if self._entries[model_type] is None else 'loaded'
+    
+    def retired_in_use(self):
+        """Jumlah versi lama yang masih dipegang request yang sedang berjalan"""
+        return len(self._retired)
+    
+    def load_all(self):
+        for model_type in self.model_types:
+            self._get(model_type)
+    
+    def warm_up(self):
+        """Muat semua tipe di background thread (request tidak menunggu)"""
+        thread = threading.Thread(target=self.load_all, name='model-warmup', daemon=True)
+        thread.start()
+        return thread
+    
+    def clear(self):
+        """Lupakan semua model; load berikutnya membaca file terbaru"""
+        for lock in self._locks.values():
+            lock.acquire()
+        try:
+            with self._publish_lock:
+                self._entries = {}
+                self._signatures = {}
+        finally:
+            for lock in self._locks.values():
+                lock.release()
+
+
 class PredictionSystem:
     """
     Sistem prediksi harga sewa yang terintegrasi dengan model ML
     """
     
-    def __init__(self, model_base_path=None, enable_cache=True):
+    # Field input yang membentuk cache key per tipe model
+    CACHE_KEY_FIELDS = {
+        'tanah': [
+            'kecamatan', 'njop', 'sertifikat', 'luas_tanah',
+            'jenis_zona', 'aksesibilitas', 'tingkat_keamanan', 'kepadatan_penduduk'
+        ],
+        'bangunan': [
+            'kecamatan', 'njop', 'sertifikat', 'luas_tanah',
+            'luas_bangunan', 'jumlah_lantai', 'jenis_zona', 'aksesibilitas'
+        ]
+    }
+    
+    # Aturan validasi input (FASE 3), dipakai validasi single maupun batch
+    VALIDATION_RULES = {
+        'tanah': {
+            'required_fields': [
+                'kecamatan', 'njop', 'sertifikat', 'luas_tanah',
+                'jenis_zona', 'aksesibilitas', 'tingkat_keamanan', 'kepadatan_penduduk'
+            ],
+            'numeric': {
+                'njop': {'min': 100000, 'max': 50000000, 'name': 'NJOP (Rp/M²)'},
+                'luas_tanah': {'min': 50, 'max': 100000, 'name': 'Luas Tanah (M²)'},
+                'kepadatan_penduduk': {'min': 0, 'max': 500000, 'name': 'Kepadatan Penduduk'}
+            },
+            'categorical': {
+                'kecamatan': 'Kecamatan',
+                'sertifikat': 'Sertifikat',
+                'jenis_zona': 'Jenis Zona',
+                'aksesibilitas': 'Aksesibilitas',
+                'tingkat_keamanan': 'Tingkat Keamanan'
+            }
+        },
+        'bangunan': {
+            'required_fields': [
+                'kecamatan', 'njop', 'sertifikat', 'luas_tanah',
+                'luas_bangunan', 'jumlah_lantai', 'jenis_zona', 'aksesibilitas'
+            ],
+            'numeric': {
+                'njop': {'min': 100000, 'max': 50000000, 'name': 'NJOP (Rp/M²)'},
+                'luas_tanah': {'min': 50, 'max': 100000, 'name': 'Luas Tanah (M²)'},
+                'luas_bangunan': {'min': 20, 'max': 50000, 'name': 'Luas Bangunan (M²)'},
+                'jumlah_lantai': {'min': 1, 'max': 50, 'name': 'Jumlah Lantai'}
+            },
+            'categorical': {
+                'kecamatan': 'Kecamatan',
+                'sertifikat': 'Sertifikat',
+                'jenis_zona': 'Jenis Zona',
+                'aksesibilitas': 'Aksesibilitas'
+            }
+        }
+    }
+    
+    def __init__(self, model_base_path=None, enable_cache=True, cache_njop_granularity=1000,
+                 cache_backend=None, skip_voting_predict=None, async_logging=None,
+                 lazy_loading=None, warm_up=None):
         """
         Initialize prediction system
         
         Args:
             model_base_path (str): Path ke folder model (default: ./model)
             enable_cache (bool): Enable prediction caching (FASE 5)
+            cache_njop_granularity (int): Pembulatan NJOP (Rp) untuk cache key
+            cache_backend (str): 'memory' atau 'sqlite'
+                (default: env PREDICTION_CACHE_BACKEND, fallback 'memory')
+            skip_voting_predict (bool): Hitung nilai ensemble dari output member
+                alih-alih memanggil VotingRegressor.predict lagi
+                (default: env PREDICTION_SKIP_VOTING_PREDICT, fallback True)
+            async_logging (bool): Tulis prediction logs lewat background writer
+                (default: env PREDICTION_LOG_ASYNC, fallback True)
+            lazy_loading (bool): Muat model saat pertama dipakai, bukan saat init
+                (default: env PREDICTION_LAZY_LOADING, fallback True)
+            warm_up (bool): Muat semua model di background thread setelah init
+                (default: env PREDICTION_WARMUP, fallback False)
         """
         if model_base_path is None:
             self.model_base_path = Path(__file__).parent / "model"
         else:
             self.model_base_path = Path(model_base_path)
         
-        self.models = {}
-        self.metadata = {}
+        # Versi baru dipublish lewat file CURRENT; setiap worker memantau mtime-nya
+        self.models = ModelRegistry(
+            self._load_model_type, ['tanah', 'bangunan'],
+            validator=self._validate_model_version,
+            watch=lambda model_type: model_pointer_signature(self.model_base_path / model_type),
+            watch_interval=float(os.environ.get('PREDICTION_MODEL_WATCH_INTERVAL', 2))
+        )
+        
+        if skip_voting_predict is None:
+            skip_voting_predict = os.environ.get('PREDICTION_SKIP_VOTING_PREDICT', '1') != '0'
+        self.skip_voting_predict = skip_voting_predict
+        
+        if async_logging is None:
+            async_logging = os.environ.get('PREDICTION_LOG_ASYNC', '1') != '0'
+        self.async_logging = async_logging
+        self.log_writer = get_prediction_log_writer()
         
         # FASE 5: Initialize cache
         self.enable_cache = enable_cache
         if enable_cache:
-            self.cache = PredictionCache(max_size=1000, ttl_minutes=30)
+            if cache_backend is None:
+                cache_backend = os.environ.get('PREDICTION_CACHE_BACKEND', 'memory')
+            self.cache = create_prediction_cache(
+                cache_backend,
+                max_size=int(os.environ.get('PREDICTION_CACHE_MAX_SIZE', 1000)),
+                ttl_minutes=float(os.environ.get('PREDICTION_CACHE_TTL_MINUTES', 30)),
+                db_path=os.environ.get('PREDICTION_CACHE_PATH')
+            )
         else:
             self.cache = None
+        self.cache_njop_granularity = cache_njop_granularity
         
         # Performance tracking
         self.performance_stats = {
@@ -137,96 +2040,293 @@ class PredictionSystem:
             'cache_misses': 0,
             'avg_prediction_time': 0
         }
+        self._stats_lock = threading.Lock()
+        
+        if lazy_loading is None:
+            lazy_loading = os.environ.get('PREDICTION_LAZY_LOADING', '1') != '0'
+        if warm_up is None:
+            # Preload mode memuat model di master; thread warm-up tidak ikut ter-fork
+            warm_up = (os.environ.get('PREDICTION_WARMUP', '0') == '1'
+                       and os.environ.get('PREDICTION_PRELOAD') != '1')
+        
+        if not lazy_loading:
+            self.load_models()
+        elif warm_up:
+            self.warm_up()
+    
+    def model_index(self, model_type):
+        """Index versi model (model/<tipe>/registry.json)"""
+        return ModelIndex(self.model_base_path / model_type)
+    
+    def list_model_versions(self, model_type):
+        """
+        Daftar versi model yang terdaftar di index
+        
+        Returns:
+            dict: {'active', 'pinned', 'versions': [info versi, terlama dulu]}
+        """
+        data = self.model_index(model_type).read()
+        return {
+            'active': data['active'],
+            'pinned': data['pinned'],
+            'versions': list(data['versions'].values())
+        }
+    
+    def pin_model_version(self, model_type, version=None):
+        """
+        Pin versi model (default: versi aktif); training baru tidak mengganti
+        versi aktif sampai unpin_model_version dipanggil
+        
+        Returns:
+            bool: True jika versi tersebut berhasil dimuat
+        """
+        self.model_index(model_type).pin(version)
+        return self._reload_active(model_type)
+    
+    def unpin_model_version(self, model_type):
+        """Lepas pin lalu aktifkan versi terbaru"""
+        index = self.model_index(model_type)
+        index.unpin()
+        index.promote_latest()
+        return self._reload_active(model_type)
+    
+    def rollback_model(self, model_type):
+        """
+        Kembali ke versi sebelum versi aktif (versi tersebut di-pin)
+        
+        Returns:
+            bool: True jika versi sebelumnya berhasil dimuat
+        """
+        self.model_index(model_type).rollback()
+        return self._reload_active(model_type)
+    
+    def _reload_active(self, model_type):
+        reloaded = self.models.reload(model_type)
+        if self.enable_cache:
+            self.cache.bump_generation()
+        return reloaded
+    
+    @property
+    def metadata(self):
+        """Metadata versi model yang sedang aktif per tipe (tanpa memicu load)"""
+        return {
+            model_type: entry['metadata']
+            for model_type, entry in self.models.loaded().items()
+        }
+    
+    def load_models(self):
+        """
+        Load semua model yang tersedia sekarang (tanpa menunggu request pertama)
+        """
+        self.models.load_all()
+    
+    def warm_up(self):
+        """
+        Muat semua model di background thread
         
-        self.load_models()
+        Returns:
+            threading.Thread: Thread warm-up
+        """
+        return self.models.warm_up()
     
-    def find_latest_model_files(self, model_type):
+    def _load_model_type(self, model_type):
         """
-        Cari file model terbaru berdasarkan timestamp
+        Load model satu tipe (dipanggil ModelRegistry saat pertama dipakai)
+        
+        Versi aktif dibaca dari index (registry.json): folder artefak
+        ber-manifest (format native + mmap) atau set file pickle lama.
         
-        Args:
-            model_type (str): 'tanah' atau 'bangunan'
-            
         Returns:
-            dict: Path ke file-file model (termasuk semua model untuk ensemble)
+            dict: Komponen model, atau None jika model tidak tersedia
         """
-        model_dir = self.model_base_path / model_type
-        
-        if not model_dir.exists():
+        try:
+            index = self.model_index(model_type)
+            version_entry = index.active_entry()
+            if version_entry is None:
+                print(f"⚠️  Model {model_type} tidak ditemukan")
+                return None
+            if version_entry['format'] == 'artifact':
+                components = self._read_artifact_components(index.version_dir(version_entry))
+            else:
+                components = self._read_pickle_components(model_type, version_entry)
+            
+            if components is None:
+                return None
+            
+            encoders = components['encoders']
+            scaler = components['scaler']
+            features = components['features']
+            lookups = compile_category_lookups(encoders)
+            model = components['model']
+            metadata = components['metadata']
+            entry = ModelVersion(
+                version=version_entry['version'],
+                metadata=metadata,
+                model=model,
+                scaler=scaler,
+                features=features,
+                encoders=encoders,
+                lookups=lookups,
+                # Pipeline tersimpan bersama artefak diutamakan
+                plan=(components.get('preprocessing')
+                      or rental_pipeline(model_type, features, encoders, scaler))
+            )
+            
+            entry['ensemble'] = self._build_ensemble(
+                metadata, model, components['members'], components['voting'],
+                components.get('weights')
+            )
+            
+            print(f"✅ Model {model_type} berhasil dimuat (versi {entry['version']})")
+            print(f"   - Performance: R² = {metadata['performance']['test_r2']:.4f}")
+            print(f"   - Features: {metadata['data_info']['features_count']}")
+            print(f"   - Ensemble: {', '.join(entry['ensemble'].member_names)}")
+            return entry
+            
+        except Exception as e:
+            print(f"❌ Error loading model {model_type}: {str(e)}")
             return None
+    
+    def _read_artifact_components(self, artifact_dir):
+        """Komponen model dari folder artefak (file diverifikasi sebelum dimuat)"""
+        artifacts = load_model_artifacts(artifact_dir)
+        objects = artifacts['objects']
+        manifest = artifacts['manifest']
+        spec = manifest.get('ensemble') or {}
+        members = OrderedDict((name, objects[name]) for name in spec.get('members', []))
+        
+        # Versi ensemble (OptimizedModelTrainer) tidak menyimpan model primary
+        # dan scaler terpisah: member pertama menjadi primary, scaling ada di
+        # pipeline preprocessing
+        model = objects.get('model')
+        if model is None:
+            if not members:
+                raise ModelArtifactError(f"Artefak tanpa model maupun member ensemble: {artifact_dir}")
+            model = next(iter(members.values()))
         
-        # Cari file dengan timestamp terbaru
-        model_files = list(model_dir.glob("*_*.pkl"))
-        metadata_files = list(model_dir.glob("metadata_*.json"))
-        
-        if not model_files:
+        return {
+            'model': model,
+            'scaler': objects.get('scaler'),
+            'features': manifest['feature_schema']['features'],
+            'encoders': objects['encoders'],
+            'preprocessing': objects.get('preprocessing'),
+            'metadata': manifest['metadata'],
+            'members': members,
+            'voting': None,
+            'weights': spec.get('weights')
+        }
+    
+    def _pickle_paths(self, model_type, version_entry):
+        """Path file pickle satu versi (dari daftar files di index)"""
+        model_dir = self.model_base_path / model_type / version_entry['path']
+        files = version_entry.get('files') or {}
+        # Member ensemble bersifat opsional: file pickle OptimizedModelTrainer
+        # lama (<member>_<tipe>.pkl dan voting_<tipe>.pkl, tanpa timestamp)
+        members = OrderedDict(
+            (name, model_dir / f"{name}_{model_type}.pkl") for name in ENSEMBLE_MEMBERS
+        )
+        voting = model_dir / f"voting_{model_type}.pkl"
+        return {
+            'model': model_dir / files.get('rental_price_model', ''),  # Best model (primary)
+            'scaler': model_dir / files.get('scaler', ''),
+            'features': model_dir / files.get('features', ''),
+            'encoders': model_dir / files.get('encoders', ''),
+            'metadata': model_dir / files.get('metadata', ''),
+            'members': OrderedDict(
+                (name, path) for name, path in members.items() if path.is_file()
+            ),
+            'voting': voting if voting.is_file() else None
+        }
+    
+    def _read_pickle_components(self, model_type, version_entry):
+        """Komponen model dari file pickle bertimestamp (format lama)"""
+        file_paths = self._pickle_paths(model_type, version_entry)
+        
+        # Cek keberadaan file
+        missing_files = []
+        for file_type in ['model', 'scaler', 'features', 'encoders', 'metadata']:
+            file_path = file_paths[file_type]
+            if not file_path.is_file():
+                missing_files.append(f"{file_type}: {file_path}")
+        
+        if missing_files:
+            print(f"⚠️  File model {model_type} tidak lengkap:")
+            for missing in missing_files:
+                print(f"    - {missing}")
             return None
         
-        # Ambil timestamp terbaru
-        timestamps = []
-        for file in model_files:
-            parts = file.stem.split('_')
-            if len(parts) >= 3:
-                timestamp = '_'.join(parts[-2:])  # Ambil 2 bagian terakhir sebagai timestamp
-                timestamps.append(timestamp)
+        with open(file_paths['metadata'], 'r') as f:
+            metadata = json.load(f)
         
-        if not timestamps:
-            return None
+        features = joblib.load(file_paths['features'])
         
-        latest_timestamp = sorted(timestamps)[-1]
+        def load_member(path):
+            # File member tanpa timestamp bisa berasal dari training dengan
+            # fitur lain; hanya dipakai jika jumlah fiturnya cocok
+            member = joblib.load(path)
+            n_features = getattr(member, 'n_features_in_', len(features))
+            if n_features != len(features):
+                print(f"⚠️  {path.name} dilewati: {n_features} fitur, model {len(features)} fitur")
+                return None
+            return member
         
-        # IMPROVED: Load all ensemble models
+        members = OrderedDict(
+            (name, load_member(path)) for name, path in file_paths['members'].items()
+        )
         return {
-            'model': model_dir / f"rental_price_model_{latest_timestamp}.pkl",  # CatBoost (primary)
-            'scaler': model_dir / f"scaler_{latest_timestamp}.pkl", 
-            'features': model_dir / f"features_{latest_timestamp}.pkl",
-            'encoders': model_dir / f"encoders_{latest_timestamp}.pkl",
-            'metadata': model_dir / f"metadata_{latest_timestamp}.json"
+            'model': joblib.load(file_paths['model']),
+            'scaler': joblib.load(file_paths['scaler']),
+            'features': features,
+            'encoders': joblib.load(file_paths['encoders']),
+            'metadata': metadata,
+            'members': OrderedDict(
+                (name, member) for name, member in members.items() if member is not None
+            ),
+            'voting': (load_member(file_paths['voting'])
+                       if file_paths['voting'] is not None else None)
         }
     
-    def load_models(self):
+    def _validate_model_version(self, model_type, entry):
+        """Smoke prediction sebelum versi dipublish (fitur ter-scale 0 = rata-rata training)"""
+        smoke_test_ensemble(entry['ensemble'], np.zeros((1, len(entry['features']))))
+    
+    def _build_ensemble(self, metadata, primary_model, members, voting, weights=None):
         """
-        Load semua model yang tersedia
+        Susun EnsembleScorer dari member yang tersedia
+        
+        Tanpa member, model primary (best model) menjadi satu-satunya
+        member sehingga perilaku sama dengan prediksi single model.
         """
-        for model_type in ['tanah', 'bangunan']:
-            try:
-                file_paths = self.find_latest_model_files(model_type)
-                
-                if file_paths is None:
-                    print(f"⚠️  Model {model_type} tidak ditemukan")
-                    continue
-                
-                # Cek keberadaan file
-                missing_files = []
-                for file_type, file_path in file_paths.items():
-                    if not file_path.exists():
-                        missing_files.append(f"{file_type}: {file_path}")
-                
-                if missing_files:
-                    print(f"⚠️  File model {model_type} tidak lengkap:")
-                    for missing in missing_files:
-                        print(f"    - {missing}")
-                    continue
-                
-                # Load model dan komponen
-                self.models[model_type] = {
-                    'model': joblib.load(file_paths['model']),
-                    'scaler': joblib.load(file_paths['scaler']),
-                    'features': joblib.load(file_paths['features']),
-                    'encoders': joblib.load(file_paths['encoders'])
-                }
-                
-                # Load metadata
-                with open(file_paths['metadata'], 'r') as f:
-                    self.metadata[model_type] = json.load(f)
-                
-                print(f"✅ Model {model_type} berhasil dimuat")
-                print(f"   - Performance: R² = {self.metadata[model_type]['performance']['test_r2']:.4f}")
-                print(f"   - Features: {self.metadata[model_type]['data_info']['features_count']}")
-                
-            except Exception as e:
-                print(f"❌ Error loading model {model_type}: {str(e)}")
-                continue
+        if voting is not None:
+            # Member diambil dari estimator di dalam VotingRegressor
+            members = OrderedDict()
+        else:
+            members = OrderedDict(members)
+        if voting is None and not members:
+            primary_name = metadata['model_info']['name']
+            members[primary_name.lower().replace(' ', '_')] = primary_model
+        
+        return EnsembleScorer(
+            members, voting=voting, skip_voting_predict=self.skip_voting_predict,
+            weights=weights
+        )
+    
+    def _model_info(self, model_type, entry=None):
+        """model_info untuk hasil prediksi (dari versi yang dipakai request)"""
+        if entry is None:
+            entry = self.models[model_type]
+        ensemble = entry['ensemble']
+        if len(ensemble.members) > 1:
+            model_name = ensemble.display_name
+        else:
+            model_name = f"{ensemble.display_name} (Primary)"
+        return {
+            'type': model_type,
+            'model_name': model_name,
+            'r2_score': entry['metadata']['performance']['test_r2'],
+            'timestamp': entry['metadata']['model_info']['timestamp'],
+            'version': entry['version']
+        }
     
     def calculate_confidence(self, predictions, ensemble_prediction):
         """
@@ -283,14 +2383,31 @@ class PredictionSystem:
     
     def reload_models(self):
         """
-        Reload semua model untuk mendapatkan versi terbaru
+        Reload semua model ke versi terbaru tanpa downtime
         Berguna setelah training model baru
+        
+        Versi terbaru di index diaktifkan (kecuali versi di-pin) dan CURRENT
+        disentuh (worker lain ikut memuat lewat watch), lalu dimuat di side
+        slot, diuji dengan smoke prediction dan di-swap. Selama itu request
+        tetap dilayani versi lama; jika versi baru gagal dimuat/divalidasi,
+        versi lama tetap aktif.
+        
+        Returns:
+            dict: tipe -> True jika versi baru dipublish
         """
         print("🔄 Reloading models...")
-        self.models.clear()
-        self.metadata.clear()
-        self.load_models()
-        print("✅ Model reload completed")
+        results = {}
+        for model_type in self.models.model_types:
+            index = self.model_index(model_type)
+            if index.read()['versions']:
+                index.promote_latest()
+            results[model_type] = self.models.reload(model_type)
+        
+        # Invalidate cache di semua worker (backend shared)
+        if self.enable_cache:
+            self.cache.bump_generation()
+        print(f"✅ Model reload completed: {results}")
+        return results
     
     def get_model_status(self):
         """
@@ -302,19 +2419,33 @@ class PredictionSystem:
         status = {}
         
         for model_type in ['tanah', 'bangunan']:
-            if model_type in self.models:
-                metadata = self.metadata[model_type]
+            load_status = self.models.status(model_type)
+            if load_status == 'not_loaded':
+                # Belum dipakai: cukup baca metadata, jangan unpickle model
+                metadata = self._read_metadata(model_type)
+            elif load_status == 'loaded':
+                entry = self.models.loaded()[model_type]
+                metadata = entry['metadata']
+            else:
+                metadata = None
+            
+            if metadata is not None:
                 status[model_type] = {
                     'available': True,
+                    'loaded': load_status == 'loaded',
                     'model_name': metadata['model_info']['name'],
                     'timestamp': metadata['model_info']['timestamp'],
+                    # Versi OptimizedModelTrainer tidak mencatat MAPE
                     'performance': {
                         'r2_score': metadata['performance']['test_r2'],
-                        'mape': metadata['performance']['test_mape'],
+                        'mape': metadata['performance'].get('test_mape'),
                         'mae': metadata['performance']['test_mae']
                     },
                     'data_info': metadata['data_info']
                 }
+                if load_status == 'loaded':
+                    status[model_type]['version'] = entry['version']
+                    status[model_type]['ensemble_members'] = entry['ensemble'].member_names
             else:
                 status[model_type] = {
                     'available': False,
@@ -323,6 +2454,20 @@ class PredictionSystem:
         
         return status
     
+    def _read_metadata(self, model_type):
+        """Baca metadata versi aktif tanpa memuat model (None jika tidak ada)"""
+        index = self.model_index(model_type)
+        version_entry = index.active_entry()
+        if version_entry is None:
+            return None
+        try:
+            if version_entry['format'] == 'artifact':
+                return read_artifact_manifest(index.version_dir(version_entry))['metadata']
+            with open(self._pickle_paths(model_type, version_entry)['metadata'], 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
     # ========================================================================
     # FASE 3: ENHANCED VALIDATION & MONITORING
     # ========================================================================
@@ -338,14 +2483,10 @@ class PredictionSystem:
             tuple: (is_valid, error_message)
         """
         errors = []
+        model_rules = self.VALIDATION_RULES['tanah']
         
         # 1. Check required fields
-        required_fields = [
-            'kecamatan', 'njop', 'sertifikat', 'luas_tanah',
-            'jenis_zona', 'aksesibilitas', 'tingkat_keamanan', 'kepadatan_penduduk'
-        ]
-        
-        for field in required_fields:
+        for field in model_rules['required_fields']:
             if field not in input_data or not input_data[field]:
                 errors.append(f"Field '{field}' wajib diisi")
         
@@ -353,25 +2494,7 @@ class PredictionSystem:
             return False, "; ".join(errors)
         
         # 2. Validate numeric ranges
-        numeric_validations = {
-            'njop': {
-                'min': 100000,
-                'max': 50000000,
-                'name': 'NJOP (Rp/M²)'
-            },
-            'luas_tanah': {
-                'min': 50,
-                'max': 100000,
-                'name': 'Luas Tanah (M²)'
-            },
-            'kepadatan_penduduk': {
-                'min': 0,
-                'max': 500000,
-                'name': 'Kepadatan Penduduk'
-            }
-        }
-        
-        for field, rules in numeric_validations.items():
+        for field, rules in model_rules['numeric'].items():
             try:
                 value = float(input_data[field])
                 if value < rules['min'] or value > rules['max']:
@@ -382,24 +2505,16 @@ class PredictionSystem:
                 errors.append(f"{rules['name']} harus berupa angka yang valid")
         
         # 3. Validate categorical values against encoders
-        if 'tanah' in self.models and 'encoders' in self.models['tanah']:
-            encoders = self.models['tanah']['encoders']
-            
-            categorical_fields = {
-                'kecamatan': 'Kecamatan',
-                'sertifikat': 'Sertifikat',
-                'jenis_zona': 'Jenis Zona',
-                'aksesibilitas': 'Aksesibilitas',
-                'tingkat_keamanan': 'Tingkat Keamanan'
-            }
+        if 'tanah' in self.models and 'lookups' in self.models['tanah']:
+            lookups = self.models['tanah']['lookups']
             
-            for field, display_name in categorical_fields.items():
-                if field in input_data and display_name in encoders:
-                    valid_values = encoders[display_name].classes_
-                    if input_data[field] not in valid_values:
+            for field, display_name in model_rules['categorical'].items():
+                if field in input_data and display_name in lookups:
+                    lookup = lookups[display_name]
+                    if input_data[field] not in lookup:
                         errors.append(
                             f"{display_name} '{input_data[field]}' tidak valid. "
-                            f"Pilihan: {', '.join(valid_values[:5])}..."
+                            f"Pilihan: {', '.join(lookup.classes[:5])}..."
                         )
         
         if errors:
@@ -418,14 +2533,10 @@ class PredictionSystem:
             tuple: (is_valid, error_message)
         """
         errors = []
+        model_rules = self.VALIDATION_RULES['bangunan']
         
         # 1. Check required fields (minimal yang diperlukan model)
-        required_fields = [
-            'kecamatan', 'njop', 'sertifikat', 'luas_tanah',
-            'luas_bangunan', 'jumlah_lantai', 'jenis_zona', 'aksesibilitas'
-        ]
-        
-        for field in required_fields:
+        for field in model_rules['required_fields']:
             if field not in input_data or not input_data[field]:
                 errors.append(f"Field '{field}' wajib diisi")
         
@@ -433,30 +2544,7 @@ class PredictionSystem:
             return False, "; ".join(errors)
         
         # 2. Validate numeric ranges
-        numeric_validations = {
-            'njop': {
-                'min': 100000,
-                'max': 50000000,
-                'name': 'NJOP (Rp/M²)'
-            },
-            'luas_tanah': {
-                'min': 50,
-                'max': 100000,
-                'name': 'Luas Tanah (M²)'
-            },
-            'luas_bangunan': {
-                'min': 20,
-                'max': 50000,
-                'name': 'Luas Bangunan (M²)'
-            },
-            'jumlah_lantai': {
-                'min': 1,
-                'max': 50,
-                'name': 'Jumlah Lantai'
-            }
-        }
-        
-        for field, rules in numeric_validations.items():
+        for field, rules in model_rules['numeric'].items():
             try:
                 value = float(input_data[field])
                 if value < rules['min'] or value > rules['max']:
@@ -480,23 +2568,16 @@ class PredictionSystem:
             pass  # Already caught by numeric validation
         
         # 4. Validate categorical values against encoders
-        if 'bangunan' in self.models and 'encoders' in self.models['bangunan']:
-            encoders = self.models['bangunan']['encoders']
-            
-            categorical_fields = {
-                'kecamatan': 'Kecamatan',
-                'sertifikat': 'Sertifikat',
-                'jenis_zona': 'Jenis Zona',
-                'aksesibilitas': 'Aksesibilitas'
-            }
+        if 'bangunan' in self.models and 'lookups' in self.models['bangunan']:
+            lookups = self.models['bangunan']['lookups']
             
-            for field, display_name in categorical_fields.items():
-                if field in input_data and display_name in encoders:
-                    valid_values = encoders[display_name].classes_
-                    if input_data[field] not in valid_values:
+            for field, display_name in model_rules['categorical'].items():
+                if field in input_data and display_name in lookups:
+                    lookup = lookups[display_name]
+                    if input_data[field] not in lookup:
                         errors.append(
                             f"{display_name} '{input_data[field]}' tidak valid. "
-                            f"Pilihan: {', '.join(valid_values[:5])}..."
+                            f"Pilihan: {', '.join(lookup.classes[:5])}..."
                         )
         
         if errors:
@@ -504,6 +2585,89 @@ class PredictionSystem:
         
         return True, None
     
+    def validate_batch_input(self, model_type, df):
+        """
+        Validasi banyak baris input sekaligus dengan operasi array (FASE 5)
+        
+        Aturan dan pesan error sama dengan validate_land_input /
+        validate_building_input, tetapi dihitung per kolom untuk seluruh batch.
+        
+        Args:
+            model_type (str): 'tanah' atau 'bangunan'
+            df (pd.DataFrame): Satu baris per input (nama field dari form)
+            
+        Returns:
+            list: Error message per baris, None jika baris valid
+        """
+        model_rules = self.VALIDATION_RULES[model_type]
+        n_rows = len(df)
+        errors = [[] for _ in range(n_rows)]
+        
+        def add_errors(mask, message):
+            for i in np.flatnonzero(mask):
+                errors[i].append(message(i) if callable(message) else message)
+        
+        # 1. Check required fields
+        for field in model_rules['required_fields']:
+            if field in df.columns:
+                column = df[field]
+                missing = (column.isna() | column.isin(['', 0])).to_numpy()
+            else:
+                missing = np.ones(n_rows, dtype=bool)
+            add_errors(missing, f"Field '{field}' wajib diisi")
+        
+        # Baris dengan field kosong berhenti di sini (sama seperti validasi single)
+        checked = np.array([not row_errors for row_errors in errors], dtype=bool)
+        if not checked.any():
+            return ["; ".join(row_errors) for row_errors in errors]
+        
+        # 2. Validate numeric ranges
+        numeric_values = {}
+        for field, rules in model_rules['numeric'].items():
+            values = pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=float)
+            numeric_values[field] = values
+            invalid = checked & np.isnan(values)
+            out_of_range = checked & ((values < rules['min']) | (values > rules['max']))
+            for i in np.flatnonzero(invalid | out_of_range):
+                if invalid[i]:
+                    errors[i].append(f"{rules['name']} harus berupa angka yang valid")
+                else:
+                    errors[i].append(
+                        f"{rules['name']} harus antara {rules['min']:,} - {rules['max']:,}"
+                    )
+        
+        # 3. Business logic validation (bangunan)
+        if model_type == 'bangunan':
+            luas_tanah = numeric_values['luas_tanah']
+            luas_bangunan = numeric_values['luas_bangunan']
+            too_large = checked & (luas_bangunan > luas_tanah * 5)
+            add_errors(
+                too_large,
+                lambda i: (
+                    f"Luas Bangunan ({float(luas_bangunan[i]):,} M²) terlalu besar "
+                    f"dibanding Luas Tanah ({float(luas_tanah[i]):,} M²)"
+                )
+            )
+        
+        # 4. Validate categorical values against encoders
+        if model_type in self.models and 'lookups' in self.models[model_type]:
+            lookups = self.models[model_type]['lookups']
+            
+            for field, display_name in model_rules['categorical'].items():
+                if display_name in lookups:
+                    lookup = lookups[display_name]
+                    column = df[field]
+                    invalid = checked & ~column.isin(lookup.classes).to_numpy()
+                    add_errors(
+                        invalid,
+                        lambda i: (
+                            f"{display_name} '{column.iloc[i]}' tidak valid. "
+                            f"Pilihan: {', '.join(lookup.classes[:5])}..."
+                        )
+                    )
+        
+        return ["; ".join(row_errors) if row_errors else None for row_errors in errors]
+    
     def log_prediction(self, model_type, input_data, prediction_result, success=True, error=None):
         """
         Log prediction untuk monitoring dan analisis
@@ -515,9 +2679,6 @@ class PredictionSystem:
             success (bool): Apakah prediksi berhasil
             error (str): Error message jika gagal
         """
-        log_dir = self.model_base_path / "logs"
-        log_dir.mkdir(exist_ok=True)
-        
         log_entry = {
             'timestamp': datetime.now().isoformat(),
             'model_type': model_type,
@@ -527,19 +2688,30 @@ class PredictionSystem:
             'error': error
         }
         
-        # Append to daily log file
-        log_file = log_dir / f"predictions_{datetime.now().strftime('%Y%m%d')}.jsonl"
+        self._write_log_entries([log_entry])
+    
+    def _write_log_entries(self, log_entries):
+        """Kirim log entries ke writer (async: satu enqueue, tanpa disk I/O)"""
+        if not log_entries:
+            return
         
-        try:
-            with open(log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
-        except Exception as e:
-            print(f"⚠️ Warning: Failed to log prediction: {e}")
+        log_dir = self.model_base_path / "logs"
+        if self.async_logging:
+            self.log_writer.put(log_dir, log_entries)
+        else:
+            self.log_writer.write_batch([(log_dir, log_entries)])
+    
+    def flush_logs(self):
+        """Tunggu sampai semua prediction logs yang tertunda tertulis ke disk"""
+        self.log_writer.flush()
     
     def get_prediction_stats(self, days=7):
         """
         Dapatkan statistik prediksi untuk monitoring
         
+        Dibaca dari rollup harian (PredictionRollupStore) yang di-update
+        incremental dari log, bukan dengan membaca ulang semua file JSONL.
+        
         Args:
             days (int): Jumlah hari ke belakang untuk analisis
             
@@ -556,63 +2728,66 @@ class PredictionSystem:
                 'predictions_by_type': {}
             }
         
-        stats = {
-            'total_predictions': 0,
-            'successful_predictions': 0,
-            'failed_predictions': 0,
-            'predictions_by_type': {'tanah': 0, 'bangunan': 0},
-            'average_confidence': 0,
-            'confidence_scores': []
-        }
+        return get_rollup_store(log_dir).get_stats(days)
+    
+    def get_hourly_prediction_stats(self, hours=24):
+        """
+        Statistik prediksi per jam untuk N jam terakhir
         
-        # Read log files from last N days
-        for i in range(days):
-            date = datetime.now() - pd.Timedelta(days=i)
-            log_file = log_dir / f"predictions_{date.strftime('%Y%m%d')}.jsonl"
-            
-            if not log_file.exists():
-                continue
+        Args:
+            hours (int): Jumlah jam ke belakang
             
-            try:
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line)
-                            stats['total_predictions'] += 1
-                            
-                            if entry['success']:
-                                stats['successful_predictions'] += 1
-                                stats['predictions_by_type'][entry['model_type']] += 1
-                                
-                                # Get confidence if available
-                                if entry['prediction_result'] and 'confidence' in entry['prediction_result']:
-                                    stats['confidence_scores'].append(
-                                        entry['prediction_result']['confidence']
-                                    )
-                            else:
-                                stats['failed_predictions'] += 1
-                                
-                        except json.JSONDecodeError:
-                            continue
-                            
-            except Exception as e:
-                print(f"⚠️ Warning: Failed to read log file {log_file}: {e}")
-        
-        # Calculate averages
-        if stats['total_predictions'] > 0:
-            stats['success_rate'] = (stats['successful_predictions'] / stats['total_predictions']) * 100
-        else:
-            stats['success_rate'] = 0
+        Returns:
+            list: Rollup per jam
+        """
+        log_dir = self.model_base_path / "logs"
+        if not log_dir.exists():
+            return []
+        return get_rollup_store(log_dir).get_hourly_stats(hours)
+    
+    def rebuild_prediction_rollups(self):
+        """
+        Bangun ulang rollup analytics dari semua prediction logs yang ada
         
-        if stats['confidence_scores']:
-            stats['average_confidence'] = sum(stats['confidence_scores']) / len(stats['confidence_scores'])
-        else:
-            stats['average_confidence'] = 0
+        Returns:
+            int: Jumlah segment log yang diproses
+        """
+        log_dir = self.model_base_path / "logs"
+        if not log_dir.exists():
+            return 0
+        return get_rollup_store(log_dir).rebuild()
+    
+    def query_prediction_logs(self, start_date=None, end_date=None, model_type=None,
+                              kecamatan=None, percentiles=(25, 50, 75, 90)):
+        """
+        Query prediction logs (arsip Parquet + segment JSONL hari berjalan)
         
-        # Remove raw scores from output
-        del stats['confidence_scores']
+        Args:
+            start_date (str): 'YYYY-MM-DD' (default: 6 hari sebelum end_date)
+            end_date (str): 'YYYY-MM-DD', inklusif (default: hari ini)
+            model_type (str): 'tanah' / 'bangunan' (opsional)
+            kecamatan (str): Filter kecamatan (opsional)
+            percentiles (tuple): Persentil harga prediksi
+            
+        Returns:
+            dict: Jumlah prediksi dan persentil harga
+        """
+        return PredictionLogArchive(self.model_base_path / "logs").query(
+            start_date, end_date, model_type=model_type, kecamatan=kecamatan,
+            percentiles=percentiles
+        )
+    
+    def compact_prediction_logs(self):
+        """
+        Padatkan segment JSONL hari-hari sebelumnya ke Parquet
         
-        return stats
+        Returns:
+            list: Hari (YYYYMMDD) yang dipadatkan
+        """
+        log_dir = self.model_base_path / "logs"
+        if not log_dir.exists():
+            return []
+        return PredictionLogArchive(log_dir).compact()
     
     def get_cache_stats(self):
         """
@@ -639,6 +2814,8 @@ class PredictionSystem:
         
         return {
             'enabled': True,
+            'cache_backend': cache_stats['backend'],
+            'cache_generation': cache_stats['generation'],
             'cache_size': cache_stats['size'],
             'cache_max_size': cache_stats['max_size'],
             'cache_ttl_minutes': cache_stats['ttl_minutes'],
@@ -656,10 +2833,88 @@ class PredictionSystem:
             return {'success': True, 'message': 'Cache cleared successfully'}
         return {'success': False, 'message': 'Caching is disabled'}
     
+    def _make_cache_input(self, model_type, input_data):
+        """
+        Bangun input ternormalisasi untuk cache key (FASE 5)
+        
+        Kecamatan dinormalisasi ke title case, NJOP dibulatkan ke
+        cache_njop_granularity, dan timestamp model ikut dimasukkan
+        sehingga reload model otomatis meng-invalidate cache lama.
+        
+        Returns:
+            dict: Input ternormalisasi, atau None jika tidak bisa dibuat
+        """
+        try:
+            normalized = {
+                'model_type': model_type,
+                'model_timestamp': self.metadata[model_type]['model_info']['timestamp']
+            }
+            for field in self.CACHE_KEY_FIELDS[model_type]:
+                value = input_data[field]
+                if field == 'kecamatan':
+                    value = ' '.join(str(value).split()).title()
+                elif field == 'njop':
+                    granularity = self.cache_njop_granularity or 1
+                    value = round(float(value) / granularity) * granularity
+                elif field in ('luas_tanah', 'luas_bangunan', 'kepadatan_penduduk'):
+                    value = float(value)
+                elif field == 'jumlah_lantai':
+                    value = int(value)
+                else:
+                    value = str(value).strip()
+                normalized[field] = value
+            return normalized
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def _get_cached_prediction(self, model_type, input_data):
+        """
+        Ambil prediksi dari cache dan update counter hit/miss
+        
+        Returns:
+            tuple: (cache_input, cached_result atau None)
+        """
+        if not self.enable_cache:
+            return None, None
+        
+        cache_input = self._make_cache_input(model_type, input_data)
+        if cache_input is None:
+            return None, None
+        
+        cached = self.cache.get(cache_input)
+        with self._stats_lock:
+            if cached is not None:
+                self.performance_stats['cache_hits'] += 1
+            else:
+                self.performance_stats['cache_misses'] += 1
+        
+        if cached is None:
+            return cache_input, None
+        
+        result = dict(cached)
+        result['cached'] = True
+        return cache_input, result
+    
+    def _record_prediction_time(self, elapsed, count=1):
+        """Update total_predictions dan avg_prediction_time (running average)"""
+        if count <= 0:
+            return
+        with self._stats_lock:
+            stats = self.performance_stats
+            previous_total = stats['total_predictions']
+            stats['total_predictions'] += count
+            stats['avg_prediction_time'] = (
+                stats['avg_prediction_time'] * previous_total + elapsed
+            ) / stats['total_predictions']
+    
     def predict_batch(self, model_type, input_list):
         """
         Batch prediction for multiple inputs (FASE 5)
         
+        Seluruh batch divalidasi, di-encode, di-scale dan diprediksi sekaligus
+        (satu matriks N×F, satu kali model.predict). Error tetap dilaporkan
+        per baris.
+        
         Args:
             model_type (str): 'tanah' or 'bangunan'
             input_list (list): List of input dictionaries
@@ -667,23 +2922,18 @@ class PredictionSystem:
         Returns:
             list: List of prediction results
         """
-        import time
-        
-        results = []
         start_time = time.time()
         
-        for input_data in input_list:
-            if model_type == 'tanah':
-                result = self.predict_land_price(input_data)
-            elif model_type == 'bangunan':
-                result = self.predict_building_price(input_data)
-            else:
-                result = {
+        if model_type in ('tanah', 'bangunan'):
+            results = self._predict_batch_vectorized(model_type, input_list)
+        else:
+            results = [
+                {
                     'success': False,
                     'error': f'Invalid model_type: {model_type}'
                 }
-            
-            results.append(result)
+                for _ in input_list
+            ]
         
         end_time = time.time()
         batch_time = end_time - start_time
@@ -698,6 +2948,131 @@ class PredictionSystem:
             'results': results
         }
     
+    def _predict_batch_vectorized(self, model_type, input_list):
+        """
+        Jalankan validasi, feature engineering dan inference untuk satu batch
+        
+        Returns:
+            list: Hasil per baris dengan format yang sama seperti
+                predict_land_price / predict_building_price
+        """
+        start_time = time.time()
+        n_rows = len(input_list)
+        if n_rows == 0:
+            return []
+        
+        rows = [row if isinstance(row, dict) else {} for row in input_list]
+        df = pd.DataFrame.from_records(rows, index=range(n_rows))
+        
+        errors = self.validate_batch_input(model_type, df)
+        errors = [
+            'Input harus berupa object' if not isinstance(row, dict) else error
+            for row, error in zip(input_list, errors)
+        ]
+        
+        results = [None] * n_rows
+        log_entries = []
+        timestamp = datetime.now().isoformat()
+        
+        def fail(i, error, message):
+            results[i] = {'success': False, 'error': message}
+            log_entries.append({
+                'timestamp': timestamp,
+                'model_type': model_type,
+                'success': False,
+                'input_data': input_list[i],
+                'prediction_result': None,
+                'error': error
+            })
+        
+        for i, error in enumerate(errors):
+            if error is not None:
+                fail(i, error, f'Validasi input gagal: {error}')
+        
+        valid_idx = [i for i, error in enumerate(errors) if error is None]
+        
+        if valid_idx:
+            try:
+                entry = self._model_version(model_type)
+                processed_df = self._build_processed_frame(model_type, df.iloc[valid_idx])
+                X_prepared = self.prepare_batch_data(processed_df, model_type, entry)
+                scored = entry['ensemble'].score(X_prepared)
+            except Exception as e:
+                for i in valid_idx:
+                    fail(i, str(e), str(e))
+                valid_idx = []
+            else:
+                model_info = self._model_info(model_type, entry)
+                processed_records = processed_df.to_dict('records')
+                member_names = list(scored['members'])
+                member_matrix = np.column_stack(list(scored['members'].values()))
+                
+                for i, prediction, member_row, processed_data in zip(
+                        valid_idx, scored['prediction'], member_matrix, processed_records):
+                    member_predictions = dict(zip(member_names, member_row.tolist()))
+                    confidence_metrics = self.calculate_confidence(
+                        list(member_predictions.values()), prediction
+                    )
+                    result = {
+                        'success': True,
+                        'prediction': f"Rp {prediction:,.0f}",
+                        'prediction_value': float(prediction),
+                        'confidence': confidence_metrics['confidence_score'],
+                        'confidence_level': confidence_metrics['confidence_level'],
+                        'cv_percentage': confidence_metrics['cv_percentage'],
+                        'input_data': processed_data,
+                        'model_predictions': member_predictions,
+                        'model_info': dict(model_info)
+                    }
+                    if model_type == 'bangunan':
+                        result['note'] = 'Model bangunan menggunakan nilai default untuk fitur yang tidak tersedia di form'
+                    results[i] = result
+                    log_entries.append({
+                        'timestamp': timestamp,
+                        'model_type': model_type,
+                        'success': True,
+                        'input_data': input_list[i],
+                        'prediction_result': result,
+                        'error': None
+                    })
+        
+        self._record_prediction_time(time.time() - start_time, count=len(valid_idx))
+        self._write_log_entries(log_entries)
+        
+        return results
+    
+    def _build_processed_frame(self, model_type, df):
+        """
+        Mapping nama field form ke nama kolom model untuk banyak baris sekaligus
+        (padanan vectorized dari processed_data di predict_*_price)
+        """
+        if model_type == 'tanah':
+            return pd.DataFrame({
+                'Kecamatan': df['kecamatan'].to_numpy(),
+                'Njop (Rp/M²)': pd.to_numeric(df['njop']).to_numpy(dtype=float),
+                'Sertifikat': df['sertifikat'].to_numpy(),
+                'Luas Tanah (M²)': pd.to_numeric(df['luas_tanah']).to_numpy(dtype=float),
+                'Jenis Zona': df['jenis_zona'].to_numpy(),
+                'Aksesibilitas': df['aksesibilitas'].to_numpy(),
+                'Tingkat Keamanan': df['tingkat_keamanan'].to_numpy(),
+                'Kepadatan_Penduduk': pd.to_numeric(df['kepadatan_penduduk']).to_numpy(dtype=float)
+            })
+        
+        # Map aksesibilitas dari form ke nilai yang dikenal model
+        aksesibilitas = np.where(
+            df['aksesibilitas'].to_numpy() == 'Baik', 'Dekat Jalan Raya', 'Dekat Sekolah'
+        ).astype(object)
+        return pd.DataFrame({
+            'Kecamatan': df['kecamatan'].to_numpy(),
+            'NJOP (Rp/m²)': pd.to_numeric(df['njop']).to_numpy(dtype=float),
+            'Sertifikat': df['sertifikat'].to_numpy(),
+            'Luas Tanah (m²)': pd.to_numeric(df['luas_tanah']).to_numpy(dtype=float),
+            'Luas Bangunan (m²)': pd.to_numeric(df['luas_bangunan']).to_numpy(dtype=float),
+            'Jumlah Lantai': pd.to_numeric(df['jumlah_lantai']).to_numpy(dtype=float).astype(int),
+            'Jenis Zona': df['jenis_zona'].to_numpy(),
+            'Aksesibilitas': aksesibilitas
+        })
+    
     def get_performance_stats(self):
         """
         Get overall performance statistics (FASE 5)
@@ -712,129 +3087,53 @@ class PredictionSystem:
             cache_stats = self.get_cache_stats()
             stats['cache'] = cache_stats
         
+        stats['logging'] = dict(self.log_writer.get_stats(), async_logging=self.async_logging)
+        
         return stats
     
-    def prepare_input_data(self, input_data, model_type):
+    def _model_version(self, model_type):
+        """Versi model aktif untuk satu request (dipegang sampai request selesai)"""
+        entry = self.models.get(model_type)
+        if entry is None:
+            raise ValueError(f"Model {model_type} tidak tersedia")
+        return entry
+    
+    def prepare_input_data(self, input_data, model_type, entry=None):
         """
         Persiapkan data input untuk prediksi dengan feature engineering yang sesuai
         
         Args:
             input_data (dict): Data input dari form
             model_type (str): 'tanah' atau 'bangunan'
+            entry (ModelVersion): Versi model yang dipakai (default: versi aktif)
             
         Returns:
             np.array: Data yang sudah diproses untuk prediksi
         """
-        if model_type not in self.models:
-            raise ValueError(f"Model {model_type} tidak tersedia")
-        
-        # Ambil komponen model
-        features = self.models[model_type]['features']
-        encoders = self.models[model_type]['encoders']
-        scaler = self.models[model_type]['scaler']
+        if entry is None:
+            entry = self._model_version(model_type)
         
-        # Buat DataFrame dari input
-        df = pd.DataFrame([input_data])
-        
-        if model_type == 'tanah':
-            # TANAH MODEL FEATURES yang dibutuhkan:
-            # ['Kecamatan', 'Njop (Rp/M²)', 'Sertifikat', 'Luas Tanah (M²)', 'Jenis Zona', 
-            #  'Aksesibilitas', 'Tingkat Keamanan', 'Kepadatan_Penduduk', 'Total_Value', 'NJOP_Category']
-            
-            # Create additional engineered features
-            df['Total_Value'] = df['Njop (Rp/M²)'] * df['Luas Tanah (M²)']
-            
-            # Create NJOP Category (binning)
-            njop_value = df['Njop (Rp/M²)'].iloc[0]
-            if njop_value <= 2000000:
-                df['NJOP_Category'] = 0  # Low
-            elif njop_value <= 4000000:
-                df['NJOP_Category'] = 1  # Medium
-            else:
-                df['NJOP_Category'] = 2  # High
-        
-        elif model_type == 'bangunan':
-            # BANGUNAN MODEL FEATURES berdasarkan encoder yang actual:
-            # ['Kecamatan', 'Sertifikat', 'Kondisi Perabotan', 'Hadap', 'Terjangkau Internet', 
-            #  'Sumber Air', 'Hook', 'Kondisi Properti', 'Aksesibilitas', 'Jenis Zona', 'NJOP_Category']
-            # Plus numerical features
-            
-            # Pastikan kolom yang wajib ada di form sudah benar
-            df = df.rename(columns={
-                'Luas Tanah (M²)': 'Luas Tanah (m²)',
-                'Luas Bangunan (M²)': 'Luas Bangunan (m²)',
-                'Njop (Rp/M²)': 'NJOP (Rp/m²)'
-            })
-            
-            # Set default values untuk fitur yang tidak ada di form HTML tapi ada di model
-            defaults = {
-                'Kamar Tidur': 2,
-                'Kamar Mandi': 1,
-                'Daya Listrik (watt)': 1300,
-                'Ruang Makan': 1,
-                'Ruang Tamu': 1,
-                'Kondisi Perabotan': 'Furnished',  # String value, akan di-encode nanti
-                'Hadap': 'Timur',  # String value, akan di-encode nanti
-                'Terjangkau Internet': 1,
-                'Lebar Jalan (m)': 3.5,
-                'Sumber Air': 'PDAM',  # String value, akan di-encode nanti
-                'Hook': 0,
-                'Kondisi Properti': 'Baik'  # String value, akan di-encode nanti
-            }
-            
-            # Add default values
-            for col, default_val in defaults.items():
-                if col not in df.columns:
-                    df[col] = default_val
-                    
-            # Create engineered features
-            df['Building_Efficiency'] = df['Luas Bangunan (m²)'] / df['Luas Tanah (m²)']
-            df['Total_NJOP_Value'] = df['NJOP (Rp/m²)'] * df['Luas Tanah (m²)']
-            df['Floor_Space_Efficiency'] = df['Luas Bangunan (m²)'] / df['Jumlah Lantai']
-            
-            # Create NJOP Category
-            njop_value = df['NJOP (Rp/m²)'].iloc[0]
-            if njop_value <= 3000000:
-                df['NJOP_Category'] = 0  # Low
-            elif njop_value <= 5000000:
-                df['NJOP_Category'] = 1  # Medium
-            else:
-                df['NJOP_Category'] = 2  # High
-        
-        # Encoding untuk kolom kategorikal
-        for col, encoder in encoders.items():
-            if col in df.columns:
-                try:
-                    # Transform nilai, gunakan nilai pertama sebagai fallback untuk unknown values
-                    df[col] = df[col].apply(lambda x: self._safe_transform(encoder, x))
-                except Exception as e:
-                    print(f"Warning: Error encoding {col}: {e}")
-                    df[col] = 0  # Fallback value
-        
-        # Pastikan urutan kolom sesuai dengan training
-        df_ordered = df.reindex(columns=features, fill_value=0)
-        
-        # Scale data
-        X_scaled = scaler.transform(df_ordered)
-        
-        return X_scaled
+        # Single row: jalur tanpa pandas di pipeline, hasil identik dengan prepare_batch_data
+        return entry['plan'].transform_row(input_data)
     
-    def _safe_transform(self, encoder, value):
+    def prepare_batch_data(self, df, model_type, entry=None):
         """
-        Transform value dengan safe handling untuk unknown categories
+        Feature engineering, encoding dan scaling untuk satu atau banyak baris
         
         Args:
-            encoder: Label encoder
-            value: Nilai yang akan di-transform
+            df (pd.DataFrame): Data input dengan nama kolom model
+            model_type (str): 'tanah' atau 'bangunan'
+            entry (ModelVersion): Versi model yang dipakai (default: versi aktif)
             
         Returns:
-            int: Encoded value
+            np.array: Matriks N×F yang sudah di-scale untuk prediksi
         """
-        try:
-            return encoder.transform([str(value)])[0]
-        except ValueError:
-            # Jika value tidak dikenal, gunakan nilai pertama dari classes_
-            return encoder.transform([encoder.classes_[0]])[0]
+        if entry is None:
+            entry = self._model_version(model_type)
+        
+        # Rename, default, fitur turunan, encoding dan scaling dalam satu
+        # pipeline (sama dengan jalur single-row prepare_input_data)
+        return entry['plan'].transform(df)
     
     def predict_land_price(self, input_data):
         """
@@ -854,6 +3153,7 @@ class PredictionSystem:
         Returns:
             dict: Hasil prediksi dengan confidence metrics
         """
+        start_time = time.time()
         try:
             # FASE 3: Validate input before processing
             is_valid, validation_error = self.validate_land_input(input_data)
@@ -866,6 +3166,13 @@ class PredictionSystem:
                 self.log_prediction('tanah', input_data, None, success=False, error=validation_error)
                 return error_result
             
+            # FASE 5: Read-through cache
+            cache_input, cached_result = self._get_cached_prediction('tanah', input_data)
+            if cached_result is not None:
+                self._record_prediction_time(time.time() - start_time)
+                self.log_prediction('tanah', input_data, cached_result, success=True)
+                return cached_result
+            
             # Mapping nama field untuk konsistensi dengan model
             processed_data = {
                 'Kecamatan': input_data['kecamatan'],
@@ -879,14 +3186,16 @@ class PredictionSystem:
             }
             
             # Persiapkan data
-            X_prepared = self.prepare_input_data(processed_data, 'tanah')
-            
-            # IMPROVED: Get prediction from primary model (CatBoost)
-            prediction = self.models['tanah']['model'].predict(X_prepared)[0]
+            entry = self._model_version('tanah')
+            X_prepared = self.prepare_input_data(processed_data, 'tanah', entry)
             
-            # For now, using single model prediction
-            # TODO: Implement ensemble with multiple models when available
-            predictions_list = [prediction]  # Single model for now
+            # Ensemble: setiap member diprediksi sekali (paralel)
+            scored = entry['ensemble'].score(X_prepared)
+            prediction = scored['prediction'][0]
+            member_predictions = {
+                name: float(output[0]) for name, output in scored['members'].items()
+            }
+            predictions_list = list(member_predictions.values())
             
             # Calculate confidence
             confidence_metrics = self.calculate_confidence(predictions_list, prediction)
@@ -902,14 +3211,14 @@ class PredictionSystem:
                 'confidence_level': confidence_metrics['confidence_level'],
                 'cv_percentage': confidence_metrics['cv_percentage'],
                 'input_data': processed_data,
-                'model_info': {
-                    'type': 'tanah',
-                    'model_name': 'CatBoost (Primary)',
-                    'r2_score': self.metadata['tanah']['performance']['test_r2'],
-                    'timestamp': self.metadata['tanah']['model_info']['timestamp']
-                }
+                'model_predictions': member_predictions,
+                'model_info': self._model_info('tanah', entry)
             }
             
+            if cache_input is not None:
+                self.cache.set(cache_input, result)
+            self._record_prediction_time(time.time() - start_time)
+            
             # FASE 3: Log successful prediction
             self.log_prediction('tanah', input_data, result, success=True)
             
@@ -943,6 +3252,7 @@ class PredictionSystem:
         Returns:
             dict: Hasil prediksi dengan confidence metrics
         """
+        start_time = time.time()
         try:
             # FASE 3: Validate input before processing
             is_valid, validation_error = self.validate_building_input(input_data)
@@ -955,6 +3265,13 @@ class PredictionSystem:
                 self.log_prediction('bangunan', input_data, None, success=False, error=validation_error)
                 return error_result
             
+            # FASE 5: Read-through cache
+            cache_input, cached_result = self._get_cached_prediction('bangunan', input_data)
+            if cached_result is not None:
+                self._record_prediction_time(time.time() - start_time)
+                self.log_prediction('bangunan', input_data, cached_result, success=True)
+                return cached_result
+            
             # NOTE: Model bangunan menggunakan field tambahan dengan default values
             # untuk fitur yang tidak ada di form HTML
             
@@ -977,14 +3294,16 @@ class PredictionSystem:
                 processed_data['Aksesibilitas'] = 'Dekat Sekolah'
                 
             # Persiapkan data menggunakan prepare_input_data
-            X_prepared = self.prepare_input_data(processed_data, 'bangunan')
-            
-            # IMPROVED: Get prediction from primary model (CatBoost)
-            prediction = self.models['bangunan']['model'].predict(X_prepared)[0]
+            entry = self._model_version('bangunan')
+            X_prepared = self.prepare_input_data(processed_data, 'bangunan', entry)
             
-            # For now, using single model prediction
-            # TODO: Implement ensemble with multiple models when available
-            predictions_list = [prediction]  # Single model for now
+            # Ensemble: setiap member diprediksi sekali (paralel)
+            scored = entry['ensemble'].score(X_prepared)
+            prediction = scored['prediction'][0]
+            member_predictions = {
+                name: float(output[0]) for name, output in scored['members'].items()
+            }
+            predictions_list = list(member_predictions.values())
             
             # Calculate confidence
             confidence_metrics = self.calculate_confidence(predictions_list, prediction)
@@ -1000,15 +3319,15 @@ class PredictionSystem:
                 'confidence_level': confidence_metrics['confidence_level'],
                 'cv_percentage': confidence_metrics['cv_percentage'],
                 'input_data': processed_data,
-                'model_info': {
-                    'type': 'bangunan',
-                    'model_name': 'CatBoost (Primary)',
-                    'r2_score': self.metadata['bangunan']['performance']['test_r2'],
-                    'timestamp': self.metadata['bangunan']['model_info']['timestamp']
-                },
+                'model_predictions': member_predictions,
+                'model_info': self._model_info('bangunan', entry),
                 'note': 'Model bangunan menggunakan nilai default untuk fitur yang tidak tersedia di form'
             }
             
+            if cache_input is not None:
+                self.cache.set(cache_input, result)
+            self._record_prediction_time(time.time() - start_time)
+            
             # FASE 3: Log successful prediction
             self.log_prediction('bangunan', input_data, result, success=True)
             
@@ -0,0 +1,311 @@
+"""
+Preprocessing Pipeline Bersama untuk Training dan Serving
+=========================================================
+
+Satu objek PreprocessingPipeline memuat seluruh langkah dari kolom input ke
+matriks fitur model:
+
+1. Rename kolom (mis. 'Luas Tanah (M²)' -> 'Luas Tanah (m²)' untuk bangunan)
+2. Konstanta per kecamatan untuk kolom yang tidak diisi (mis. kepadatan
+   penduduk), dihitung sekali saat fit
+3. Fitur turunan (Total_Value, NJOP_Category, ...) - satu definisi
+   vectorized untuk satu baris maupun batch
+4. Encoding kategori lewat tabel kode hasil kompilasi (tanpa LabelEncoder
+   di hot path), default fitur yang tidak ada di form sudah ter-encode di
+   baris template
+5. Urutan kolom sesuai training dan scaling (x - mean_) / scale_
+
+Trainer memanggil fit() lalu transform() untuk data training, menyimpan
+pipeline di samping model (preprocessing.joblib), dan serving memanggil
+transform() yang sama. Model lama tanpa pipeline tersimpan memakai
+PreprocessingPipeline.from_encoders() saat dimuat.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Batas NJOP (Rp/m²) untuk NJOP_Category: <= batas[0] Low, <= batas[1] Medium, sisanya High
+NJOP_CATEGORY_THRESHOLDS = {
+    'tanah': (2000000, 4000000),
+    'bangunan': (3000000, 5000000)
+}
+
+# Default untuk fitur bangunan yang tidak ada di form HTML tapi ada di model
+BANGUNAN_DEFAULT_FEATURES = {
+    'Kamar Tidur': 2,
+    'Kamar Mandi': 1,
+    'Daya Listrik (watt)': 1300,
+    'Ruang Makan': 1,
+    'Ruang Tamu': 1,
+    'Kondisi Perabotan': 'Furnished',  # String value, akan di-encode nanti
+    'Hadap': 'Timur',  # String value, akan di-encode nanti
+    'Terjangkau Internet': 1,
+    'Lebar Jalan (m)': 3.5,
+    'Sumber Air': 'PDAM',  # String value, akan di-encode nanti
+    'Hook': 0,
+    'Kondisi Properti': 'Baik'  # String value, akan di-encode nanti
+}
+
+# Nama kolom form bangunan -> nama kolom model bangunan
+BANGUNAN_RENAMES = {
+    'Luas Tanah (M²)': 'Luas Tanah (m²)',
+    'Luas Bangunan (M²)': 'Luas Bangunan (m²)',
+    'Njop (Rp/M²)': 'NJOP (Rp/m²)'
+}
+
+
+def njop_category(njop_value, model_type):
+    """
+    NJOP_Category (0 = Low, 1 = Medium, 2 = High)
+
+    Menerima satu nilai maupun array (hasil berupa array dengan bentuk sama)
+    """
+    low, medium = NJOP_CATEGORY_THRESHOLDS[model_type]
+    if np.ndim(njop_value) == 0:
+        if njop_value <= low:
+            return 0
+        if njop_value <= medium:
+            return 1
+        return 2
+    njop_value = np.asarray(njop_value)
+    return np.select([njop_value <= low, njop_value <= medium], [0, 1], default=2)
+
+
+# Fitur turunan per set (nama -> fungsi kolom). Operasi numpy berlaku sama
+# untuk skalar (satu baris) dan array (batch), sehingga hasilnya identik
+DERIVED_FEATURES = {
+    'tanah': OrderedDict([
+        ('Total_Value', lambda c: c['Njop (Rp/M²)'] * c['Luas Tanah (M²)']),
+        ('NJOP_Category', lambda c: njop_category(c['Njop (Rp/M²)'], 'tanah'))
+    ]),
+    'bangunan': OrderedDict([
+        ('Building_Efficiency', lambda c: c['Luas Bangunan (m²)'] / c['Luas Tanah (m²)']),
+        ('Total_NJOP_Value', lambda c: c['NJOP (Rp/m²)'] * c['Luas Tanah (m²)']),
+        ('Floor_Space_Efficiency', lambda c: c['Luas Bangunan (m²)'] / c['Jumlah Lantai']),
+        ('NJOP_Category', lambda c: njop_category(c['NJOP (Rp/m²)'], 'bangunan'))
+    ])
+}
+
+
+class UnknownCategoryError(ValueError):
+    """Nilai kategori tidak dikenal saat pipeline memakai unknown='error'"""
+
+    def __init__(self, column, values):
+        self.column = column
+        self.values = list(values)
+        super().__init__(
+            f"Invalid value for {column}. Please use values from training data."
+        )
+
+
+class PreprocessingPipeline:
+    """
+    Preprocessing hasil fit saat training, dieksekusi apa adanya saat serving
+
+    Semua state yang dibutuhkan transform() (tabel kode kategori, baris
+    template berisi default, konstanta per kecamatan, mean/scale) dihitung
+    di compile(), bukan per request.
+    """
+
+    KECAMATAN_COLUMN = 'Kecamatan'
+
+    def __init__(self, features, categorical=(), derived=None, renames=None,
+                 defaults=None, kecamatan_columns=(), unknown='error', scaler=None):
+        """
+        Args:
+            features (list): Urutan kolom fitur model
+            categorical (list): Kolom kategori (di-encode ke kode LabelEncoder)
+            derived (str): Set fitur turunan di DERIVED_FEATURES (None = tanpa)
+            renames (dict): Nama kolom input -> nama kolom model
+            defaults (dict): Nilai untuk kolom yang tidak ada di input
+            kecamatan_columns (list): Kolom yang bisa diisi dari konstanta per kecamatan
+            unknown (str): 'error' (UnknownCategoryError) atau 'fallback' (kode kategori pertama)
+            scaler: StandardScaler yang sudah di-fit (opsional)
+        """
+        if derived is not None and derived not in DERIVED_FEATURES:
+            raise ValueError(f"Set fitur turunan tidak dikenal: {derived}")
+        if unknown not in ('error', 'fallback'):
+            raise ValueError(f"Mode kategori tidak dikenal: {unknown}")
+
+        self.features = list(features)
+        self.categorical = [col for col in categorical]
+        self.derived = derived
+        self.renames = dict(renames or {})
+        self.defaults = dict(defaults or {})
+        self.kecamatan_columns = list(kecamatan_columns)
+        self.unknown = unknown
+        self.categories = {}
+        self.kecamatan_constants = {}
+        self.mean = None
+        self.scale = None
+        if scaler is not None:
+            self.mean = scaler.mean_ if scaler.with_mean else None
+            self.scale = scaler.scale_ if scaler.with_std else None
+
+    @classmethod
+    def from_encoders(cls, features, encoders, scaler=None, **kwargs):
+        """Pipeline dari komponen model yang sudah ada (LabelEncoder per kolom)"""
+        pipeline = cls(features, categorical=list(encoders), scaler=scaler, **kwargs)
+        pipeline.categories = {
+            col: [str(label) for label in encoder.classes_] for col, encoder in encoders.items()
+        }
+        return pipeline.compile()
+
+    def fit(self, df):
+        """
+        Pelajari kategori (urutan sama dengan LabelEncoder) dan konstanta
+        per kecamatan dari data training
+        """
+        df = df.rename(columns=self.renames)
+        self.categories = {
+            col: sorted(df[col].astype(str).unique()) for col in self.categorical
+        }
+        self.kecamatan_constants = {
+            col: df.groupby(df[self.KECAMATAN_COLUMN].astype(str))[col].median().to_dict()
+            for col in self.kecamatan_columns
+        }
+        return self.compile()
+
+    def compile(self):
+        """Bangun tabel lookup dan baris template (dipanggil setelah fit/load)"""
+        self._positions = {name: pos for pos, name in enumerate(self.features)}
+        self._codes = {
+            col: {label: code for code, label in enumerate(labels)}
+            for col, labels in self.categories.items()
+        }
+        self._derived = DERIVED_FEATURES[self.derived] if self.derived else {}
+
+        # Kolom yang tidak diisi input/default bernilai 0 (sama dengan reindex fill_value=0)
+        self._template = np.zeros(len(self.features), dtype=np.float64)
+        for col, value in self.defaults.items():
+            if col in self._positions:
+                self._template[self._positions[col]] = self._encode_value(col, value)
+        return self
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ('_positions', '_codes', '_derived', '_template'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.compile()
+
+    def encoders(self):
+        """LabelEncoder per kolom kategori (untuk manifest / deteksi drift)"""
+        from sklearn.preprocessing import LabelEncoder
+
+        encoders = {}
+        for col, labels in self.categories.items():
+            encoder = LabelEncoder()
+            encoder.classes_ = np.array(labels, dtype=object)
+            encoders[col] = encoder
+        return encoders
+
+    def can_fill(self, column):
+        """True jika kolom boleh tidak diisi (default atau konstanta per kecamatan)"""
+        column = self.renames.get(column, column)
+        return column in self.defaults or column in self.kecamatan_constants
+
+    def _encode_value(self, col, value):
+        codes = self._codes.get(col)
+        if codes is None:
+            return value
+        code = codes.get(str(value))
+        if code is None:
+            if self.unknown == 'error':
+                raise UnknownCategoryError(col, [value])
+            code = 0
+        return code
+
+    def _encode_array(self, col, values):
+        codes = self._codes[col]
+        mapped = pd.Series(values, dtype=object).astype(str).map(codes)
+        unknown = mapped.isna()
+        if unknown.any():
+            if self.unknown == 'error':
+                raise UnknownCategoryError(col, np.asarray(values)[unknown.to_numpy()][:5])
+            mapped = mapped.fillna(0)
+        return mapped.to_numpy(dtype=np.float64)
+
+    def _fill_from_kecamatan(self, values, scalar):
+        for col, constants in self.kecamatan_constants.items():
+            if col in values or self.KECAMATAN_COLUMN not in values:
+                continue
+            kecamatan = values[self.KECAMATAN_COLUMN]
+            if scalar:
+                if str(kecamatan) in constants:
+                    values[col] = constants[str(kecamatan)]
+            else:
+                filled = pd.Series(kecamatan, dtype=object).astype(str).map(constants)
+                if filled.isna().all():
+                    continue
+                # Per baris seperti transform_row: kecamatan tidak dikenal
+                # memakai nilai template (default / 0) untuk kolom tersebut
+                pos = self._positions.get(col)
+                fallback = self._template[pos] if pos is not None else np.nan
+                values[col] = filled.fillna(fallback).to_numpy(dtype=np.float64)
+
+    def _finish(self, X):
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        return X
+
+    def transform_row(self, row):
+        """
+        Satu baris (dict) -> array (1, F), tanpa pandas
+
+        Hasil identik byte-per-byte dengan transform() untuk DataFrame satu baris.
+        """
+        values = {self.renames.get(col, col): value for col, value in row.items()}
+        self._fill_from_kecamatan(values, scalar=True)
+        for name, func in self._derived.items():
+            values[name] = func(values)
+
+        X = self._template.copy()
+        for col, value in values.items():
+            pos = self._positions.get(col)
+            if pos is not None:
+                X[pos] = self._encode_value(col, value)
+        return self._finish(X).reshape(1, -1)
+
+    def transform(self, data):
+        """
+        Data input -> matriks fitur float64 (N, F)
+
+        Args:
+            data: dict (satu baris), list of dict, atau DataFrame
+        """
+        if isinstance(data, dict):
+            return self.transform_row(data)
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame(list(data))
+
+        values = {
+            self.renames.get(col, col): data[col].to_numpy() for col in data.columns
+        }
+        self._fill_from_kecamatan(values, scalar=False)
+        for name, func in self._derived.items():
+            values[name] = func(values)
+
+        X = np.tile(self._template, (len(data), 1))
+        for col, column in values.items():
+            pos = self._positions.get(col)
+            if pos is None:
+                continue
+            if col in self._codes:
+                X[:, pos] = self._encode_array(col, column)
+            else:
+                X[:, pos] = np.asarray(column, dtype=np.float64)
+        return self._finish(X)
+
+    def transform_frame(self, data):
+        """transform() sebagai DataFrame dengan nama kolom fitur (untuk model yang di-fit dengan DataFrame)"""
+        return pd.DataFrame(self.transform(data), columns=self.features)
@@ -35,9 +35,10 @@ def init_db_simple():
             
             print(f"✅ Connected to PostgreSQL")
             
-            # Create all tables
+            # Create all tables (migrations/, sama dengan `flask db upgrade`)
             print("\n🏗️  Creating database tables...")
-            db.create_all()
+            from flask_migrate import upgrade
+            upgrade()
             
             # Verify
             from sqlalchemy import inspect
@@ -0,0 +1,34 @@
+"""
+Bangun ulang rollup analytics prediksi dari prediction logs yang sudah ada
+===========================================================================
+
+Rollup (model/logs/analytics.sqlite3) biasanya di-update incremental saat
+analytics di-query. Script ini menghapus semua rollup dan membaca ulang
+seluruh predictions_*.jsonl serta arsip Parquet di model/logs/columnar/,
+misalnya setelah log lama dipindahkan/dihapus.
+
+Usage:
+    python rebuild_prediction_analytics.py [--log-dir model/logs]
+"""
+
+import sys
+from pathlib import Path
+
+from prediction_system import PredictionRollupStore
+
+log_dir = Path(__file__).parent / "model" / "logs"
+if len(sys.argv) == 3 and sys.argv[1] == '--log-dir':
+    log_dir = Path(sys.argv[2])
+
+if not log_dir.exists():
+    print(f"❌ Folder log tidak ditemukan: {log_dir}")
+    sys.exit(1)
+
+print(f"🔄 Rebuilding prediction rollups dari {log_dir}...")
+store = PredictionRollupStore(log_dir)
+segments = store.rebuild()
+stats = store.get_stats(days=365)
+
+print(f"✅ {segments} segment log diproses")
+print(f"   - Total prediksi (365 hari): {stats['total_predictions']}")
+print(f"   - Success rate: {stats['success_rate']:.2f}%")
@@ -15,6 +15,12 @@ if __name__ == '__main__':
     # Set debug to False for production
     debug = os.environ.get('FLASK_ENV') != 'production'
     
+    # Dispatcher job training (di gunicorn dimulai oleh post_fork, lihat gunicorn.conf.py);
+    # dengan reloader hanya di proses child yang melayani request
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from training_jobs import ensure_training_runner
+        ensure_training_runner()
+    
     app.run(
         host='0.0.0.0',
         port=port,
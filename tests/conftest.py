@@ -0,0 +1,25 @@
+"""
+Konfigurasi pytest bersama
+
+File generation cache KPI dashboard diarahkan ke direktori sementara
+sebelum modul app diimport, agar test tidak menulis ke instance/ milik repo
+(dan tidak berbagi state dengan dev server yang sedang berjalan).
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+_state_dir = None
+
+
+def pytest_configure(config):
+    global _state_dir
+    _state_dir = tempfile.mkdtemp(prefix='dashboard-stats-')
+    os.environ['DASHBOARD_STATS_DB'] = str(Path(_state_dir) / "dashboard_stats.sqlite3")
+
+
+def pytest_unconfigure(config):
+    if _state_dir is not None:
+        shutil.rmtree(_state_dir, ignore_errors=True)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memori per gunicorn worker, dengan dan tanpa preload
+===============================================================
+
+Menjalankan gunicorn (run:app) dua kali:
+- tanpa preload: setiap worker memuat model sendiri (PREDICTION_WARMUP=1)
+- dengan preload: model dimuat sekali di master (GUNICORN_PRELOAD=1)
+
+Setelah startup dan beberapa request prediksi, dibaca /proc/<pid>/smaps_rollup
+untuk setiap worker. RSS menghitung halaman yang dibagi (shared) penuh di
+setiap worker; PSS membagi halaman shared rata ke semua proses dan Private
+adalah memori yang benar-benar milik worker tersebut.
+
+Linux only. Run:
+    python tests/model_tests/benchmark_worker_memory.py --workers 4
+"""
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+LAND_FORM = {
+    'kecamatan': 'Gubeng',
+    'njop': '5000000',
+    'sertifikat': 'SHM',
+    'luas_tanah': '500',
+    'jenis_zona': 'Komersial',
+    'aksesibilitas': 'Baik',
+    'tingkat_keamanan': 'tinggi',
+    'kepadatan_penduduk': '123961'
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def read_memory_kb(pid):
+    """Rss, Pss dan Private (clean + dirty) dalam kB"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'private': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    }
+
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def wait_until_up(port, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/prediction/model_status', timeout=5)
+            return True
+        except Exception:
+            time.sleep(0.5)
+    return False
+
+
+def run(preload, workers, requests, settle):
+    port = free_port()
+    env = dict(os.environ)
+    env.pop('PREDICTION_PRELOAD', None)
+    env['GUNICORN_PRELOAD'] = '1' if preload else '0'
+    # Tanpa preload: setiap worker memuat semua model sendiri
+    env['PREDICTION_WARMUP'] = '0' if preload else '1'
+
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'run:app',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--timeout', '120'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_until_up(port, timeout=120):
+            raise RuntimeError('gunicorn tidak merespons')
+        time.sleep(settle)
+
+        body = urllib.parse.urlencode(LAND_FORM).encode()
+        for _ in range(requests):
+            urllib.request.urlopen(
+                f'http://127.0.0.1:{port}/prediction/predict_land_price', data=body, timeout=30
+            ).read()
+
+        return read_memory_kb(proc.pid), [read_memory_kb(pid) for pid in worker_pids(proc.pid)]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=60)
+
+
+def report(label, master, workers):
+    print(f"\n{label}")
+    print(f"  {'process':<10} {'RSS MB':>8} {'PSS MB':>8} {'Private MB':>11}")
+    rows = [('master', master)] + [(f'worker {i}', m) for i, m in enumerate(workers, 1)]
+    for name, mem in rows:
+        print(f"  {name:<10} {mem['rss'] / 1024:8.1f} {mem['pss'] / 1024:8.1f} {mem['private'] / 1024:11.1f}")
+    total_pss = sum(m['pss'] for m in [master] + workers) / 1024
+    print(f"  total PSS: {total_pss:.1f} MB")
+    return total_pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSS/PSS per gunicorn worker')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=40, help='Request prediksi sebelum diukur')
+    parser.add_argument('--settle', type=float, default=10.0, help='Detik menunggu warm-up worker')
+    args = parser.parse_args()
+
+    before = report('Tanpa preload', *run(False, args.workers, args.requests, args.settle))
+    after = report('Dengan preload', *run(True, args.workers, args.requests, args.settle))
+    print(f"\nTotal PSS: {before:.1f} MB -> {after:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Tests for App Import Time Budget
+================================
+
+Memastikan boot aplikasi (import app + create_app) tidak mengimport library
+ML/training dan selesai dalam budget waktu, serta profiler import
+(APP_IMPORT_PROFILE=1) mencatat waktu per modul.
+
+Run tests:
+    python -m pytest tests/test_app_import.py -v
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Add parent directory to path
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.import_profile import ImportProfiler
+
+# Budget cold import app + create_app() (detik); override untuk mesin lambat
+IMPORT_BUDGET_SECONDS = float(os.environ.get('APP_IMPORT_BUDGET_SECONDS', 2.5))
+
+# Library yang hanya boleh diimport saat model dimuat / training
+HEAVY_MODULES = ['pandas', 'numpy', 'scipy', 'sklearn', 'xgboost', 'catboost', 'joblib']
+
+
+def run_boot(tmp_path, script, **env):
+    """Jalankan script di interpreter baru (cold import) dan kembalikan output JSON-nya"""
+    environment = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path / 'app.db'}",
+        PYTHONPATH=str(PROJECT_ROOT),
+        PREDICTION_PRELOAD='0',
+        PREDICTION_WARMUP='0',
+        **env
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', textwrap.dedent(script)],
+        cwd=tmp_path, env=environment, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestColdImport:
+    """Test cases for boot import budget"""
+
+    def test_boot_skips_ml_stack_within_budget(self, tmp_path):
+        result = run_boot(tmp_path, '''
+            import json, sys, time
+            started = time.perf_counter()
+            from app import create_app
+            create_app()
+            elapsed = time.perf_counter() - started
+            print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))
+        ''', APP_IMPORT_PROFILE='0')
+
+        loaded = [name for name in HEAVY_MODULES if name in result['modules']]
+        assert loaded == [], f"Boot mengimport library berat: {loaded}"
+        assert result['elapsed'] < IMPORT_BUDGET_SECONDS
+
+    def test_profile_endpoint_reports_boot_imports(self, tmp_path):
+        result = run_boot(tmp_path, '''
+            import json
+            from app import create_app
+            client = create_app().test_client()
+            assert client.get('/api/admin/import-timings').status_code == 401
+            with client.session_transaction() as session:
+                session['user_id'] = 1
+                session['role'] = 'admin'
+            print(json.dumps(client.get('/api/admin/import-timings?limit=500').get_json()))
+        ''', APP_IMPORT_PROFILE='1')
+
+        assert result['enabled'] == True
+        modules = {record['module']: record for record in result['modules']}
+        assert 'flask' in modules and 'app.routes' in modules
+        assert all(r['self_us'] <= r['cumulative_us'] for r in result['modules'])
+        assert result['boot_ms'] > 0
+
+
+class TestImportProfiler:
+    """Test cases for self / cumulative accounting"""
+
+    def test_nested_imports(self, tmp_path, monkeypatch):
+        (tmp_path / 'profiled_outer.py').write_text('import time\nimport profiled_inner\ntime.sleep(0.02)\n')
+        (tmp_path / 'profiled_inner.py').write_text('import time\ntime.sleep(0.05)\n')
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        profiler = ImportProfiler()
+        profiler.start()
+        try:
+            import profiled_outer  # noqa: F401
+        finally:
+            profiler.stop()
+            sys.modules.pop('profiled_outer', None)
+            sys.modules.pop('profiled_inner', None)
+
+        assert not profiler.active
+        records = {record['module']: record for record in profiler.records}
+        outer, inner = records['profiled_outer'], records['profiled_inner']
+        assert (outer['depth'], inner['depth']) == (0, 1)
+        # cumulative = self + cumulative modul anak (pembulatan mikrodetik)
+        assert abs(outer['cumulative_us'] - outer['self_us'] - inner['cumulative_us']) <= 1
+        assert inner['self_us'] >= 50000
+        assert outer['self_us'] >= 20000
+
+        report = profiler.report(limit=1)
+        assert [record['module'] for record in report['modules']] == ['profiled_outer']
+        with pytest.raises(ValueError):
+            profiler.report(sort='name')
@@ -0,0 +1,235 @@
+"""
+Tests for Dashboard Statistics Service
+======================================
+
+Memastikan KPI dashboard dihitung dengan beberapa query agregasi, di-cache
+(TTL) dan di-invalidate setelah aset / pengajuan / transaksi berubah.
+
+Run tests:
+    python -m pytest tests/test_dashboard_stats.py -v
+"""
+
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app, db
+from app.dashboard_stats import (
+    DashboardStatsCache, compute_dashboard_stats, dashboard_stats_cache, invalidate_dashboard_stats
+)
+from app.models_sqlalchemy import RentalAsset, RentalRequest
+from app.models_rental_transaction import RentalTransaction
+
+
+def make_asset(name, asset_type, harga_sewa, status='available'):
+    return RentalAsset(
+        name=name, asset_type=asset_type, kecamatan='Coblong', alamat='Jl. Test',
+        luas_tanah=100, njop_per_m2=1000000, harga_sewa=harga_sewa,
+        sertifikat='SHM', jenis_zona='Perumahan', status=status
+    )
+
+
+def make_request(asset, status):
+    return RentalRequest(
+        asset_id=asset.id, nama_penyewa='Penyewa', email='p@test.com', telepon='08123',
+        durasi_sewa=6, tanggal_mulai=date.today(), status=status
+    )
+
+
+def make_transaction(asset, request, user_id, monthly_price, total_months, status='active', days_left=90):
+    today = date.today()
+    return RentalTransaction(
+        rental_request_id=request.id, user_id=user_id, asset_id=asset.id,
+        start_date=today, end_date=today + timedelta(days=days_left),
+        current_end_date=today + timedelta(days=days_left), monthly_price=monthly_price,
+        total_months=total_months, remaining_amount=0, status=status
+    )
+
+
+class CountStatements:
+    """Hitung statement SQL yang dikirim ke database"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(Engine, 'before_cursor_execute', self)
+        return self.statements
+
+    def __exit__(self, *exc):
+        event.remove(Engine, 'before_cursor_execute', self)
+
+
+@pytest.fixture
+def app_context(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'app.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, role VARCHAR(20))"))
+        db.session.execute(text("INSERT INTO users (role) VALUES ('pengguna'), ('pengguna'), ('admin')"))
+
+        assets = [
+            make_asset('A', 'tanah', 4000000, 'rented'),
+            make_asset('B', 'tanah', 6000000, 'available'),
+            make_asset('C', 'bangunan', 12000000, 'rented'),
+            make_asset('D', 'bangunan', 8000000, 'maintenance'),
+        ]
+        db.session.add_all(assets)
+        db.session.flush()
+        requests = [
+            make_request(assets[0], 'active'),
+            make_request(assets[2], 'active'),
+            make_request(assets[1], 'pending'),
+            make_request(assets[3], 'approved'),
+        ]
+        db.session.add_all(requests)
+        db.session.flush()
+        db.session.add_all([
+            make_transaction(assets[0], requests[0], 1, 4000000, 6, days_left=10),
+            make_transaction(assets[2], requests[1], 2, 12000000, 12),
+            make_transaction(assets[1], requests[2], 1, 6000000, 3, status='completed'),
+        ])
+        db.session.commit()
+        dashboard_stats_cache.invalidate()
+        yield app
+        db.session.remove()
+    dashboard_stats_cache.invalidate()
+
+
+class TestComputeDashboardStats:
+    """Test cases for aggregated KPI query"""
+
+    def test_values_match_per_metric_queries(self, app_context):
+        with CountStatements() as statements:
+            stats = compute_dashboard_stats()
+
+        assert len(statements) == 4
+        assert (stats['total_assets'], stats['available_assets'], stats['rented_assets'],
+                stats['maintenance_assets']) == (4, 1, 2, 1)
+        assert stats['occupancy_rate'] == 50.0
+        assert (stats['pending_requests'], stats['approved_requests'], stats['new_requests_this_month']) == (1, 1, 4)
+        assert stats['monthly_revenue'] == 16000000.0
+        assert (stats['min_price'], stats['max_price'], stats['avg_rental_price']) == (4000000.0, 12000000.0, 7500000.0)
+        assert (stats['avg_tanah_price'], stats['avg_bangunan_price']) == (5000000.0, 10000000.0)
+        assert (stats['active_renters'], stats['new_renters_this_month']) == (2, 2)
+        assert stats['avg_rental_duration'] == 9
+        assert stats['expiring_contracts'] == 1
+        assert stats['total_users'] == 2
+
+    def test_empty_tables(self, app_context):
+        RentalTransaction.query.delete()
+        RentalRequest.query.delete()
+        RentalAsset.query.delete()
+        db.session.commit()
+
+        stats = compute_dashboard_stats()
+        assert stats['total_assets'] == 0 and stats['occupancy_rate'] == 0
+        assert stats['monthly_revenue'] == 0 and stats['avg_rental_duration'] == 0
+
+
+class TestDashboardStatsCache:
+    """Test cases for TTL cache and invalidation"""
+
+    def test_cached_until_status_change_commit(self, app_context):
+        first = dashboard_stats_cache.get()
+        with CountStatements() as statements:
+            assert dashboard_stats_cache.get() == first
+        assert statements == []
+
+        asset = RentalAsset.query.filter_by(name='B').one()
+        asset.status = 'rented'
+        db.session.flush()
+        db.session.rollback()
+        assert dashboard_stats_cache.get()['rented_assets'] == 2
+
+        asset = RentalAsset.query.filter_by(name='B').one()
+        asset.status = 'rented'
+        db.session.commit()
+        assert dashboard_stats_cache.get()['rented_assets'] == 3
+
+    def test_ttl_and_stale_compute(self, app_context):
+        cache = DashboardStatsCache(ttl_seconds=0)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'value': len(calls)}
+
+        assert cache.get(compute) == {'value': 1}
+        assert cache.get(compute) == {'value': 2}
+
+        # Invalidate saat compute berjalan -> hasil lama tidak disimpan
+        cache = DashboardStatsCache(ttl_seconds=60)
+
+        def racing_compute():
+            cache.invalidate()
+            return {'value': 'stale'}
+
+        assert cache.get(racing_compute) == {'value': 'stale'}
+        assert cache.get(compute) == {'value': 3}
+        assert cache.get_stats()['cached'] == True
+
+    def test_invalidation_reaches_other_workers(self, tmp_path):
+        """Test invalidate di satu worker membuat snapshot worker lain kedaluwarsa"""
+        committing = DashboardStatsCache(ttl_seconds=60, db_path=tmp_path / "stats.sqlite3")
+        other = DashboardStatsCache(ttl_seconds=60, db_path=tmp_path / "stats.sqlite3",
+                                    generation_check_interval=0)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'value': len(calls)}
+
+        assert other.get(compute) == {'value': 1}
+        assert other.get(compute) == {'value': 1}
+
+        committing.invalidate()
+        assert other.get_stats()['cached'] == False
+        assert other.get(compute) == {'value': 2}
+        assert other.get_stats()['generation'] == committing.generation == 1
+
+    def test_fresh_snapshot_served_without_io(self, tmp_path):
+        """Test dalam interval cek generation, snapshot dilayani tanpa query SQLite"""
+        cache = DashboardStatsCache(ttl_seconds=60, db_path=tmp_path / "stats.sqlite3",
+                                    generation_check_interval=60)
+        other = DashboardStatsCache(ttl_seconds=60, db_path=tmp_path / "stats.sqlite3")
+        assert cache.get(lambda: {'value': 1}) == {'value': 1}
+
+        statements = []
+        cache._connect().set_trace_callback(statements.append)
+        other.invalidate()
+        for _ in range(5):
+            assert cache.get(lambda: {'value': 2}) == {'value': 1}
+        assert statements == []
+
+        # Invalidate di worker ini langsung terlihat tanpa menunggu interval
+        cache.invalidate()
+        assert cache.get(lambda: {'value': 3}) == {'value': 3}
+
+    def test_suite_does_not_touch_repo_instance_dir(self):
+        instance_dir = Path(__file__).parent.parent / "instance"
+        assert instance_dir not in dashboard_stats_cache.db_path.parents
+
+    def test_endpoint_uses_shared_snapshot(self, app_context):
+        client = app_context.test_client()
+        payload = client.get('/api/dashboard/stats').get_json()
+        assert payload['success'] == True
+        assert payload['stats']['monthly_revenue'] == 16000000.0
+
+        with CountStatements() as statements:
+            client.get('/api/dashboard/stats')
+        assert not any('rental_' in statement for statement in statements)
+
+        invalidate_dashboard_stats()
+        assert dashboard_stats_cache.get_stats()['cached'] == False
@@ -0,0 +1,107 @@
+"""
+Parity Tests for Pandas-free Feature Assembly (PreprocessingPipeline)
+====================================================================
+
+Memastikan jalur single-row pipeline (tanpa pandas) menghasilkan matriks
+yang identik byte-per-byte dengan jalur batch prepare_batch_data.
+
+Run tests:
+    python -m pytest tests/test_feature_plan.py -v
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from prediction_system import PredictionSystem
+
+DATA_DIR = Path(__file__).parent.parent / "data" / "raw"
+
+
+@pytest.fixture(scope='module')
+def prediction_system():
+    """Create a prediction system instance for testing"""
+    return PredictionSystem(enable_cache=False)
+
+
+def load_tanah_rows():
+    """Baris Dataset_Tanah_Surabaya.csv dalam format processed_data predict_land_price"""
+    df = pd.read_csv(DATA_DIR / "Dataset_Tanah_Surabaya.csv")
+    return [
+        {
+            'Kecamatan': row['Kecamatan'],
+            'Njop (Rp/M²)': float(row['Njop (Rp/M²)']),
+            'Sertifikat': row['Sertifikat'],
+            'Luas Tanah (M²)': float(row['Luas Tanah (M²)']),
+            'Jenis Zona': row['Jenis Zona'],
+            'Aksesibilitas': row['Aksesibilitas'],
+            'Tingkat Keamanan': row['Tingkat Keamanan'],
+            'Kepadatan_Penduduk': float(row['Kepadatan_Penduduk'])
+        }
+        for row in df.to_dict('records')
+    ]
+
+
+def load_bangunan_rows():
+    """Baris Dataset_Bangunan_Surabaya.csv dalam format processed_data predict_building_price"""
+    df = pd.read_csv(DATA_DIR / "Dataset_Bangunan_Surabaya.csv")
+    return [
+        {
+            'Kecamatan': row['Kecamatan'],
+            'NJOP (Rp/m²)': float(row['NJOP (Rp/m²)']),
+            'Sertifikat': row['Sertifikat'],
+            'Luas Tanah (m²)': float(row['Luas Tanah (m²)']),
+            'Luas Bangunan (m²)': float(row['Luas Bangunan (m²)']),
+            'Jumlah Lantai': int(row['Jumlah Lantai']),
+            'Jenis Zona': row['Jenis Zona'],
+            'Aksesibilitas': row['Aksesibilitas']
+        }
+        for row in df.to_dict('records')
+    ]
+
+
+class TestFeaturePlanParity:
+    """Jalur single-row harus identik dengan jalur batch"""
+
+    def test_tanah_dataset_parity(self, prediction_system):
+        """Test setiap baris Dataset_Tanah_Surabaya.csv menghasilkan bytes yang sama"""
+        if 'tanah' not in prediction_system.models:
+            pytest.skip("Model tanah tidak tersedia")
+
+        plan = prediction_system.models['tanah']['plan']
+
+        for row in load_tanah_rows():
+            expected = prediction_system.prepare_batch_data(pd.DataFrame([row]), 'tanah')
+            actual = plan.transform(row)
+
+            assert actual.dtype == expected.dtype
+            assert actual.shape == expected.shape
+            assert actual.tobytes() == expected.tobytes(), row
+
+    def test_bangunan_dataset_parity(self, prediction_system):
+        """Test 200 baris pertama Dataset_Bangunan_Surabaya.csv menghasilkan bytes yang sama"""
+        if 'bangunan' not in prediction_system.models:
+            pytest.skip("Model bangunan tidak tersedia")
+
+        plan = prediction_system.models['bangunan']['plan']
+
+        for row in load_bangunan_rows()[:200]:
+            expected = prediction_system.prepare_batch_data(pd.DataFrame([row]), 'bangunan')
+            actual = plan.transform(row)
+
+            assert actual.tobytes() == expected.tobytes(), row
+
+    def test_non_finite_input_rejected(self, prediction_system):
+        """Test NaN tetap ditolak seperti StandardScaler.transform"""
+        if 'tanah' not in prediction_system.models:
+            pytest.skip("Model tanah tidak tersedia")
+
+        row = dict(load_tanah_rows()[0], **{'Luas Tanah (M²)': float('nan')})
+
+        with pytest.raises(ValueError):
+            prediction_system.models['tanah']['plan'].transform(row)
@@ -0,0 +1,158 @@
+"""
+Tests for Histogram Service
+===========================
+
+Memastikan histogram harga (bucket, hitungan per seri dan persentil)
+dihitung dalam satu query dan hasilnya sama dengan perhitungan numpy.
+
+Run tests:
+    python -m pytest tests/test_histogram.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import column, event, table, text
+from sqlalchemy.engine import Engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app, db
+from app.histogram import compute_histogram, histogram_options, value_source
+
+PRICES = [500000, 1500000, 2500000, 2500000, 3000000, 4200000, 6100000, 9000000, 12000000, 75000000]
+
+
+@pytest.fixture
+def app_context(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'app.db'}")
+    app = create_app()
+    with app.app_context():
+        db.session.execute(text("CREATE TABLE harga (id INTEGER PRIMARY KEY, jenis VARCHAR(10), nilai FLOAT)"))
+        for index, price in enumerate(PRICES):
+            db.session.execute(
+                text("INSERT INTO harga (jenis, nilai) VALUES (:jenis, :nilai)"),
+                {'jenis': 'tanah' if index % 2 else 'bangunan', 'nilai': price}
+            )
+        db.session.execute(text("INSERT INTO harga (jenis, nilai) VALUES ('tanah', NULL), ('tanah', -1)"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+harga = table('harga', column('jenis'), column('nilai'))
+
+
+def run_histogram(**kwargs):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        result = compute_histogram(db.session, **kwargs)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+    assert len(statements) == 1
+    return result
+
+
+class TestComputeHistogram:
+    """Test cases for single-scan histogram"""
+
+    def test_edges_counts_and_percentiles(self, app_context):
+        edges = [0, 2000000, 5000000, 10000000, float('inf')]
+        result = run_histogram(
+            sources=value_source(harga.c.nilai), edges=edges,
+            labels=['< 2 Juta', '2-5 Juta', '5-10 Juta', '> 10 Juta']
+        )
+
+        values = np.array(PRICES + [-1], dtype=float)
+        expected_counts = [int(((values >= low) & (values < high)).sum()) for low, high in zip(edges[:-1], edges[1:])]
+        assert [bucket['count'] for bucket in result['buckets']] == expected_counts == [2, 4, 2, 2]
+        assert result['buckets'][0]['label'] == '< 2 Juta'
+        assert (result['buckets'][-1]['min_edge'], result['buckets'][-1]['max_edge']) == (10000000, None)
+
+        statistics = result['statistics']
+        assert statistics['count'] == 11 and statistics['out_of_range'] == 1
+        assert statistics['min'] == -1 and statistics['max'] == 75000000
+        assert statistics['avg'] == pytest.approx(values.mean())
+        for p in (25, 50, 75, 90):
+            assert statistics['percentiles'][f'p{p}'] == np.percentile(values, p, method='inverted_cdf')
+
+    def test_series_split_in_same_scan(self, app_context):
+        result = run_histogram(
+            sources=[
+                value_source(harga.c.nilai, series='tanah', where=[harga.c.jenis == 'tanah']),
+                value_source(harga.c.nilai, series='bangunan', where=[harga.c.jenis == 'bangunan'])
+            ],
+            edges=[0, 5000000, float('inf')]
+        )
+        assert result['series'] == {'tanah': 6, 'bangunan': 5}
+        assert result['buckets'][0]['series'] == {'tanah': 3, 'bangunan': 3}
+        assert result['buckets'][1]['series'] == {'tanah': 2, 'bangunan': 2}
+        assert result['buckets'][1]['label'] == '>= 5,000,000'
+
+    def test_quantile_buckets(self, app_context):
+        result = run_histogram(
+            sources=value_source(harga.c.nilai, where=[harga.c.nilai >= 0]), quantiles=5, percentiles=(50,)
+        )
+        assert [bucket['count'] for bucket in result['buckets']] == [2, 2, 2, 2, 2]
+        assert [bucket['label'] for bucket in result['buckets']] == ['Q1', 'Q2', 'Q3', 'Q4', 'Q5']
+        assert result['buckets'][0]['min_edge'] == 500000 and result['buckets'][-1]['max_edge'] == 75000000
+        assert result['statistics']['percentiles'] == {'p50': 3000000}
+
+    def test_empty_source(self, app_context):
+        result = run_histogram(
+            sources=value_source(harga.c.nilai, where=[harga.c.nilai > 1e12]), edges=[0, 10, float('inf')]
+        )
+        assert [bucket['count'] for bucket in result['buckets']] == [0, 0]
+        assert result['statistics']['count'] == 0 and result['statistics']['percentiles']['p50'] == 0
+
+    def test_invalid_options(self, app_context):
+        source = value_source(harga.c.nilai)
+        with pytest.raises(ValueError):
+            compute_histogram(db.session, source, edges=[0, 10, 5])
+        with pytest.raises(ValueError):
+            compute_histogram(db.session, source, edges=[0, 10], quantiles=3)
+        with pytest.raises(ValueError):
+            compute_histogram(db.session, source, edges=[0, 10, 20], labels=['satu'])
+        with pytest.raises(ValueError):
+            histogram_options({'quantiles': 'abc'}, [0, 1])
+        assert histogram_options({'edges': '0,10,inf'}, [0, 1]) == {'edges': [0.0, 10.0, float('inf')]}
+
+
+class TestPriceRangeEndpoints:
+    """Test cases for price distribution charts"""
+
+    def test_price_range_distribution_over_prediction_tables(self, app_context):
+        db.session.execute(text("CREATE TABLE prediksi_properti_tanah (id INTEGER PRIMARY KEY, harga_prediksi_tanah FLOAT)"))
+        db.session.execute(text("CREATE TABLE prediksi_properti_bangunan_tanah (id INTEGER PRIMARY KEY, harga_prediksi_total FLOAT)"))
+        db.session.execute(text("INSERT INTO prediksi_properti_tanah (harga_prediksi_tanah) VALUES (300000000), (1500000000)"))
+        db.session.execute(text("INSERT INTO prediksi_properti_bangunan_tanah (harga_prediksi_total) VALUES (700000000), (9000000000)"))
+        db.session.commit()
+
+        payload = app_context.test_client().get('/api/visualization/price-range-distribution').get_json()
+        assert payload['success'] == True
+        assert [(row['range'], row['tanah_count'], row['bangunan_count']) for row in payload['data']] == [
+            ('< 500 Juta', 1, 0), ('500 Juta - 1 Milyar', 0, 1), ('1 - 2 Milyar', 1, 0),
+            ('2 - 5 Milyar', 0, 0), ('> 5 Milyar', 0, 1)
+        ]
+        assert payload['statistics']['count'] == 4
+
+        client = app_context.test_client()
+        assert client.get('/api/visualization/price-range-distribution?quantiles=x').status_code == 400
+        assert client.get('/api/visualization/price-range-distribution?edges=10,5').status_code == 400
+
+    def test_dashboard_price_range_analysis(self, app_context):
+        db.create_all()
+        client = app_context.test_client()
+        payload = client.get('/api/dashboard/price-range-analysis').get_json()
+        assert payload['success'] == True
+        assert [row['count'] for row in payload['data']['histogram']] == [0, 0, 0, 0, 0, 0]
+
+        assert client.get('/api/dashboard/price-range-analysis?quantiles=x').status_code == 400
@@ -0,0 +1,264 @@
+"""
+Tests for Incremental / Warm-Start Retraining
+=============================================
+
+Memastikan training store hanya menambah baris baru, drift memicu full
+retrain, dan warm-start melanjutkan model sebelumnya (bukan melatih ulang).
+
+Run tests:
+    python -m pytest tests/test_incremental_training.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import LabelEncoder
+from xgboost import XGBRegressor
+from catboost import CatBoostRegressor
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from incremental_training import (
+    TrainingStore, detect_drift, incremental_rounds, holdout_split,
+    warm_start_xgboost, warm_start_catboost, warm_start_random_forest
+)
+from prediction_system import save_model_artifacts, load_model_artifacts
+
+
+def make_frame(n, seed=0, scale=1.0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'kecamatan': rng.choice(['Gubeng', 'Rungkut', 'Wonokromo'], n),
+        'luas': rng.uniform(50, 500, n) * scale,
+        'jarak': rng.uniform(1, 20, n)
+    })
+    df['harga'] = df['luas'] * 1e6 - df['jarak'] * 1e7 + rng.normal(0, 1e7, n)
+    return df
+
+
+def encoded(df):
+    X = df[['kecamatan', 'luas', 'jarak']].copy()
+    encoder = LabelEncoder().fit(['Gubeng', 'Rungkut', 'Wonokromo'])
+    X['kecamatan'] = encoder.transform(X['kecamatan'])
+    return X, df['harga'], {'kecamatan': encoder}
+
+
+class TestTrainingStore:
+    """Test cases for persisted training rows"""
+
+    def test_append_returns_only_new_rows(self, tmp_path):
+        store = TrainingStore(tmp_path / "store.csv", ['kecamatan', 'luas', 'jarak', 'harga'])
+        data = make_frame(100)
+
+        existing, delta = store.append(data.iloc[:60])
+        assert len(existing) == 0 and len(delta) == 60
+
+        # Upload ulang dengan 20 baris yang sudah ada
+        existing, delta = store.append(data.iloc[40:])
+        assert len(existing) == 60
+        assert len(delta) == 40
+        assert len(store.load()) == 100
+
+        existing, delta = store.append(data)
+        assert len(delta) == 0
+
+    def test_diff_does_not_write(self, tmp_path):
+        store = TrainingStore(tmp_path / "store.csv", ['kecamatan', 'luas', 'jarak', 'harga'])
+        existing, delta = store.diff(make_frame(30))
+        assert len(existing) == 0 and len(delta) == 30
+        assert not store.path.exists()
+        assert store.combine(existing, delta) is delta
+
+
+class TestStoreUpdatedAfterSave:
+    """Test cases for keeping the store untouched when training fails"""
+
+    JUAL_COLUMNS = {
+        'Kecamatan': ['Gubeng', 'Rungkut', 'Wonokromo'],
+        'Sertifikat': ['SHM', 'HGB'],
+        'Jenis Zona': ['Perumahan', 'Komersial'],
+        'Aksesibilitas': ['Baik', 'Buruk'],
+        'Tingkat Keamanan': ['tinggi', 'rendah']
+    }
+
+    @pytest.fixture
+    def jual_csv(self, tmp_path):
+        rng = np.random.default_rng(0)
+        n = 60
+        df = pd.DataFrame({col: rng.choice(values, n) for col, values in self.JUAL_COLUMNS.items()})
+        df['Luas Tanah (M²)'] = rng.uniform(50, 500, n)
+        df['Kepadatan_Penduduk'] = rng.uniform(5e4, 2e5, n)
+        df['Jarak ke Pusat Kota (km)'] = rng.uniform(1, 20, n)
+        df['Harga Jual (Rp)'] = df['Luas Tanah (M²)'] * 1e7
+        df.to_csv(tmp_path / "jual_tanah.csv", index=False)
+        return tmp_path / "jual_tanah.csv"
+
+    def test_cancelled_jual_training_keeps_store(self, tmp_path, jual_csv):
+        from auto_model_trainer_jual import AutoModelTrainerJual
+        from training_jobs import TrainingJobCancelled
+
+        def cancel(fraction, message):
+            raise TrainingJobCancelled()
+
+        trainer = AutoModelTrainerJual(project_root=tmp_path)
+        with pytest.raises(TrainingJobCancelled):
+            trainer.train_models_from_files(tanah_file_path=str(jual_csv), progress=cancel, incremental=True)
+        assert not (tmp_path / "data" / "training_store" / "jual_tanah.csv").exists()
+
+    def test_failed_save_keeps_store(self, tmp_path, monkeypatch):
+        from auto_model_trainer_optimized import OptimizedModelTrainer
+
+        monkeypatch.chdir(tmp_path)
+        make_frame(120).rename(columns={'harga': 'harga_jual'}).to_csv('data.csv', index=False)
+        trainer = OptimizedModelTrainer('tanah', use_tuning=False, cpu_budget=1, importance_method='none')
+        trainer.get_optimized_params = lambda name: {
+            'random_forest': {'n_estimators': 5},
+            'xgboost': {'n_estimators': 5},
+            'catboost': {'iterations': 5}
+        }[name]
+        store_path = trainer.store_path
+
+        def fail(*args, **kwargs):
+            raise OSError("disk penuh")
+
+        monkeypatch.setattr(trainer, 'save_artifacts', fail)
+        with pytest.raises(OSError):
+            trainer.train_models('data.csv')
+        assert not store_path.exists()
+
+        monkeypatch.undo()
+        monkeypatch.chdir(tmp_path)
+        trainer.train_models('data.csv')
+        assert len(pd.read_csv(store_path)) == 120
+
+
+class TestDriftDetection:
+    """Test cases for warm-start vs full retrain decision"""
+
+    def test_similar_delta_no_drift(self):
+        _, _, encoders = encoded(make_frame(10))
+        result = detect_drift(make_frame(800), make_frame(200, seed=1), ['luas', 'jarak', 'harga'], encoders)
+        assert result['drift'] == False
+
+    def test_shifted_numeric_feature(self):
+        _, _, encoders = encoded(make_frame(10))
+        result = detect_drift(make_frame(800), make_frame(200, seed=1, scale=3), ['luas', 'jarak'], encoders)
+        assert result['drift'] == True
+        assert result['psi']['luas'] > 0.2
+
+    def test_small_similar_delta_no_drift(self):
+        """Test delta kecil dari distribusi yang sama (detect_drift asli) jarang dianggap drift"""
+        _, _, encoders = encoded(make_frame(10))
+        existing = make_frame(1000)
+        for n_rows in (5, 10, 20, 50, 100, 150):
+            results = [
+                detect_drift(existing, make_frame(n_rows, seed=seed), ['luas', 'jarak', 'harga'], encoders)
+                for seed in range(1, 51)
+            ]
+            assert sum(result['drift'] for result in results) <= 2, n_rows
+            assert set(results[0]['ks_pvalues']) == {'luas', 'jarak', 'harga'}
+
+        result = detect_drift(existing, make_frame(20, seed=1, scale=3), ['luas', 'jarak'], encoders)
+        assert result['drift'] == True and result['reasons'][0].startswith('ks_p<')
+
+    def test_unseen_category_and_large_delta(self):
+        _, _, encoders = encoded(make_frame(10))
+        delta = make_frame(200, seed=1)
+        delta.loc[0, 'kecamatan'] = 'Tegalsari'
+
+        result = detect_drift(make_frame(800), delta, ['luas'], encoders)
+        assert result['unseen_categories'] == {'kecamatan': ['Tegalsari']}
+
+        result = detect_drift(make_frame(100), make_frame(200, seed=1), ['luas'], encoders)
+        assert 'delta_too_large' in result['reasons']
+
+    def test_small_delta_evaluated_in_sample(self):
+        X, y, _ = encoded(make_frame(20))
+        X_train, X_test, _, _, in_sample = holdout_split(X, y)
+        assert in_sample == True and X_test is X_train
+
+        X, y, _ = encoded(make_frame(100))
+        X_train, X_test, _, _, in_sample = holdout_split(X, y)
+        assert in_sample == False and (len(X_train), len(X_test)) == (80, 20)
+
+    def test_rounds_scale_with_delta(self):
+        assert incremental_rounds(300, 100, 1000) == 30
+        assert incremental_rounds(300, 1, 1000) == 10
+        assert incremental_rounds(300, 50, 0) == 300
+
+
+class TestWarmStart:
+    """Test cases for continuing previous models on the delta"""
+
+    @pytest.fixture
+    def trained(self):
+        X, y, _ = encoded(make_frame(400))
+        X_delta, y_delta, _ = encoded(make_frame(80, seed=1))
+        return X, y, X_delta, y_delta
+
+    def test_boosters_continue_from_previous(self, trained):
+        X, y, X_delta, y_delta = trained
+        xgb = XGBRegressor(n_estimators=50, max_depth=4).fit(X, y)
+        cat = CatBoostRegressor(iterations=50, depth=4, verbose=False, allow_writing_files=False).fit(X, y)
+
+        xgb_new = warm_start_xgboost(xgb, X_delta, y_delta, 10)
+        assert xgb_new.get_booster().num_boosted_rounds() == 60
+        assert xgb_new.get_params()['max_depth'] == 4
+
+        cat_new = warm_start_catboost(cat, X_delta, y_delta, 10)
+        assert cat_new.tree_count_ == 60
+
+    def test_random_forest_adds_trees(self, trained):
+        X, y, X_delta, y_delta = trained
+        rf = RandomForestRegressor(n_estimators=20, random_state=42).fit(X, y)
+        old_trees = list(rf.estimators_)
+
+        rf = warm_start_random_forest(rf, X_delta, y_delta, 5)
+        assert len(rf.estimators_) == 25
+        assert rf.estimators_[:20] == old_trees
+        assert rf.warm_start == False
+
+    def test_artifact_keeps_hyperparameters(self, tmp_path, trained):
+        """Test .ubj tidak menyimpan hyperparameter -> manifest menyimpan params"""
+        X, y, X_delta, y_delta = trained
+        xgb = XGBRegressor(n_estimators=30, max_depth=3, learning_rate=0.2).fit(X, y)
+        save_model_artifacts(tmp_path, {'xgboost': xgb}, list(X.columns))
+
+        loaded = load_model_artifacts(tmp_path, mmap=False)['objects']['xgboost']
+        assert loaded.get_params()['max_depth'] == 3
+        assert loaded.get_params()['learning_rate'] == 0.2
+        np.testing.assert_allclose(loaded.predict(X_delta), xgb.predict(X_delta), rtol=1e-6)
+
+        continued = warm_start_xgboost(loaded, X_delta, y_delta, 10)
+        assert continued.get_booster().num_boosted_rounds() == 40
+
+    def test_in_sample_metrics_kept_out_of_index(self, tmp_path, monkeypatch):
+        """Test warm-start pada delta kecil: metrics ditandai in_sample, tidak masuk registry"""
+        from auto_model_trainer_optimized import OptimizedModelTrainer
+        from prediction_system import ModelIndex
+
+        monkeypatch.chdir(tmp_path)
+        data = make_frame(130).rename(columns={'harga': 'harga_jual'})
+        data.iloc[:120].to_csv('data.csv', index=False)
+        trainer = OptimizedModelTrainer('tanah', use_tuning=False, cpu_budget=1, importance_method='none')
+        trainer.get_optimized_params = lambda name: {
+            'random_forest': {'n_estimators': 5},
+            'xgboost': {'n_estimators': 5},
+            'catboost': {'iterations': 5}
+        }[name]
+        first = trainer.train_models('data.csv')
+
+        data.to_csv('data.csv', index=False)
+        result = trainer.train_models('data.csv', incremental=True)
+        assert result['training_mode'] == 'incremental' and result['delta_rows'] == 10
+
+        version = ModelIndex(Path('model') / 'tanah').versions()[result['version']]
+        assert version['metrics'] is None
+        metadata = load_model_artifacts(Path('model') / 'tanah' / result['version'], mmap=False)['manifest']['metadata']
+        assert metadata['performance']['evaluation'] == 'in_sample'
+        assert ModelIndex(Path('model') / 'tanah').versions()[first['version']]['metrics']['evaluation'] == 'holdout'
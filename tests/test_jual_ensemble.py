@@ -0,0 +1,186 @@
+"""
+Tests for Jual Ensemble Scoring
+===============================
+
+Memastikan endpoint prediksi jual memprediksi setiap member satu kali dan
+nilai ensemble sama dengan VotingRegressor.predict (termasuk weights).
+
+Run tests:
+    python -m pytest tests/test_jual_ensemble.py -v
+"""
+
+import pytest
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from flask import Flask
+from sklearn.ensemble import VotingRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.preprocessing import LabelEncoder
+from sklearn.tree import DecisionTreeRegressor
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import routes_jual_prediction
+from prediction_system import EnsembleScorer, ModelRegistry, save_model_artifacts
+
+FEATURES = [
+    'Kecamatan', 'Sertifikat', 'Luas Tanah (M²)', 'Jenis Zona', 'Aksesibilitas',
+    'Tingkat Keamanan', 'Kepadatan_Penduduk', 'Jarak ke Pusat Kota (km)'
+]
+
+TANAH_INPUT = {
+    'kecamatan': 'Gubeng',
+    'sertifikat': 'SHM',
+    'luas_tanah': 500,
+    'jenis_zona': 'Komersial',
+    'aksesibilitas': 'Baik',
+    'tingkat_keamanan': 'tinggi',
+    'kepadatan_penduduk': 123961,
+    'jarak_ke_pusat': 5.0
+}
+
+
+class CountingRegressor(LinearRegression):
+    """LinearRegression yang menghitung jumlah pemanggilan predict"""
+
+    predict_calls = 0
+
+    def predict(self, X):
+        type(self).predict_calls += 1
+        return super().predict(X)
+
+
+def encoded_row(encoders):
+    """TANAH_INPUT dalam bentuk matriks fitur yang sudah di-encode"""
+    return pd.DataFrame([{
+        'Kecamatan': encoders['Kecamatan'].transform(['Gubeng'])[0],
+        'Sertifikat': encoders['Sertifikat'].transform(['SHM'])[0],
+        'Luas Tanah (M²)': 500.0,
+        'Jenis Zona': encoders['Jenis Zona'].transform(['Komersial'])[0],
+        'Aksesibilitas': encoders['Aksesibilitas'].transform(['Baik'])[0],
+        'Tingkat Keamanan': encoders['Tingkat Keamanan'].transform(['tinggi'])[0],
+        'Kepadatan_Penduduk': 123961,
+        'Jarak ke Pusat Kota (km)': 5.0
+    }])[FEATURES]
+
+
+def fresh_registry():
+    """Registry model jual kosong (diganti per test lewat monkeypatch)"""
+    return ModelRegistry(
+        routes_jual_prediction.load_jual_models, ['tanah', 'bangunan'],
+        validator=routes_jual_prediction.validate_jual_models
+    )
+
+
+@pytest.fixture
+def jual_tanah_dir(tmp_path):
+    """Folder model jual tanah kecil dengan VotingRegressor berbobot"""
+    rng = np.random.RandomState(0)
+    n = 120
+    raw = pd.DataFrame({
+        'Kecamatan': rng.choice(['Gubeng', 'Rungkut', 'Sukolilo'], n),
+        'Sertifikat': rng.choice(['SHM', 'HGB'], n),
+        'Luas Tanah (M²)': rng.uniform(100, 1000, n),
+        'Jenis Zona': rng.choice(['Komersial', 'Perumahan'], n),
+        'Aksesibilitas': rng.choice(['Baik', 'Buruk'], n),
+        'Tingkat Keamanan': rng.choice(['tinggi', 'rendah'], n),
+        'Kepadatan_Penduduk': rng.randint(50000, 150000, n),
+        'Jarak ke Pusat Kota (km)': rng.uniform(1, 20, n)
+    })
+    y = 5e6 * raw['Luas Tanah (M²)'] + rng.normal(0, 1e8, n)
+
+    encoders = {}
+    X = raw.copy()
+    for col in ['Kecamatan', 'Sertifikat', 'Jenis Zona', 'Aksesibilitas', 'Tingkat Keamanan']:
+        encoders[col] = LabelEncoder().fit(raw[col])
+        X[col] = encoders[col].transform(raw[col])
+
+    voting = VotingRegressor([
+        ('xgb', DecisionTreeRegressor(max_depth=5, random_state=0)),
+        ('rf', Ridge(alpha=1.0)),
+        ('cat', CountingRegressor())
+    ], weights=[1, 2, 3]).fit(X[FEATURES], y)
+
+    joblib.dump(voting, tmp_path / 'voting_regressor.pkl')
+    joblib.dump(encoders, tmp_path / 'label_encoders.pkl')
+    joblib.dump(FEATURES, tmp_path / 'feature_names.pkl')
+
+    return tmp_path, voting, encoders
+
+
+@pytest.fixture
+def client(jual_tanah_dir, monkeypatch):
+    model_dir, _, _ = jual_tanah_dir
+    monkeypatch.setattr(routes_jual_prediction, 'TANAH_MODEL_PATH', str(model_dir))
+    monkeypatch.setattr(routes_jual_prediction, 'jual_models', fresh_registry())
+    assert routes_jual_prediction.load_tanah_models()
+
+    app = Flask(__name__)
+    app.register_blueprint(routes_jual_prediction.jual_prediction_bp)
+    return app.test_client()
+
+
+@pytest.fixture
+def manifest_client(jual_tanah_dir, tmp_path_factory, monkeypatch):
+    """Client dengan folder model jual dalam format artefak (manifest.json)"""
+    _, voting, encoders = jual_tanah_dir
+    scorer = EnsembleScorer(voting=voting)
+    model_dir = tmp_path_factory.mktemp('jual_tanah_artifacts')
+    save_model_artifacts(
+        model_dir, dict(scorer.members, encoders=encoders), FEATURES, encoders,
+        ensemble={'members': scorer.member_names, 'weights': voting.weights}
+    )
+
+    monkeypatch.setattr(routes_jual_prediction, 'TANAH_MODEL_PATH', str(model_dir))
+    monkeypatch.setattr(routes_jual_prediction, 'jual_models', fresh_registry())
+    assert routes_jual_prediction.load_tanah_models()
+
+    app = Flask(__name__)
+    app.register_blueprint(routes_jual_prediction.jual_prediction_bp)
+    return app.test_client()
+
+
+class TestJualEnsemble:
+    """Test cases for single-pass ensemble scoring on jual endpoints"""
+
+    def test_ensemble_matches_voting_predict(self, client, jual_tanah_dir):
+        """Test ensemble value equals weighted VotingRegressor.predict"""
+        _, voting, encoders = jual_tanah_dir
+
+        response = client.post('/jual-prediction/predict-tanah', json=TANAH_INPUT)
+        body = response.get_json()
+        assert response.status_code == 200
+        assert body['success'] == True
+
+        assert body['prediction'] == pytest.approx(voting.predict(encoded_row(encoders))[0], rel=1e-12)
+        assert set(body['all_predictions']) == {'xgboost', 'random_forest', 'catboost', 'ensemble'}
+        assert body['model_used'] == 'Ensemble (XGBoost + Random Forest + CatBoost)'
+
+    def test_each_member_predicts_once(self, client):
+        """Test each member runs exactly once per request and reports timings"""
+        CountingRegressor.predict_calls = 0
+
+        body = client.post('/jual-prediction/predict-tanah', json=TANAH_INPUT).get_json()
+
+        assert CountingRegressor.predict_calls == 1
+        assert set(body['model_timings_ms']) == {'xgboost', 'random_forest', 'catboost'}
+        assert all(t >= 0 for t in body['model_timings_ms'].values())
+
+    def test_manifest_artifacts_match_voting_predict(self, manifest_client, jual_tanah_dir):
+        """Test folder ber-manifest memberi prediksi sama dengan VotingRegressor lama"""
+        _, voting, encoders = jual_tanah_dir
+
+        body = manifest_client.post('/jual-prediction/predict-tanah', json=TANAH_INPUT).get_json()
+
+        assert body['success'] == True
+        assert body['prediction'] == pytest.approx(voting.predict(encoded_row(encoders))[0], rel=1e-12)
+        assert body['model_used'] == 'Ensemble (XGBoost + Random Forest + CatBoost)'
+        assert isinstance(routes_jual_prediction.jual_models['tanah']['features'], list)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
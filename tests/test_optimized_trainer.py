@@ -0,0 +1,283 @@
+"""
+Tests for OptimizedModelTrainer Tuning Engine
+=============================================
+
+Memastikan budget CPU dibagi antara fold CV dan thread model, booster
+memakai early stopping pada validation split, ensemble memakai member
+hasil tuning tanpa refit, dan versi hasil training bisa langsung dilayani
+PredictionSystem.
+
+Run tests:
+    python -m pytest tests/test_optimized_trainer.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from xgboost import XGBRegressor
+from catboost import CatBoostRegressor
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from auto_model_trainer_optimized import OptimizedModelTrainer, split_cpu_budget
+from feature_importance import native_importance, permutation_importance_shared
+from prediction_system import PredictionSystem, ModelIndex, load_model_artifacts
+
+
+class SmallGridTrainer(OptimizedModelTrainer):
+    """Trainer dengan grid kecil agar test cepat"""
+
+    N_CANDIDATES = 4
+    CV_FOLDS = 2
+    EARLY_STOPPING_ROUNDS = 5
+
+    GRIDS = {
+        'random_forest': {'n_estimators': [10, 20], 'max_depth': [4, None]},
+        'xgboost': {'n_estimators': [500], 'learning_rate': [0.3, 0.5], 'max_depth': [2, 3]},
+        'catboost': {'iterations': [500], 'learning_rate': [0.3, 0.5], 'depth': [2, 3]}
+    }
+
+    def get_optimized_params(self, model_name):
+        return self.GRIDS[model_name]
+
+
+class CountingRegressor(LinearRegression):
+    """Menghitung jumlah pemanggilan predict"""
+
+    calls = 0
+
+    def predict(self, X):
+        CountingRegressor.calls += 1
+        return super().predict(X)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(0)
+    n = 300
+    df = pd.DataFrame({
+        'kecamatan': rng.choice(['Gubeng', 'Rungkut', 'Wonokromo'], n),
+        'luas': rng.uniform(50, 500, n),
+        'jarak': rng.uniform(1, 20, n)
+    })
+    df['harga_jual'] = df['luas'] * 1e6 - df['jarak'] * 1e7 + rng.normal(0, 1e7, n)
+    df.to_csv('data.csv', index=False)
+    return tmp_path / 'data.csv'
+
+
+class TestCpuBudget:
+    """Test cases for splitting cores between CV folds and model threads"""
+
+    def test_split_never_oversubscribes(self):
+        assert split_cpu_budget(8, 5) == (5, 1)
+        assert split_cpu_budget(20, 5) == (5, 4)
+        assert split_cpu_budget(2, 5) == (2, 1)
+        assert split_cpu_budget(1, 5) == (1, 1)
+
+    def test_estimators_use_model_threads(self):
+        trainer = OptimizedModelTrainer('tanah', use_tuning=True, cpu_budget=12)
+        assert (trainer.search_jobs, trainer.model_threads) == (5, 2)
+        assert trainer.base_estimator('random_forest').n_jobs == 2
+        assert trainer.base_estimator('xgboost').n_jobs == 2
+        assert trainer.base_estimator('catboost').get_params()['thread_count'] == 2
+
+        # Tanpa tuning seluruh budget dipakai model
+        trainer = OptimizedModelTrainer('tanah', use_tuning=False, cpu_budget=12)
+        assert trainer.model_threads == 12
+
+
+class TestTuningEngine:
+    """Test cases for halving search, early stopping and ensemble reuse"""
+
+    def test_tuned_members_reused_without_refit(self, dataset):
+        trainer = SmallGridTrainer('tanah', use_tuning=True, cpu_budget=1)
+        result = trainer.train_models(dataset)
+
+        assert result['success'] == True
+        assert set(result['best_params']) == {'random_forest', 'xgboost', 'catboost'}
+        assert set(result['timings']) == {'random_forest', 'xgboost', 'catboost', 'total', 'feature_importance'}
+        assert result['feature_importance_status'] == 'done'
+
+        artifacts = load_model_artifacts(Path('model') / 'tanah' / result['version'], mmap=False)
+        assert artifacts['manifest']['ensemble'] == {
+            'members': ['random_forest', 'xgboost', 'catboost'], 'weights': None
+        }
+
+        # Early stopping menghentikan booster jauh sebelum batas 500 iterasi
+        xgb_model = artifacts['objects']['xgboost']
+        cat_model = artifacts['objects']['catboost']
+        assert xgb_model.get_booster().num_boosted_rounds() < 500
+        assert cat_model.tree_count_ < 500
+
+    def test_without_tuning_uses_early_stopping(self, dataset):
+        trainer = SmallGridTrainer('tanah', use_tuning=False, cpu_budget=1)
+        trainer.get_optimized_params = lambda name: {
+            'random_forest': {'n_estimators': 10},
+            'xgboost': {'n_estimators': 500, 'learning_rate': 0.5},
+            'catboost': {'iterations': 500, 'learning_rate': 0.5}
+        }[name]
+        result = trainer.train_models(dataset)
+
+        assert result['best_params'] is None
+        assert result['performances']['voting']['r2_score'] > 0.8
+        models = load_model_artifacts(Path('model') / 'tanah' / result['version'], mmap=False)['objects']
+        assert models['xgboost'].get_booster().num_boosted_rounds() < 500
+
+
+class TestFeatureImportance:
+    """Test cases for native / permutation importance stage"""
+
+    @pytest.fixture
+    def encoded(self, dataset):
+        df = pd.read_csv(dataset)
+        df['kecamatan'] = df['kecamatan'].astype('category').cat.codes
+        return df[['kecamatan', 'luas', 'jarak']], df['harga_jual']
+
+    def test_native_importance_normalized(self, encoded):
+        X, y = encoded
+        for model in (
+            RandomForestRegressor(n_estimators=10, random_state=42),
+            XGBRegressor(n_estimators=20),
+            CatBoostRegressor(iterations=20, verbose=False, allow_writing_files=False)
+        ):
+            importance = native_importance(model.fit(X, y), X.columns)
+            assert importance['importance'].sum() == pytest.approx(1.0)
+            assert importance['feature'].iloc[0] == 'luas'
+
+        assert native_importance(LinearRegression().fit(X, y), X.columns) is None
+
+    def test_permutation_shares_member_predictions(self, encoded):
+        """Test ensemble tidak memicu prediksi tambahan dan baris di-subsample"""
+        X, y = encoded
+        members = {'a': CountingRegressor().fit(X, y), 'b': CountingRegressor().fit(X, y)}
+        CountingRegressor.calls = 0
+
+        result = permutation_importance_shared(members, X, y, n_repeats=2, max_rows=50)
+
+        # baseline + kolom x repeat, sekali per member
+        assert CountingRegressor.calls == 2 * (1 + 3 * 2)
+        assert set(result) == {'a', 'b', 'voting'}
+        assert result['voting']['feature'].iloc[0] == 'luas'
+        assert (result['voting']['method'] == 'permutation').all()
+
+    def test_async_stage_runs_after_save(self, dataset):
+        trainer = OptimizedModelTrainer(
+            'tanah', use_tuning=False, cpu_budget=1, importance_async=True
+        )
+        trainer.get_optimized_params = lambda name: {
+            'random_forest': {'n_estimators': 10},
+            'xgboost': {'n_estimators': 20},
+            'catboost': {'iterations': 20}
+        }[name]
+        result = trainer.train_models(dataset)
+
+        assert result['feature_importance_status'] == 'pending'
+        importance = trainer.wait_feature_importance(timeout=30)
+        assert set(importance) == {'random_forest', 'xgboost', 'catboost'}
+        assert (Path('model') / 'tanah' / 'feature_importance_xgboost.csv').exists()
+
+
+class TestServing:
+    """Test cases for serving a version trained by OptimizedModelTrainer"""
+
+    @pytest.fixture
+    def rental_dataset(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        rng = np.random.default_rng(1)
+        n = 200
+        df = pd.DataFrame({
+            'Kecamatan': rng.choice(['Gubeng', 'Rungkut', 'Mulyorejo'], n),
+            'Njop (Rp/M²)': rng.uniform(1e6, 8e6, n),
+            'Sertifikat': rng.choice(['SHM', 'HGB'], n),
+            'Luas Tanah (M²)': rng.uniform(100, 1000, n),
+            'Jenis Zona': rng.choice(['Komersial', 'Perumahan'], n),
+            'Aksesibilitas': rng.choice(['Baik', 'Buruk'], n),
+            'Tingkat Keamanan': rng.choice(['tinggi', 'rendah'], n),
+            'Kepadatan_Penduduk': rng.uniform(5e4, 2e5, n)
+        })
+        df['harga_sewa'] = df['Njop (Rp/M²)'] * df['Luas Tanah (M²)'] / 100 + rng.normal(0, 1e6, n)
+        df.to_csv('rental.csv', index=False)
+        return tmp_path / 'rental.csv'
+
+    def train(self, csv_path):
+        trainer = OptimizedModelTrainer('tanah', use_tuning=False, cpu_budget=1, importance_method='none')
+        trainer.get_optimized_params = lambda name: {
+            'random_forest': {'n_estimators': 10},
+            'xgboost': {'n_estimators': 20},
+            'catboost': {'iterations': 20}
+        }[name]
+        return trainer.train_models(csv_path)
+
+    def test_rental_upload_job_trains_and_publishes(self, rental_dataset, tmp_path, monkeypatch):
+        """Test job 'rental' dari upload memakai trainer ini lalu mengaktifkan versinya"""
+        import training_jobs
+
+        monkeypatch.setattr(OptimizedModelTrainer, 'get_optimized_params', lambda self, name: {
+            'random_forest': {'n_estimators': 10},
+            'xgboost': {'n_estimators': 20},
+            'catboost': {'iterations': 20}
+        }[name])
+        reload_models = training_jobs.reload_trained_models
+        monkeypatch.setattr(training_jobs, 'reload_trained_models',
+                            lambda model_types: reload_models(['tanah'], model_base_path=tmp_path / 'model'))
+
+        queue = training_jobs.TrainingJobQueue(tmp_path / 'jobs.sqlite3')
+        job_id = queue.submit('rental', [('tanah', str(rental_dataset))], {'use_tuning': False})
+        queue.claim()
+        assert training_jobs.run_job(queue, job_id) == 'succeeded'
+
+        result = queue.get(job_id)['result']
+        version = result['models_trained'][0]['version']
+        assert result['published_versions'] == {'tanah': version}
+        assert ModelIndex(Path('model') / 'tanah').read()['active'] == version
+
+    def test_prediction_system_serves_trained_version(self, rental_dataset):
+        result = self.train(rental_dataset)
+
+        system = PredictionSystem(model_base_path=Path('model'), enable_cache=False, async_logging=False)
+        entry = system.models['tanah']
+        assert entry['version'] == result['version']
+        assert entry['ensemble'].member_names == ['random_forest', 'xgboost', 'catboost']
+
+        prediction = system.predict_land_price({
+            'kecamatan': 'Gubeng', 'njop': 3724000, 'sertifikat': 'SHM', 'luas_tanah': 500,
+            'jenis_zona': 'Komersial', 'aksesibilitas': 'Baik', 'tingkat_keamanan': 'tinggi',
+            'kepadatan_penduduk': 123961
+        })
+        assert prediction['success'] == True, prediction.get('error')
+        assert set(prediction['model_predictions']) == {'random_forest', 'xgboost', 'catboost'}
+        assert prediction['model_info']['version'] == result['version']
+        assert prediction['model_info']['r2_score'] == pytest.approx(result['performances']['voting']['r2_score'])
+
+        status = system.get_model_status()['tanah']
+        assert status['version'] == result['version'] and status['performance']['mape'] is None
+
+    def test_version_registered_in_existing_index(self, rental_dataset):
+        """Test versi baru masuk registry.json yang sudah ada (bukan hanya lewat scan awal)"""
+        (Path('model') / 'tanah').mkdir(parents=True)
+        index = ModelIndex(Path('model') / 'tanah')
+        index.register('20200101_000000', metrics={'test_r2': 0.1})
+
+        result = self.train(rental_dataset)
+
+        data = index.read()
+        assert list(data['versions']) == ['20200101_000000', result['version']]
+        assert data['active'] == result['version']
+        assert data['versions'][result['version']]['metrics']['test_r2'] == pytest.approx(
+            result['performances']['voting']['r2_score']
+        )
+
+        # Versi yang di-pin tidak dipindahkan oleh training baru; training
+        # dalam detik yang sama mendapat versi baru (tidak menimpa)
+        index.activate('20200101_000000', pin=True)
+        second = self.train(rental_dataset)
+        assert second['version'] > result['version']
+        assert len(index.read()['versions']) == 3
+        assert index.read()['active'] == '20200101_000000'
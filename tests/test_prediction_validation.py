@@ -11,14 +11,15 @@ Run tests:
 import pytest
 import json
 import os
+import time
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import sys
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from prediction_system import PredictionSystem
+from prediction_system import PredictionSystem, SQLitePredictionCache
 
 @pytest.fixture
 def prediction_system():
@@ -26,6 +27,11 @@ def prediction_system():
     system = PredictionSystem()
     return system
 
+def copy_model_dir(source, target):
+    """Copy folder model tanpa index/pointer runtime (di-bootstrap ulang dari file)"""
+    import shutil
+    shutil.copytree(source, target, ignore=shutil.ignore_patterns('registry.json*', 'CURRENT'))
+
 class TestLandInputValidation:
     """Test cases for land prediction input validation"""
     
@@ -231,11 +237,12 @@ class TestPredictionLogging:
             test_result, 
             success=True
         )
+        prediction_system.flush_logs()
         
-        # Check log file exists
+        # Check log file exists (segment per proses)
         log_dir = tmp_path / "logs"
         today = datetime.now().strftime('%Y%m%d')
-        log_file = log_dir / f"predictions_{today}.jsonl"
+        log_file = log_dir / f"predictions_{today}_{os.getpid()}.jsonl"
         
         assert log_file.exists()
         
@@ -251,6 +258,30 @@ class TestPredictionLogging:
         # Restore original path
         prediction_system.model_base_path = original_base_path
     
+    def test_log_is_not_written_on_request_thread(self, prediction_system, tmp_path):
+        """Test log_prediction only enqueues and segments are read by analytics"""
+        original_base_path = prediction_system.model_base_path
+        prediction_system.model_base_path = tmp_path
+        writer = prediction_system.log_writer
+        
+        writer.flush()
+        original_interval = writer.flush_interval
+        writer.flush_interval = 0.5
+        try:
+            for _ in range(3):
+                prediction_system.log_prediction('tanah', {}, {'confidence': 90.0}, success=True)
+            
+            # Masih di buffer writer, belum ada I/O dari request thread
+            assert not (tmp_path / "logs").exists()
+            
+            prediction_system.flush_logs()
+            stats = prediction_system.get_prediction_stats(days=1)
+            assert stats['total_predictions'] == 3
+            assert stats['average_confidence'] == pytest.approx(90.0)
+        finally:
+            writer.flush_interval = original_interval
+            prediction_system.model_base_path = original_base_path
+    
     def test_log_failed_prediction(self, prediction_system, tmp_path):
         """Test that failed predictions are logged correctly"""
         # Override log directory
@@ -272,11 +303,12 @@ class TestPredictionLogging:
             success=False,
             error=error_message
         )
+        prediction_system.flush_logs()
         
         # Check log file
         log_dir = tmp_path / "logs"
         today = datetime.now().strftime('%Y%m%d')
-        log_file = log_dir / f"predictions_{today}.jsonl"
+        log_file = log_dir / f"predictions_{today}_{os.getpid()}.jsonl"
         
         assert log_file.exists()
         
@@ -368,6 +400,142 @@ class TestPredictionAnalytics:
         
         # Restore
         prediction_system.model_base_path = original_base_path
+    
+    def test_rollups_are_incremental(self, tmp_path):
+        """Test rollups only consume new complete lines and survive a new store"""
+        from prediction_system import PredictionRollupStore
+        
+        log_dir = tmp_path / "logs"
+        log_dir.mkdir()
+        now = datetime.now()
+        log_file = log_dir / f"predictions_{now.strftime('%Y%m%d')}_1.jsonl"
+        
+        def entry(model_type, success, confidence=None):
+            return json.dumps({
+                'timestamp': now.isoformat(),
+                'model_type': model_type,
+                'success': success,
+                'prediction_result': {'confidence': confidence} if success else None
+            }) + '\n'
+        
+        log_file.write_text(entry('tanah', True, 92.0) + entry('tanah', False))
+        store = PredictionRollupStore(log_dir)
+        assert store.get_stats(days=7)['total_predictions'] == 2
+        
+        # Baris terakhir belum lengkap: belum dihitung
+        with open(log_file, 'a') as f:
+            f.write(entry('bangunan', True, 81.0) + entry('tanah', True, 99.0)[:20])
+        stats = store.get_stats(days=7)
+        assert stats['total_predictions'] == 3
+        assert stats['predictions_by_type'] == {'tanah': 1, 'bangunan': 1}
+        assert stats['confidence_histogram'] == {'80-90': 1, '90-100': 1}
+        
+        # Store baru (worker lain) melanjutkan dari offset yang tersimpan
+        reopened = PredictionRollupStore(log_dir)
+        assert reopened.get_stats(days=7)['total_predictions'] == 3
+        assert reopened.get_hourly_stats(hours=1)[0]['total_predictions'] == 3
+        
+        reopened.rebuild()
+        assert reopened.get_stats(days=7) == stats
+
+
+class TestPredictionLogArchive:
+    """Test cases for columnar (Parquet) prediction log archive"""
+
+    @staticmethod
+    def write_segment(log_dir, day, entries):
+        log_file = log_dir / f"predictions_{day.strftime('%Y%m%d')}_1.jsonl"
+        with open(log_file, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+        # Hari yang sudah selesai dan tidak lagi ditulis
+        os.utime(log_file, (time.time() - 3600, time.time() - 3600))
+        return log_file
+
+    @staticmethod
+    def make_entry(day, kecamatan, price, success=True, njop=3724000):
+        return {
+            'timestamp': day.replace(hour=10).isoformat(),
+            'model_type': 'tanah',
+            'success': success,
+            'input_data': {'kecamatan': kecamatan, 'njop': njop, 'sertifikat': 'SHM'},
+            'prediction_result': {'prediction_value': price, 'confidence': 90.0} if success else None,
+            'error': None if success else 'Validasi gagal'
+        }
+
+    def test_compaction_preserves_queries_and_rollups(self, tmp_path):
+        """Test compacted Parquet answers the same query and rollups survive"""
+        pytest.importorskip('pyarrow')
+        from prediction_system import PredictionLogArchive, get_rollup_store
+
+        log_dir = tmp_path / "logs"
+        log_dir.mkdir()
+        yesterday = datetime.now() - timedelta(days=1)
+        entries = [self.make_entry(yesterday, 'Gubeng', price) for price in (1e6, 2e6, 3e6, 4e6)]
+        entries += [
+            self.make_entry(yesterday, 'Rungkut', 9e6),
+            self.make_entry(yesterday, 'Gubeng', None, success=False, njop='abc')
+        ]
+        segment = self.write_segment(log_dir, yesterday, entries)
+
+        archive = PredictionLogArchive(log_dir)
+        before = archive.query(model_type='tanah', kecamatan='Gubeng', percentiles=(50,))
+        stats_before = get_rollup_store(log_dir).get_stats(days=7)
+
+        assert archive.compact() == [yesterday.strftime('%Y%m%d')]
+        assert not segment.exists()
+        assert archive.archive_path(yesterday.strftime('%Y%m%d')).exists()
+
+        after = archive.query(model_type='tanah', kecamatan='Gubeng', percentiles=(50,))
+        assert after['total_predictions'] == before['total_predictions'] == 5
+        assert after['successful_predictions'] == 4
+        assert after['price_percentiles'] == before['price_percentiles'] == {'p50': 2.5e6}
+        assert after['files_scanned'] == 1
+
+        assert get_rollup_store(log_dir).get_stats(days=7) == stats_before
+        get_rollup_store(log_dir).rebuild()
+        assert get_rollup_store(log_dir).get_stats(days=7)['total_predictions'] == 6
+
+    def test_late_segment_of_archived_day_is_queried(self, tmp_path):
+        """Test segment JSONL yang ditulis setelah harinya dipadatkan tetap ikut query"""
+        pytest.importorskip('pyarrow')
+        from prediction_system import PredictionLogArchive
+
+        log_dir = tmp_path / "logs"
+        log_dir.mkdir()
+        yesterday = datetime.now() - timedelta(days=1)
+        self.write_segment(log_dir, yesterday, [self.make_entry(yesterday, 'Gubeng', 1e6)])
+        archive = PredictionLogArchive(log_dir)
+        assert archive.compact() == [yesterday.strftime('%Y%m%d')]
+
+        # Flush terlambat dari writer worker lain
+        late = log_dir / f"predictions_{yesterday.strftime('%Y%m%d')}_2.jsonl"
+        late.write_text(json.dumps(self.make_entry(yesterday, 'Gubeng', 3e6)) + '\n')
+        os.utime(late, (time.time() - 3600, time.time() - 3600))
+
+        result = archive.query(kecamatan='Gubeng', percentiles=(50,))
+        assert result['total_predictions'] == 2
+        assert result['price_percentiles'] == {'p50': 2e6}
+
+        # Compaction berikutnya menggabungkan segment ke Parquet yang sama
+        assert archive.compact() == [yesterday.strftime('%Y%m%d')]
+        assert not late.exists()
+        assert archive.query(kecamatan='Gubeng')['total_predictions'] == 2
+
+    def test_current_day_is_not_compacted(self, tmp_path):
+        """Test segments of today stay as JSONL and are still queryable"""
+        pytest.importorskip('pyarrow')
+        from prediction_system import PredictionLogArchive
+
+        log_dir = tmp_path / "logs"
+        log_dir.mkdir()
+        today = datetime.now()
+        segment = self.write_segment(log_dir, today, [self.make_entry(today, 'Gubeng', 5e6)])
+
+        archive = PredictionLogArchive(log_dir)
+        assert archive.compact() == []
+        assert segment.exists()
+        assert archive.query()['total_predictions'] == 1
 
 
 class TestConfidenceCalculation:
@@ -411,6 +579,660 @@ class TestConfidenceCalculation:
         assert confidence['confidence_level'] in ['Moderate', 'Low']
 
 
+class TestPredictionCache:
+    """Test cases for read-through prediction cache (FASE 5)"""
+
+    LAND_INPUT = {
+        'kecamatan': 'Gubeng',
+        'njop': 3724000,
+        'sertifikat': 'SHM',
+        'luas_tanah': 500,
+        'jenis_zona': 'Komersial',
+        'aksesibilitas': 'Baik',
+        'tingkat_keamanan': 'tinggi',
+        'kepadatan_penduduk': 123961
+    }
+
+    def test_cache_key_normalization(self, prediction_system):
+        """Test near-identical inputs map to the same cache key"""
+        if 'tanah' not in prediction_system.models:
+            pytest.skip("Model tanah tidak tersedia")
+
+        variant = dict(self.LAND_INPUT, kecamatan='  gubeng ', njop=3724200)
+        key_a = prediction_system._make_cache_input('tanah', self.LAND_INPUT)
+        key_b = prediction_system._make_cache_input('tanah', variant)
+
+        assert key_a == key_b
+        assert key_a['model_timestamp'] == prediction_system.metadata['tanah']['model_info']['timestamp']
+
+    def test_repeated_prediction_hits_cache(self, prediction_system, tmp_path):
+        """Test second identical prediction is served from cache and counted"""
+        if 'tanah' not in prediction_system.models:
+            pytest.skip("Model tanah tidak tersedia")
+
+        original_base_path = prediction_system.model_base_path
+        prediction_system.model_base_path = tmp_path
+
+        first = prediction_system.predict_land_price(dict(self.LAND_INPUT))
+        second = prediction_system.predict_land_price(dict(self.LAND_INPUT))
+
+        assert first['success'] == True
+        assert second.get('cached') == True
+        assert second['prediction_value'] == first['prediction_value']
+
+        stats = prediction_system.get_cache_stats()
+        assert stats['cache_hits'] == 1
+        assert stats['cache_misses'] == 1
+        assert stats['total_predictions'] == 2
+
+        prediction_system.model_base_path = original_base_path
+
+
+class TestCategoryLookup:
+    """Test cases for compiled categorical lookup tables"""
+
+    def test_lookup_matches_label_encoder(self, prediction_system):
+        """Test lookup codes equal LabelEncoder.transform and unknowns fall back"""
+        for model_type, components in prediction_system.models.items():
+            for col, encoder in components['encoders'].items():
+                lookup = components['lookups'][col]
+
+                for label in encoder.classes_:
+                    assert label in lookup
+                    assert lookup.encode(label) == encoder.transform([label])[0]
+
+                assert 'kategori_tidak_dikenal' not in lookup
+                assert lookup.get('kategori_tidak_dikenal') is None
+                assert lookup.encode('kategori_tidak_dikenal') == encoder.transform([encoder.classes_[0]])[0]
+
+
+class TestBatchPrediction:
+    """Test cases for vectorized batch prediction (FASE 5)"""
+
+    def test_batch_matches_single_predictions(self, prediction_system, tmp_path):
+        """Test batch results equal single-row predictions and keep per-row errors"""
+        if 'tanah' not in prediction_system.models:
+            pytest.skip("Model tanah tidak tersedia")
+
+        original_base_path = prediction_system.model_base_path
+        prediction_system.model_base_path = tmp_path
+        prediction_system.enable_cache = False
+
+        valid = dict(TestPredictionCache.LAND_INPUT)
+        other = dict(valid, kecamatan='Rungkut', njop=2352000, luas_tanah=1840)
+        invalid = dict(valid, njop=50000)
+
+        batch = prediction_system.predict_batch('tanah', [valid, invalid, other])
+
+        assert batch['total_predictions'] == 3
+        assert batch['successful'] == 2
+        assert batch['failed'] == 1
+
+        results = batch['results']
+        assert results[0]['prediction_value'] == prediction_system.predict_land_price(valid)['prediction_value']
+        assert results[2]['prediction_value'] == prediction_system.predict_land_price(other)['prediction_value']
+        assert results[1]['success'] == False
+        assert results[1]['error'] == prediction_system.predict_land_price(invalid)['error']
+
+        prediction_system.model_base_path = original_base_path
+
+    def test_batch_validation_matches_single(self, prediction_system):
+        """Test array validation reports the same messages as single validation"""
+        import pandas as pd
+
+        inputs = [
+            dict(TestPredictionCache.LAND_INPUT),
+            dict(TestPredictionCache.LAND_INPUT, luas_tanah='abc'),
+            {'njop': 0}
+        ]
+
+        batch_errors = prediction_system.validate_batch_input('tanah', pd.DataFrame(inputs))
+
+        for input_data, batch_error in zip(inputs, batch_errors):
+            _, error = prediction_system.validate_land_input(input_data)
+            assert batch_error == error
+
+
+class TestEnsembleScoring:
+    """Test cases for multi-model ensemble scoring (FASE 1)"""
+
+    @pytest.fixture
+    def ensemble_model_dir(self, tmp_path):
+        """Copy model tanah ke tmp_path dan tambahkan member ensemble kecil
+        dengan nama file OptimizedModelTrainer (<member>_tanah.pkl)"""
+        import shutil
+        import joblib
+        import numpy as np
+        from sklearn.ensemble import VotingRegressor
+        from sklearn.linear_model import LinearRegression, Ridge
+        from sklearn.tree import DecisionTreeRegressor
+
+        source = Path(__file__).parent.parent / "model" / "tanah"
+        if not source.exists():
+            pytest.skip("Model tanah tidak tersedia")
+        target = tmp_path / "tanah"
+        copy_model_dir(source, target)
+
+        rng = np.random.RandomState(42)
+        X = rng.normal(size=(200, 10))
+        y = 5e6 + 1e6 * X[:, 3] + 2e5 * rng.normal(size=200)
+
+        members = {
+            'xgboost': DecisionTreeRegressor(max_depth=4, random_state=0),
+            'random_forest': Ridge(alpha=1.0),
+            'catboost': LinearRegression()
+        }
+        voting = VotingRegressor(
+            [('xgb', members['xgboost']), ('rf', members['random_forest']), ('cb', members['catboost'])],
+            weights=[2, 1, 1]
+        ).fit(X, y)
+
+        for name, model in members.items():
+            joblib.dump(model.fit(X, y), target / f"{name}_tanah.pkl")
+
+        return tmp_path, voting
+
+    def test_member_files_are_loaded(self, ensemble_model_dir):
+        """Test all member files are loaded and confidence uses the real spread"""
+        model_dir, _ = ensemble_model_dir
+        system = PredictionSystem(model_base_path=model_dir, enable_cache=False)
+
+        ensemble = system.models['tanah']['ensemble']
+        assert ensemble.member_names == ['xgboost', 'random_forest', 'catboost']
+
+        result = system.predict_land_price(dict(TestPredictionCache.LAND_INPUT))
+        assert result['success'] == True
+        assert set(result['model_predictions']) == {'xgboost', 'random_forest', 'catboost'}
+        assert result['model_info']['model_name'] == 'Ensemble (XGBoost + Random Forest + CatBoost)'
+
+        values = list(result['model_predictions'].values())
+        assert result['prediction_value'] == pytest.approx(sum(values) / 3)
+        assert result['cv_percentage'] > 0
+
+    def test_member_with_other_features_is_skipped(self, ensemble_model_dir):
+        """Test member dengan jumlah fitur berbeda tidak ikut ensemble"""
+        import joblib
+        import numpy as np
+        from sklearn.linear_model import LinearRegression
+
+        model_dir, _ = ensemble_model_dir
+        X = np.random.RandomState(0).normal(size=(50, 3))
+        joblib.dump(LinearRegression().fit(X, X[:, 0]), model_dir / "tanah" / "catboost_tanah.pkl")
+
+        system = PredictionSystem(model_base_path=model_dir, enable_cache=False)
+        assert system.models['tanah']['ensemble'].member_names == ['xgboost', 'random_forest']
+
+    def test_skip_voting_matches_voting_predict(self, ensemble_model_dir):
+        """Test weighted member average equals VotingRegressor.predict"""
+        import joblib
+        import numpy as np
+
+        model_dir, voting = ensemble_model_dir
+        joblib.dump(voting, model_dir / "tanah" / "voting_tanah.pkl")
+
+        fast = PredictionSystem(model_base_path=model_dir, enable_cache=False)
+        exact = PredictionSystem(model_base_path=model_dir, enable_cache=False,
+                                 skip_voting_predict=False)
+
+        X = np.random.RandomState(1).normal(size=(25, 10))
+        fast_scored = fast.models['tanah']['ensemble'].score(X)
+        exact_scored = exact.models['tanah']['ensemble'].score(X)
+
+        np.testing.assert_allclose(fast_scored['prediction'], voting.predict(X), rtol=1e-12)
+        np.testing.assert_allclose(exact_scored['prediction'], voting.predict(X), rtol=1e-12)
+        assert 'voting' not in fast_scored['timings_ms']
+        assert 'voting' in exact_scored['timings_ms']
+
+    def test_primary_model_only(self, prediction_system):
+        """Test tanpa file member, model primary tetap dipakai sendiri"""
+        if 'tanah' not in prediction_system.models:
+            pytest.skip("Model tanah tidak tersedia")
+
+        ensemble = prediction_system.models['tanah']['ensemble']
+        assert len(ensemble.members) == 1
+        assert prediction_system._model_info('tanah')['model_name'] == 'CatBoost (Primary)'
+
+
+class TestModelArtifacts:
+    """Test cases for manifest-based model artifacts"""
+
+    @pytest.fixture
+    def artifact_dir(self, tmp_path):
+        """Folder artefak dengan XGBoost, CatBoost dan RandomForest kecil"""
+        import numpy as np
+        from catboost import CatBoostRegressor
+        from sklearn.ensemble import RandomForestRegressor
+        from xgboost import XGBRegressor
+        from prediction_system import save_model_artifacts
+
+        rng = np.random.RandomState(0)
+        X = rng.rand(200, 4)
+        y = X @ np.array([3.0, 1.0, -2.0, 0.5]) + 0.1 * rng.rand(200)
+
+        objects = {
+            'xgboost': XGBRegressor(n_estimators=20, max_depth=3).fit(X, y),
+            'random_forest': RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y),
+            'catboost': CatBoostRegressor(iterations=20, depth=3, verbose=False, allow_writing_files=False).fit(X, y)
+        }
+        save_model_artifacts(
+            tmp_path, objects, ['a', 'b', 'c', 'd'],
+            ensemble={'members': list(objects), 'weights': [1, 2, 1]}
+        )
+        return tmp_path, objects, X
+
+    def test_native_formats_roundtrip(self, artifact_dir):
+        """Test booster disimpan native dan prediksi identik setelah dimuat"""
+        import numpy as np
+        from prediction_system import load_model_artifacts, ensemble_from_artifacts
+
+        path, objects, X = artifact_dir
+        artifacts = load_model_artifacts(path)
+        files = artifacts['manifest']['files']
+
+        assert files['xgboost']['path'] == 'xgboost.ubj'
+        assert files['catboost']['path'] == 'catboost.cbm'
+        assert files['random_forest']['path'] == 'random_forest.joblib'
+        assert artifacts['manifest']['feature_schema']['features'] == ['a', 'b', 'c', 'd']
+
+        for name, model in objects.items():
+            np.testing.assert_array_equal(artifacts['objects'][name].predict(X), model.predict(X))
+
+        scored = ensemble_from_artifacts(artifacts).score(X)
+        expected = np.average(
+            np.column_stack([model.predict(X) for model in objects.values()]),
+            axis=1, weights=[1, 2, 1]
+        )
+        np.testing.assert_allclose(scored['prediction'], expected, rtol=1e-12)
+
+    def test_truncated_file_detected_before_load(self, artifact_dir, monkeypatch):
+        """Test file terpotong ditolak sebelum joblib.load dipanggil"""
+        import prediction_system as ps_module
+        from prediction_system import load_model_artifacts, ModelArtifactError
+
+        path, _, _ = artifact_dir
+        target = path / 'random_forest.joblib'
+        target.write_bytes(target.read_bytes()[:-100])
+
+        def fail_load(*args, **kwargs):
+            raise AssertionError("joblib.load tidak boleh dipanggil")
+        monkeypatch.setattr(ps_module.joblib, 'load', fail_load)
+
+        with pytest.raises(ModelArtifactError, match='terpotong'):
+            load_model_artifacts(path)
+
+    def test_checksum_mismatch_detected(self, artifact_dir):
+        """Test file berubah dengan ukuran sama ditolak lewat sha256"""
+        from prediction_system import load_model_artifacts, ModelArtifactError
+
+        path, _, _ = artifact_dir
+        target = path / 'catboost.cbm'
+        data = bytearray(target.read_bytes())
+        data[-1] ^= 0xFF
+        target.write_bytes(bytes(data))
+
+        with pytest.raises(ModelArtifactError, match='Checksum'):
+            load_model_artifacts(path)
+
+    def test_prediction_system_prefers_artifacts(self, tmp_path):
+        """Test folder artefak dipakai dan hasil prediksi sama dengan pickle lama"""
+        from prediction_system import save_model_artifacts, ModelIndex
+
+        source = Path(__file__).parent.parent / "model" / "tanah"
+        if not source.exists():
+            pytest.skip("Model tanah tidak tersedia")
+        copy_model_dir(source, tmp_path / "tanah")
+
+        legacy = PredictionSystem(model_base_path=tmp_path, enable_cache=False)
+        components = legacy._read_pickle_components('tanah', legacy.model_index('tanah').active_entry())
+        timestamp = components['metadata']['model_info']['timestamp']
+        save_model_artifacts(
+            tmp_path / "tanah" / timestamp,
+            {'model': components['model'], 'scaler': components['scaler'],
+             'encoders': components['encoders']},
+            components['features'], components['encoders'],
+            metadata=components['metadata']
+        )
+        ModelIndex(tmp_path / "tanah").register(timestamp)
+
+        system = PredictionSystem(model_base_path=tmp_path, enable_cache=False)
+        assert system.model_index('tanah').active_entry()['format'] == 'artifact'
+
+        expected = legacy.predict_land_price(dict(TestPredictionCache.LAND_INPUT))
+        result = system.predict_land_price(dict(TestPredictionCache.LAND_INPUT))
+        assert result['prediction_value'] == expected['prediction_value']
+        assert system.get_model_status()['tanah']['timestamp'] == timestamp
+
+
+class TestSQLitePredictionCache:
+    """Test cases for shared SQLite cache backend"""
+
+    def test_entries_shared_between_instances(self, tmp_path):
+        """Test two cache instances (two workers) see the same entries"""
+        db_path = tmp_path / "cache.sqlite3"
+        worker_a = SQLitePredictionCache(db_path)
+        worker_b = SQLitePredictionCache(db_path)
+
+        worker_a.set({'kecamatan': 'Gubeng'}, {'prediction_value': 1.5})
+
+        assert worker_b.get({'kecamatan': 'Gubeng'}) == {'prediction_value': 1.5}
+
+    def test_generation_bump_invalidates(self, tmp_path):
+        """Test bump_generation invalidates entries for every instance"""
+        db_path = tmp_path / "cache.sqlite3"
+        worker_a = SQLitePredictionCache(db_path)
+        worker_b = SQLitePredictionCache(db_path)
+
+        worker_a.set({'kecamatan': 'Gubeng'}, {'prediction_value': 1.5})
+        worker_b.bump_generation()
+
+        assert worker_a.get({'kecamatan': 'Gubeng'}) is None
+        assert worker_a.get_stats()['generation'] == 1
+
+    def test_size_bounded_eviction(self, tmp_path):
+        """Test least recently used entries are evicted beyond max_size"""
+        cache = SQLitePredictionCache(tmp_path / "cache.sqlite3", max_size=2)
+
+        cache.set({'i': 1}, {'v': 1})
+        cache.set({'i': 2}, {'v': 2})
+        cache.set({'i': 3}, {'v': 3})
+
+        assert cache.get_stats()['size'] == 2
+        assert cache.get({'i': 1}) is None
+        assert cache.get({'i': 3}) == {'v': 3}
+
+
+class TestModelRegistry:
+    """Test cases for lazy model loading"""
+
+    def test_concurrent_first_use_loads_once(self):
+        """Test concurrent first requests share a single load per type"""
+        import threading
+        from prediction_system import ModelRegistry
+
+        calls = []
+
+        def slow_loader(model_type):
+            calls.append(model_type)
+            time.sleep(0.2)
+            return {'type': model_type}
+
+        registry = ModelRegistry(slow_loader, ['tanah', 'bangunan'])
+        assert registry.status('tanah') == 'not_loaded'
+
+        threads = [threading.Thread(target=lambda: registry['tanah']) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert calls == ['tanah']
+        assert registry.status('tanah') == 'loaded'
+        assert registry.status('bangunan') == 'not_loaded'
+
+    def test_failed_load_is_remembered(self):
+        """Test missing models are not reloaded on every request until clear()"""
+        from prediction_system import ModelRegistry
+
+        calls = []
+        registry = ModelRegistry(lambda t: calls.append(t), ['tanah'])
+
+        assert 'tanah' not in registry
+        assert 'tanah' not in registry
+        assert registry.status('tanah') == 'failed'
+        assert len(calls) == 1
+
+        registry.clear()
+        assert 'tanah' not in registry
+        assert len(calls) == 2
+
+    def test_reload_serves_old_version_until_swap(self):
+        """Test requests selama reload tetap mendapat versi lama, tidak pernah kosong"""
+        import threading
+        from prediction_system import ModelRegistry
+
+        versions = iter(['v1', 'v2'])
+        loading = threading.Event()
+
+        def loader(model_type):
+            version = next(versions)
+            if version == 'v2':
+                loading.set()
+                time.sleep(0.2)
+            return {'version': version}
+
+        registry = ModelRegistry(loader, ['tanah'])
+        assert registry['tanah']['version'] == 'v1'
+
+        thread = threading.Thread(target=registry.reload, args=('tanah',))
+        thread.start()
+        loading.wait()
+        seen = []
+        while thread.is_alive():
+            entry = registry.get('tanah')
+            seen.append(None if entry is None else entry['version'])
+        thread.join()
+
+        assert seen[0] == 'v1'
+        assert None not in seen
+        assert registry['tanah']['version'] == 'v2'
+
+    def test_failed_validation_keeps_old_version(self):
+        """Test versi baru yang gagal smoke test tidak dipublish"""
+        from prediction_system import ModelRegistry
+
+        versions = iter(['v1', 'broken'])
+
+        def validator(model_type, entry):
+            if entry['version'] == 'broken':
+                raise ValueError('smoke prediction gagal')
+
+        registry = ModelRegistry(lambda t: {'version': next(versions)}, ['tanah'], validator=validator)
+        assert registry['tanah']['version'] == 'v1'
+
+        assert registry.reload('tanah') == False
+        assert registry['tanah']['version'] == 'v1'
+
+    def test_pointer_change_triggers_swap(self):
+        """Test perubahan signature CURRENT memicu swap di background"""
+        from prediction_system import ModelRegistry
+
+        pointer = {'tanah': 1}
+        versions = iter(['v1', 'v2'])
+        registry = ModelRegistry(
+            lambda t: {'version': next(versions)}, ['tanah'],
+            watch=lambda t: pointer[t], watch_interval=0.01
+        )
+        assert registry['tanah']['version'] == 'v1'
+
+        pointer['tanah'] = 2
+        deadline = time.time() + 5
+        while registry['tanah']['version'] != 'v2' and time.time() < deadline:
+            time.sleep(0.02)
+
+        assert registry['tanah']['version'] == 'v2'
+        assert registry.swap_count == 1
+
+    def test_old_version_released_when_idle(self):
+        """Test versi lama dilepas setelah request terakhir yang memakainya selesai"""
+        import gc
+        from prediction_system import ModelRegistry, ModelVersion
+
+        versions = iter(['v1', 'v2'])
+        registry = ModelRegistry(lambda t: ModelVersion(version=next(versions)), ['tanah'])
+
+        in_flight = registry['tanah']
+        registry.reload('tanah')
+        assert in_flight['version'] == 'v1'
+        assert registry.retired_in_use() == 1
+
+        del in_flight
+        gc.collect()
+        assert registry.retired_in_use() == 0
+
+    def test_prediction_system_follows_current_pointer(self, tmp_path, monkeypatch):
+        """Test PredictionSystem memuat versi yang dipublish ke CURRENT"""
+        from prediction_system import save_model_artifacts, publish_model_version, ModelIndex
+
+        source = Path(__file__).parent.parent / "model" / "tanah"
+        if not source.exists():
+            pytest.skip("Model tanah tidak tersedia")
+        copy_model_dir(source, tmp_path / "tanah")
+
+        legacy = PredictionSystem(model_base_path=tmp_path)
+        components = legacy._read_pickle_components('tanah', legacy.model_index('tanah').active_entry())
+        for version in ['20250101_000000', '20250201_000000']:
+            save_model_artifacts(
+                tmp_path / "tanah" / version,
+                {'model': components['model'], 'scaler': components['scaler'],
+                 'encoders': components['encoders']},
+                components['features'], components['encoders'],
+                metadata=components['metadata']
+            )
+            ModelIndex(tmp_path / "tanah").register(version, activate=False)
+        publish_model_version(tmp_path / "tanah", '20250101_000000')
+
+        monkeypatch.setenv('PREDICTION_MODEL_WATCH_INTERVAL', '0.01')
+        system = PredictionSystem(model_base_path=tmp_path, enable_cache=False)
+        assert system.models['tanah']['version'] == '20250101_000000'
+
+        publish_model_version(tmp_path / "tanah", '20250201_000000')
+        deadline = time.time() + 5
+        while system.models['tanah']['version'] != '20250201_000000' and time.time() < deadline:
+            time.sleep(0.02)
+
+        assert system.models['tanah']['version'] == '20250201_000000'
+        result = system.predict_land_price(dict(TestPredictionCache.LAND_INPUT))
+        assert result['model_info']['version'] == '20250201_000000'
+
+    def test_init_does_not_load_models(self):
+        """Test PredictionSystem() is cheap and status works without loading"""
+        system = PredictionSystem(enable_cache=False)
+
+        assert system.models.status('tanah') == 'not_loaded'
+        status = system.get_model_status()
+        assert system.models.status('tanah') == 'not_loaded'
+
+        if status['tanah']['available']:
+            assert status['tanah']['loaded'] == False
+            assert 'tanah' in system.models
+            assert system.get_model_status()['tanah']['loaded'] == True
+
+
+class TestModelIndex:
+    """Test cases for per-type model index (registry.json)"""
+
+    @pytest.fixture
+    def legacy_dir(self, tmp_path):
+        """Folder pickle lama dengan dua versi + file tanpa timestamp"""
+        model_dir = tmp_path / "tanah"
+        model_dir.mkdir()
+        for version in ['20250101_000000', '20250201_000000']:
+            for name in ['rental_price_model', 'scaler', 'features', 'encoders']:
+                (model_dir / f"{name}_{version}.pkl").write_bytes(b'')
+            (model_dir / f"metadata_{version}.json").write_text(
+                json.dumps({'performance': {'test_r2': 0.9}})
+            )
+        # Ditulis OptimizedModelTrainer di folder yang sama
+        (model_dir / "label_encoders_tanah.pkl").write_bytes(b'')
+        (model_dir / "performance_metrics_tanah.json").write_text('{}')
+        return model_dir
+
+    def test_bootstrap_ignores_untimestamped_files(self, legacy_dir):
+        """Test scan awal hanya mendaftarkan set file bertimestamp; read tidak menulis index"""
+        from prediction_system import ModelIndex, MODEL_INDEX_FILE, MODEL_POINTER_FILE
+
+        data = ModelIndex(legacy_dir).read()
+        assert not (legacy_dir / MODEL_INDEX_FILE).exists()
+        assert not (legacy_dir / MODEL_POINTER_FILE).exists()
+
+        written = ModelIndex(legacy_dir).bootstrap()
+        assert (written['active'], list(written['versions'])) == (data['active'], list(data['versions']))
+
+        assert list(data['versions']) == ['20250101_000000', '20250201_000000']
+        assert data['active'] == '20250201_000000'
+        entry = data['versions']['20250201_000000']
+        assert entry['files']['rental_price_model'] == 'rental_price_model_20250201_000000.pkl'
+        assert entry['metrics'] == {'test_r2': 0.9}
+        assert (legacy_dir / MODEL_INDEX_FILE).exists()
+
+    def test_read_does_not_scan_directory(self, legacy_dir, monkeypatch):
+        """Test setelah index ada, loader tidak lagi scan folder dan hasil parse di-cache"""
+        from prediction_system import ModelIndex
+
+        ModelIndex(legacy_dir).bootstrap()
+        monkeypatch.setattr(ModelIndex, 'scan', lambda self: pytest.fail('folder di-scan'))
+        loads = []
+        original_load = json.load
+        monkeypatch.setattr(json, 'load', lambda f: loads.append(1) or original_load(f))
+
+        for _ in range(100):
+            assert ModelIndex(legacy_dir).active_entry()['version'] == '20250201_000000'
+        assert len(loads) == 0
+
+        ModelIndex(legacy_dir).register('20250301_000000')
+        assert ModelIndex(legacy_dir).active_entry()['version'] == '20250301_000000'
+
+    def test_unindexed_scan_cached_until_folder_changes(self, legacy_dir, monkeypatch):
+        """Test tanpa registry.json, hasil scan di-cache di memori sampai folder berubah"""
+        from prediction_system import ModelIndex
+
+        assert ModelIndex(legacy_dir).active_entry()['version'] == '20250201_000000'
+        scans = []
+        original_scan = ModelIndex.scan
+        monkeypatch.setattr(ModelIndex, 'scan', lambda self: scans.append(1) or original_scan(self))
+        for _ in range(10):
+            ModelIndex(legacy_dir).read()
+        assert scans == []
+
+        (legacy_dir / "20250301_000000").mkdir()
+        (legacy_dir / "20250301_000000" / "manifest.json").write_text('{}')
+        assert ModelIndex(legacy_dir).read()['active'] == '20250301_000000'
+        assert scans == [1]
+
+    def test_pin_and_rollback(self, legacy_dir):
+        """Test versi di-pin tidak diganti training baru, rollback ke versi sebelumnya"""
+        from prediction_system import ModelIndex, read_model_pointer
+
+        index = ModelIndex(legacy_dir)
+        index.register('20250301_000000', metrics={'test_r2': 0.8})
+        assert read_model_pointer(legacy_dir) == '20250301_000000'
+
+        index.rollback()
+        assert index.read()['active'] == '20250201_000000'
+        assert index.read()['pinned'] == True
+        assert read_model_pointer(legacy_dir) == '20250201_000000'
+
+        index.register('20250401_000000')
+        index.promote_latest()
+        assert index.read()['active'] == '20250201_000000'
+        assert list(index.versions())[-1] == '20250401_000000'
+
+        index.unpin()
+        index.promote_latest()
+        assert index.read()['active'] == '20250401_000000'
+
+        with pytest.raises(ValueError):
+            index.activate('20990101_000000')
+
+    def test_concurrent_registrations_are_kept(self, legacy_dir):
+        """Test register dari beberapa thread tidak saling menimpa (lock + tulis atomic)"""
+        import threading
+        from prediction_system import ModelIndex
+
+        ModelIndex(legacy_dir).read()
+        versions = [f"202506{day:02d}_000000" for day in range(1, 13)]
+        threads = [
+            threading.Thread(target=ModelIndex(legacy_dir).register, args=(version,))
+            for version in versions
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert set(versions) <= set(ModelIndex(legacy_dir).versions())
+
+
 class TestModelStatus:
     """Test cases for model status reporting"""
     
@@ -0,0 +1,212 @@
+"""
+Tests for Shared Preprocessing Pipeline
+=======================================
+
+Memastikan pipeline yang di-fit saat training dan disimpan bersama model
+menghasilkan matriks fitur yang sama persis saat serving (endpoint jual),
+baik per baris maupun batch.
+
+Run tests:
+    python -m pytest tests/test_preprocessing.py -v
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+from sklearn.preprocessing import LabelEncoder
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import routes_jual_prediction
+from auto_model_trainer_jual import AutoModelTrainerJual
+from prediction_system import ModelRegistry
+from preprocessing import PreprocessingPipeline, UnknownCategoryError
+
+CATEGORICAL = ['Kecamatan', 'Sertifikat', 'Jenis Zona', 'Aksesibilitas', 'Tingkat Keamanan']
+
+# Field JSON endpoint -> kolom training
+JSON_FIELDS = {
+    'kecamatan': 'Kecamatan',
+    'sertifikat': 'Sertifikat',
+    'luas_tanah': 'Luas Tanah (M²)',
+    'jenis_zona': 'Jenis Zona',
+    'aksesibilitas': 'Aksesibilitas',
+    'tingkat_keamanan': 'Tingkat Keamanan',
+    'kepadatan_penduduk': 'Kepadatan_Penduduk',
+    'jarak_ke_pusat': 'Jarak ke Pusat Kota (km)'
+}
+
+
+def make_tanah_frame(n=150, seed=0):
+    rng = np.random.RandomState(seed)
+    kecamatan = rng.choice(['Gubeng', 'Rungkut', 'Sukolilo'], n)
+    df = pd.DataFrame({
+        'Kecamatan': kecamatan,
+        'Sertifikat': rng.choice(['SHM', 'HGB'], n),
+        'Luas Tanah (M²)': rng.uniform(100, 1000, n).round(1),
+        'Jenis Zona': rng.choice(['Komersial', 'Perumahan'], n),
+        'Aksesibilitas': rng.choice(['Baik', 'Buruk'], n),
+        'Tingkat Keamanan': rng.choice(['tinggi', 'rendah'], n),
+        # Kepadatan tetap per kecamatan (seperti data asli)
+        'Kepadatan_Penduduk': pd.Series(kecamatan).map(
+            {'Gubeng': 120000, 'Rungkut': 90000, 'Sukolilo': 60000}
+        ),
+        'Jarak ke Pusat Kota (km)': rng.uniform(1, 20, n).round(2)
+    })
+    df[AutoModelTrainerJual.TARGET_COL] = 5e6 * df['Luas Tanah (M²)'] + rng.normal(0, 1e8, n)
+    return df
+
+
+def as_json(row):
+    """Satu baris training -> payload JSON endpoint /predict-tanah"""
+    return {
+        field: (row[col].item() if hasattr(row[col], 'item') else row[col])
+        for field, col in JSON_FIELDS.items()
+    }
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    """Model jual tanah hasil AutoModelTrainerJual (satu kali per modul)"""
+    root = tmp_path_factory.mktemp('jual_project')
+    df = make_tanah_frame()
+    csv_path = root / 'jual_tanah.csv'
+    df.to_csv(csv_path, index=False)
+
+    trainer = AutoModelTrainerJual(root)
+    result = trainer.train_models_from_files(tanah_file_path=str(csv_path))
+    assert result['errors'] == []
+    return root, trainer, df
+
+
+@pytest.fixture
+def client(trained, monkeypatch):
+    root, _, _ = trained
+    monkeypatch.setattr(routes_jual_prediction, 'TANAH_MODEL_PATH', str(root / 'model' / 'jual_tanah'))
+    monkeypatch.setattr(routes_jual_prediction, 'jual_models', ModelRegistry(
+        routes_jual_prediction.load_jual_models, ['tanah', 'bangunan'],
+        validator=routes_jual_prediction.validate_jual_models
+    ))
+    assert routes_jual_prediction.load_tanah_models()
+
+    app = Flask(__name__)
+    app.register_blueprint(routes_jual_prediction.jual_prediction_bp)
+    return app.test_client()
+
+
+class TestTrainServeParity:
+    """Test cases for the pipeline saved by training and executed by serving"""
+
+    def test_saved_pipeline_reproduces_training_matrix(self, trained, client):
+        _, trainer, df = trained
+        X_train = trainer.build_pipeline('jual_tanah').fit(df).transform(df)
+
+        pipeline = routes_jual_prediction.jual_models.get('tanah')['preprocessing']
+        assert pipeline is not None
+        assert np.array_equal(pipeline.transform(df), X_train)
+
+        # Jalur satu baris (dipakai endpoint) identik dengan batch
+        rows = np.vstack([pipeline.transform_row(row) for row in df.to_dict('records')])
+        assert np.array_equal(rows, X_train)
+
+    def test_endpoint_prediction_matches_training_encoding(self, trained, client):
+        _, trainer, df = trained
+        models = routes_jual_prediction.jual_models.get('tanah')
+        X_train = trainer.build_pipeline('jual_tanah').fit(df).transform_frame(df)
+
+        for i in (0, 7, 42):
+            response = client.post('/jual-prediction/predict-tanah', json=as_json(df.iloc[i]))
+            assert response.status_code == 200
+            expected = models['ensemble'].score(X_train.iloc[[i]])['prediction'][0]
+            assert response.get_json()['prediction'] == pytest.approx(float(expected), rel=1e-12)
+
+    def test_kepadatan_filled_from_kecamatan(self, trained, client):
+        _, _, df = trained
+        payload = as_json(df.iloc[3])
+        with_density = client.post('/jual-prediction/predict-tanah', json=payload).get_json()
+
+        del payload['kepadatan_penduduk']
+        response = client.post('/jual-prediction/predict-tanah', json=payload)
+        assert response.status_code == 200
+        assert response.get_json()['prediction'] == with_density['prediction']
+
+    def test_unknown_category_rejected(self, trained, client):
+        _, _, df = trained
+        payload = as_json(df.iloc[0])
+        payload['sertifikat'] = 'Girik'
+
+        response = client.post('/jual-prediction/predict-tanah', json=payload)
+        assert response.status_code == 400
+        assert 'Invalid value for Sertifikat' in response.get_json()['error']
+
+
+class TestPreprocessingPipeline:
+    """Test cases for fit / encoding / serialization"""
+
+    def test_codes_match_label_encoder(self):
+        df = make_tanah_frame(60)
+        features = list(df.columns.drop(AutoModelTrainerJual.TARGET_COL))
+        pipeline = PreprocessingPipeline(features, CATEGORICAL).fit(df)
+
+        X = pipeline.transform_frame(df)
+        for col in CATEGORICAL:
+            expected = LabelEncoder().fit_transform(df[col].astype(str))
+            assert np.array_equal(X[col].to_numpy(), expected)
+            assert list(pipeline.encoders()[col].classes_) == sorted(df[col].unique())
+
+    def test_pickle_roundtrip_recompiles(self):
+        df = make_tanah_frame(60)
+        features = list(df.columns.drop(AutoModelTrainerJual.TARGET_COL))
+        pipeline = PreprocessingPipeline(
+            features, CATEGORICAL, kecamatan_columns=['Kepadatan_Penduduk']
+        ).fit(df)
+
+        state = pipeline.__getstate__()
+        assert '_codes' not in state and '_template' not in state
+
+        restored = pickle.loads(pickle.dumps(pipeline))
+        assert np.array_equal(restored.transform(df), pipeline.transform(df))
+        assert restored.kecamatan_constants == {
+            'Kepadatan_Penduduk': {'Gubeng': 120000, 'Rungkut': 90000, 'Sukolilo': 60000}
+        }
+
+    def test_kecamatan_fill_per_row_in_batch(self):
+        """Test batch campuran kecamatan dikenal/tidak dikenal sama dengan transform_row per baris"""
+        df = make_tanah_frame(60)
+        features = list(df.columns.drop(AutoModelTrainerJual.TARGET_COL))
+        pipeline = PreprocessingPipeline(
+            features, CATEGORICAL, kecamatan_columns=['Kepadatan_Penduduk'], unknown='fallback',
+            defaults={'Kepadatan_Penduduk': 75000}
+        ).fit(df)
+
+        rows = df.drop(columns=[AutoModelTrainerJual.TARGET_COL, 'Kepadatan_Penduduk']).iloc[:4].to_dict('records')
+        rows[1]['Kecamatan'] = 'Tegalsari'
+        batch = pipeline.transform(rows)
+        for position, row in enumerate(rows):
+            assert np.array_equal(batch[position], pipeline.transform_row(row)[0])
+
+        density = batch[:, features.index('Kepadatan_Penduduk')]
+        assert density[1] == 75000
+        assert density[0] == pipeline.kecamatan_constants['Kepadatan_Penduduk'][rows[0]['Kecamatan']]
+
+    def test_unknown_modes(self):
+        df = make_tanah_frame(60)
+        features = list(df.columns.drop(AutoModelTrainerJual.TARGET_COL))
+        row = df.iloc[0].to_dict()
+        row['Kecamatan'] = 'Tegalsari'
+
+        strict = PreprocessingPipeline(features, CATEGORICAL).fit(df)
+        with pytest.raises(UnknownCategoryError) as exc:
+            strict.transform_row(row)
+        assert exc.value.column == 'Kecamatan'
+        with pytest.raises(UnknownCategoryError):
+            strict.transform([row, df.iloc[1].to_dict()])
+
+        lenient = PreprocessingPipeline(features, CATEGORICAL, unknown='fallback').fit(df)
+        assert lenient.transform_row(row)[0, features.index('Kecamatan')] == 0
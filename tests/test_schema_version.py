@@ -0,0 +1,108 @@
+"""
+Tests for Schema Version Check at Boot
+======================================
+
+Memastikan DDL hanya dijalankan `flask db upgrade` (migrations/), sementara
+create_app() di setiap worker cukup membaca versi skema dengan satu SELECT.
+
+Run tests:
+    python -m pytest tests/test_schema_version.py -v
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Add parent directory to path
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app import create_app, db
+from app.database import check_schema_version, schema_head_revisions
+
+MODEL_TABLES = {
+    'rental_assets', 'rental_requests', 'admin_notifications',
+    'user_notifications', 'user_favorites', 'rental_transactions'
+}
+
+
+def flask_db_upgrade(database_url):
+    """Jalankan `flask db upgrade` (proses terpisah, seperti release step deploy)"""
+    result = subprocess.run(
+        [sys.executable, '-m', 'flask', 'db', 'upgrade'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120,
+        env=dict(os.environ, DATABASE_URL=database_url, PREDICTION_PRELOAD='0', PREDICTION_WARMUP='0')
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def table_names(db_path):
+    with sqlite3.connect(db_path) as connection:
+        return {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    db_path = tmp_path / 'app.db'
+    database_url = f"sqlite:///{db_path}"
+    monkeypatch.setenv('DATABASE_URL', database_url)
+    monkeypatch.delenv('PREDICTION_PRELOAD', raising=False)
+    monkeypatch.delenv('PREDICTION_WARMUP', raising=False)
+    return db_path, database_url
+
+
+class TestSchemaVersion:
+    """Test cases for boot-time version check vs explicit migration"""
+
+    def test_boot_does_not_create_tables(self, database):
+        db_path, _ = database
+        app = create_app()
+
+        with app.app_context():
+            schema = check_schema_version()
+        assert schema == {
+            'current': None, 'head': sorted(schema_head_revisions()), 'up_to_date': False
+        }
+        assert table_names(db_path) == set()
+
+    def test_upgrade_then_boot_runs_single_select(self, database):
+        db_path, database_url = database
+        flask_db_upgrade(database_url)
+        assert {'users', 'pengajuan_sewa', 'alembic_version'} | MODEL_TABLES <= table_names(db_path)
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, 'before_cursor_execute', record)
+        try:
+            app = create_app()
+        finally:
+            event.remove(Engine, 'before_cursor_execute', record)
+
+        assert statements == ['SELECT version_num FROM alembic_version']
+        with app.app_context():
+            assert check_schema_version()['up_to_date'] == True
+
+    def test_upgrade_adopts_tables_from_old_boot(self, database):
+        """Database lama (create_all saat boot) di-upgrade tanpa error, admin tidak dobel"""
+        db_path, database_url = database
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+        flask_db_upgrade(database_url)
+        flask_db_upgrade(database_url)
+
+        with sqlite3.connect(db_path) as connection:
+            admins = connection.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'").fetchone()[0]
+            version = connection.execute("SELECT version_num FROM alembic_version").fetchall()
+        assert admins == 1
+        assert {row[0] for row in version} == set(schema_head_revisions())
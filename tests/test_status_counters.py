@@ -0,0 +1,213 @@
+"""
+Tests for Status Counters
+=========================
+
+Memastikan tabel status_counters ikut berubah (dalam transaksi yang sama)
+saat RentalAsset / RentalRequest / RentalTransaction ditambah, diubah
+statusnya atau dihapus, dan reconcile membangun ulang counter yang drift.
+
+Run tests:
+    python -m pytest tests/test_status_counters.py -v
+"""
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app, db
+from app.models_sqlalchemy import RentalAsset, RentalRequest
+from app.models_rental_transaction import RentalTransaction
+from app.status_counters import reconcile_status_counters, status_count, status_counts, total_count
+
+
+def make_asset(name, status='available'):
+    return RentalAsset(
+        name=name, asset_type='tanah', kecamatan='Coblong', alamat='Jl. Test',
+        luas_tanah=100, njop_per_m2=1000000, harga_sewa=5000000,
+        sertifikat='SHM', jenis_zona='Perumahan', status=status
+    )
+
+
+def make_request(asset, status=None):
+    return RentalRequest(
+        asset_id=asset.id, nama_penyewa='Penyewa', email='p@test.com', telepon='08123',
+        durasi_sewa=6, tanggal_mulai=date.today(), status=status
+    )
+
+
+@pytest.fixture
+def app_context(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'app.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+class TestStatusCounterListeners:
+    """Test cases for insert / update / delete listeners"""
+
+    def test_insert_update_delete(self, app_context):
+        assets = [make_asset('A'), make_asset('B'), make_asset('C', 'maintenance')]
+        db.session.add_all(assets)
+        db.session.commit()
+        assert status_counts(RentalAsset) == {'available': 2, 'maintenance': 1}
+
+        assets[0].status = 'rented'
+        assets[1].name = 'B2'  # perubahan non-status tidak menyentuh counter
+        db.session.commit()
+        assert status_counts(RentalAsset) == {'available': 1, 'rented': 1, 'maintenance': 1}
+
+        db.session.delete(assets[2])
+        db.session.commit()
+        assert status_counts(RentalAsset) == {'available': 1, 'rented': 1, 'maintenance': 0}
+        assert total_count(RentalAsset) == 2
+
+    def test_status_loaded_after_commit_expiry(self, app_context):
+        asset = make_asset('A')
+        db.session.add(asset)
+        db.session.commit()
+
+        # Setelah commit atribut expired; nilai lama tetap dimuat sebelum di-set
+        asset.status = 'reserved'
+        db.session.commit()
+        assert status_counts(RentalAsset) == {'available': 0, 'reserved': 1}
+
+    def test_defaults_and_rollback(self, app_context):
+        asset = make_asset('A')
+        db.session.add(asset)
+        db.session.flush()
+        db.session.add(make_request(asset))
+        db.session.commit()
+        # Default kolom (status='pending') ikut terhitung
+        assert status_counts(RentalRequest) == {'pending': 1}
+
+        asset.status = 'rented'
+        db.session.add(make_asset('B'))
+        db.session.flush()
+        db.session.rollback()
+        assert status_counts(RentalAsset) == {'available': 1}
+
+    def test_transactions_counted(self, app_context):
+        asset = make_asset('A', 'rented')
+        db.session.add(asset)
+        db.session.flush()
+        rental_request = make_request(asset, 'active')
+        db.session.add(rental_request)
+        db.session.flush()
+        today = date.today()
+        transaction = RentalTransaction(
+            rental_request_id=rental_request.id, user_id=1, asset_id=asset.id,
+            start_date=today, end_date=today + timedelta(days=180), current_end_date=today + timedelta(days=180),
+            monthly_price=5000000, total_months=6, remaining_amount=0
+        )
+        db.session.add(transaction)
+        db.session.commit()
+        assert status_count(RentalTransaction, 'active') == 1
+
+        transaction.status = 'completed'
+        db.session.commit()
+        assert status_counts(RentalTransaction) == {'active': 0, 'completed': 1}
+
+
+class TestReconcile:
+    """Test cases for rebuilding counters from scratch"""
+
+    def test_reconcile_fixes_drift(self, app_context):
+        db.session.add_all([make_asset('A'), make_asset('B'), make_asset('C')])
+        db.session.commit()
+
+        # Bulk update / SQL mentah tidak melewati listener
+        RentalAsset.query.filter_by(name='A').update({'status': 'rented'})
+        db.session.execute(text("DELETE FROM rental_assets WHERE name = 'C'"))
+        db.session.commit()
+        assert status_counts(RentalAsset) == {'available': 3}
+
+        corrections = reconcile_status_counters()
+        assert corrections['rental_assets']['available'] == {'counter': 3, 'actual': 1}
+        assert corrections['rental_assets']['rented'] == {'counter': None, 'actual': 1}
+        assert status_counts(RentalAsset) == {
+            'available': 1, 'rented': 1, 'maintenance': 0, 'reserved': 0
+        }
+        assert status_count(RentalRequest, 'pending') == 0
+        assert reconcile_status_counters() == {}
+
+    def test_cli_command(self, app_context):
+        db.session.add(make_asset('A'))
+        db.session.commit()
+        db.session.execute(text("DELETE FROM status_counters"))
+        db.session.commit()
+
+        runner = app_context.test_cli_runner()
+        result = runner.invoke(args=['reconcile-status-counters'])
+        assert result.exit_code == 0
+        assert '[FIX] rental_assets.available: None -> 1' in result.output
+        assert 'sudah sesuai' in runner.invoke(args=['reconcile-status-counters']).output
+
+
+class TestCountEndpoints:
+    """Test cases for endpoints reading status_counters"""
+
+    def test_rental_request_count_reads_counters(self, app_context):
+        asset = make_asset('A')
+        db.session.add(asset)
+        db.session.flush()
+        db.session.add_all([make_request(asset), make_request(asset), make_request(asset, 'approved')])
+        db.session.commit()
+
+        client = app_context.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = 1
+            session['role'] = 'admin'
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, 'before_cursor_execute', record)
+        try:
+            payload = client.get('/api/admin/rental-request-count').get_json()
+        finally:
+            event.remove(Engine, 'before_cursor_execute', record)
+
+        assert payload['data'] == {
+            'pending': 2, 'approved': 1, 'rejected': 0, 'active': 0, 'completed': 0, 'total': 3
+        }
+        assert len(statements) == 1 and 'status_counters' in statements[0]
+
+        assert client.get('/rental/api/stats').get_json()['stats']['available_assets'] == 1
+        reconciled = client.post('/api/admin/status-counters/reconcile').get_json()
+        assert reconciled == {'success': True, 'corrections': {}}
+
+    def test_force_delete_keeps_counters(self, app_context):
+        asset = make_asset('A', 'rented')
+        db.session.add_all([asset, make_asset('B')])
+        db.session.flush()
+        rental_request = make_request(asset, 'active')
+        db.session.add_all([rental_request, make_request(asset)])
+        db.session.flush()
+        today = date.today()
+        db.session.add(RentalTransaction(
+            rental_request_id=rental_request.id, user_id=1, asset_id=asset.id,
+            start_date=today, end_date=today + timedelta(days=180), current_end_date=today + timedelta(days=180),
+            monthly_price=5000000, total_months=6, remaining_amount=0
+        ))
+        db.session.commit()
+        asset_id = asset.id
+
+        response = app_context.test_client().delete(f'/rental/api/assets/{asset_id}/force-delete')
+        assert response.get_json()['success'] == True
+
+        assert status_counts(RentalAsset) == {'available': 1, 'rented': 0}
+        assert status_counts(RentalRequest) == {'active': 0, 'pending': 0}
+        assert status_counts(RentalTransaction) == {'active': 0}
+        assert reconcile_status_counters() == {}
@@ -0,0 +1,273 @@
+"""
+Tests for Background Training Job Queue
+=======================================
+
+Memastikan upload langsung mengembalikan job id, klaim job atomic dengan
+batas job paralel global, serta progress, cancel dan deteksi crash proses
+training.
+
+Run tests:
+    python -m pytest tests/test_training_jobs.py -v
+"""
+
+import io
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import training_jobs
+from training_jobs import TrainingJobQueue, TrainingJobRunner, run_job
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return TrainingJobQueue(tmp_path / "jobs.sqlite3")
+
+
+class CommandRunner(TrainingJobRunner):
+    """Runner dengan proses pengganti (tanpa training sungguhan)"""
+
+    def __init__(self, queue, code, **kwargs):
+        super().__init__(queue, **kwargs)
+        self.code = code
+
+    def _spawn(self, job):
+        return subprocess.Popen([sys.executable, '-c', self.code])
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.05)
+    return predicate()
+
+
+class TestTrainingJobQueue:
+    """Test cases for SQLite job queue"""
+
+    def test_claim_respects_global_limit(self, tmp_path, queue):
+        """Test dua instance (dua worker) tidak melebihi max_running"""
+        other_worker = TrainingJobQueue(tmp_path / "jobs.sqlite3")
+        first = queue.submit('jual', [('jual_tanah', 'a.csv')])
+        second = queue.submit('jual', [('jual_tanah', 'b.csv')])
+
+        assert queue.claim(max_running=1)['id'] == first
+        assert other_worker.claim(max_running=1) is None
+        assert other_worker.claim(max_running=2)['id'] == second
+        assert queue.get(first)['files'] == [['jual_tanah', 'a.csv']]
+
+    def test_cancel_queued_and_running(self, queue):
+        """Test job queued langsung batal, job running ditandai untuk dihentikan"""
+        running = queue.submit('jual', [])
+        queued = queue.submit('jual', [])
+        queue.claim()
+
+        assert queue.cancel(queued)['status'] == 'cancelled'
+        assert queue.claim(max_running=5) is None
+
+        job = queue.cancel(running)
+        assert job['status'] == 'running'
+        assert job['cancel_requested'] == True
+        assert queue.update_progress(running, 0.5, 'Training XGBoost') == True
+        assert queue.get(running)['progress'] == 0.5
+
+    def test_unknown_kind_rejected(self, queue):
+        with pytest.raises(ValueError):
+            queue.submit('unknown', [])
+
+
+class TestRunJob:
+    """Test cases for job execution in the training process"""
+
+    @pytest.fixture
+    def fake_trainer(self, monkeypatch):
+        module = types.ModuleType('fake_trainer')
+        module.calls = []
+
+        def train(files, progress=None):
+            module.calls.append(files)
+            for step in range(4):
+                progress(step / 4, f'step {step}')
+            return {'success': True, 'models_trained': [], 'errors': [], 'timestamp': 'x'}
+
+        module.train = train
+        monkeypatch.setitem(sys.modules, 'fake_trainer', module)
+        monkeypatch.setitem(training_jobs.JOB_KINDS, 'jual', ('fake_trainer', 'train', []))
+        return module
+
+    def test_success_records_result(self, queue, fake_trainer):
+        job_id = queue.submit('jual', [('jual_tanah', 'a.csv')])
+        queue.claim()
+
+        assert run_job(queue, job_id) == 'succeeded'
+        job = queue.get(job_id)
+        assert job['status'] == 'succeeded'
+        assert job['progress'] == 1.0
+        assert job['result']['published_versions'] == {}
+        assert fake_trainer.calls == [[('jual_tanah', 'a.csv')]]
+
+    def test_options_passed_to_trainer(self, queue, fake_trainer, monkeypatch):
+        calls = []
+
+        def train(files, progress=None, incremental=None):
+            calls.append(incremental)
+            return {'success': True}
+
+        monkeypatch.setattr(fake_trainer, 'train', train)
+        job_id = queue.submit('jual', [], {'incremental': False})
+        assert queue.get(job_id)['options'] == {'incremental': False}
+        queue.claim()
+
+        assert run_job(queue, job_id) == 'succeeded'
+        assert calls == [False]
+
+    def test_cancel_stops_between_steps(self, queue, fake_trainer, monkeypatch):
+        """Test cancel dicek di laporan progress dan tidak tertelan except Exception trainer"""
+        def train(files, progress=None):
+            try:
+                progress(0.1, 'step')
+                queue.cancel(job_id)
+                progress(0.2, 'step')
+            except Exception:
+                pytest.fail('cancel tertangkap sebagai error biasa')
+            return {'success': True}
+
+        monkeypatch.setattr(fake_trainer, 'train', train)
+        job_id = queue.submit('jual', [])
+        queue.claim()
+
+        assert run_job(queue, job_id) == 'cancelled'
+        assert queue.get(job_id)['progress'] == 0.2
+
+
+class TestTrainingJobRunner:
+    """Test cases for dispatcher process handling"""
+
+    def test_cancel_terminates_process(self, queue):
+        runner = CommandRunner(queue, 'import time; time.sleep(60)')
+        job_id = queue.submit('jual', [])
+
+        runner.poll()
+        job = queue.get(job_id)
+        assert job['status'] == 'running'
+        process = runner._processes[job_id]
+        assert job['pid'] == process.pid
+
+        queue.cancel(job_id)
+        runner.poll()
+        assert process.poll() is not None
+        assert queue.get(job_id)['status'] == 'cancelled'
+
+    def test_crashed_process_marked_failed(self, queue):
+        runner = CommandRunner(queue, 'raise SystemExit(3)')
+        job_id = queue.submit('jual', [])
+
+        runner.poll()
+        assert wait_for(lambda: runner._processes[job_id].poll() is not None)
+        runner.poll()
+
+        job = queue.get(job_id)
+        assert job['status'] == 'failed'
+        assert 'kode 3' in job['error']
+
+    def test_orphaned_job_recovered(self, queue):
+        """Test job running dengan proses yang sudah mati tidak menahan antrian"""
+        job_id = queue.submit('jual', [])
+        queue.claim()
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        queue.set_pid(job_id, process.pid)
+
+        assert queue.recover_orphans() == 1
+        assert queue.get(job_id)['status'] == 'failed'
+
+    def test_orphan_of_other_runner_recovered_while_running(self, queue):
+        """Test job dari worker yang sudah di-recycle dan prosesnya crash tidak memblokir antrian"""
+        runner = CommandRunner(queue, 'import time; time.sleep(60)', orphan_check_interval=0)
+        runner.poll()
+
+        # Job diklaim runner lain yang kemudian hilang; proses anaknya crash
+        orphan_id = queue.submit('jual', [])
+        queue.claim()
+        process = subprocess.Popen([sys.executable, '-c', 'raise SystemExit(1)'])
+        process.wait()
+        queue.set_pid(orphan_id, process.pid)
+        job_id = queue.submit('jual', [])
+
+        runner.poll()
+        assert queue.get(orphan_id)['status'] == 'failed'
+        assert queue.get(job_id)['status'] == 'running'
+        runner._processes[job_id].kill()
+        runner._processes[job_id].wait()
+
+        runner = CommandRunner(queue, 'pass', orphan_check_interval=60)
+        runner.poll()
+        assert runner._last_orphan_check is not None
+        checked_at = runner._last_orphan_check
+        runner.poll()
+        assert runner._last_orphan_check == checked_at
+
+
+class TestRunnerStartup:
+    """Test cases for starting the dispatcher in every worker at boot"""
+
+    def test_post_fork_starts_runner(self, monkeypatch):
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(
+            'gunicorn_conf', Path(__file__).parent.parent / 'gunicorn.conf.py'
+        )
+        gunicorn_conf = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(gunicorn_conf)
+
+        started = []
+        monkeypatch.setattr(training_jobs, 'ensure_training_runner', lambda: started.append(True))
+        gunicorn_conf.post_fork(types.SimpleNamespace(log=None), types.SimpleNamespace(pid=1))
+        assert started == [True]
+
+    def test_external_runner_not_started(self, monkeypatch):
+        monkeypatch.setenv('TRAINING_JOB_RUNNER', 'external')
+        monkeypatch.setattr(training_jobs, '_runner', None)
+        assert training_jobs.ensure_training_runner() is None
+        assert training_jobs._runner is None
+
+
+class TestUploadEndpoint:
+    """Test cases for upload -> job id response"""
+
+    def test_upload_returns_job_id(self, tmp_path, queue, monkeypatch):
+        from app import routes_jual_prediction
+        from app.routes_prediction import prediction_bp
+
+        monkeypatch.setattr(training_jobs, '_queue', queue)
+        monkeypatch.setenv('TRAINING_JOB_RUNNER', 'external')
+
+        app = Flask(__name__)
+        app.root_path = str(tmp_path / "app")
+        app.register_blueprint(prediction_bp, url_prefix='/prediction')
+        app.register_blueprint(routes_jual_prediction.jual_prediction_bp)
+        client = app.test_client()
+
+        response = client.post(
+            '/jual-prediction/upload-dataset',
+            data={'jual_tanah_file': (io.BytesIO(b'Kecamatan\nGubeng\n'), 'tanah.csv')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 202
+        job_id = response.json['job_id']
+
+        status = client.get(response.json['results']['training']['status_url']).json
+        assert status['job']['status'] == 'queued'
+        assert status['job']['kind'] == 'jual'
+
+        cancelled = client.post(f'/prediction/training_jobs/{job_id}/cancel').json
+        assert cancelled['job']['status'] == 'cancelled'
+        assert client.get('/prediction/training_jobs/missing').status_code == 404
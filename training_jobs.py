@@ -0,0 +1,519 @@
+"""
+Background Training Job Queue
+=============================
+
+Training model (RandomizedSearchCV, refit VotingRegressor, dst.) tidak lagi
+berjalan di dalam HTTP request:
+
+- Upload menyimpan CSV lalu memanggil TrainingJobQueue.submit() dan langsung
+  mengembalikan job id
+- Antrian disimpan di SQLite (instance/training_jobs.sqlite3, WAL mode) sehingga
+  job tetap tercatat walau worker gunicorn restart dan terlihat dari semua worker
+- TrainingJobRunner (dispatcher thread di setiap worker, dimulai saat boot
+  oleh post_fork gunicorn / run.py, atau proses terpisah lewat
+  `python training_jobs.py worker`) mengklaim job secara atomic dan
+  menjalankan setiap job di proses Python tersendiri. Batas job paralel
+  (TRAINING_JOB_WORKERS) berlaku global untuk semua worker
+- Progress ditulis ke tabel job oleh proses training; cancel menghentikan
+  proses tersebut
+- Setelah training sukses, versi baru diaktifkan di index model
+  (ModelIndex) sehingga file CURRENT berubah dan semua worker melakukan
+  hot-swap lewat watch ModelRegistry
+
+Usage:
+    python training_jobs.py worker          # runner terpisah dari gunicorn
+    python training_jobs.py run <job_id>    # dipakai runner, satu job
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_DB_PATH = PROJECT_ROOT / "instance" / "training_jobs.sqlite3"
+
+JOB_KINDS = {
+    # kind -> (module trainer, fungsi, tipe model yang di-reload setelah sukses)
+    'rental': ('auto_model_trainer_optimized', 'auto_train_from_uploads', ['tanah', 'bangunan']),
+    'jual': ('auto_model_trainer_jual', 'auto_train_jual_from_uploads', ['jual_tanah', 'jual_bangunan'])
+}
+
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class TrainingJobCancelled(BaseException):
+    """
+    Dilempar dari callback progress saat job dibatalkan
+
+    Turunan BaseException agar tidak tertangkap `except Exception` di trainer
+    (yang mencatat error lalu lanjut ke tipe model berikutnya).
+    """
+
+
+class TrainingJobQueue:
+    """
+    Antrian job training berbasis SQLite (dipakai bersama semua worker)
+
+    Status job: queued -> running -> succeeded / failed / cancelled
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS training_jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " files TEXT NOT NULL,"
+                " options TEXT,"
+                " status TEXT NOT NULL,"
+                " progress REAL NOT NULL DEFAULT 0,"
+                " message TEXT,"
+                " result TEXT,"
+                " error TEXT,"
+                " cancel_requested INTEGER NOT NULL DEFAULT 0,"
+                " pid INTEGER,"
+                " created_at TEXT NOT NULL,"
+                " started_at TEXT,"
+                " finished_at TEXT)"
+            )
+            # DB dari versi sebelum kolom options ada
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(training_jobs)")]
+            if 'options' not in columns:
+                conn.execute("ALTER TABLE training_jobs ADD COLUMN options TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_training_jobs_status "
+                "ON training_jobs (status, created_at)"
+            )
+
+    def _connect(self):
+        """Koneksi per thread dan per proses (aman setelah fork gunicorn)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _row_to_job(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['files'] = json.loads(job['files'])
+        job['options'] = json.loads(job['options']) if job['options'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+
+    def submit(self, kind, files, options=None):
+        """
+        Masukkan job training ke antrian
+
+        Args:
+            kind (str): 'rental' atau 'jual'
+            files (list): List of (type, path) seperti argumen auto_train_*_from_uploads
+            options (dict): Keyword argument tambahan untuk trainer (mis. incremental)
+
+        Returns:
+            str: Job id
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Jenis job training tidak dikenal: {kind}")
+
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO training_jobs (id, kind, files, options, status, message, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', 'Menunggu antrian', ?)",
+                (job_id, kind, json.dumps([list(item) for item in files]),
+                 json.dumps(options) if options else None, datetime.now().isoformat())
+            )
+        return job_id
+
+    def get(self, job_id):
+        """Job sebagai dict (None jika tidak ada)"""
+        row = self._connect().execute(
+            "SELECT * FROM training_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return self._row_to_job(row)
+
+    def list_jobs(self, limit=20, status=None):
+        """Job terbaru dulu"""
+        query = "SELECT * FROM training_jobs"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._row_to_job(row) for row in self._connect().execute(query, params)]
+
+    def claim(self, max_running=1):
+        """
+        Ambil job queued tertua secara atomic (BEGIN IMMEDIATE)
+
+        Returns:
+            dict: Job yang sekarang berstatus running, atau None jika antrian
+            kosong / sudah ada max_running job yang berjalan
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            running = conn.execute(
+                "SELECT COUNT(*) FROM training_jobs WHERE status = 'running'"
+            ).fetchone()[0]
+            row = None
+            if running < max_running:
+                row = conn.execute(
+                    "SELECT * FROM training_jobs WHERE status = 'queued' "
+                    "ORDER BY created_at LIMIT 1"
+                ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE training_jobs SET status = 'running', started_at = ?, "
+                    "message = 'Memulai training' WHERE id = ?",
+                    (datetime.now().isoformat(), row['id'])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row['id']) if row is not None else None
+
+    def set_pid(self, job_id, pid):
+        with self._connect() as conn:
+            conn.execute("UPDATE training_jobs SET pid = ? WHERE id = ?", (pid, job_id))
+
+    def update_progress(self, job_id, progress, message=None):
+        """
+        Simpan progress job (0-1)
+
+        Returns:
+            bool: True jika job diminta dibatalkan
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "UPDATE training_jobs SET progress = ?, message = COALESCE(?, message) "
+                "WHERE id = ? AND status = 'running'",
+                (round(float(progress), 4), message, job_id)
+            )
+        row = conn.execute(
+            "SELECT cancel_requested FROM training_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def finish(self, job_id, status, result=None, error=None, message=None):
+        """Tandai job selesai (hanya jika masih queued/running)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE training_jobs SET status = ?, result = ?, error = ?, "
+                "message = COALESCE(?, message), finished_at = ?, "
+                "progress = CASE WHEN ? = 'succeeded' THEN 1 ELSE progress END "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (status, json.dumps(result, default=str) if result is not None else None,
+                 error, message, datetime.now().isoformat(), status, job_id)
+            )
+
+    def cancel(self, job_id):
+        """
+        Batalkan job: job queued langsung cancelled, job running dihentikan
+        runner (dan dicek di setiap laporan progress)
+
+        Returns:
+            dict: Job setelah diminta batal, atau None jika tidak ada
+        """
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE training_jobs SET status = 'cancelled', cancel_requested = 1, "
+                "message = 'Dibatalkan sebelum dijalankan', finished_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (now, job_id)
+            )
+            conn.execute(
+                "UPDATE training_jobs SET cancel_requested = 1 "
+                "WHERE id = ? AND status = 'running'",
+                (job_id,)
+            )
+        return self.get(job_id)
+
+    def recover_orphans(self):
+        """
+        Job running yang prosesnya sudah tidak ada (host restart, proses
+        di-kill) ditandai failed agar tidak menahan slot antrian
+
+        Returns:
+            int: Jumlah job yang ditandai failed
+        """
+        recovered = 0
+        for job in self.list_jobs(limit=1000, status='running'):
+            if job['pid'] is None:
+                # Baru diklaim, proses belum tercatat (beri waktu runner)
+                started = datetime.fromisoformat(job['started_at'])
+                orphaned = (datetime.now() - started).total_seconds() > 60
+            else:
+                orphaned = not _pid_alive(job['pid'])
+            if orphaned:
+                self.finish(job['id'], 'failed', error='Proses training berhenti tanpa hasil')
+                recovered += 1
+        return recovered
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TrainingJobRunner:
+    """
+    Dispatcher job training
+
+    Satu thread daemon yang secara berkala mengklaim job dari antrian dan
+    menjalankannya sebagai proses anak (`python training_jobs.py run <id>`),
+    memantau permintaan cancel, dan menandai job gagal jika prosesnya mati.
+    Aman dijalankan di setiap worker gunicorn: klaim job bersifat atomic.
+
+    Job running milik runner lain (mis. worker yang sudah di-recycle) yang
+    prosesnya mati dideteksi recover_orphans() setiap orphan_check_interval
+    detik, agar tidak menahan batas job paralel global selamanya.
+    """
+
+    ORPHAN_CHECK_INTERVAL = 30.0
+
+    def __init__(self, queue, max_workers=1, poll_interval=1.0, orphan_check_interval=None):
+        self.queue = queue
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.orphan_check_interval = (
+            self.ORPHAN_CHECK_INTERVAL if orphan_check_interval is None else orphan_check_interval
+        )
+        self._last_orphan_check = None
+        self._processes = {}
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Mulai dispatcher thread (idempotent, dimulai ulang setelah fork)"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='training-jobs', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ Training job runner error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def poll(self):
+        """Satu putaran: pantau proses berjalan lalu klaim job baru jika slot tersedia"""
+        for job_id, process in list(self._processes.items()):
+            job = self.queue.get(job_id)
+            if process.poll() is None:
+                if job is None or job['cancel_requested']:
+                    process.terminate()
+                    try:
+                        process.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        process.kill()
+                    self.queue.finish(job_id, 'cancelled', message='Dibatalkan')
+                    del self._processes[job_id]
+                continue
+
+            # Proses selesai; jika tidak sempat menulis hasil berarti crash
+            self.queue.finish(
+                job_id, 'failed',
+                error=f'Proses training keluar dengan kode {process.returncode}'
+            )
+            del self._processes[job_id]
+
+        now = time.monotonic()
+        if self._last_orphan_check is None or now - self._last_orphan_check >= self.orphan_check_interval:
+            self._last_orphan_check = now
+            recovered = self.queue.recover_orphans()
+            if recovered:
+                print(f"⚠️ {recovered} training job tanpa proses ditandai failed")
+
+        while True:
+            job = self.queue.claim(self.max_workers)
+            if job is None:
+                break
+            process = self._spawn(job)
+            self.queue.set_pid(job['id'], process.pid)
+            self._processes[job['id']] = process
+            print(f"🚀 Training job {job['id']} ({job['kind']}) dimulai, pid {process.pid}")
+
+    
+    def _spawn(self, job):
+        """Proses training terpisah: crash/kill tidak ikut menjatuhkan worker web"""
+        return subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), 'run', job['id'],
+             '--db', str(self.queue.db_path)],
+            cwd=str(PROJECT_ROOT)
+        )
+
+
+def reload_trained_models(model_types, model_base_path=None):
+    """
+    Aktifkan versi terbaru tiap tipe di index dan sentuh CURRENT
+
+    Semua worker memuat versi baru lewat watch ModelRegistry (side slot +
+    smoke test + swap). Versi yang di-pin tidak diganti.
+    """
+    from prediction_system import ModelIndex
+
+    base = Path(model_base_path or PROJECT_ROOT / "model")
+    published = {}
+    for model_type in model_types:
+        index = ModelIndex(base / model_type)
+        if index.read()['versions']:
+            published[model_type] = index.promote_latest()['active']
+    return published
+
+
+def run_job(queue, job_id):
+    """
+    Jalankan satu job di proses ini (dipanggil proses anak runner)
+
+    Returns:
+        str: Status akhir job
+    """
+    job = queue.get(job_id)
+    if job is None or job['status'] != 'running':
+        return job['status'] if job else None
+
+    module_name, function_name, model_types = JOB_KINDS[job['kind']]
+
+    def progress(fraction, message=None):
+        # Cancel dicek di setiap tahap (juga jika runner yang memulai job sudah mati)
+        if queue.update_progress(job_id, fraction, message):
+            raise TrainingJobCancelled()
+
+    try:
+        trainer = getattr(__import__(module_name), function_name)
+        files = [tuple(item) for item in job['files']]
+        results = trainer(files, progress=progress, **job['options'])
+
+        if not results.get('success'):
+            queue.finish(job_id, 'failed', result=results,
+                         error='; '.join(results.get('errors', [])) or 'Training gagal')
+            return 'failed'
+
+        progress(1.0, 'Memuat ulang model di semua worker')
+        results['published_versions'] = reload_trained_models(model_types)
+        queue.finish(job_id, 'succeeded', result=results, message='Selesai')
+        return 'succeeded'
+
+    except TrainingJobCancelled:
+        queue.finish(job_id, 'cancelled', message='Dibatalkan')
+        return 'cancelled'
+    except Exception as e:
+        queue.finish(job_id, 'failed', error=f'{type(e).__name__}: {e}')
+        return 'failed'
+
+
+# Singleton per proses (dibuat saat pertama dipakai)
+_queue = None
+_runner = None
+_lock = threading.Lock()
+
+
+def get_training_queue():
+    global _queue
+    with _lock:
+        if _queue is None:
+            _queue = TrainingJobQueue(os.environ.get('TRAINING_JOB_DB') or DEFAULT_DB_PATH)
+        return _queue
+
+
+def ensure_training_runner():
+    """
+    Pastikan dispatcher berjalan di proses ini
+
+    Dipanggil saat worker boot (post_fork di gunicorn.conf.py, run.py) agar
+    setiap worker - termasuk worker pengganti setelah recycle - mengambil job
+    dari antrian bersama, dan lagi saat job disubmit.
+
+    TRAINING_JOB_RUNNER=external: tidak ada dispatcher di worker web; job
+    dijalankan oleh `python training_jobs.py worker`.
+    """
+    global _runner
+    if os.environ.get('TRAINING_JOB_RUNNER', 'inprocess') == 'external':
+        return None
+    with _lock:
+        if _runner is None:
+            _runner = TrainingJobRunner(
+                get_training_queue(),
+                max_workers=int(os.environ.get('TRAINING_JOB_WORKERS', 1)),
+                poll_interval=float(os.environ.get('TRAINING_JOB_POLL_INTERVAL', 1.0))
+            )
+    _runner.start()
+    return _runner
+
+
+def submit_training_job(kind, files, options=None):
+    """Submit job lalu pastikan ada runner yang akan menjalankannya"""
+    job_id = get_training_queue().submit(kind, files, options)
+    ensure_training_runner()
+    return job_id
+
+
+def main(argv):
+    db_path = None
+    if '--db' in argv:
+        db_path = argv[argv.index('--db') + 1]
+        argv = argv[:argv.index('--db')] + argv[argv.index('--db') + 2:]
+
+    queue = TrainingJobQueue(db_path or os.environ.get('TRAINING_JOB_DB') or DEFAULT_DB_PATH)
+
+    if len(argv) == 2 and argv[0] == 'run':
+        return 0 if run_job(queue, argv[1]) == 'succeeded' else 1
+
+    if len(argv) == 1 and argv[0] == 'worker':
+        runner = TrainingJobRunner(
+            queue,
+            max_workers=int(os.environ.get('TRAINING_JOB_WORKERS', 1)),
+            poll_interval=float(os.environ.get('TRAINING_JOB_POLL_INTERVAL', 1.0))
+        )
+        print(f"🧵 Training job runner aktif ({queue.db_path}), Ctrl+C untuk berhenti")
+        runner.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            runner.stop()
+        return 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))